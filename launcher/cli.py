@@ -43,6 +43,16 @@ def build_parser() -> argparse.ArgumentParser:
     sub_sessions = subparsers.add_parser("sessions", help="Show the number of active Pilot sessions.")
     sub_sessions.add_argument("--json", dest="json_output", action="store_true")
 
+    # Toolchain command
+    sub_toolchain = subparsers.add_parser("toolchain", help="Show the checker toolchains resolved for this session.")
+    sub_toolchain.add_argument("--json", dest="json_output", action="store_true")
+
+    # Coverage command
+    sub_coverage = subparsers.add_parser("coverage", help="Index coverage artifacts for test selection.")
+    sub_coverage.add_argument("paths", nargs="*", help="Coverage artifacts (default: found in the project)")
+    sub_coverage.add_argument("--rebuild", action="store_true", help="Re-read every artifact")
+    sub_coverage.add_argument("--json", dest="json_output", action="store_true")
+
     # Worktree command
     sub_worktree = subparsers.add_parser("worktree", help="Manage spec worktrees.")
     wt_sub = sub_worktree.add_subparsers(dest="wt_command", metavar="SUBCOMMAND")
@@ -71,8 +81,10 @@ def main() -> int:
 
     from .license import cmd_status, cmd_verify, cmd_trial, cmd_activate, cmd_deactivate
     from .context import cmd_check_context
+    from .coverage import cmd_coverage
     from .plan import cmd_register_plan
     from .session import cmd_sessions
+    from .toolchain import cmd_toolchain
     from .worktree import (
         cmd_worktree_create, cmd_worktree_detect, cmd_worktree_diff,
         cmd_worktree_sync, cmd_worktree_cleanup, cmd_worktree_status,
@@ -107,6 +119,12 @@ def main() -> int:
         ),
         "register-plan": lambda: cmd_register_plan(args.plan_path, args.status),
         "sessions": lambda: cmd_sessions(json_output=getattr(args, "json_output", False)),
+        "toolchain": lambda: cmd_toolchain(json_output=getattr(args, "json_output", False)),
+        "coverage": lambda: cmd_coverage(
+            json_output=getattr(args, "json_output", False),
+            paths=getattr(args, "paths", None),
+            rebuild=getattr(args, "rebuild", False),
+        ),
         "statusline": cmd_statusline,
     }
 
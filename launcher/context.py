@@ -5,9 +5,11 @@ from __future__ import annotations
 import json
 import os
 import sys
-import time
 from pathlib import Path
 
+from .context_gauge import read_context_pct
+from .jsonl_tail import last_record
+
 
 def _get_history_path() -> Path:
     config_dir = os.environ.get("CLAUDE_CONFIG_DIR", str(Path.home() / ".claude"))
@@ -19,18 +21,7 @@ def _read_statusline_cache() -> float | None:
     if not session_id:
         return None
 
-    cache_file = Path.home() / ".pilot" / "sessions" / session_id / "context-pct.json"
-    if not cache_file.exists():
-        return None
-
-    try:
-        data = json.loads(cache_file.read_text())
-        ts = data.get("ts")
-        if ts is None or time.time() - ts > 120:
-            return None
-        return float(data.get("pct", 0))
-    except (json.JSONDecodeError, OSError, ValueError, TypeError):
-        return None
+    return read_context_pct(Path.home() / ".pilot" / "sessions" / session_id)
 
 
 def get_context_percentage() -> float:
@@ -38,17 +29,11 @@ def get_context_percentage() -> float:
     if cached is not None:
         return cached
 
-    history = _get_history_path()
-    if not history.exists():
+    last_entry = last_record(_get_history_path())
+    if last_entry is None:
         return 0.0
 
     try:
-        with history.open() as f:
-            lines = f.readlines()
-        if not lines:
-            return 0.0
-
-        last_entry = json.loads(lines[-1])
         tokens_used = last_entry.get("tokensUsed", 0)
         max_tokens = last_entry.get("maxTokens", 200000)
 
@@ -56,7 +41,7 @@ def get_context_percentage() -> float:
             return 0.0
 
         return round((tokens_used / max_tokens) * 100, 1)
-    except (json.JSONDecodeError, OSError, KeyError):
+    except TypeError:
         return 0.0
 
 
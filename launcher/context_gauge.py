@@ -0,0 +1,96 @@
+"""Context gauge — the statusline's context reading in a memory-mapped record.
+
+context.gauge in the session directory is a fixed-size record (magic,
+sequence number, percentage, timestamp, Claude session id) that the
+statusline rewrites in place on every refresh. Writers take an flock and
+follow the seqlock pattern: the sequence number is odd while the record is
+being written and even once it is complete. Readers take no lock; they
+copy the record and retry if the sequence number was odd or changed while
+they read it.
+
+pilot/hooks/_context_gauge.py reads the same record; both sides treat a
+reading older than STALE_AFTER_S as missing.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+GAUGE_FILE = "context.gauge"
+MAGIC = b"PCG1"
+RECORD = struct.Struct("<4s4xQddH64s")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+PAYLOAD = struct.Struct("<ddH64s")
+PAYLOAD_OFFSET = 16
+GAUGE_SIZE = 128
+STALE_AFTER_S = 60.0
+READ_ATTEMPTS = 64
+
+
+@dataclass(frozen=True)
+class GaugeReading:
+    """One complete reading published by the statusline."""
+
+    pct: float
+    ts: float
+    session_id: str
+    seq: int
+
+
+def write_gauge(session_dir: Path, pct: float, session_id: str = "", ts: float | None = None) -> None:
+    """Publish a reading. Raises OSError on failure."""
+    session_dir.mkdir(parents=True, exist_ok=True)
+    encoded = session_id.encode()[:64]
+    fd = os.open(session_dir / GAUGE_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        if os.fstat(fd).st_size < GAUGE_SIZE:
+            os.ftruncate(fd, GAUGE_SIZE)
+        with mmap.mmap(fd, GAUGE_SIZE) as gauge:
+            (seq,) = SEQ.unpack_from(gauge, SEQ_OFFSET)
+            seq = (seq + 1) | 1
+            SEQ.pack_into(gauge, SEQ_OFFSET, seq)
+            gauge[0:4] = MAGIC
+            PAYLOAD.pack_into(gauge, PAYLOAD_OFFSET, pct, time.time() if ts is None else ts, len(encoded), encoded)
+            SEQ.pack_into(gauge, SEQ_OFFSET, seq + 1)
+    finally:
+        os.close(fd)
+
+
+def read_gauge(session_dir: Path) -> GaugeReading | None:
+    """The last complete reading, or None if there is none."""
+    try:
+        fd = os.open(session_dir / GAUGE_FILE, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if os.fstat(fd).st_size < GAUGE_SIZE:
+            return None
+        with mmap.mmap(fd, GAUGE_SIZE, access=mmap.ACCESS_READ) as gauge:
+            for _ in range(READ_ATTEMPTS):
+                magic, seq, pct, ts, length, encoded = RECORD.unpack(gauge[: RECORD.size])
+                if seq % 2 or SEQ.unpack_from(gauge, SEQ_OFFSET)[0] != seq:
+                    continue
+                if magic != MAGIC:
+                    return None
+                return GaugeReading(pct, ts, encoded[:length].decode(errors="replace"), seq)
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+    return None
+
+
+def read_context_pct(session_dir: Path) -> float | None:
+    """Context percentage from the gauge, or None if it is missing or stale."""
+    reading = read_gauge(session_dir)
+    if reading is None or time.time() - reading.ts > STALE_AFTER_S:
+        return None
+    return reading.pct
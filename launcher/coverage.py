@@ -0,0 +1,357 @@
+"""coverage command — ingests coverage artifacts into a line-to-tests index for test selection.
+
+Reads the coverage artifacts of the current project and records, for every
+covered source line, which tests executed it:
+
+- coverage.py data files (.coverage, .coverage.*) with dynamic contexts, e.g.
+  from `pytest --cov --cov-context=test`; each context is one test
+- Go cover profiles (*.out, *.coverprofile); each profile counts as one test
+- Istanbul JSON (coverage/coverage-final.json, .nyc_output/*.json); each
+  file counts as one test
+
+Per source file the index holds sorted, non-overlapping line ranges with the
+tests covering each range, so the hooks can look up the tests for an edited
+line range with a binary search, and the hash of the source the coverage was
+recorded against. Files modified after an artifact covering them was written
+are left out, since their line numbers may no longer match. The index lives in
+<cache dir>/coverage/<project>.json. Artifacts whose mtime and size are
+unchanged since the last run are not read again, and only the files covered
+by new or changed artifacts are re-merged.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import tempfile
+from pathlib import Path
+
+INDEX_VERSION = 2
+SQLITE_HEADER = b"SQLite format 3\x00"
+COVERAGE_PY_GLOBS = (".coverage", ".coverage.*")
+GO_PROFILE_GLOBS = ("*.out", "*.coverprofile", "coverage/*.out", "coverage/*.coverprofile")
+ISTANBUL_GLOBS = ("coverage/coverage-final.json", "coverage/*.json", ".nyc_output/*.json")
+CONTEXT_PHASES = ("|setup", "|run", "|teardown")
+
+
+def _get_cache_dir() -> Path:
+    override = os.environ.get("PILOT_CACHE_DIR", "").strip()
+    return Path(override) if override else Path.home() / ".pilot" / "cache"
+
+
+def find_project_root(start: Path) -> Path:
+    """Nearest directory above start holding .git, or start itself."""
+    current = start.resolve()
+    for directory in (current, *current.parents):
+        if (directory / ".git").exists():
+            return directory
+    return current
+
+
+def get_index_path(root: Path) -> Path:
+    digest = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+    return _get_cache_dir() / "coverage" / f"{digest}.json"
+
+
+def _is_sqlite(path: Path) -> bool:
+    try:
+        with path.open("rb") as f:
+            return f.read(len(SQLITE_HEADER)) == SQLITE_HEADER
+    except OSError:
+        return False
+
+
+def _is_go_profile(path: Path) -> bool:
+    try:
+        with path.open(errors="replace") as f:
+            return f.readline().startswith("mode:")
+    except OSError:
+        return False
+
+
+def find_artifacts(root: Path) -> list[tuple[str, Path]]:
+    """Coverage artifacts in the project, as (kind, path)."""
+    found: dict[Path, str] = {}
+    for pattern in COVERAGE_PY_GLOBS:
+        for path in root.glob(pattern):
+            if path.is_file() and _is_sqlite(path):
+                found[path] = "coverage.py"
+    for pattern in GO_PROFILE_GLOBS:
+        for path in root.glob(pattern):
+            if path.is_file() and _is_go_profile(path):
+                found[path] = "go"
+    for pattern in ISTANBUL_GLOBS:
+        for path in root.glob(pattern):
+            if path.is_file() and path not in found:
+                found[path] = "istanbul"
+    return sorted(((kind, path) for path, kind in found.items()), key=lambda item: str(item[1]))
+
+
+def numbits_to_lines(numbits: bytes) -> list[int]:
+    """Decode coverage.py's numbits: bit j of byte i marks line i * 8 + j."""
+    return [index * 8 + bit for index, byte in enumerate(numbits) if byte for bit in range(8) if byte & (1 << bit)]
+
+
+def _relative(path: str, root: Path) -> str | None:
+    try:
+        return Path(path).resolve().relative_to(root).as_posix()
+    except (ValueError, OSError):
+        return None
+
+
+def read_coverage_py(path: Path, root: Path, label: str) -> dict[str, dict[str, set[int]]]:
+    """Lines per file and context from a coverage.py SQLite data file."""
+    lines: dict[str, dict[str, set[int]]] = {}
+    with sqlite3.connect(f"file:{path}?mode=ro", uri=True) as db:
+        rows = db.execute(
+            "SELECT file.path, context.context, line_bits.numbits FROM line_bits"
+            " JOIN file ON file.id = line_bits.file_id JOIN context ON context.id = line_bits.context_id"
+        )
+        for file_path, context, numbits in rows:
+            rel = _relative(file_path, root)
+            if rel is None:
+                continue
+            for phase in CONTEXT_PHASES:
+                context = context.removesuffix(phase)
+            lines.setdefault(rel, {}).setdefault(context or label, set()).update(numbits_to_lines(numbits))
+    return lines
+
+
+def _go_modules(root: Path) -> dict[str, Path]:
+    modules = {}
+    for go_mod in [root / "go.mod", *root.glob("*/go.mod")]:
+        try:
+            text = go_mod.read_text(errors="replace")
+        except OSError:
+            continue
+        for line in text.splitlines():
+            if line.startswith("module "):
+                modules[line.split()[1]] = go_mod.parent
+                break
+    return modules
+
+
+def read_go_profile(path: Path, root: Path, label: str) -> dict[str, dict[str, set[int]]]:
+    """Covered lines per file from a Go cover profile (file.go:l.c,l.c statements count)."""
+    modules = _go_modules(root)
+    lines: dict[str, dict[str, set[int]]] = {}
+    with path.open(errors="replace") as f:
+        next(f, None)
+        for line in f:
+            location, _, counts = line.strip().rpartition(" ")
+            file_name, _, span = location.rpartition(":")
+            if not span or counts in ("", "0"):
+                continue
+            try:
+                start = int(span.split(",")[0].split(".")[0])
+                end = int(span.split(",")[1].split(".")[0])
+            except (IndexError, ValueError):
+                continue
+            rel = None
+            for module, module_dir in modules.items():
+                if file_name.startswith(module + "/"):
+                    rel = _relative(str(module_dir / file_name[len(module) + 1 :]), root)
+                    break
+            if rel is None:
+                rel = _relative(file_name, root) if os.path.isabs(file_name) else None
+            if rel is not None:
+                lines.setdefault(rel, {}).setdefault(label, set()).update(range(start, end + 1))
+    return lines
+
+
+def read_istanbul(path: Path, root: Path, label: str) -> dict[str, dict[str, set[int]]]:
+    """Lines of executed statements per file from an Istanbul coverage JSON."""
+    data = json.loads(path.read_text())
+    lines: dict[str, dict[str, set[int]]] = {}
+    if not isinstance(data, dict):
+        return lines
+    for file_path, file_coverage in data.items():
+        if not isinstance(file_coverage, dict) or "statementMap" not in file_coverage:
+            continue
+        rel = _relative(file_coverage.get("path", file_path), root)
+        if rel is None:
+            continue
+        counts = file_coverage.get("s", {})
+        for statement_id, location in file_coverage["statementMap"].items():
+            if counts.get(statement_id):
+                start = location["start"]["line"]
+                end = location.get("end", {}).get("line") or start
+                lines.setdefault(rel, {}).setdefault(label, set()).update(range(start, end + 1))
+    return lines
+
+
+READERS = {"coverage.py": read_coverage_py, "go": read_go_profile, "istanbul": read_istanbul}
+
+
+def _to_ranges(lines: set[int]) -> list[list[int]]:
+    ranges: list[list[int]] = []
+    for line in sorted(lines):
+        if ranges and ranges[-1][1] == line - 1:
+            ranges[-1][1] = line
+        else:
+            ranges.append([line, line])
+    return ranges
+
+
+def merge_file(artifacts: dict[str, dict], rel: str, context_ids: dict[str, int]) -> dict | None:
+    """Sorted, non-overlapping line ranges of one file with the test ids covering each."""
+    covering: dict[int, set[int]] = {}
+    for artifact in artifacts.values():
+        for context, ranges in artifact["lines"].get(rel, {}).items():
+            context_id = context_ids[context]
+            for start, end in ranges:
+                for line in range(start, end + 1):
+                    covering.setdefault(line, set()).add(context_id)
+    if not covering:
+        return None
+    starts: list[int] = []
+    ends: list[int] = []
+    tests: list[list[int]] = []
+    for line in sorted(covering):
+        ids = sorted(covering[line])
+        if ends and ends[-1] == line - 1 and tests[-1] == ids:
+            ends[-1] = line
+        else:
+            starts.append(line)
+            ends.append(line)
+            tests.append(ids)
+    return {"starts": starts, "ends": ends, "tests": tests}
+
+
+def source_sha(path: Path, recorded_ns: int) -> str | None:
+    """Content hash of a covered source file, or None if it changed after its coverage was recorded."""
+    try:
+        if path.stat().st_mtime_ns > recorded_ns:
+            return None
+        return hashlib.sha256(path.read_bytes()).hexdigest()
+    except OSError:
+        return None
+
+
+def _empty_index(root: Path) -> dict:
+    return {"version": INDEX_VERSION, "root": str(root), "contexts": [], "artifacts": {}, "files": {}}
+
+
+def load_index(root: Path) -> dict:
+    try:
+        index = json.loads(get_index_path(root).read_text())
+    except (OSError, json.JSONDecodeError):
+        return _empty_index(root)
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return _empty_index(root)
+    return index
+
+
+def update_index(root: Path, artifacts: list[tuple[str, Path]] | None = None, rebuild: bool = False) -> dict:
+    """Ingest new and changed artifacts into the project's index. Returns a summary.
+
+    Artifacts given explicitly are merged into the stored ones; otherwise the
+    project is scanned and stored artifacts that are gone are dropped.
+    """
+    root = root.resolve()
+    index = _empty_index(root) if rebuild else load_index(root)
+    stored: dict[str, dict] = index["artifacts"]
+    current: dict[str, dict] = {} if artifacts is None else dict(stored)
+    artifacts = find_artifacts(root) if artifacts is None else artifacts
+
+    changed_files: set[str] = set()
+    updated = 0
+    for kind, path in artifacts:
+        key = str(path.resolve())
+        try:
+            stat = path.stat()
+        except OSError:
+            continue
+        previous = stored.get(key)
+        signature = (kind, stat.st_mtime_ns, stat.st_size)
+        if previous and (previous["kind"], previous["mtime"], previous["size"]) == signature:
+            current[key] = previous
+            continue
+        label = _relative(key, root) or path.name
+        try:
+            lines = READERS[kind](path, root, label)
+        except (OSError, ValueError, KeyError, TypeError, sqlite3.Error):
+            continue
+        current[key] = {
+            "kind": kind,
+            "mtime": stat.st_mtime_ns,
+            "size": stat.st_size,
+            "lines": {
+                rel: {ctx: _to_ranges(ls) for ctx, ls in by_context.items()} for rel, by_context in lines.items()
+            },
+        }
+        changed_files.update(current[key]["lines"])
+        if previous:
+            changed_files.update(previous["lines"])
+        updated += 1
+    for key, previous in stored.items():
+        if key not in current:
+            changed_files.update(previous["lines"])
+
+    contexts: list[str] = index["contexts"]
+    context_ids = {name: i for i, name in enumerate(contexts)}
+    for artifact in current.values():
+        for by_context in artifact["lines"].values():
+            for context in by_context:
+                if context not in context_ids:
+                    context_ids[context] = len(contexts)
+                    contexts.append(context)
+
+    index["artifacts"] = current
+    for rel in changed_files:
+        merged = merge_file(current, rel, context_ids)
+        if merged is not None:
+            recorded_ns = min(artifact["mtime"] for artifact in current.values() if rel in artifact["lines"])
+            merged["sha"] = source_sha(root / rel, recorded_ns)
+        if merged is None or merged["sha"] is None:
+            index["files"].pop(rel, None)
+        else:
+            index["files"][rel] = merged
+
+    index_path = get_index_path(root)
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=index_path.parent, prefix=".coverage-", suffix=".tmp")
+    with os.fdopen(fd, "w") as f:
+        json.dump(index, f, separators=(",", ":"))
+    os.replace(tmp_name, index_path)
+
+    used = {i for entry in index["files"].values() for ids in entry["tests"] for i in ids}
+    return {
+        "root": str(root),
+        "index": str(index_path),
+        "artifacts": len(current),
+        "updated": updated,
+        "files": len(index["files"]),
+        "tests": len(used),
+    }
+
+
+def cmd_coverage(json_output: bool = False, paths: list[str] | None = None, rebuild: bool = False) -> int:
+    root = find_project_root(Path.cwd())
+    artifacts = None
+    if paths:
+        artifacts = []
+        for raw in paths:
+            path = Path(raw)
+            if _is_sqlite(path):
+                artifacts.append(("coverage.py", path))
+            elif _is_go_profile(path):
+                artifacts.append(("go", path))
+            elif path.is_file():
+                artifacts.append(("istanbul", path))
+    summary = update_index(root, artifacts, rebuild)
+    if json_output:
+        print(json.dumps(summary))
+        return 0
+
+    if not summary["artifacts"]:
+        print(f"No coverage artifacts found in {root}.")
+        return 0
+    print(
+        f"Indexed {summary['files']} files covered by {summary['tests']} tests "
+        f"from {summary['artifacts']} artifacts ({summary['updated']} updated)."
+    )
+    print(f"Index: {summary['index']}")
+    return 0
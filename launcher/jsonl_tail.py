@@ -0,0 +1,58 @@
+"""Read JSONL files from the end — the newest records of an append-only log.
+
+~/.claude/history.jsonl grows without bound, but the statusline and
+check-context only need its last record. iter_records_reverse() seeks back
+from the end of the file one block at a time and yields complete records
+newest first, so reading the last record costs one block read whatever the
+size of the file, and the caller stops reading by stopping the iteration.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+from collections.abc import Iterator
+from pathlib import Path
+
+BLOCK_SIZE = 64 * 1024
+
+
+def iter_lines_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[bytes]:
+    """Yield the non-empty lines of path, last line first, without their newline."""
+    with path.open("rb") as f:
+        pos = f.seek(0, os.SEEK_END)
+        partial = b""
+        while pos > 0:
+            size = min(block_size, pos)
+            pos -= size
+            f.seek(pos)
+            lines = (f.read(size) + partial).split(b"\n")
+            partial = lines[0]
+            for line in reversed(lines[1:]):
+                if line.strip():
+                    yield line
+        if partial.strip():
+            yield partial
+
+
+def iter_records_reverse(path: Path, block_size: int = BLOCK_SIZE) -> Iterator[dict]:
+    """Yield the JSON object records of path, newest first.
+
+    Lines that are not JSON objects (including a record still being written)
+    are skipped. Raises OSError if path cannot be read.
+    """
+    for line in iter_lines_reverse(path, block_size):
+        try:
+            record = json.loads(line)
+        except ValueError:
+            continue
+        if isinstance(record, dict):
+            yield record
+
+
+def last_record(path: Path) -> dict | None:
+    """The newest JSON object record of path, or None if it has none or cannot be read."""
+    try:
+        return next(iter_records_reverse(path), None)
+    except OSError:
+        return None
@@ -4,9 +4,12 @@ from __future__ import annotations
 
 import json
 import os
+import sqlite3
 import sys
 from pathlib import Path
 
+from .session_state import write_value
+
 VALID_STATUSES = {"PENDING", "COMPLETE", "VERIFIED"}
 
 
@@ -24,7 +27,13 @@ def cmd_register_plan(plan_path: str, status: str) -> int:
     session_dir = _get_session_dir()
     session_dir.mkdir(parents=True, exist_ok=True)
 
-    plan_file = session_dir / "active_plan.json"
     data = {"plan_path": plan_path, "status": status}
+    try:
+        write_value(session_dir, "active_plan", data)
+    except (OSError, sqlite3.Error) as e:
+        print(f"Failed to register plan: {e}", file=sys.stderr)
+        return 1
+    # Exported for the console, which reads the plan path from this file.
+    plan_file = session_dir / "active_plan.json"
     plan_file.write_text(json.dumps(data, indent=2))
     return 0
@@ -0,0 +1,61 @@
+"""Session state store shared with the hooks — state.db in the session directory.
+
+Same database as pilot/hooks/_session_state.py: a SQLite table in WAL mode
+holding one JSON value per key (active_plan, ...). The launcher
+reads and writes single keys; importing the legacy per-key JSON files is left
+to the hooks, which never overwrite a key the launcher already wrote.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from pathlib import Path
+
+STATE_FILE = "state.db"
+BUSY_TIMEOUT_S = 5.0
+
+
+def get_session_dir() -> Path:
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return Path.home() / ".pilot" / "sessions" / session_id
+
+
+def _connect(session_dir: Path) -> sqlite3.Connection:
+    session_dir.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(session_dir / STATE_FILE, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+    except sqlite3.Error:
+        db.close()
+        raise
+    return db
+
+
+def read_value(session_dir: Path, key: str):
+    """The stored value of key, or None if it is missing or unreadable."""
+    if not (session_dir / STATE_FILE).exists():
+        return None
+    try:
+        db = _connect(session_dir)
+    except (OSError, sqlite3.Error):
+        return None
+    try:
+        row = db.execute("SELECT value FROM state WHERE key = ?", (key,)).fetchone()
+        return json.loads(row[0]) if row else None
+    except (sqlite3.Error, ValueError):
+        return None
+    finally:
+        db.close()
+
+
+def write_value(session_dir: Path, key: str, value) -> None:
+    """Store value under key in one statement. Raises OSError or sqlite3.Error on failure."""
+    db = _connect(session_dir)
+    try:
+        db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, json.dumps(value, sort_keys=True)))
+    finally:
+        db.close()
@@ -5,9 +5,11 @@ from __future__ import annotations
 import json
 import os
 import sys
-import time
 from pathlib import Path
 
+from .context_gauge import write_gauge
+from .jsonl_tail import last_record
+
 
 def _get_session_cache_dir() -> Path:
     session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
@@ -15,17 +17,10 @@ def _get_session_cache_dir() -> Path:
 
 
 def _get_claude_session_id() -> str:
-    history = Path.home() / ".claude" / "history.jsonl"
-    if not history.exists():
+    last_entry = last_record(Path.home() / ".claude" / "history.jsonl")
+    if last_entry is None:
         return ""
-    try:
-        with history.open() as f:
-            lines = f.readlines()
-            if lines:
-                return json.loads(lines[-1]).get("sessionId", "")
-    except (json.JSONDecodeError, OSError):
-        pass
-    return ""
+    return last_entry.get("sessionId", "")
 
 
 def _read_stdin() -> str:
@@ -38,13 +33,8 @@ def _read_stdin() -> str:
 
 
 def write_context_cache(pct: float, cc_session_id: str = "") -> None:
-    cache_dir = _get_session_cache_dir()
-    cache_dir.mkdir(parents=True, exist_ok=True)
-
-    cache_file = cache_dir / "context-pct.json"
-    data = {"pct": pct, "ts": time.time(), "session_id": cc_session_id}
     try:
-        cache_file.write_text(json.dumps(data))
+        write_gauge(_get_session_cache_dir(), pct, cc_session_id)
     except OSError:
         pass
 
@@ -3,10 +3,12 @@
 from __future__ import annotations
 
 import json
+import time
 from pathlib import Path
 from unittest.mock import patch
 
 from launcher.context import cmd_check_context, get_context_percentage
+from launcher.context_gauge import write_gauge
 
 
 def test_check_context_json_output(capsys, tmp_path):
@@ -36,3 +38,30 @@ def test_check_context_threshold_exceeded(capsys, tmp_path):
     with patch("launcher.context.get_context_percentage", return_value=85.0):
         result = cmd_check_context(json_output=True, threshold=80)
     assert result == 1
+
+
+def test_reads_context_pct_from_gauge(tmp_path, monkeypatch):
+    monkeypatch.setenv("PILOT_SESSION_ID", "test-session")
+    with patch("launcher.context.Path.home", return_value=tmp_path):
+        write_gauge(tmp_path / ".pilot" / "sessions" / "test-session", 37.5)
+        assert get_context_percentage() == 37.5
+
+
+def test_stale_gauge_falls_back_to_history(tmp_path, monkeypatch):
+    monkeypatch.setenv("PILOT_SESSION_ID", "test-session")
+    write_gauge(tmp_path / ".pilot" / "sessions" / "test-session", 37.5, ts=time.time() - 61)
+    with patch("launcher.context.Path.home", return_value=tmp_path):
+        with patch("launcher.context._get_history_path", return_value=tmp_path / "nonexistent"):
+            assert get_context_percentage() == 0.0
+
+
+def test_reads_last_history_entry(tmp_path):
+    history = tmp_path / "history.jsonl"
+    history.write_text(
+        json.dumps({"tokensUsed": 10000, "maxTokens": 200000})
+        + "\n"
+        + json.dumps({"tokensUsed": 50000, "maxTokens": 200000})
+        + "\n"
+    )
+    with patch("launcher.context._get_history_path", return_value=history):
+        assert get_context_percentage() == 25.0
@@ -0,0 +1,51 @@
+"""Tests for the memory-mapped context gauge."""
+
+from __future__ import annotations
+
+import multiprocessing
+
+from launcher.context_gauge import GAUGE_FILE, GAUGE_SIZE, read_context_pct, read_gauge, write_gauge
+
+
+def _write_many(session_dir, count):
+    for n in range(1, count + 1):
+        write_gauge(session_dir, float(n), f"cc-{n}", ts=float(n))
+
+
+def test_write_then_read(tmp_path):
+    write_gauge(tmp_path, 42.5, "cc-1", ts=100.0)
+
+    reading = read_gauge(tmp_path)
+
+    assert (reading.pct, reading.ts, reading.session_id, reading.seq) == (42.5, 100.0, "cc-1", 2)
+    assert (tmp_path / GAUGE_FILE).stat().st_size == GAUGE_SIZE
+
+
+def test_rewrites_in_place(tmp_path):
+    write_gauge(tmp_path, 10.0, "a-much-longer-session-id")
+    inode = (tmp_path / GAUGE_FILE).stat().st_ino
+
+    write_gauge(tmp_path, 20.0, "short")
+
+    reading = read_gauge(tmp_path)
+    assert (reading.pct, reading.session_id, reading.seq) == (20.0, "short", 4)
+    assert (tmp_path / GAUGE_FILE).stat().st_ino == inode
+
+
+def test_missing_gauge(tmp_path):
+    assert read_gauge(tmp_path) is None
+    assert read_context_pct(tmp_path) is None
+
+
+def test_readers_never_see_a_torn_record(tmp_path):
+    write_gauge(tmp_path, 0.0, "cc-0", ts=0.0)
+    writer = multiprocessing.get_context("fork").Process(target=_write_many, args=(tmp_path, 2000))
+    writer.start()
+    while writer.is_alive():
+        reading = read_gauge(tmp_path)
+        if reading is not None:
+            assert reading.ts == reading.pct
+            assert reading.session_id == f"cc-{int(reading.pct)}"
+    writer.join()
+
+    assert read_gauge(tmp_path).pct == 2000.0
@@ -0,0 +1,210 @@
+"""Tests for coverage command."""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+
+import pytest
+
+from launcher.coverage import (
+    cmd_coverage,
+    find_artifacts,
+    load_index,
+    numbits_to_lines,
+    read_go_profile,
+    update_index,
+)
+
+
+@pytest.fixture(autouse=True)
+def _cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setenv("PILOT_CACHE_DIR", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = tmp_path / "project"
+    (root / ".git").mkdir(parents=True)
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("\n" * 20)
+    return root.resolve()
+
+
+def _numbits(lines):
+    data = bytearray(max(lines) // 8 + 1)
+    for line in lines:
+        data[line // 8] |= 1 << (line % 8)
+    return bytes(data)
+
+
+def _write_coverage_db(path, rows):
+    """A coverage.py data file: rows of (file path, context, lines)."""
+    if path.exists():
+        path.unlink()
+    with sqlite3.connect(path) as db:
+        db.execute("CREATE TABLE file (id INTEGER PRIMARY KEY, path TEXT)")
+        db.execute("CREATE TABLE context (id INTEGER PRIMARY KEY, context TEXT)")
+        db.execute("CREATE TABLE line_bits (file_id INTEGER, context_id INTEGER, numbits BLOB)")
+        files: dict[str, int] = {}
+        contexts: dict[str, int] = {}
+        for file_path, context, lines in rows:
+            file_id = files.setdefault(file_path, len(files) + 1)
+            context_id = contexts.setdefault(context, len(contexts) + 1)
+            db.execute("INSERT OR IGNORE INTO file VALUES (?, ?)", (file_id, file_path))
+            db.execute("INSERT OR IGNORE INTO context VALUES (?, ?)", (context_id, context))
+            db.execute("INSERT INTO line_bits VALUES (?, ?, ?)", (file_id, context_id, _numbits(lines)))
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+def test_numbits_to_lines():
+    assert numbits_to_lines(_numbits([1, 7, 8, 20])) == [1, 7, 8, 20]
+
+
+def test_coverage_py_contexts_become_tests(project):
+    app = str(project / "src" / "app.py")
+    _write_coverage_db(
+        project / ".coverage",
+        [
+            (app, "tests/test_app.py::test_a|run", [1, 2, 3, 10]),
+            (app, "tests/test_app.py::test_b|run", [3, 4]),
+            (app, "tests/test_app.py::test_b|setup", [5]),
+            ("/elsewhere/lib.py", "tests/test_app.py::test_a|run", [1]),
+        ],
+    )
+
+    summary = update_index(project)
+
+    assert summary["artifacts"] == 1
+    assert summary["files"] == 1
+    assert summary["tests"] == 2
+    index = load_index(project)
+    contexts = index["contexts"]
+    entry = index["files"]["src/app.py"]
+    ranges = [
+        (start, end, sorted(contexts[i] for i in ids))
+        for start, end, ids in zip(entry["starts"], entry["ends"], entry["tests"])
+    ]
+    assert ranges == [
+        (1, 2, ["tests/test_app.py::test_a"]),
+        (3, 3, ["tests/test_app.py::test_a", "tests/test_app.py::test_b"]),
+        (4, 5, ["tests/test_app.py::test_b"]),
+        (10, 10, ["tests/test_app.py::test_a"]),
+    ]
+
+
+def test_unchanged_artifacts_are_not_read_again(project):
+    app = str(project / "src" / "app.py")
+    _write_coverage_db(project / ".coverage", [(app, "test_a", [1])])
+    assert update_index(project)["updated"] == 1
+
+    assert update_index(project)["updated"] == 0
+
+    _write_coverage_db(project / ".coverage", [(app, "test_a", [1]), (app, "test_b", [2])])
+    _bump_mtime(project / ".coverage")
+    summary = update_index(project)
+    assert summary["updated"] == 1
+    assert summary["tests"] == 2
+
+
+def test_removed_artifact_drops_its_files(project):
+    (project / "src" / "other.py").write_text("x = 1\n")
+    _write_coverage_db(project / ".coverage", [(str(project / "src" / "app.py"), "test_a", [1])])
+    _write_coverage_db(project / ".coverage.worker1", [(str(project / "src" / "other.py"), "test_b", [1])])
+    assert update_index(project)["files"] == 2
+
+    (project / ".coverage.worker1").unlink()
+
+    update_index(project)
+
+    assert list(load_index(project)["files"]) == ["src/app.py"]
+
+
+def test_named_artifacts_merge_into_stored_ones(project):
+    (project / "src" / "other.py").write_text("x = 1\n")
+    _write_coverage_db(project / ".coverage", [(str(project / "src" / "app.py"), "test_a", [1])])
+    _write_coverage_db(project / ".coverage.worker1", [(str(project / "src" / "other.py"), "test_b", [1])])
+    update_index(project)
+
+    _write_coverage_db(project / ".coverage.worker1", [(str(project / "src" / "other.py"), "test_c", [1])])
+    _bump_mtime(project / ".coverage.worker1")
+    summary = update_index(project, [("coverage.py", project / ".coverage.worker1")])
+
+    assert summary["artifacts"] == 2
+    assert sorted(load_index(project)["files"]) == ["src/app.py", "src/other.py"]
+
+
+def test_source_modified_after_artifact_is_left_out(project):
+    _write_coverage_db(project / ".coverage", [(str(project / "src" / "app.py"), "test_a", [1])])
+    _bump_mtime(project / "src" / "app.py")
+
+    update_index(project)
+
+    assert load_index(project)["files"] == {}
+
+
+def test_go_profile(project):
+    (project / "go.mod").write_text("module example.com/app\n")
+    (project / "store").mkdir()
+    (project / "store" / "store.go").write_text("package store\n")
+    profile = project / "cover.out"
+    profile.write_text(
+        "mode: set\n"
+        "example.com/app/store/store.go:3.20,5.2 2 1\n"
+        "example.com/app/store/store.go:7.20,9.2 2 0\n"
+        "github.com/other/lib/lib.go:1.1,2.2 1 1\n"
+    )
+
+    lines = read_go_profile(profile, project, "cover.out")
+
+    assert lines == {"store/store.go": {"cover.out": {3, 4, 5}}}
+
+
+def test_istanbul_json(project):
+    (project / "src" / "app.ts").write_text("\n" * 10)
+    report = project / "coverage" / "coverage-final.json"
+    report.parent.mkdir()
+    report.write_text(
+        json.dumps(
+            {
+                str(project / "src" / "app.ts"): {
+                    "path": str(project / "src" / "app.ts"),
+                    "statementMap": {
+                        "0": {"start": {"line": 2, "column": 0}, "end": {"line": 3, "column": 1}},
+                        "1": {"start": {"line": 6, "column": 0}, "end": {"line": 6, "column": 9}},
+                    },
+                    "s": {"0": 4, "1": 0},
+                }
+            }
+        )
+    )
+
+    assert find_artifacts(project) == [("istanbul", report)]
+    update_index(project)
+
+    entry = load_index(project)["files"]["src/app.ts"]
+    assert (entry["starts"], entry["ends"]) == ([2], [3])
+
+
+def test_cmd_coverage_json(project, monkeypatch, capsys):
+    _write_coverage_db(project / ".coverage", [(str(project / "src" / "app.py"), "test_a", [1])])
+    monkeypatch.chdir(project / "src")
+
+    assert cmd_coverage(json_output=True) == 0
+
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["root"] == str(project)
+    assert summary["files"] == 1
+
+
+def test_cmd_coverage_without_artifacts(project, monkeypatch, capsys):
+    monkeypatch.chdir(project)
+
+    assert cmd_coverage() == 0
+
+    assert "No coverage artifacts" in capsys.readouterr().out
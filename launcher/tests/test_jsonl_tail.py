@@ -0,0 +1,64 @@
+"""Tests for the reverse JSONL tail reader."""
+
+from __future__ import annotations
+
+import json
+
+import pytest
+
+from launcher.jsonl_tail import iter_lines_reverse, iter_records_reverse, last_record
+
+
+def _write(path, records, trailer=""):
+    path.write_text("".join(json.dumps(record) + "\n" for record in records) + trailer)
+
+
+@pytest.mark.parametrize("block_size", [1, 7, 64, 64 * 1024])
+def test_records_newest_first_at_any_block_size(tmp_path, block_size):
+    history = tmp_path / "history.jsonl"
+    records = [{"n": n, "text": "x" * n} for n in range(50)]
+    _write(history, records)
+
+    assert list(iter_records_reverse(history, block_size)) == records[::-1]
+
+
+def test_skips_blank_lines_and_partial_record(tmp_path):
+    history = tmp_path / "history.jsonl"
+    _write(history, [{"n": 1}, {"n": 2}], trailer='\n\n[1, 2]\n{"n": 3, "te')
+
+    assert list(iter_records_reverse(history, block_size=4)) == [{"n": 2}, {"n": 1}]
+
+
+def test_last_line_without_newline(tmp_path):
+    history = tmp_path / "history.jsonl"
+    history.write_text('{"n": 1}\n{"n": 2}')
+
+    assert list(iter_lines_reverse(history)) == [b'{"n": 2}', b'{"n": 1}']
+
+
+def test_stops_reading_when_the_caller_does(tmp_path):
+    history = tmp_path / "history.jsonl"
+    _write(history, [{"n": n} for n in range(10_000)])
+    reads = []
+
+    class CountingPath(type(history)):
+        def open(self, *args, **kwargs):
+            f = super().open(*args, **kwargs)
+            read = f.read
+
+            def counted(size=-1):
+                reads.append(size)
+                return read(size)
+
+            f.read = counted
+            return f
+
+    assert last_record(CountingPath(history)) == {"n": 9999}
+    assert len(reads) == 1
+
+
+def test_last_record_missing_or_empty(tmp_path):
+    assert last_record(tmp_path / "missing.jsonl") is None
+
+    (tmp_path / "empty.jsonl").write_text("")
+    assert last_record(tmp_path / "empty.jsonl") is None
@@ -7,6 +7,7 @@ from pathlib import Path
 from unittest.mock import patch
 
 from launcher.plan import cmd_register_plan
+from launcher.session_state import read_value
 
 
 def test_register_plan_creates_file(tmp_path):
@@ -20,6 +21,7 @@ def test_register_plan_creates_file(tmp_path):
     data = json.loads(plan_file.read_text())
     assert data["plan_path"] == "docs/plans/my-plan.md"
     assert data["status"] == "PENDING"
+    assert read_value(session_dir, "active_plan") == data
 
 
 def test_register_plan_updates_existing(tmp_path):
@@ -6,7 +6,8 @@ import json
 from pathlib import Path
 from unittest.mock import patch
 
-from launcher.statusline_cmd import cmd_statusline, write_context_cache
+from launcher.context_gauge import read_gauge
+from launcher.statusline_cmd import _get_claude_session_id, cmd_statusline, write_context_cache
 
 
 def test_write_context_cache(tmp_path):
@@ -14,12 +15,10 @@ def test_write_context_cache(tmp_path):
     with patch("launcher.statusline_cmd._get_session_cache_dir", return_value=cache_dir):
         write_context_cache(42.5, "test-cc-session")
 
-    cache_file = cache_dir / "context-pct.json"
-    assert cache_file.exists()
-    data = json.loads(cache_file.read_text())
-    assert data["pct"] == 42.5
-    assert "ts" in data
-    assert data["session_id"] == "test-cc-session"
+    reading = read_gauge(cache_dir)
+    assert reading.pct == 42.5
+    assert reading.ts > 0
+    assert reading.session_id == "test-cc-session"
 
 
 def test_statusline_outputs_text(capsys, tmp_path):
@@ -31,3 +30,11 @@ def test_statusline_outputs_text(capsys, tmp_path):
     assert result == 0
     captured = capsys.readouterr()
     assert "%" in captured.out
+
+
+def test_claude_session_id_from_last_history_entry(tmp_path):
+    history = tmp_path / ".claude" / "history.jsonl"
+    history.parent.mkdir()
+    history.write_text(json.dumps({"sessionId": "old"}) + "\n" + json.dumps({"sessionId": "new"}) + "\n")
+    with patch("launcher.statusline_cmd.Path.home", return_value=tmp_path):
+        assert _get_claude_session_id() == "new"
@@ -0,0 +1,68 @@
+"""Tests for toolchain command."""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+from launcher.toolchain import cmd_toolchain, load_toolchains
+
+
+def _write_entry(toolchain_file, root, tools, state):
+    toolchain_file.parent.mkdir(parents=True, exist_ok=True)
+    entry = {"language": "go", "directory": str(root), "root": str(root), "tools": tools, "state": state}
+    toolchain_file.write_text(json.dumps({"entries": {f"go:{root}": entry}}))
+
+
+def test_no_toolchains(capsys, tmp_path):
+    with patch("launcher.toolchain._get_toolchain_path", return_value=tmp_path / "toolchain.json"):
+        result = cmd_toolchain()
+    assert result == 0
+    assert "No toolchains" in capsys.readouterr().out
+
+
+def test_fresh_entry_with_version(tmp_path):
+    toolchain_file = tmp_path / "toolchain.json"
+    (tmp_path / "go.mod").write_text("module x\n")
+    state = {
+        "path": os.environ.get("PATH", ""),
+        "mtimes": {
+            "package.json": None,
+            "node_modules/.bin": None,
+            "go.mod": (tmp_path / "go.mod").stat().st_mtime_ns,
+            "pyproject.toml": None,
+        },
+    }
+    _write_entry(toolchain_file, tmp_path, {"go": "/usr/bin/go", "golangci-lint": None}, state)
+
+    with (
+        patch("launcher.toolchain._get_toolchain_path", return_value=toolchain_file),
+        patch("launcher.toolchain.tool_version", return_value="go version go1.22.0"),
+    ):
+        toolchains = load_toolchains()
+
+    assert toolchains == [
+        {
+            "language": "go",
+            "root": str(tmp_path),
+            "fresh": True,
+            "tools": {
+                "go": {"path": "/usr/bin/go", "version": "go version go1.22.0"},
+                "golangci-lint": {"path": None, "version": None},
+            },
+        }
+    ]
+
+
+def test_text_output_marks_stale_entries(capsys, tmp_path):
+    toolchain_file = tmp_path / "toolchain.json"
+    _write_entry(toolchain_file, tmp_path, {"go": None}, {"path": "/old", "mtimes": {}})
+
+    with patch("launcher.toolchain._get_toolchain_path", return_value=toolchain_file):
+        result = cmd_toolchain()
+
+    assert result == 0
+    out = capsys.readouterr().out
+    assert f"go: {tmp_path} (stale)" in out
+    assert "not found" in out
@@ -0,0 +1,85 @@
+"""toolchain command — prints the checker toolchains resolved for this session."""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+from pathlib import Path
+
+WATCHED_PATHS = ("package.json", "node_modules/.bin", "go.mod", "pyproject.toml")
+
+
+def _get_toolchain_path() -> Path:
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return Path.home() / ".pilot" / "sessions" / session_id / "toolchain.json"
+
+
+def _is_fresh(entry: dict) -> bool:
+    directory = Path(entry.get("root") or entry.get("directory") or ".")
+    mtimes = {}
+    for name in WATCHED_PATHS:
+        try:
+            mtimes[name] = (directory / name).stat().st_mtime_ns
+        except OSError:
+            mtimes[name] = None
+    return entry.get("state") == {"path": os.environ.get("PATH", ""), "mtimes": mtimes}
+
+
+def tool_version(binary: str) -> str | None:
+    """First line of `binary --version`, or None if it cannot be run."""
+    try:
+        result = subprocess.run([binary, "--version"], capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    output = (result.stdout or result.stderr).strip()
+    return output.splitlines()[0] if output else None
+
+
+def load_toolchains() -> list[dict]:
+    """Cached toolchains, one per language and project root, with tool versions."""
+    try:
+        data = json.loads(_get_toolchain_path().read_text())
+    except (OSError, json.JSONDecodeError):
+        return []
+    entries = data.get("entries") if isinstance(data, dict) else None
+    if not isinstance(entries, dict):
+        return []
+
+    by_project: dict[tuple[str, str], dict] = {}
+    for entry in entries.values():
+        if not isinstance(entry, dict):
+            continue
+        key = (entry.get("language", ""), entry.get("root") or entry.get("directory", ""))
+        if key in by_project:
+            continue
+        by_project[key] = {
+            "language": key[0],
+            "root": key[1],
+            "fresh": _is_fresh(entry),
+            "tools": {
+                name: {"path": path, "version": tool_version(path) if path else None}
+                for name, path in (entry.get("tools") or {}).items()
+            },
+        }
+    return [by_project[key] for key in sorted(by_project)]
+
+
+def cmd_toolchain(json_output: bool = False) -> int:
+    toolchains = load_toolchains()
+    if json_output:
+        print(json.dumps({"toolchains": toolchains}))
+        return 0
+
+    if not toolchains:
+        print("No toolchains resolved in this session yet.")
+        return 0
+    for toolchain in toolchains:
+        stale = "" if toolchain["fresh"] else " (stale)"
+        print(f"{toolchain['language']}: {toolchain['root']}{stale}")
+        for name, tool in toolchain["tools"].items():
+            if tool["path"]:
+                print(f"  {name:<14} {tool['path']}  {tool['version'] or 'unknown version'}")
+            else:
+                print(f"  {name:<14} not found")
+    return 0
@@ -0,0 +1,218 @@
+"""Persistent diagnostics cache for language checkers.
+
+Entries are keyed by the checked file's content hash, the identity of every
+tool binary involved and the hashes of the config files that steer those
+tools. An edit that produces content already checked under the same toolchain
+and config returns the stored result without spawning any tool.
+
+Entries are small JSON files under <cache dir>/diagnostics. A hit refreshes the
+entry's mtime, and the directory is trimmed oldest-first (LRU) once it exceeds
+MAX_ENTRIES or MAX_BYTES. Keys use paths relative to the project, so sessions
+and spec worktrees of the same repository share entries.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from _snapshot import snapshot
+from _util import get_cache_dir
+
+MAX_ENTRIES = 2000
+MAX_BYTES = 32 * 1024 * 1024
+CONFIG_SEARCH_DEPTH = 20
+
+PYTHON_CONFIG_FILES = ("pyproject.toml", "ruff.toml", ".ruff.toml", "setup.cfg")
+TYPESCRIPT_CONFIG_FILES = (
+    "package.json",
+    "tsconfig.json",
+    ".editorconfig",
+    ".prettierrc",
+    ".prettierrc.json",
+    ".prettierrc.yaml",
+    ".prettierrc.yml",
+    ".prettierrc.js",
+    ".prettierrc.cjs",
+    ".prettierrc.mjs",
+    "prettier.config.js",
+    "prettier.config.cjs",
+    "prettier.config.mjs",
+    ".prettierignore",
+    ".eslintrc",
+    ".eslintrc.json",
+    ".eslintrc.yaml",
+    ".eslintrc.yml",
+    ".eslintrc.js",
+    ".eslintrc.cjs",
+    "eslint.config.js",
+    "eslint.config.cjs",
+    "eslint.config.mjs",
+    "eslint.config.ts",
+    ".eslintignore",
+)
+GO_CONFIG_FILES = ("go.mod", "go.sum", ".golangci.yml", ".golangci.yaml", ".golangci.toml", ".golangci.json")
+
+
+def cache_enabled() -> bool:
+    """Check whether the diagnostics cache is enabled (PILOT_DIAGNOSTICS_CACHE=0 disables)."""
+    return os.environ.get("PILOT_DIAGNOSTICS_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def _diagnostics_dir() -> Path:
+    return get_cache_dir() / "diagnostics"
+
+
+def tool_fingerprint(binary: str | None) -> str | None:
+    """Identify a tool binary by resolved path, size and mtime.
+
+    Upgrading a tool replaces its binary, which changes the fingerprint. A
+    missing tool fingerprints as "" (its absence is part of the key); a path
+    that cannot be stat'ed returns None and makes the check uncacheable.
+    """
+    if not binary:
+        return ""
+    try:
+        resolved = Path(binary).resolve()
+        stat = resolved.stat()
+    except OSError:
+        return None
+    return f"{resolved}:{stat.st_size}:{stat.st_mtime_ns}"
+
+
+def config_fingerprint(file_path: Path, config_names: tuple[str, ...]) -> str:
+    """Hash every config file named in config_names from the file's directory upwards.
+
+    Only file contents and their distance from the checked file are hashed, not
+    absolute paths, so identical checkouts produce identical fingerprints.
+    """
+    digest = hashlib.sha256()
+    current = file_path.resolve().parent
+    for depth in range(CONFIG_SEARCH_DEPTH):
+        for name in config_names:
+            candidate = current / name
+            try:
+                content = candidate.read_bytes()
+            except OSError:
+                continue
+            digest.update(f"{depth}:{name}:".encode())
+            digest.update(hashlib.sha256(content).digest())
+        if (current / ".git").exists() or current.parent == current:
+            break
+        current = current.parent
+    return digest.hexdigest()
+
+
+def _relative_path(file_path: Path) -> str:
+    try:
+        return str(file_path.resolve().relative_to(Path.cwd().resolve()))
+    except (ValueError, OSError):
+        return str(file_path.resolve())
+
+
+def diagnostics_key(
+    language: str,
+    file_path: Path,
+    binaries: list[str | None],
+    config_names: tuple[str, ...],
+    extra: list[str] | None = None,
+    content: bytes | None = None,
+) -> str | None:
+    """Build the cache key for checking file_path, or None if it can't be cached.
+
+    content overrides the bytes on disk for checkers that work in memory.
+    """
+    if not cache_enabled():
+        return None
+
+    tool_parts = []
+    for binary in binaries:
+        fingerprint = tool_fingerprint(binary)
+        if fingerprint is None:
+            return None
+        tool_parts.append(fingerprint)
+
+    if content is None:
+        snap = snapshot(file_path)
+        if snap is None:
+            return None
+        content_hash = snap.sha256
+    else:
+        content_hash = hashlib.sha256(content).hexdigest()
+
+    material = [
+        language,
+        _relative_path(file_path),
+        content_hash,
+        tool_parts,
+        config_fingerprint(file_path, config_names),
+        extra or [],
+    ]
+    return hashlib.sha256(json.dumps(material).encode()).hexdigest()
+
+
+def lookup(key: str | None) -> dict | None:
+    """Return the cached payload for key and mark it recently used."""
+    if key is None:
+        return None
+    entry = _diagnostics_dir() / f"{key}.json"
+    try:
+        payload = json.loads(entry.read_text())
+        os.utime(entry)
+    except (OSError, json.JSONDecodeError):
+        return None
+    return payload if isinstance(payload, dict) else None
+
+
+def store(key: str | None, payload: dict) -> None:
+    """Persist payload under key atomically, then enforce the size caps."""
+    if key is None:
+        return
+    cache_dir = _diagnostics_dir()
+    try:
+        cache_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_dir, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(payload, f)
+        os.replace(tmp_name, cache_dir / f"{key}.json")
+    except OSError:
+        return
+    evict(cache_dir)
+
+
+def evict(cache_dir: Path, max_entries: int = MAX_ENTRIES, max_bytes: int = MAX_BYTES) -> int:
+    """Remove least recently used entries until both caps hold. Returns entries removed."""
+    entries = []
+    total_bytes = 0
+    try:
+        with os.scandir(cache_dir) as it:
+            for entry in it:
+                if not entry.name.endswith(".json"):
+                    continue
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+                total_bytes += stat.st_size
+    except OSError:
+        return 0
+
+    if len(entries) <= max_entries and total_bytes <= max_bytes:
+        return 0
+
+    removed = 0
+    entries.sort()
+    for _, size, path in entries:
+        if len(entries) - removed <= max_entries and total_bytes <= max_bytes:
+            break
+        try:
+            os.unlink(path)
+        except OSError:
+            continue
+        removed += 1
+        total_bytes -= size
+    return removed
@@ -0,0 +1,161 @@
+"""Streaming // comment lexer for TypeScript/JavaScript and Go.
+
+strip_line_comments makes one left-to-right pass over the source and tracks
+whether the cursor is in code, a quoted string, a rune, a raw string, a
+template literal (including nested ${...} expressions), a regex literal or a
+block comment. Only // comments found in code are removed, so "//" inside
+strings, URLs in template literals and commented-out code in /* */ blocks are
+left alone.
+
+The lexer does not track JSX text, so in jsx mode (.tsx/.jsx files, and
+plain .js files, which React projects use for JSX) a "//" right after ":" or
+">" (a URL, or text at the start of an element) is never treated as a comment.
+
+Code between two // comments is consumed by a single regex match, consecutive
+matches come from one finditer, and runs of lines that contain no "/", "`" or
+line continuation (and so cannot hold a comment or change state) are skipped
+with str.find. The Python loop runs once per comment, template substitution
+or regex literal rather than once per line.
+"""
+
+from __future__ import annotations
+
+import re
+
+_STRINGS = r"\"[^\"\\\n]*(?:\\[\s\S][^\"\\\n]*)*\"?|'[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*'?"
+_BLOCK_COMMENT = r"/\*[\s\S]*?(?:\*/|\Z)"
+_PLAIN_TEMPLATE = r"`[^`\\$]*(?:(?:\\[\s\S]|\$(?!\{)|\$\{[^{}`\"'/]*\})[^`\\$]*)*`"
+_LINE_COMMENT = r"(//[^\n]*)?"
+
+_GO_CODE = re.compile(rf"(?:[^\"'`/]+|{_STRINGS}|`[^`]*`?|{_BLOCK_COMMENT}|/(?![/*]))*{_LINE_COMMENT}")
+_TS_CODE = re.compile(rf"(?:[^\"'`/]+|{_STRINGS}|{_PLAIN_TEMPLATE}|{_BLOCK_COMMENT})*{_LINE_COMMENT}")
+_TS_EXPRESSION = re.compile(rf"(?:[^\"'`/{{}}]+|{_STRINGS}|{_PLAIN_TEMPLATE}|{_BLOCK_COMMENT})*{_LINE_COMMENT}")
+_TS_TEMPLATE_BODY = re.compile(r"[^`\\$]*(?:(?:\\[\s\S]|\$(?!\{))[^`\\$]*)*")
+_TS_REGEX_BODY = re.compile(r"(?:[^/\\\n\[]+|\\.|\[(?:[^\]\\\n]|\\.)*\]?)*/?")
+
+_REGEX_PRECEDERS = frozenset("(,=:[!&|?{};+-*%<>~^")
+_REGEX_KEYWORDS = frozenset(
+    {"return", "typeof", "case", "do", "else", "in", "of", "void", "yield", "await", "delete", "throw", "new"}
+)
+_TEMPLATE = -1
+# Past this many characters to the next "/", plain lines are skipped with
+# str.find instead of being matched by the code regex.
+_SKIP_DISTANCE = 512
+
+
+def strip_line_comments(content: str, preserve: re.Pattern[str], language: str) -> tuple[str, bool]:
+    """Remove // comments that do not match preserve. Returns (new_content, changed).
+
+    A comment after code is cut with its preceding whitespace; a line holding
+    only a comment is deleted. language is "typescript", "jsx" or "go".
+    """
+    if "//" not in content:
+        return content, False
+
+    is_go = language == "go"
+    is_jsx = language == "jsx"
+    length = len(content)
+    out: list[str] = []
+    copied = 0
+    pos = 0
+    stack: list[int] = []
+    # Lines before the next "/", "`" or line continuation start and end in
+    # code and hold no comment, so they are skipped with str.find.
+    next_slash = next_backtick = next_continuation = -1
+
+    while pos < length:
+        if stack and stack[-1] == _TEMPLATE:
+            pos = _TS_TEMPLATE_BODY.match(content, pos).end()
+            if pos >= length:
+                break
+            if content[pos] == "`":
+                stack.pop()
+                pos += 1
+            else:
+                stack.append(0)
+                pos += 2
+            continue
+
+        if not stack:
+            if next_slash < pos:
+                next_slash = _find(content, "/", pos)
+            if next_backtick < pos:
+                next_backtick = _find(content, "`", pos)
+            if next_continuation < pos:
+                next_continuation = _find(content, "\\\n", pos)
+            special = min(next_slash, next_backtick, next_continuation)
+            if special >= length:
+                break
+            line_start = content.rfind("\n", pos, special) + 1
+            if line_start > pos:
+                pos = line_start
+
+        code = _GO_CODE if is_go else _TS_EXPRESSION if stack else _TS_CODE
+        # Consecutive comments are taken from one finditer; the loop only
+        # falls back to the state machine at a template, brace, regex literal
+        # or division, or to skip ahead when the next "/" is far away.
+        comment = -1
+        for match in code.finditer(content, pos):
+            pos = match.end()
+            comment = match.start(1)
+            if comment < 0:
+                break
+            jsx_text = is_jsx and content[comment - 1 : comment] in (":", ">")
+            if not jsx_text and not preserve.search(content, comment, pos):
+                line_start = content.rfind("\n", 0, comment) + 1
+                before = content[line_start:comment].rstrip()
+                out.append(content[copied:line_start])
+                if before:
+                    out.append(before)
+                    copied = pos
+                else:
+                    copied = min(pos + 1, length)
+            if next_slash < pos and not stack:
+                next_slash = _find(content, "/", pos)
+                if next_slash - pos > _SKIP_DISTANCE:
+                    break
+        if comment >= 0:
+            continue
+        if pos >= length:
+            break
+
+        char = content[pos]
+        if char == "`":
+            stack.append(_TEMPLATE)
+            pos += 1
+        elif char == "{":
+            stack[-1] += 1
+            pos += 1
+        elif char == "}":
+            if stack[-1]:
+                stack[-1] -= 1
+            else:
+                stack.pop()
+            pos += 1
+        elif char == "/" and _starts_regex(content, pos):
+            pos = _TS_REGEX_BODY.match(content, pos + 1).end()
+        else:
+            pos += 1
+
+    if not out:
+        return content, False
+    out.append(content[copied:])
+    return "".join(out), True
+
+
+def _find(content: str, needle: str, start: int) -> int:
+    found = content.find(needle, start)
+    return len(content) if found < 0 else found
+
+
+def _starts_regex(content: str, pos: int) -> bool:
+    """Decide whether the / at pos opens a regex literal rather than dividing."""
+    i = pos - 1
+    while i >= 0 and content[i] in " \t\r\n":
+        i -= 1
+    if i < 0 or content[i] in _REGEX_PRECEDERS:
+        return True
+    start = i
+    while start >= 0 and (content[start].isalnum() or content[start] in "_$"):
+        start -= 1
+    return content[start + 1 : i + 1] in _REGEX_KEYWORDS
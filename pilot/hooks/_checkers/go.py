@@ -4,10 +4,10 @@ from __future__ import annotations
 
 import re
 import shutil
-import subprocess
 import sys
 from pathlib import Path
 
+from _snapshot import read_text, write_text
 from _util import (
     GREEN,
     NC,
@@ -16,96 +16,258 @@ from _util import (
     check_file_length,
 )
 
+from _checkers import cache, toolchain
+from _checkers.comments import strip_line_comments
+from _checkers.runner import BACKGROUND_BUDGET_S, Budget, Tool, ToolRun, complete_in_background
+from _checkers.touched import existed_before, pre_edit_content, print_untouched, split_touched, touched_lines
+
+GO_TOOLS = ("go", "gofmt", "golangci-lint")
+VET_VALUE = 3.0
+LINT_VALUE = 2.0
+GO_PRESERVE_RE = re.compile(r"//\s*(?:nolint|TODO|FIXME|XXX|NOTE|go:)", re.IGNORECASE)
+
 
 def strip_go_comments(file_path: Path) -> bool:
     """Remove inline // comments from Go file."""
-    preserve_patterns = re.compile(r"//\s*nolint|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*go:", re.IGNORECASE)
-
-    try:
-        content = file_path.read_text()
-        lines = content.splitlines(keepends=True)
-    except Exception:
+    content = read_text(file_path)
+    if content is None:
         return False
 
-    new_lines = []
-    modified = False
+    new_content, modified = strip_line_comments(content, GO_PRESERVE_RE, "go")
+    if modified:
+        write_text(file_path, new_content)
+    return modified
 
-    for line in lines:
-        if "//" not in line or '"//' in line or "'//" in line or "`//" in line or "://" in line:
-            new_lines.append(line)
-            continue
 
-        match = re.search(r"//.*$", line)
-        if not match or preserve_patterns.search(match.group(0)):
-            new_lines.append(line)
-            continue
+def resolve_toolchain(file_path: Path) -> toolchain.Toolchain:
+    """Resolve go, gofmt and golangci-lint for file_path through the session toolchain cache."""
+    return toolchain.resolve("go", file_path, GO_TOOLS, _which)
 
-        before_comment = line[: match.start()].rstrip()
-        if before_comment:
-            new_lines.append(before_comment + "\n")
-            modified = True
-        else:
-            modified = True
 
-    if modified:
-        file_path.write_text("".join(new_lines))
-        return True
-    return False
+def _which(name: str, project_root: Path | None) -> str | None:
+    return shutil.which(name)
+
+
+def is_lint_target(file_path: Path) -> bool:
+    """Check whether file_path gets formatted and linted (test files are skipped)."""
+    return not file_path.name.endswith("_test.go")
 
 
-def check_go(file_path: Path) -> tuple[int, str]:
-    """Check Go file with gofmt, go vet, and golangci-lint. Returns (exit_code, reason)."""
+def check_go(file_path: Path, tool_input: dict | None = None) -> tuple[int, str]:
+    """Check Go file with gofmt, go vet, and golangci-lint. Returns (exit_code, reason).
+
+    gofmt rewrites the file first; go vet and golangci-lint then analyze it
+    concurrently. tool_input scopes the report to the edited lines.
+    """
+    original = read_text(file_path)
     strip_go_comments(file_path)
 
-    if file_path.name.endswith("_test.go"):
+    if not is_lint_target(file_path):
         return 0, ""
 
     check_file_length(file_path)
 
-    go_bin = shutil.which("go")
-    gofmt_bin = shutil.which("gofmt")
-    golangci_lint_bin = shutil.which("golangci-lint")
+    resolved = resolve_toolchain(file_path)
+    go_bin = resolved.get("go")
+    gofmt_bin = resolved.get("gofmt")
+    golangci_lint_bin = resolved.get("golangci-lint")
 
     if not go_bin:
         return 0, ""
 
+    binaries = [go_bin, gofmt_bin, golangci_lint_bin]
+    pre_edit = pre_edit_content(original, tool_input) if original is not None else None
+    previous = cache.lookup(_cache_key(file_path, binaries, pre_edit)) if pre_edit is not None else None
+    cached = cache.lookup(_cache_key(file_path, binaries))
+    if cached is not None:
+        return report_go(file_path, cached, golangci_lint_bin, tool_input, previous)
+
+    tools = []
     if gofmt_bin:
-        try:
-            subprocess.run([gofmt_bin, "-w", str(file_path)], capture_output=True, check=False)
-        except Exception:
-            pass
+        tools.append(Tool("gofmt", [gofmt_bin, "-w", str(file_path)], mutating=True))
+    tools.append(Tool("go vet", [go_bin, "vet", str(file_path)], value=VET_VALUE))
+    if golangci_lint_bin:
+        tools.append(Tool("golangci-lint", [golangci_lint_bin, "run", "--fast", str(file_path)], value=LINT_VALUE))
 
+    budget = Budget(project_root=resolved.root)
+    results = _parse_analyzer_runs(budget.run_all(tools))
+
+    if budget.skipped:
+        budget.report(file_path, "go", background=complete_in_background(file_path, "go"))
+        return report_go(file_path, results, golangci_lint_bin, tool_input, previous) if results else (2, "")
+    budget.report(file_path, "go")
+
+    cache.store(_cache_key(file_path, binaries), results)
+    return report_go(file_path, results, golangci_lint_bin, tool_input, previous)
+
+
+def _parse_analyzer_runs(runs: dict[str, ToolRun]) -> dict[str, tuple]:
+    """Turn completed go vet / golangci-lint runs into results, in a fixed order."""
     results: dict[str, tuple] = {}
-    has_issues = False
 
-    try:
-        result = subprocess.run([go_bin, "vet", str(file_path)], capture_output=True, text=True, check=False)
-        output = result.stdout + result.stderr
-        if result.returncode != 0 or output.strip():
+    vet = runs.get("go vet")
+    if vet and vet.completed:
+        output = vet.stdout + vet.stderr
+        if vet.returncode != 0 or output.strip():
             lines = [line.strip() for line in output.splitlines() if line.strip() and not line.strip().startswith("#")]
             if lines:
-                has_issues = True
                 results["vet"] = (len(lines), lines)
-    except Exception:
-        pass
 
+    lint = runs.get("golangci-lint")
+    if lint and lint.completed and lint.returncode != 0:
+        lines = [line.strip() for line in (lint.stdout + lint.stderr).splitlines() if line.strip()]
+        issue_count = len([line for line in lines if ": " in line])
+        if issue_count > 0:
+            results["lint"] = (issue_count, lines)
+
+    return results
+
+
+def format_go(file_path: Path, content: str) -> str | None:
+    """Format content with gofmt over stdin, without touching file_path.
+
+    Returns None when gofmt is not installed or fails.
+    """
+    resolved = resolve_toolchain(file_path)
+    gofmt_bin = resolved.get("gofmt")
+    if not gofmt_bin:
+        return None
+    formatted = Budget(BACKGROUND_BUDGET_S, resolved.root).run("gofmt", [gofmt_bin], input=content)
+    if not formatted.completed or formatted.returncode != 0:
+        return None
+    return formatted.stdout
+
+
+def lint_go_batch(files: list[Path]) -> dict[Path, dict]:
+    """Analyze several files with one read-only go vet and golangci-lint call.
+
+    The tools run on the packages containing the files; reported lines are
+    attributed back to the file they name. Returns per-file results in the
+    shape check_go reports, or {} when go is not installed.
+    """
+    if not files:
+        return {}
+    resolved = resolve_toolchain(files[0])
+    go_bin = resolved.get("go")
+    if not go_bin:
+        return {}
+    golangci_lint_bin = resolved.get("golangci-lint")
+
+    package_dirs = sorted({str(f.resolve().parent) for f in files})
+    targets: dict[Path, dict] = {f.resolve(): {} for f in files}
+    tools = [Tool("go vet (batch)", [go_bin, "vet", *package_dirs], value=VET_VALUE)]
+    if golangci_lint_bin:
+        tools.append(
+            Tool("golangci-lint (batch)", [golangci_lint_bin, "run", "--fast", *package_dirs], value=LINT_VALUE)
+        )
+
+    runs = Budget(BACKGROUND_BUDGET_S, resolved.root).run_all(tools)
+    vet = runs["go vet (batch)"]
+    _attribute_go_output(vet.stdout + vet.stderr, targets, "vet", skip_headers=True)
     if golangci_lint_bin:
+        lint = runs["golangci-lint (batch)"]
+        _attribute_go_output(lint.stdout + lint.stderr, targets, "lint", skip_headers=False)
+
+    return {f: targets[f.resolve()] for f in files}
+
+
+_GO_LOCATION = re.compile(r"^(?P<path>[^\s:]+\.go):(?P<line>\d+)")
+
+
+def _attribute_go_output(output: str, targets: dict[Path, dict], tool: str, skip_headers: bool) -> None:
+    """Assign tool output lines to the file each line (or block of lines) names."""
+    current: Path | None = None
+    for raw in output.splitlines():
+        line = raw.strip()
+        if not line or (skip_headers and line.startswith("#")):
+            continue
+        match = _GO_LOCATION.match(line)
+        if match:
+            current = Path(match.group("path")).resolve()
+        if current not in targets:
+            continue
+        count, lines = targets[current].get(tool, (0, []))
+        targets[current][tool] = (count + (1 if match else 0), [*lines, line])
+
+
+_GO_IMPORT_BLOCK = re.compile(r"^import\s*\(([^)]*)\)", re.MULTILINE)
+_GO_IMPORT_SPEC = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.MULTILINE)
+_GO_QUOTED = re.compile(r'"([^"]+)"')
+_GO_MODULE = re.compile(r"^module\s+(\S+)", re.MULTILINE)
+
+
+def _package_fingerprint(file_path: Path) -> list[str]:
+    """Identify the other .go files in the package, which go vet also reads."""
+    try:
+        siblings = sorted(p for p in file_path.parent.glob("*.go") if p.name != file_path.name)
+        return [f"{p.name}:{p.stat().st_size}:{p.stat().st_mtime_ns}" for p in siblings]
+    except OSError:
+        return []
+
+
+def _find_module(file_path: Path) -> tuple[Path, str] | None:
+    """The directory and module path of the go.mod that owns file_path."""
+    for directory in file_path.resolve().parents:
+        go_mod = directory / "go.mod"
+        if go_mod.is_file():
+            match = _GO_MODULE.search(read_text(go_mod) or "")
+            return (directory, match.group(1)) if match else None
+    return None
+
+
+def _imports_fingerprint(file_path: Path, content: str | None) -> list[str]:
+    """Identify the .go files of in-module packages file_path imports.
+
+    go vet type-checks those packages, so a change to their API changes the
+    result for file_path even when the file itself is unchanged.
+    """
+    source = content if content is not None else read_text(file_path)
+    module = _find_module(file_path) if source else None
+    if module is None:
+        return []
+    module_root, module_path = module
+    imports = set(_GO_IMPORT_SPEC.findall(source))
+    for block in _GO_IMPORT_BLOCK.findall(source):
+        imports.update(_GO_QUOTED.findall(block))
+
+    parts = []
+    for imported in sorted(imports):
+        if imported != module_path and not imported.startswith(module_path + "/"):
+            continue
+        package_dir = module_root / imported[len(module_path) + 1 :]
         try:
-            result = subprocess.run(
-                [golangci_lint_bin, "run", "--fast", str(file_path)], capture_output=True, text=True, check=False
-            )
-            output = result.stdout + result.stderr
-            if result.returncode != 0:
-                lines = [line.strip() for line in output.splitlines() if line.strip()]
-                issue_count = len([line for line in lines if ": " in line])
-                if issue_count > 0:
-                    has_issues = True
-                    results["lint"] = (issue_count, lines)
-        except Exception:
-            pass
-
-    if has_issues:
-        _print_go_issues(file_path, results)
+            files = sorted(p for p in package_dir.glob("*.go") if not p.name.endswith("_test.go"))
+            parts.extend(f"{imported}/{p.name}:{p.stat().st_size}:{p.stat().st_mtime_ns}" for p in files)
+        except OSError:
+            continue
+    return parts
+
+
+def _cache_key(file_path: Path, binaries: list[str | None], content: str | None = None) -> str | None:
+    return cache.diagnostics_key(
+        "go",
+        file_path,
+        binaries,
+        cache.GO_CONFIG_FILES,
+        extra=_package_fingerprint(file_path) + _imports_fingerprint(file_path, content),
+        content=content.encode() if content is not None else None,
+    )
+
+
+def report_go(
+    file_path: Path,
+    results: dict,
+    golangci_lint_bin: str | None = "",
+    tool_input: dict | None = None,
+    previous: dict | None = None,
+) -> tuple[int, str]:
+    """Print collected diagnostics and build the (exit_code, reason) result.
+
+    Diagnostics on lines the edit did not touch are collapsed into a count;
+    previous holds the cached results for the file before the edit, if known.
+    """
+    if results:
+        _print_go_issues(file_path, results, touched_lines(file_path, tool_input), previous)
         parts = []
         for tool_name, (count, _) in results.items():
             parts.append(f"{count} {tool_name}")
@@ -119,7 +281,9 @@ def check_go(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
-def _print_go_issues(file_path: Path, results: dict[str, tuple]) -> None:
+def _print_go_issues(
+    file_path: Path, results: dict[str, tuple], touched: set[int] | None = None, previous: dict | None = None
+) -> None:
     """Print Go diagnostic issues to stderr."""
     print("", file=sys.stderr)
     try:
@@ -134,10 +298,13 @@ def _print_go_issues(file_path: Path, results: dict[str, tuple]) -> None:
         print("", file=sys.stderr)
         print(f"🔍 go vet: {count} {plural}", file=sys.stderr)
         print("───────────────────────────────────────", file=sys.stderr)
-        for line in lines[:10]:
+        before = None if previous is None else previous.get("vet", (0, []))[1]
+        shown, untouched = _split_go_output(file_path, lines, touched, before)
+        for line in shown[:10]:
             print(f"  {line}", file=sys.stderr)
-        if count > 10:
-            print(f"  ... and {count - 10} more issues", file=sys.stderr)
+        if len(shown) > 10:
+            print(f"  ... and {len(shown) - 10} more issues", file=sys.stderr)
+        print_untouched(untouched, pre_existing=before is not None)
         print("", file=sys.stderr)
 
     if "lint" in results:
@@ -146,10 +313,43 @@ def _print_go_issues(file_path: Path, results: dict[str, tuple]) -> None:
         print("", file=sys.stderr)
         print(f"🔧 golangci-lint: {count} {plural}", file=sys.stderr)
         print("───────────────────────────────────────", file=sys.stderr)
-        for line in lines[:10]:
+        before = None if previous is None else previous.get("lint", (0, []))[1]
+        shown, untouched = _split_go_output(file_path, lines, touched, before)
+        for line in shown[:10]:
             print(f"  {line}", file=sys.stderr)
-        if len(lines) > 10:
-            print(f"  ... and {len(lines) - 10} more lines", file=sys.stderr)
+        if len(shown) > 10:
+            print(f"  ... and {len(shown) - 10} more lines", file=sys.stderr)
+        print_untouched(untouched, pre_existing=before is not None)
         print("", file=sys.stderr)
 
     print(f"{RED}Fix Go issues above before continuing{NC}", file=sys.stderr)
+
+
+def _split_go_output(
+    file_path: Path, lines: list[str], touched: set[int] | None, before: list[str] | None = None
+) -> tuple[list[str], int]:
+    """Split tool output by touched lines, keeping each issue's context lines with it.
+
+    before holds the same tool's output for the file before the edit, if
+    known. Returns the lines to show and the number of issues left out.
+    """
+    if touched is None:
+        return lines, 0
+    issues = _group_go_issues(file_path, lines)
+    previous = None if before is None else _group_go_issues(file_path, before)
+    existed = existed_before(previous, lambda issue: _GO_LOCATION.sub("", issue[1][0], count=1))
+    shown, untouched = split_touched(issues, touched, lambda issue: issue[0], existed)
+    return [line for _, issue_lines in shown for line in issue_lines], untouched
+
+
+def _group_go_issues(file_path: Path, lines: list[str]) -> list[tuple[int | None, list[str]]]:
+    """Group tool output into (line in file_path or None, output lines) per issue."""
+    issues: list[tuple[int | None, list[str]]] = []
+    for line in lines:
+        match = _GO_LOCATION.match(line)
+        if match or not issues:
+            number = int(match.group("line")) if match and Path(match.group("path")).name == file_path.name else None
+            issues.append((number, [line]))
+        else:
+            issues[-1][1].append(line)
+    return issues
@@ -0,0 +1,154 @@
+"""Client for the warm type-checking language server (lsp_server.py).
+
+Type checking is opt-in (PILOT_TYPE_CHECK=1). One basedpyright (Python) or
+vtsls (TypeScript) process per project root stays warm between edits and
+receives each edit as an incremental didChange, so a check costs one
+round-trip instead of re-analyzing the project. Reported are errors in the
+edited file and errors newly introduced in other files the server has open.
+When no server is running one is started in the background and the edit is
+checked without types.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+from pathlib import Path
+
+from _util import NC, YELLOW, get_runtime_dir
+
+from _checkers.touched import print_untouched, split_touched
+
+SERVER_SCRIPT = Path(__file__).with_name("lsp_server.py")
+LANGUAGE_SERVERS = {
+    "python": ("basedpyright-langserver", "--stdio"),
+    "typescript": ("vtsls", "--stdio"),
+}
+CONNECT_TIMEOUT_S = 0.2
+REQUEST_TIMEOUT_S = float(os.environ.get("PILOT_TYPE_CHECK_TIMEOUT", "3"))
+IDLE_TIMEOUT_S = int(os.environ.get("PILOT_LSP_IDLE", "600"))
+ERROR_SEVERITY = 1
+MAX_PRINTED = 10
+
+
+def type_check_enabled() -> bool:
+    """Check whether type checking is enabled (off unless PILOT_TYPE_CHECK=1)."""
+    return os.environ.get("PILOT_TYPE_CHECK", "0").strip().lower() in ("1", "true", "yes")
+
+
+def get_server_socket_path(language: str, project_root: Path) -> Path:
+    """Get the socket path of the language server for project_root."""
+    digest = hashlib.sha256(str(project_root.resolve()).encode()).hexdigest()[:16]
+    return get_runtime_dir() / f"lsp-{language}-{digest}.sock"
+
+
+def find_server(language: str, project_root: Path) -> str | None:
+    """Find the language server binary, preferring the project's node_modules."""
+    binary = LANGUAGE_SERVERS[language][0]
+    local_bin = project_root / "node_modules" / ".bin" / binary
+    if local_bin.exists():
+        return str(local_bin)
+    return shutil.which(binary)
+
+
+def spawn_server(language: str, project_root: Path) -> None:
+    """Start the language server for project_root in the background."""
+    binary = find_server(language, project_root)
+    if not binary:
+        return
+    try:
+        subprocess.Popen(
+            [
+                sys.executable,
+                str(SERVER_SCRIPT),
+                language,
+                str(project_root.resolve()),
+                str(get_server_socket_path(language, project_root)),
+                str(IDLE_TIMEOUT_S),
+                binary,
+                *LANGUAGE_SERVERS[language][1:],
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def request_types(sock: socket.socket, file_path: Path, text: str) -> dict | None:
+    """Send the edited file to a connected server and wait for its diagnostics."""
+    request = {"file": str(file_path.resolve()), "text": text, "timeout": REQUEST_TIMEOUT_S}
+    try:
+        with sock:
+            sock.settimeout(REQUEST_TIMEOUT_S + 1.0)
+            sock.sendall(json.dumps(request).encode())
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        response = json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+    if not isinstance(response, dict) or not isinstance(response.get("diagnostics"), list):
+        return None
+    return response
+
+
+def check_types(language: str, project_root: Path | None, file_path: Path, text: str) -> dict[str, tuple]:
+    """Type errors for the edited file and its dependents, as {"type errors": (count, diagnostics)}.
+
+    Returns {} when type checking is disabled, the server is still starting,
+    or nothing was found.
+    """
+    if not type_check_enabled() or language not in LANGUAGE_SERVERS:
+        return {}
+    root = project_root or file_path.resolve().parent
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_S)
+        sock.connect(str(get_server_socket_path(language, root)))
+    except OSError:
+        sock.close()
+        spawn_server(language, root)
+        return {}
+
+    response = request_types(sock, file_path, text)
+    if response is None:
+        return {}
+    errors = [
+        diag
+        for diag in [*response["diagnostics"], *response.get("dependents", [])]
+        if isinstance(diag, dict) and diag.get("severity", ERROR_SEVERITY) == ERROR_SEVERITY
+    ]
+    return {"type errors": (len(errors), errors)} if errors else {}
+
+
+def print_type_errors(file_path: Path, diagnostics: list[dict], touched: set[int] | None = None) -> None:
+    """Print type errors to stderr. Errors in dependents always count as touched."""
+    count = len(diagnostics)
+    plural = "error" if count == 1 else "errors"
+    print("", file=sys.stderr)
+    print(f"🔎 Types: {count} {plural}", file=sys.stderr)
+    print("───────────────────────────────────────", file=sys.stderr)
+    resolved = file_path.resolve()
+
+    def line_of(diag: dict) -> int | None:
+        return diag.get("line", 0) if Path(diag.get("file", resolved)) == resolved else None
+
+    shown, untouched = split_touched(diagnostics, touched, line_of)
+    for diag in shown[:MAX_PRINTED]:
+        location = f"{Path(diag.get('file', file_path)).name}:{diag.get('line', 0)}:{diag.get('column', 0)}"
+        suffix = "" if line_of(diag) is not None else f" {YELLOW}(dependent){NC}"
+        print(f"  {location} {diag.get('code', '')}: {diag.get('message', '')}{suffix}", file=sys.stderr)
+    if len(shown) > MAX_PRINTED:
+        print(f"  ... and {len(shown) - MAX_PRINTED} more errors", file=sys.stderr)
+    print_untouched(untouched)
+    print("", file=sys.stderr)
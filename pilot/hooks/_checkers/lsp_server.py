@@ -0,0 +1,421 @@
+#!/usr/bin/env python3
+"""Warm language server for type checking (basedpyright, vtsls).
+
+One process per language and project root runs the language server over
+stdio and serves check requests on a Unix socket (see lsp.py). The server
+keeps the project's type information loaded between edits; each check sends
+the edited file as an incremental didChange and waits for the diagnostics
+published for that version. Diagnostics that appear in other open files while
+the server settles are reported as introduced in dependents.
+
+At most MAX_OPEN_DOCUMENTS files stay open; the least recently checked one is
+closed first. An open file whose mtime changed since it was synced (a git
+checkout, a formatter, another tool) is closed and announced with
+workspace/didChangeWatchedFiles, so the server reads it from disk again.
+
+Usage: lsp_server.py <language> <project_root> <socket_path> <idle_timeout_s> <server_cmd>...
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import Counter
+from pathlib import Path
+from typing import IO
+from urllib.parse import unquote, urlparse
+
+INITIALIZE_TIMEOUT_S = 60.0
+SETTLE_S = 0.2
+SHUTDOWN_TIMEOUT_S = 2.0
+REQUEST_READ_TIMEOUT_S = 10.0
+SYNC_INCREMENTAL = 2
+MAX_OPEN_DOCUMENTS = 16
+FILE_CHANGED = 2
+FILE_DELETED = 3
+LANGUAGE_IDS = {
+    ".py": "python",
+    ".pyi": "python",
+    ".ts": "typescript",
+    ".mts": "typescript",
+    ".tsx": "typescriptreact",
+    ".js": "javascript",
+    ".mjs": "javascript",
+    ".jsx": "javascriptreact",
+}
+
+
+def text_position(text: str, offset: int) -> dict:
+    """LSP position (0-based line, UTF-16 character) of offset in text."""
+    line_start = text.rfind("\n", 0, offset) + 1
+    character = len(text[line_start:offset].encode("utf-16-le")) // 2
+    return {"line": text.count("\n", 0, offset), "character": character}
+
+
+def _common_prefix(old: str, new: str) -> int:
+    low, high = 0, min(len(old), len(new))
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[:mid] == new[:mid]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def _common_suffix(old: str, new: str, limit: int) -> int:
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if old[len(old) - mid :] == new[len(new) - mid :]:
+            low = mid
+        else:
+            high = mid - 1
+    return low
+
+
+def text_change(old: str, new: str) -> dict:
+    """The single range replacement that turns old into new."""
+    prefix = _common_prefix(old, new)
+    suffix = _common_suffix(old, new, min(len(old), len(new)) - prefix)
+    return {
+        "range": {"start": text_position(old, prefix), "end": text_position(old, len(old) - suffix)},
+        "text": new[prefix : len(new) - suffix],
+    }
+
+
+def to_diagnostic(path: str, item: dict) -> dict:
+    start = (item.get("range") or {}).get("start") or {}
+    code = item.get("code")
+    return {
+        "file": path,
+        "line": start.get("line", 0) + 1,
+        "column": start.get("character", 0) + 1,
+        "code": str(code) if code is not None else str(item.get("source", "")),
+        "message": item.get("message", ""),
+        "severity": item.get("severity", 1),
+    }
+
+
+def _fingerprint(item: dict) -> tuple[str, str]:
+    """Identify a diagnostic independently of its position, which shifts with edits."""
+    return str(item.get("code")), item.get("message", "")
+
+
+class LanguageServerSession:
+    """A language server process and the documents it has open."""
+
+    def __init__(self, cmd: list[str], root: Path) -> None:
+        self.root = root
+        self.proc = subprocess.Popen(
+            cmd, cwd=root, stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self._write_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._next_id = 0
+        self._responses: dict[int, dict] = {}
+        self.diagnostics: dict[str, list[dict]] = {}
+        self.published_versions: dict[str, int | None] = {}
+        self.publish_count = 0
+        self.documents: dict[str, tuple[int, str, int | None]] = {}
+        self.sync_kind = 1
+        threading.Thread(target=self._read_loop, daemon=True).start()
+
+    def initialize(self, timeout: float = INITIALIZE_TIMEOUT_S) -> bool:
+        result = self.request(
+            "initialize",
+            {
+                "processId": os.getpid(),
+                "rootUri": self.root.as_uri(),
+                "workspaceFolders": [{"uri": self.root.as_uri(), "name": self.root.name}],
+                "capabilities": {
+                    "textDocument": {
+                        "synchronization": {"didSave": False},
+                        "publishDiagnostics": {"versionSupport": True},
+                    },
+                    "workspace": {
+                        "configuration": True,
+                        "workspaceFolders": True,
+                        "didChangeWatchedFiles": {"dynamicRegistration": False},
+                    },
+                },
+            },
+            timeout,
+        )
+        if result is None:
+            return False
+        sync = (result.get("capabilities") or {}).get("textDocumentSync")
+        self.sync_kind = sync.get("change", 1) if isinstance(sync, dict) else sync or 1
+        self.notify("initialized", {})
+        return True
+
+    def alive(self) -> bool:
+        return self.proc.poll() is None
+
+    def _send(self, message: dict) -> None:
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        with self._write_lock:
+            assert self.proc.stdin is not None
+            self.proc.stdin.write(f"Content-Length: {len(body)}\r\n\r\n".encode() + body)
+            self.proc.stdin.flush()
+
+    def notify(self, method: str, params: dict) -> None:
+        self._send({"method": method, "params": params})
+
+    def request(self, method: str, params: dict, timeout: float) -> dict | None:
+        with self._cond:
+            self._next_id += 1
+            request_id = self._next_id
+        self._send({"id": request_id, "method": method, "params": params})
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while request_id not in self._responses:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.alive():
+                    return None
+                self._cond.wait(remaining)
+            response = self._responses.pop(request_id)
+        result = response.get("result")
+        return result if isinstance(result, dict) else {}
+
+    def _read_loop(self) -> None:
+        stream = self.proc.stdout
+        assert stream is not None
+        while (message := _read_message(stream)) is not None:
+            if "method" not in message:
+                with self._cond:
+                    self._responses[message.get("id")] = message
+                    self._cond.notify_all()
+            elif "id" in message:
+                self._answer(message)
+            elif message["method"] == "textDocument/publishDiagnostics":
+                params = message.get("params") or {}
+                with self._cond:
+                    uri = params.get("uri", "")
+                    self.diagnostics[uri] = list(params.get("diagnostics") or [])
+                    self.published_versions[uri] = params.get("version")
+                    self.publish_count += 1
+                    self._cond.notify_all()
+        with self._cond:
+            self._cond.notify_all()
+
+    def _answer(self, message: dict) -> None:
+        """Reply to server-to-client requests with neutral defaults."""
+        result = None
+        if message["method"] == "workspace/configuration":
+            result = [None] * len((message.get("params") or {}).get("items") or [])
+        elif message["method"] == "workspace/workspaceFolders":
+            result = [{"uri": self.root.as_uri(), "name": self.root.name}]
+        self._send({"id": message["id"], "result": result})
+
+    def check(self, path: str, text: str, timeout: float) -> dict | None:
+        """Sync path to text and collect its diagnostics. Returns None on timeout."""
+        uri = Path(path).as_uri()
+        with self._cond:
+            baseline = {other: Counter(map(_fingerprint, items)) for other, items in self.diagnostics.items()}
+            previous_count = self.publish_count
+
+        version = self._sync(uri, path, text)
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._published(uri, version, previous_count):
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 or not self.alive():
+                    return None
+                self._cond.wait(remaining)
+            settled_count = self.publish_count
+            while True:
+                remaining = min(SETTLE_S, deadline - time.monotonic())
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+                if self.publish_count == settled_count:
+                    break
+                settled_count = self.publish_count
+            own = [to_diagnostic(path, item) for item in self.diagnostics.get(uri, [])]
+            dependents: list[dict] = []
+            for other, items in self.diagnostics.items():
+                if other == uri:
+                    continue
+                seen = baseline.get(other, Counter()).copy()
+                for item in items:
+                    fingerprint = _fingerprint(item)
+                    if seen[fingerprint]:
+                        seen[fingerprint] -= 1
+                    else:
+                        dependents.append(to_diagnostic(_uri_path(other), item))
+        return {"diagnostics": own, "dependents": dependents}
+
+    def _sync(self, uri: str, path: str, text: str) -> int:
+        opened = self.documents.pop(uri, None)
+        self._release_documents()
+        mtime = _mtime(path)
+        if opened is None:
+            language_id = LANGUAGE_IDS.get(Path(path).suffix, "plaintext")
+            self.notify(
+                "textDocument/didOpen",
+                {"textDocument": {"uri": uri, "languageId": language_id, "version": 1, "text": text}},
+            )
+            self.documents[uri] = (1, text, mtime)
+            return 1
+        version, old_text, _ = opened
+        version += 1
+        change = text_change(old_text, text) if self.sync_kind == SYNC_INCREMENTAL else {"text": text}
+        self.notify(
+            "textDocument/didChange",
+            {"textDocument": {"uri": uri, "version": version}, "contentChanges": [change]},
+        )
+        self.documents[uri] = (version, text, mtime)
+        return version
+
+    def _release_documents(self) -> None:
+        """Close open documents changed on disk, then the oldest beyond MAX_OPEN_DOCUMENTS - 1."""
+        changes = []
+        for uri, (_, _, mtime) in list(self.documents.items()):
+            current = _mtime(_uri_path(uri))
+            if current != mtime:
+                self._close_document(uri)
+                changes.append({"uri": uri, "type": FILE_DELETED if current is None else FILE_CHANGED})
+        if changes:
+            self.notify("workspace/didChangeWatchedFiles", {"changes": changes})
+        while len(self.documents) >= MAX_OPEN_DOCUMENTS:
+            self._close_document(next(iter(self.documents)))
+
+    def _close_document(self, uri: str) -> None:
+        del self.documents[uri]
+        self.notify("textDocument/didClose", {"textDocument": {"uri": uri}})
+        with self._cond:
+            self.diagnostics.pop(uri, None)
+            self.published_versions.pop(uri, None)
+
+    def _published(self, uri: str, version: int, previous_count: int) -> bool:
+        if self.publish_count == previous_count or uri not in self.published_versions:
+            return False
+        published = self.published_versions[uri]
+        return published is None or published >= version
+
+    def close(self) -> None:
+        if self.alive():
+            self.request("shutdown", {}, SHUTDOWN_TIMEOUT_S)
+            try:
+                self.notify("exit", {})
+            except OSError:
+                pass
+        try:
+            self.proc.wait(SHUTDOWN_TIMEOUT_S)
+        except subprocess.TimeoutExpired:
+            self.proc.kill()
+
+
+def _uri_path(uri: str) -> str:
+    return unquote(urlparse(uri).path)
+
+
+def _mtime(path: str) -> int | None:
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+def _read_message(stream: IO[bytes]) -> dict | None:
+    """Read one Content-Length framed JSON-RPC message, or None at EOF."""
+    length = None
+    while True:
+        line = stream.readline()
+        if not line:
+            return None
+        line = line.strip()
+        if not line:
+            break
+        name, _, value = line.decode("ascii", "replace").partition(":")
+        if name.lower() == "content-length":
+            length = int(value.strip())
+    if length is None:
+        return None
+    body = stream.read(length)
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return {}
+    return message if isinstance(message, dict) else {}
+
+
+def _read_request(conn: socket.socket) -> dict:
+    conn.settimeout(REQUEST_READ_TIMEOUT_S)
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    try:
+        request = json.loads(b"".join(chunks))
+    except ValueError:
+        return {}
+    return request if isinstance(request, dict) else {}
+
+
+def _send_response(conn: socket.socket, response: dict) -> None:
+    try:
+        conn.sendall(json.dumps(response).encode())
+    except OSError:
+        pass
+
+
+def serve(root: Path, socket_path: Path, idle_timeout: float, cmd: list[str]) -> int:
+    """Run the language server and answer check requests until idle or it exits."""
+    lock_file = socket_path.with_suffix(".lock").open("w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return 0
+
+    try:
+        session = LanguageServerSession(cmd, root)
+    except OSError:
+        lock_file.close()
+        return 1
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        if not session.initialize():
+            return 1
+        socket_path.unlink(missing_ok=True)
+        server.bind(str(socket_path))
+        os.chmod(socket_path, 0o600)
+        server.listen(16)
+        server.settimeout(idle_timeout)
+        while session.alive():
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                break
+            with conn:
+                try:
+                    request = _read_request(conn)
+                except OSError:
+                    continue
+                if not request.get("file"):
+                    _send_response(conn, {"error": "no file"})
+                    continue
+                result = session.check(
+                    str(request["file"]), str(request.get("text", "")), float(request.get("timeout", 5.0))
+                )
+                _send_response(conn, result if result is not None else {"pending": True})
+    finally:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+        session.close()
+        lock_file.close()
+    return 0
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 6:
+        print(__doc__.strip().splitlines()[-1], file=sys.stderr)
+        sys.exit(2)
+    sys.exit(serve(Path(sys.argv[2]), Path(sys.argv[3]), float(sys.argv[4]), sys.argv[5:]))
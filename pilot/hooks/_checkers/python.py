@@ -1,15 +1,16 @@
-"""Python file checker — comment stripping, ruff."""
+"""Python file checker — comment stripping, single-pass ruff format/fix/lint."""
 
 from __future__ import annotations
 
 import io
+import json
 import re
 import shutil
-import subprocess
 import sys
 import tokenize
 from pathlib import Path
 
+from _snapshot import read_text, write_text
 from _util import (
     GREEN,
     NC,
@@ -17,54 +18,182 @@ from _util import (
     check_file_length,
 )
 
+from _checkers import cache, toolchain
+from _checkers.lsp import check_types, print_type_errors
+from _checkers.runner import BACKGROUND_BUDGET_S, Budget, complete_in_background
+from _checkers.touched import existed_before, pre_edit_content, print_untouched, split_touched, touched_lines
 
-def strip_python_comments(file_path: Path) -> bool:
+FIXABLE_RULES = "I,RUF022"
+MAX_EDITED_SPANS = 32
+PRESERVE_RE = re.compile(
+    r"#!|#\s*type:|#\s*noqa|#\s*pragma:|#\s*pylint:|#\s*pyright:|#\s*ruff:|#\s*fmt:|#\s*TODO|#\s*FIXME|#\s*XXX|#\s*NOTE",
+    re.IGNORECASE,
+)
+# Column-0 lines that open a top-level definition; tokenizing can resume there.
+RESYNC_HEADS = ("def ", "async def ", "class ", "@")
+# Code, comments and complete string literals. A match over a prefix stops
+# short of its end when the prefix ends inside a string.
+_CLOSED_CODE_RE = re.compile(
+    r"(?:[^\"'\\#]+|\\[\s\S]|#[^\n]*|\"\"\"[\s\S]*?\"\"\"|'''[\s\S]*?'''"
+    r"|\"[^\"\\\n]*(?:\\[\s\S][^\"\\\n]*)*\"|'[^'\\\n]*(?:\\[\s\S][^'\\\n]*)*')*"
+)
+
+
+def strip_python_comments(file_path: Path, tool_input: dict | None = None) -> bool:
     """Remove inline comments from Python file using tokenizer."""
-    try:
-        content = file_path.read_text()
-    except Exception:
+    content = read_text(file_path)
+    if content is None:
         return False
 
-    preserve_patterns = [
-        r"#!",
-        r"#\s*type:",
-        r"#\s*noqa",
-        r"#\s*pragma:",
-        r"#\s*pylint:",
-        r"#\s*pyright:",
-        r"#\s*ruff:",
-        r"#\s*fmt:",
-        r"#\s*TODO",
-        r"#\s*FIXME",
-        r"#\s*XXX",
-        r"#\s*NOTE",
-    ]
-    preserve_re = re.compile("|".join(preserve_patterns), re.IGNORECASE)
+    new_content = _strip_comments(content, tool_input)
+    if new_content != content:
+        write_text(file_path, new_content)
+        return True
+    return False
+
+
+def _strip_comments(content: str, tool_input: dict | None = None) -> str:
+    """Return content with inline comments removed, preserving directives.
+
+    Given the tool_input of an Edit or MultiEdit, only the lines holding the
+    replacement text are tokenized and spliced back. The whole file is
+    processed for Write, or when an edited region may start inside a string.
+    """
+    spans = edited_spans(content, tool_input)
+    if spans is not None:
+        stripped = _strip_spans(content, spans)
+        if stripped is not None:
+            return stripped
+    stripped = _strip_block(content)
+    return content if stripped is None else stripped
+
+
+def edited_spans(content: str, tool_input: dict | None) -> list[tuple[int, int]] | None:
+    """Character spans of the whole lines holding the text an edit wrote.
+
+    Returns None when the whole file has to be processed: a Write, an unknown
+    tool, or replacement text that no longer appears in content.
+    """
+    if not tool_input:
+        return None
+    if isinstance(tool_input.get("edits"), list):
+        texts = [edit.get("new_string") if isinstance(edit, dict) else None for edit in tool_input["edits"]]
+    elif "new_string" in tool_input:
+        texts = [tool_input["new_string"]]
+    else:
+        return None
+
+    spans: list[tuple[int, int]] = []
+    for text in texts:
+        if not isinstance(text, str):
+            return None
+        if not any(char in text for char in "#'\"\\"):
+            continue
+        start = content.find(text)
+        if start < 0:
+            return None
+        while start >= 0:
+            if len(spans) >= MAX_EDITED_SPANS:
+                return None
+            line_start = content.rfind("\n", 0, start) + 1
+            line_end = content.find("\n", start + len(text) - 1 if text.endswith("\n") else start + len(text))
+            spans.append((line_start, len(content) if line_end < 0 else line_end + 1))
+            start = content.find(text, start + len(text))
+    return _merge_spans(spans)
+
+
+def _merge_spans(spans: list[tuple[int, int]]) -> list[tuple[int, int]]:
+    merged: list[tuple[int, int]] = []
+    for start, end in sorted(spans):
+        if merged and start <= merged[-1][1]:
+            merged[-1] = (merged[-1][0], max(end, merged[-1][1]))
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def _strip_spans(content: str, spans: list[tuple[int, int]]) -> str | None:
+    """Strip comments inside spans only. Returns None if any span is ambiguous."""
+    blocks: list[tuple[int, int]] = []
+    for start, end in spans:
+        while start > 0 and content.endswith("\\\n", 0, start):
+            start = content.rfind("\n", 0, start - 1) + 1
+        if blocks and start < blocks[-1][1]:
+            return None
+        blocks.append((start, end))
+    if not _starts_in_code(content, [start for start, _ in blocks]):
+        return None
+
+    parts: list[str] = []
+    copied = 0
+    for start, end in blocks:
+        stripped = _strip_block(content[start:end], bracketed=True)
+        if stripped is None:
+            return None
+        parts.append(content[copied:start])
+        parts.append(stripped)
+        copied = end
+    parts.append(content[copied:])
+    return "".join(parts)
+
+
+def _starts_in_code(content: str, starts: list[int]) -> bool:
+    """Check that no line start in starts (ascending) falls inside a multi-line string.
 
+    Tokenizing resumes at the nearest top-level definition before the first
+    start, once a regex pass confirms that line is outside every string;
+    otherwise the whole prefix is tokenized. Without a triple quote between
+    that point and the last start, no start can be inside a string.
+    """
+    if not starts:
+        return True
+    resync = max(content.rfind("\n" + head, 0, starts[0]) for head in RESYNC_HEADS) + 1
+    if resync and _CLOSED_CODE_RE.match(content, 0, resync).end() != resync:
+        resync = 0
+    if content.find('"""', resync, starts[-1]) < 0 and content.find("'''", resync, starts[-1]) < 0:
+        return True
+    rows = iter([content.count("\n", resync, start) + 1 for start in starts])
+    row = next(rows)
     try:
-        tokens = list(tokenize.generate_tokens(io.StringIO(content).readline))
-    except tokenize.TokenError:
+        for tok in tokenize.generate_tokens(io.StringIO(content[resync:]).readline):
+            while tok.start[0] >= row:
+                row = next(rows, None)
+                if row is None:
+                    return True
+            if tok.end[0] >= row:
+                return False
+    except (tokenize.TokenError, SyntaxError):
         return False
+    return True
 
-    lines = content.splitlines(keepends=True)
-    comments_to_remove: list[tuple[int, int, int]] = []
 
-    for tok in tokens:
-        if tok.type == tokenize.COMMENT:
-            if preserve_re.search(tok.string):
-                continue
-            start_row, start_col = tok.start
-            _, end_col = tok.end
-            comments_to_remove.append((start_row, start_col, end_col))
+def _strip_block(text: str, bracketed: bool = False) -> str | None:
+    """Remove comments from text. Returns None if text cannot be tokenized.
 
-    if not comments_to_remove:
-        return False
+    A bracketed block is tokenized inside an opening bracket so it may start
+    and end mid-statement at any indentation.
+    """
+    source = "(\n" + text if bracketed else text
+    comments: list[tuple[int, int]] = []
+    try:
+        for tok in tokenize.generate_tokens(io.StringIO(source).readline):
+            if tok.type == tokenize.COMMENT and not PRESERVE_RE.search(tok.string):
+                comments.append(tok.start)
+    except tokenize.TokenError as exc:
+        if not bracketed or "multi-line statement" not in str(exc):
+            return None
+    except SyntaxError:
+        return None
+
+    if not comments:
+        return text
 
-    new_lines = list(lines)
+    new_lines = text.splitlines(keepends=True)
     lines_to_delete: set[int] = set()
+    row_offset = 2 if bracketed else 1
 
-    for line_num, start_col, _ in reversed(comments_to_remove):
-        idx = line_num - 1
+    for line_num, start_col in reversed(comments):
+        idx = line_num - row_offset
         if idx >= len(new_lines):
             continue
         line = new_lines[idx]
@@ -77,57 +206,212 @@ def strip_python_comments(file_path: Path) -> bool:
     for idx in sorted(lines_to_delete, reverse=True):
         del new_lines[idx]
 
-    new_content = "".join(new_lines)
-    if new_content != content:
-        file_path.write_text(new_content)
-        return True
-    return False
+    return "".join(new_lines)
+
+
+def resolve_toolchain(file_path: Path) -> toolchain.Toolchain:
+    """Resolve ruff for file_path through the session toolchain cache."""
+    return toolchain.resolve("python", file_path, ("ruff",), _which)
+
+
+def _which(name: str, project_root: Path | None) -> str | None:
+    return shutil.which(name)
+
+
+def is_lint_target(file_path: Path) -> bool:
+    """Check whether file_path gets formatted and linted (test files are skipped)."""
+    return "test_" not in file_path.name and "spec" not in file_path.name
 
 
-def check_python(file_path: Path) -> tuple[int, str]:
-    """Check Python file with ruff. Returns (exit_code, reason)."""
-    strip_python_comments(file_path)
+def check_python(file_path: Path, tool_input: dict | None = None) -> tuple[int, str]:
+    """Check Python file with ruff. Returns (exit_code, reason).
 
-    if "test_" in file_path.name or "spec" in file_path.name:
+    The file is read once; comment stripping, formatting and import fixes are
+    piped through ruff in memory and the result is written back once.
+    tool_input scopes comment stripping to the lines the edit wrote.
+    """
+    original = read_text(file_path)
+    if original is None:
         return 0, ""
+    content = _strip_comments(original, tool_input)
 
+    if not is_lint_target(file_path):
+        _write_if_changed(file_path, original, content)
+        return 0, ""
+
+    resolved = resolve_toolchain(file_path)
+    ruff_bin = resolved.get("ruff")
+    if not ruff_bin:
+        _write_if_changed(file_path, original, content)
+        check_file_length(file_path)
+        types = check_types("python", resolved.root, file_path, content)
+        return report_python(file_path, types, tool_input) if types else (0, "")
+
+    pre_edit = pre_edit_content(original, tool_input)
+    previous = cache.lookup(_cache_key(file_path, ruff_bin, pre_edit)) if pre_edit is not None else None
+    cached = cache.lookup(_cache_key(file_path, ruff_bin, content))
+    if cached is not None:
+        _write_if_changed(file_path, original, content)
+        check_file_length(file_path)
+        types = check_types("python", resolved.root, file_path, content)
+        return report_python(file_path, {**cached, **types}, tool_input, previous)
+
+    budget = Budget(project_root=resolved.root)
+    content, diagnostics = run_ruff_pipeline(ruff_bin, file_path, content, budget)
+    _write_if_changed(file_path, original, content)
     check_file_length(file_path)
 
-    ruff_bin = shutil.which("ruff")
-    if ruff_bin:
-        try:
-            subprocess.run(
-                [ruff_bin, "check", "--select", "I,RUF022", "--fix", str(file_path)], capture_output=True, check=False
-            )
-            subprocess.run([ruff_bin, "format", str(file_path)], capture_output=True, check=False)
-        except Exception:
-            pass
+    if budget.skipped:
+        budget.report(file_path, "python", background=complete_in_background(file_path, "python"))
+        return 2, ""
+    budget.report(file_path, "python")
+
+    results: dict[str, tuple] = {}
+    if diagnostics:
+        results["ruff"] = (len(diagnostics), diagnostics)
+
+    cache.store(_cache_key(file_path, ruff_bin, content), results)
+    types = check_types("python", resolved.root, file_path, content)
+    return report_python(file_path, {**results, **types}, tool_input, previous)
+
+
+def run_ruff_pipeline(
+    ruff_bin: str, file_path: Path, content: str, budget: Budget | None = None
+) -> tuple[str, list[dict]]:
+    """Fix imports, lint and format content with two ruff calls over stdin.
+
+    ruff check --fix runs first and its output is piped into ruff format, so
+    the written source is always formatted. Returns the rewritten source and
+    structured diagnostics with code, line, column, message and whether ruff
+    offers a fix; their positions refer to the fixed source before formatting.
+    On any ruff failure, or when the budget runs out, the content is returned
+    unchanged for that step.
+    """
+    budget = budget or Budget()
+    stdin_args = ["--stdin-filename", str(file_path), "-"]
+
+    checked = budget.run(
+        "ruff check",
+        [
+            ruff_bin,
+            "check",
+            "--fix",
+            "--extend-select",
+            FIXABLE_RULES,
+            "--fixable",
+            FIXABLE_RULES,
+            "--output-format=json",
+            *stdin_args,
+        ],
+        input=content,
+    )
+    if not checked.completed:
+        return content, []
+    if checked.stdout or not content.strip():
+        content = checked.stdout
+    diagnostics = _parse_ruff_json(checked.stderr)
+
+    formatted = budget.run("ruff format", [ruff_bin, "format", *stdin_args], input=content)
+    if formatted.completed and formatted.returncode == 0 and (formatted.stdout or not content.strip()):
+        content = formatted.stdout
+    return content, diagnostics
+
+
+def _parse_ruff_json(output: str) -> list[dict]:
+    """Extract diagnostics from ruff's JSON report, ignoring surrounding log lines."""
+    return [_to_diagnostic(item) for item in _parse_ruff_report(output)]
+
+
+def _parse_ruff_report(output: str) -> list[dict]:
+    start = output.find("[")
+    end = output.rfind("]")
+    if start == -1 or end < start:
+        return []
+    try:
+        report = json.loads(output[start : end + 1])
+    except json.JSONDecodeError:
+        return []
+    if not isinstance(report, list):
+        return []
+    return [item for item in report if isinstance(item, dict)]
+
 
+def _to_diagnostic(item: dict) -> dict:
+    location = item.get("location") or {}
+    return {
+        "code": item.get("code") or "invalid-syntax",
+        "line": location.get("row", 0),
+        "column": location.get("column", 0),
+        "message": item.get("message", ""),
+        "fixable": item.get("fix") is not None,
+    }
+
+
+def format_python(file_path: Path, content: str) -> str | None:
+    """Format content and fix its imports over stdin, without touching file_path.
+
+    Returns None when ruff is not installed.
+    """
+    resolved = resolve_toolchain(file_path)
+    ruff_bin = resolved.get("ruff")
     if not ruff_bin:
-        return 0, ""
+        return None
+    formatted, _ = run_ruff_pipeline(ruff_bin, file_path, content, Budget(BACKGROUND_BUDGET_S, resolved.root))
+    return formatted
 
-    results: dict[str, tuple] = {}
-    has_issues = False
-
-    if ruff_bin:
-        try:
-            result = subprocess.run(
-                [ruff_bin, "check", "--output-format=concise", str(file_path)],
-                capture_output=True,
-                text=True,
-                check=False,
-            )
-            output = result.stdout + result.stderr
-            error_pattern = re.compile(r":\d+:\d+: [A-Z]{1,3}\d+")
-            error_lines = [line for line in output.splitlines() if error_pattern.search(line)]
-            if error_lines:
-                has_issues = True
-                results["ruff"] = (len(error_lines), error_lines)
-        except Exception:
-            pass
-
-    if has_issues:
-        _print_python_issues(file_path, results)
+
+def lint_python_batch(files: list[Path]) -> dict[Path, dict]:
+    """Lint several files with one read-only ruff call.
+
+    Returns per-file results in the shape check_python reports. Files are
+    omitted when ruff is not installed.
+    """
+    if not files:
+        return {}
+    resolved = resolve_toolchain(files[0])
+    ruff_bin = resolved.get("ruff")
+    if not ruff_bin:
+        return {}
+
+    paths = [str(f) for f in files]
+    checked = Budget(BACKGROUND_BUDGET_S, resolved.root).run(
+        "ruff check (batch)", [ruff_bin, "check", "--extend-select", FIXABLE_RULES, "--output-format=json", *paths]
+    )
+    if not checked.completed:
+        return {}
+
+    by_file: dict[Path, list[dict]] = {f.resolve(): [] for f in files}
+    for item in _parse_ruff_report(checked.stdout):
+        target = Path(item.get("filename", "")).resolve()
+        if target in by_file:
+            by_file[target].append(_to_diagnostic(item))
+
+    results: dict[Path, dict] = {}
+    for file_path in files:
+        diagnostics = by_file[file_path.resolve()]
+        results[file_path] = {"ruff": (len(diagnostics), diagnostics)} if diagnostics else {}
+    return results
+
+
+def _write_if_changed(file_path: Path, original: str, content: str) -> None:
+    if content != original:
+        write_text(file_path, content)
+
+
+def _cache_key(file_path: Path, ruff_bin: str, content: str) -> str | None:
+    return cache.diagnostics_key("python", file_path, [ruff_bin], cache.PYTHON_CONFIG_FILES, content=content.encode())
+
+
+def report_python(
+    file_path: Path, results: dict, tool_input: dict | None = None, previous: dict | None = None
+) -> tuple[int, str]:
+    """Print collected diagnostics and build the (exit_code, reason) result.
+
+    Diagnostics on lines the edit did not touch are collapsed into a count;
+    previous holds the cached results for the file before the edit, if known.
+    """
+    if results:
+        _print_python_issues(file_path, results, touched_lines(file_path, tool_input), previous)
         parts = []
         for tool_name, (count, _) in results.items():
             parts.append(f"{count} {tool_name}")
@@ -139,7 +423,9 @@ def check_python(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
-def _print_python_issues(file_path: Path, results: dict[str, tuple]) -> None:
+def _print_python_issues(
+    file_path: Path, results: dict[str, tuple], touched: set[int] | None = None, previous: dict | None = None
+) -> None:
     """Print Python diagnostic issues to stderr."""
     print("", file=sys.stderr)
     try:
@@ -149,18 +435,22 @@ def _print_python_issues(file_path: Path, results: dict[str, tuple]) -> None:
     print(f"{RED}🛑 Python Issues found in: {display_path}{NC}", file=sys.stderr)
 
     if "ruff" in results:
-        count, error_lines = results["ruff"]
+        count, diagnostics = results["ruff"]
         plural = "issue" if count == 1 else "issues"
         print("", file=sys.stderr)
         print(f"🔧 Ruff: {count} {plural}", file=sys.stderr)
         print("───────────────────────────────────────", file=sys.stderr)
-        for line in error_lines:
-            parts = line.split(None, 1)
-            if parts:
-                code = parts[0]
-                msg = parts[1] if len(parts) > 1 else ""
-                msg = msg.replace("[*] ", "")
-                print(f"  {code}: {msg}", file=sys.stderr)
+        before = None if previous is None else previous.get("ruff", (0, []))[1]
+        existed = existed_before(before, lambda diag: (diag["code"], diag["message"]))
+        shown, untouched = split_touched(diagnostics, touched, lambda diag: diag["line"], existed)
+        for diag in shown:
+            marker = " [*]" if diag["fixable"] else ""
+            location = f"{file_path.name}:{diag['line']}:{diag['column']}"
+            print(f"  {location} {diag['code']}{marker}: {diag['message']}", file=sys.stderr)
+        print_untouched(untouched, pre_existing=existed is not None)
         print("", file=sys.stderr)
 
+    if "type errors" in results:
+        print_type_errors(file_path, results["type errors"][1], touched)
+
     print(f"{RED}Fix Python issues above before continuing{NC}", file=sys.stderr)
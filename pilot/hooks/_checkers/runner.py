@@ -0,0 +1,297 @@
+"""Budgeted tool execution for language checkers.
+
+Checkers declare each tool as mutating (formatters, --fix) or read-only
+(linters, vet). Budget.run_all runs the mutating tools serially first, in the
+order given, then the read-only analyzers concurrently on a bounded thread
+pool, and returns every run keyed in declaration order so diagnostics merge
+deterministically regardless of which analyzer finishes first.
+
+Every check gets a latency budget (PILOT_HOOK_BUDGET_S, default 10s). Tools run
+through a Budget, which skips a tool whose learned cost exceeds the time left
+and kills one that runs past it. Analyzers are ordered by value per second of
+expected cost, so the cheapest useful diagnostics land first.
+
+Each tool's wall time feeds an exponentially weighted average kept per project
+root in <cache dir>/tool-costs.json. A run killed at the end of the budget
+raises the tool's cost to at least the time it ran, so the next check skips
+it (and completes it in the background) instead of killing it again. Each
+time a tool is skipped as over budget, its learned cost decays towards the
+static default, so a tool that once ran slow is tried again. Every check appends which tools ran and which
+were skipped, and why, to checker-runs.jsonl in the session directory.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+
+from _snapshot import invalidate
+from _util import NC, YELLOW, _sessions_base, get_cache_dir
+
+DEFAULT_BUDGET_S = float(os.environ.get("PILOT_HOOK_BUDGET_S", "10"))
+BACKGROUND_BUDGET_S = 120.0
+COST_SMOOTHING = 0.3
+MAX_RUN_LOG_BYTES = 512 * 1024
+MAX_ANALYZER_WORKERS = int(os.environ.get("PILOT_CHECKER_WORKERS", "4"))
+_COSTS_LOCK = threading.Lock()
+
+DEFAULT_COSTS_S = {
+    "ruff format": 0.3,
+    "ruff check": 0.3,
+    "prettier": 1.0,
+    "eslint": 2.0,
+    "gofmt": 0.2,
+    "go vet": 2.0,
+    "golangci-lint": 5.0,
+}
+
+
+@dataclass(frozen=True)
+class Tool:
+    """A tool invocation declared by a checker.
+
+    mutating tools rewrite the file and run serially before any read-only
+    analyzer; value ranks read-only analyzers against their expected cost.
+    """
+
+    name: str
+    cmd: list[str]
+    mutating: bool = False
+    value: float = 1.0
+    cwd: Path | None = None
+    input: str | None = None
+
+
+@dataclass
+class ToolRun:
+    """Outcome of one tool invocation. skipped holds the reason it did not complete."""
+
+    name: str
+    returncode: int | None = None
+    stdout: str = ""
+    stderr: str = ""
+    duration_s: float = 0.0
+    skipped: str = ""
+
+    @property
+    def completed(self) -> bool:
+        return not self.skipped
+
+
+def _costs_path() -> Path:
+    return get_cache_dir() / "tool-costs.json"
+
+
+def _load_all_costs() -> dict[str, dict[str, float]]:
+    try:
+        costs = json.loads(_costs_path().read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    if not isinstance(costs, dict):
+        return {}
+    return {root: tools for root, tools in costs.items() if isinstance(tools, dict)}
+
+
+def _root_key(project_root: Path | None) -> str:
+    return str(project_root) if project_root is not None else ""
+
+
+def load_costs(project_root: Path | None = None) -> dict[str, float]:
+    """Load learned tool costs in seconds for project_root."""
+    return _load_all_costs().get(_root_key(project_root), {})
+
+
+def estimated_cost(name: str, costs: dict[str, float] | None = None, project_root: Path | None = None) -> float:
+    """Expected wall time of a tool: learned average, else a static default."""
+    costs = load_costs(project_root) if costs is None else costs
+    return float(costs.get(name, DEFAULT_COSTS_S.get(name, 1.0)))
+
+
+def _update_cost(name: str, project_root: Path | None, target: float, at_least: bool = False) -> None:
+    """Move the tool's learned cost for project_root towards target (raise it to target if at_least)."""
+    with _COSTS_LOCK:
+        all_costs = _load_all_costs()
+        costs = all_costs.setdefault(_root_key(project_root), {})
+        previous = costs.get(name)
+        if at_least:
+            costs[name] = max(float(previous if previous is not None else DEFAULT_COSTS_S.get(name, 1.0)), target)
+        else:
+            costs[name] = target if previous is None else previous + COST_SMOOTHING * (target - previous)
+        path = _costs_path()
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f".{os.getpid()}.tmp")
+            tmp.write_text(json.dumps(all_costs))
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+
+def record_cost(name: str, duration_s: float, project_root: Path | None = None) -> None:
+    """Fold a measured duration into the tool's running average."""
+    _update_cost(name, project_root, duration_s)
+
+
+def record_timeout(name: str, elapsed_s: float, project_root: Path | None = None) -> None:
+    """Raise the cost of a tool killed after elapsed_s to at least that, so it is skipped next time."""
+    _update_cost(name, project_root, elapsed_s, at_least=True)
+
+
+def decay_cost(name: str, project_root: Path | None = None) -> None:
+    """Move a skipped tool's learned cost towards its default, so it gets probed again."""
+    costs = load_costs(project_root)
+    if name in costs:
+        _update_cost(name, project_root, DEFAULT_COSTS_S.get(name, 1.0))
+
+
+def order_by_value(tools: list[tuple[str, float]], project_root: Path | None = None) -> list[str]:
+    """Order (name, value) pairs by value per expected second, best first."""
+    costs = load_costs(project_root)
+    return [name for name, value in sorted(tools, key=lambda t: -t[1] / max(estimated_cost(t[0], costs), 0.01))]
+
+
+@dataclass
+class Budget:
+    """Wall-clock budget shared by the tools of one check.
+
+    Learned tool costs are looked up and recorded for project_root.
+    """
+
+    seconds: float = DEFAULT_BUDGET_S
+    project_root: Path | None = None
+    started: float = field(default_factory=time.monotonic)
+    runs: list[ToolRun] = field(default_factory=list)
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def remaining(self) -> float:
+        return max(0.0, self.seconds - (time.monotonic() - self.started))
+
+    def run(
+        self,
+        name: str,
+        cmd: list[str],
+        *,
+        input: str | None = None,
+        cwd: Path | None = None,
+    ) -> ToolRun:
+        """Run a tool within the remaining budget and record the outcome."""
+        remaining = self.remaining()
+        expected = estimated_cost(name, project_root=self.project_root)
+        if remaining <= 0 or expected > remaining:
+            decay_cost(name, self.project_root)
+            return self._record(ToolRun(name, skipped=f"over budget (~{expected:.1f}s needed, {remaining:.1f}s left)"))
+
+        start = time.monotonic()
+        try:
+            result = subprocess.run(
+                cmd,
+                input=input,
+                capture_output=True,
+                text=True,
+                check=False,
+                cwd=cwd,
+                timeout=remaining,
+            )
+        except subprocess.TimeoutExpired:
+            duration = time.monotonic() - start
+            record_timeout(name, duration, self.project_root)
+            return self._record(ToolRun(name, duration_s=duration, skipped=f"timed out after {remaining:.1f}s"))
+        except (OSError, ValueError) as exc:
+            return self._record(ToolRun(name, skipped=f"failed to start: {exc}"))
+
+        duration = time.monotonic() - start
+        record_cost(name, duration, self.project_root)
+        return self._record(ToolRun(name, result.returncode, result.stdout or "", result.stderr or "", duration))
+
+    def _record(self, run: ToolRun) -> ToolRun:
+        with self._lock:
+            self.runs.append(run)
+        return run
+
+    def run_tool(self, tool: Tool) -> ToolRun:
+        """Run a declared tool within the remaining budget."""
+        return self.run(tool.name, tool.cmd, input=tool.input, cwd=tool.cwd)
+
+    def run_all(self, tools: list[Tool], max_workers: int = MAX_ANALYZER_WORKERS) -> dict[str, ToolRun]:
+        """Run mutating tools serially, then read-only analyzers concurrently.
+
+        Analyzers are submitted best value-per-cost first. The returned runs are
+        keyed in the order the tools were declared. File snapshots are dropped
+        once a mutating tool has rewritten files in place.
+        """
+        runs: dict[str, ToolRun] = {}
+        for tool in tools:
+            if tool.mutating:
+                runs[tool.name] = self.run_tool(tool)
+                if tool.input is None:
+                    invalidate()
+
+        analyzers = {tool.name: tool for tool in tools if not tool.mutating}
+        if len(analyzers) == 1:
+            (tool,) = analyzers.values()
+            runs[tool.name] = self.run_tool(tool)
+        elif analyzers:
+            order = order_by_value([(tool.name, tool.value) for tool in analyzers.values()], self.project_root)
+            with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(analyzers)))) as pool:
+                futures = {name: pool.submit(self.run_tool, analyzers[name]) for name in order}
+                for name, future in futures.items():
+                    runs[name] = future.result()
+
+        return {tool.name: runs[tool.name] for tool in tools}
+
+    @property
+    def skipped(self) -> list[ToolRun]:
+        return [run for run in self.runs if not run.completed]
+
+    def report(self, file_path: Path, language: str, background: bool = False) -> None:
+        """Log this check's runs and tell the agent about skipped tools."""
+        log_runs(file_path, language, self.runs)
+        if not self.skipped:
+            return
+        print("", file=sys.stderr)
+        for run in self.skipped:
+            print(f"{YELLOW}⏭️  Skipped {run.name}: {run.skipped}{NC}", file=sys.stderr)
+        if background:
+            print("   Full results will be reported after the next edit.", file=sys.stderr)
+
+
+def get_run_log_path() -> Path:
+    """Get session-scoped checker run log path."""
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return _sessions_base() / session_id / "checker-runs.jsonl"
+
+
+def log_runs(file_path: Path, language: str, runs: list[ToolRun]) -> None:
+    """Append which tools ran and which were skipped (and why) to the run log."""
+    entry = {
+        "ts": time.time(),
+        "file": str(file_path),
+        "language": language,
+        "ran": [{"tool": run.name, "duration_s": round(run.duration_s, 3)} for run in runs if run.completed],
+        "skipped": [{"tool": run.name, "reason": run.skipped} for run in runs if not run.completed],
+    }
+    path = get_run_log_path()
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        if path.exists() and path.stat().st_size > MAX_RUN_LOG_BYTES:
+            os.replace(path, path.with_suffix(".jsonl.1"))
+        with path.open("a") as f:
+            f.write(json.dumps(entry) + "\n")
+    except OSError:
+        pass
+
+
+def complete_in_background(file_path: Path, language: str) -> bool:
+    """Queue the file for a full background lint whose results the next hook reports."""
+    import lint_queue
+
+    if not lint_queue.coalescing_enabled():
+        return False
+    return lint_queue.enqueue(file_path, language)
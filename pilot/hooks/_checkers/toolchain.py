@@ -0,0 +1,160 @@
+"""Toolchain resolution cache - project root and tool binaries per source directory.
+
+Resolving a checker's tools walks up to 20 parent directories for a project
+marker and probes node_modules/.bin and $PATH for every binary. resolve() does
+that once per language and source directory and records the result in
+toolchain.json in the session directory.
+
+An entry stays valid while $PATH and the mtimes of package.json,
+node_modules/.bin, go.mod and pyproject.toml in its project root are
+unchanged, so a lookup costs one stat per watched path. Entries are also held
+in memory, which lets the hook daemon answer repeated lookups without reading
+the file. `pilot toolchain` prints the cached entries.
+
+Set PILOT_TOOLCHAIN_CACHE=0 to resolve on every call.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import tempfile
+import threading
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+
+from _util import _sessions_base
+
+WATCHED_PATHS = ("package.json", "node_modules/.bin", "go.mod", "pyproject.toml")
+ROOT_MARKERS = {"python": "pyproject.toml", "typescript": "package.json", "go": "go.mod"}
+MAX_ROOT_DEPTH = 20
+MAX_ENTRIES = 256
+
+_memory: dict[str, dict] = {}
+_LOCK = threading.Lock()
+
+
+@dataclass(frozen=True)
+class Toolchain:
+    """Resolved project root and tool binaries for one source directory."""
+
+    root: Path | None
+    tools: dict[str, str | None]
+
+    def get(self, name: str) -> str | None:
+        return self.tools.get(name)
+
+
+def toolchain_enabled() -> bool:
+    """Check whether the toolchain cache is enabled (PILOT_TOOLCHAIN_CACHE=0 disables)."""
+    return os.environ.get("PILOT_TOOLCHAIN_CACHE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def get_toolchain_path() -> Path:
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return _sessions_base() / session_id / "toolchain.json"
+
+
+def find_marker_root(file_path: Path, marker: str) -> Path | None:
+    """Find the nearest directory above file_path that contains marker."""
+    current = file_path.parent
+    for _ in range(MAX_ROOT_DEPTH + 1):
+        if current == current.parent:
+            break
+        if (current / marker).exists():
+            return current
+        current = current.parent
+    return None
+
+
+def watched_state(directory: Path) -> dict:
+    """$PATH and the mtimes of the watched files in directory (None when missing)."""
+    mtimes: dict[str, int | None] = {}
+    for name in WATCHED_PATHS:
+        try:
+            mtimes[name] = (directory / name).stat().st_mtime_ns
+        except OSError:
+            mtimes[name] = None
+    return {"path": os.environ.get("PATH", ""), "mtimes": mtimes}
+
+
+def resolve(
+    language: str,
+    file_path: Path,
+    tools: tuple[str, ...],
+    find_binary: Callable[[str, Path | None], str | None],
+    find_root: Callable[[Path], Path | None] | None = None,
+) -> Toolchain:
+    """Return the toolchain for file_path, resolving it with find_root and find_binary on a miss.
+
+    find_root defaults to the nearest directory holding the language's
+    ROOT_MARKERS entry.
+    """
+    find_root = find_root or partial(find_marker_root, marker=ROOT_MARKERS[language])
+    if not toolchain_enabled():
+        root = find_root(file_path)
+        return Toolchain(root, {name: find_binary(name, root) for name in tools})
+
+    directory = os.path.abspath(file_path.parent)
+    key = f"{language}:{directory}"
+    entry = _memory.get(key) or load_entries().get(key)
+    if entry is not None and set(tools) <= set(entry["tools"]) and _is_fresh(entry):
+        _memory[key] = entry
+        return _to_toolchain(entry)
+
+    root = find_root(file_path)
+    entry = {
+        "language": language,
+        "directory": directory,
+        "root": str(root) if root else None,
+        "tools": {name: find_binary(name, root) for name in tools},
+        "state": watched_state(root or Path(directory)),
+        "resolved_at": time.time(),
+    }
+    _memory[key] = entry
+    _store(key, entry)
+    return _to_toolchain(entry)
+
+
+def _is_fresh(entry: dict) -> bool:
+    return entry.get("state") == watched_state(Path(entry["root"] or entry["directory"]))
+
+
+def _to_toolchain(entry: dict) -> Toolchain:
+    return Toolchain(Path(entry["root"]) if entry["root"] else None, dict(entry["tools"]))
+
+
+def load_entries(toolchain_path: Path | None = None) -> dict[str, dict]:
+    """Read the cached entries, keyed "<language>:<directory>"."""
+    try:
+        data = json.loads((toolchain_path or get_toolchain_path()).read_text())
+    except (OSError, json.JSONDecodeError):
+        return {}
+    entries = data.get("entries") if isinstance(data, dict) else None
+    return entries if isinstance(entries, dict) else {}
+
+
+def _store(key: str, entry: dict) -> None:
+    toolchain_path = get_toolchain_path()
+    with _LOCK:
+        entries = load_entries(toolchain_path)
+        entries[key] = entry
+        if len(entries) > MAX_ENTRIES:
+            newest = sorted(entries.items(), key=lambda item: item[1].get("resolved_at", 0), reverse=True)
+            entries = dict(newest[:MAX_ENTRIES])
+        try:
+            toolchain_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=toolchain_path.parent, prefix=".toolchain-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump({"entries": entries}, f)
+            os.replace(tmp_name, toolchain_path)
+        except OSError:
+            pass
+
+
+def clear_memory() -> None:
+    """Forget in-memory entries (the session file is kept)."""
+    _memory.clear()
@@ -0,0 +1,184 @@
+"""Diff-scoped reporting - which lines an edit touched, and which diagnostics sit on them.
+
+Checkers print diagnostics on touched lines in full and collapse the rest
+into a one-line count. Touched lines come from the PostToolUse tool_input (the
+new_string of an Edit or each edit of a MultiEdit, located in the file as
+written) and otherwise, for a Write, a deletion or a replacement a formatter
+rewrote, from the file's `git diff -U0 HEAD` hunks; a deletion hunk touches
+the lines on either side of it. When neither is available every diagnostic is
+shown.
+
+A diagnostic off the touched lines is only called pre-existing when the
+checker's diagnostics cache holds the same diagnostic for the file as it was
+before the edit (rebuilt by undoing the edit's replacements). Diagnostics the
+edit introduced elsewhere, such as an import left unused, are shown in full.
+"""
+
+from __future__ import annotations
+
+import re
+import subprocess
+import sys
+from collections.abc import Callable, Hashable, Iterable
+from pathlib import Path
+from typing import TypeVar
+
+from _snapshot import read_text
+
+GIT_DIFF_TIMEOUT_S = 2.0
+_HUNK_RE = re.compile(r"^@@ -\d+(?:,\d+)? \+(\d+)(?:,(\d+))? @@", re.MULTILINE)
+
+T = TypeVar("T")
+
+
+def touched_lines(file_path: Path, tool_input: dict | None = None) -> set[int] | None:
+    """1-based lines the current edit touched, or None when unknown.
+
+    Without a tool_input there is no edit to scope to (direct checks, settled
+    batch results), so None is returned.
+    """
+    if not tool_input:
+        return None
+    lines = lines_from_tool_input(file_path, tool_input)
+    return lines if lines is not None else lines_from_git_diff(file_path)
+
+
+def lines_from_tool_input(file_path: Path, tool_input: dict | None) -> set[int] | None:
+    """Lines holding the replacement text of an Edit or MultiEdit.
+
+    Returns None for other tools, for a deletion (its position is not in the
+    replacement text), or when a replacement can no longer be found because
+    a formatter rewrote it.
+    """
+    content = read_text(file_path) if tool_input else None
+    if content is None:
+        return None
+    return _lines_holding(content, _edit_texts(tool_input, "new_string"))
+
+
+def replaced_lines(previous: str, tool_input: dict | None) -> set[int] | None:
+    """Lines of previous (the file before an Edit or MultiEdit) holding the text the edit replaced.
+
+    Returns None for other tools and for pure insertions.
+    """
+    return _lines_holding(previous, _edit_texts(tool_input, "old_string")) if tool_input else None
+
+
+def _edit_texts(tool_input: dict, key: str) -> list[str]:
+    edits = tool_input.get("edits")
+    if isinstance(edits, list):
+        texts = [edit.get(key) for edit in edits if isinstance(edit, dict)]
+    else:
+        texts = [tool_input.get(key)]
+    return [text.strip("\n") for text in texts if isinstance(text, str)]
+
+
+def _lines_holding(content: str, texts: list[str]) -> set[int] | None:
+    if not texts:
+        return None
+    lines: set[int] = set()
+    for text in texts:
+        if not text:
+            return None
+        start = content.find(text)
+        if start < 0:
+            return None
+        while start >= 0:
+            first = content.count("\n", 0, start) + 1
+            lines.update(range(first, first + text.count("\n") + 1))
+            start = content.find(text, start + len(text))
+    return lines
+
+
+def lines_from_git_diff(file_path: Path) -> set[int] | None:
+    """Lines added or changed since HEAD, or None outside git or for untracked files."""
+    try:
+        result = subprocess.run(
+            ["git", "diff", "--no-color", "--no-ext-diff", "-U0", "HEAD", "--", file_path.name],
+            cwd=file_path.parent,
+            capture_output=True,
+            text=True,
+            timeout=GIT_DIFF_TIMEOUT_S,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    if result.returncode != 0 or not result.stdout:
+        return None
+
+    lines: set[int] = set()
+    for match in _HUNK_RE.finditer(result.stdout):
+        start = int(match.group(1))
+        count = int(match.group(2)) if match.group(2) is not None else 1
+        lines.update(range(start, start + count) if count else range(max(start, 1), start + 2))
+    return lines
+
+
+def pre_edit_content(content: str, tool_input: dict | None) -> str | None:
+    """The file before an Edit or MultiEdit, rebuilt by undoing its replacements.
+
+    content is the file as the edit wrote it. Returns None for other tools, or
+    when a replacement cannot be undone unambiguously (a deletion, or
+    replacement text that is missing or appears more than once).
+    """
+    if not tool_input:
+        return None
+    edits = tool_input.get("edits")
+    if not isinstance(edits, list):
+        edits = [tool_input] if "new_string" in tool_input else []
+    if not edits:
+        return None
+    for edit in reversed(edits):
+        if not isinstance(edit, dict):
+            return None
+        old, new = edit.get("old_string"), edit.get("new_string")
+        if not isinstance(old, str) or not isinstance(new, str) or not new:
+            return None
+        count = content.count(new)
+        if count == 0 or (count > 1 and not edit.get("replace_all")):
+            return None
+        content = content.replace(new, old)
+    return content
+
+
+def existed_before(previous: Iterable[T] | None, identity: Callable[[T], Hashable]) -> Callable[[T], bool] | None:
+    """Predicate telling whether an item was also reported before the edit, or None if unknown."""
+    if previous is None:
+        return None
+    known = {identity(item) for item in previous}
+    return lambda item: identity(item) in known
+
+
+def split_touched(
+    items: Iterable[T],
+    touched: set[int] | None,
+    line_of: Callable[[T], int | None],
+    existed: Callable[[T], bool] | None = None,
+) -> tuple[list[T], int]:
+    """Items to show in full, and the number left out.
+
+    Items on touched lines, or without a line in this file, are shown. With
+    existed given, items elsewhere are left out only if they were reported
+    before the edit too.
+    """
+    if touched is None:
+        return list(items), 0
+    shown = []
+    hidden = 0
+    for item in items:
+        line = line_of(item)
+        if line is None or line in touched or (existed is not None and not existed(item)):
+            shown.append(item)
+        else:
+            hidden += 1
+    return shown, hidden
+
+
+def print_untouched(count: int, pre_existing: bool = False) -> None:
+    """Collapse diagnostics on lines the edit did not touch into one line.
+
+    pre_existing says they are known to predate the edit.
+    """
+    if count:
+        plural = "issue" if count == 1 else "issues"
+        label = "pre-existing " if pre_existing else ""
+        print(f"  + {count} {label}{plural} on lines this edit did not touch", file=sys.stderr)
@@ -0,0 +1,215 @@
+#!/usr/bin/env node
+/**
+ * Warm ESLint/Prettier server for the TypeScript checker.
+ *
+ * Usage: node ts_server.cjs <project_root> <socket_path> [idle_seconds]
+ *
+ * Loads the project's own eslint and prettier from node_modules once and
+ * serves check requests over a Unix socket. Each connection carries one JSON
+ * request ({"file": path, "format": bool}) terminated by the client closing its
+ * write side; the reply is one JSON object ({"formatted": bool, "eslint": [...]})
+ * in the same shape as `eslint --format json`.
+ *
+ * Config files are re-stat'ed on every request and the linters are rebuilt when
+ * any of them change. An upgraded eslint/prettier package makes the server exit
+ * so the next check starts a fresh one. The server exits after idle_seconds
+ * without requests.
+ */
+
+"use strict";
+
+const fs = require("fs");
+const net = require("net");
+const path = require("path");
+const { createRequire } = require("module");
+
+const [, , rootArg, socketPath, idleArg] = process.argv;
+const projectRoot = path.resolve(rootArg || ".");
+const IDLE_MS = Number(idleArg || 600) * 1000;
+const CONFIG_NAMES = [
+  "package.json",
+  "tsconfig.json",
+  ".editorconfig",
+  ".prettierrc",
+  ".prettierrc.json",
+  ".prettierrc.yaml",
+  ".prettierrc.yml",
+  ".prettierrc.js",
+  ".prettierrc.cjs",
+  ".prettierrc.mjs",
+  "prettier.config.js",
+  "prettier.config.cjs",
+  "prettier.config.mjs",
+  ".prettierignore",
+  ".eslintrc",
+  ".eslintrc.json",
+  ".eslintrc.yaml",
+  ".eslintrc.yml",
+  ".eslintrc.js",
+  ".eslintrc.cjs",
+  "eslint.config.js",
+  "eslint.config.cjs",
+  "eslint.config.mjs",
+  "eslint.config.ts",
+  ".eslintignore",
+];
+
+const projectRequire = createRequire(path.join(projectRoot, "package.json"));
+
+function tryRequire(name) {
+  try {
+    return projectRequire(name);
+  } catch {
+    return null;
+  }
+}
+
+function statSignature(file) {
+  try {
+    const st = fs.statSync(file);
+    return `${st.size}:${st.mtimeMs}`;
+  } catch {
+    return "";
+  }
+}
+
+function packageSignature() {
+  return ["eslint", "prettier"]
+    .map((name) => statSignature(path.join(projectRoot, "node_modules", name, "package.json")))
+    .join("|");
+}
+
+function configSignature(file) {
+  const parts = [];
+  let dir = path.dirname(file);
+  for (let depth = 0; depth < 20; depth++) {
+    for (const name of CONFIG_NAMES) {
+      parts.push(statSignature(path.join(dir, name)));
+    }
+    if (dir === projectRoot || path.dirname(dir) === dir) break;
+    dir = path.dirname(dir);
+  }
+  return parts.join("|");
+}
+
+const startupPackages = packageSignature();
+const eslintModule = tryRequire("eslint");
+const prettier = tryRequire("prettier");
+const configSignatures = new Map();
+let eslint = null;
+
+async function createESLint() {
+  if (!eslintModule) return null;
+  const ESLintClass = eslintModule.loadESLint
+    ? await eslintModule.loadESLint({ cwd: projectRoot })
+    : eslintModule.ESLint;
+  return new ESLintClass({ cwd: projectRoot });
+}
+
+async function reloadIfConfigChanged(file) {
+  const dir = path.dirname(file);
+  const rootSignature = configSignature(path.join(projectRoot, "package.json"));
+  const dirSignature = configSignature(file);
+  const previousRoot = configSignatures.get(projectRoot);
+  const previousDir = configSignatures.get(dir);
+  configSignatures.set(projectRoot, rootSignature);
+  configSignatures.set(dir, dirSignature);
+
+  const changed =
+    (previousRoot !== undefined && previousRoot !== rootSignature) ||
+    (previousDir !== undefined && previousDir !== dirSignature);
+  if (!changed) return;
+  eslint = await createESLint();
+  if (prettier && prettier.clearConfigCache) await prettier.clearConfigCache();
+}
+
+async function formatFile(file) {
+  if (!prettier) return false;
+  const info = await prettier.getFileInfo(file, {
+    ignorePath: path.join(projectRoot, ".prettierignore"),
+  });
+  if (info.ignored || !info.inferredParser) return false;
+  const options = (await prettier.resolveConfig(file, { editorconfig: true })) || {};
+  const source = fs.readFileSync(file, "utf8");
+  const output = await prettier.format(source, { ...options, filepath: file });
+  if (output === source) return false;
+  fs.writeFileSync(file, output);
+  return true;
+}
+
+async function check(request) {
+  if (packageSignature() !== startupPackages) {
+    return { restart: true };
+  }
+  const file = path.resolve(request.file);
+  await reloadIfConfigChanged(file);
+  const formatted = request.format ? await formatFile(file) : false;
+  if (!eslint) eslint = await createESLint();
+  if (!eslint) return { error: "eslint not installed in project" };
+  const results = await eslint.lintFiles([file]);
+  return {
+    formatted,
+    eslint: results.map(({ source, ...rest }) => rest),
+  };
+}
+
+let idleTimer = null;
+function resetIdle(server) {
+  if (idleTimer) clearTimeout(idleTimer);
+  idleTimer = setTimeout(() => shutdown(server), IDLE_MS);
+}
+
+function shutdown(server) {
+  server.close();
+  try {
+    fs.unlinkSync(socketPath);
+  } catch {}
+  process.exit(0);
+}
+
+let queue = Promise.resolve();
+
+function handleConnection(server, conn) {
+  const chunks = [];
+  conn.on("data", (chunk) => chunks.push(chunk));
+  conn.on("error", () => {});
+  conn.on("end", () => {
+    resetIdle(server);
+    queue = queue.then(async () => {
+      let response;
+      try {
+        response = await check(JSON.parse(Buffer.concat(chunks).toString("utf8")));
+      } catch (err) {
+        response = { error: String((err && err.message) || err) };
+      }
+      conn.end(JSON.stringify(response), () => {
+        if (response.restart) shutdown(server);
+      });
+    });
+  });
+}
+
+function listen() {
+  const server = net.createServer({ allowHalfOpen: true }, (conn) => handleConnection(server, conn));
+  server.on("error", (err) => {
+    if (err.code !== "EADDRINUSE") process.exit(1);
+    const probe = net.connect(socketPath);
+    probe.on("connect", () => process.exit(0));
+    probe.on("error", () => {
+      try {
+        fs.unlinkSync(socketPath);
+      } catch {}
+      server.listen(socketPath);
+    });
+  });
+  server.listen(socketPath, () => {
+    fs.chmodSync(socketPath, 0o600);
+    resetIdle(server);
+  });
+}
+
+if (!rootArg || !socketPath) {
+  process.stderr.write("usage: ts_server.cjs <project_root> <socket_path> [idle_seconds]\n");
+  process.exit(2);
+}
+listen();
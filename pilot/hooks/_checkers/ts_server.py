@@ -0,0 +1,118 @@
+"""Client for the warm ESLint/Prettier server (ts_server.cjs).
+
+One Node process per project root keeps the project's eslint and prettier
+loaded between edits, so a check costs a socket round-trip instead of Node
+startup plus config and plugin loading. When no server is running one is
+started in the background and the caller falls back to the CLI for that edit.
+
+Set PILOT_TS_SERVER=0 to always use the CLI path.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import shutil
+import socket
+import subprocess
+from pathlib import Path
+
+from _util import get_runtime_dir
+
+SERVER_SCRIPT = Path(__file__).with_name("ts_server.cjs")
+CONNECT_TIMEOUT_S = 0.2
+REQUEST_TIMEOUT_S = 30.0
+IDLE_TIMEOUT_S = int(os.environ.get("PILOT_TS_SERVER_IDLE", "600"))
+
+
+def server_enabled() -> bool:
+    """Check whether the warm server should be used (PILOT_TS_SERVER=0 disables)."""
+    return os.environ.get("PILOT_TS_SERVER", "1").strip().lower() not in ("0", "false", "no")
+
+
+def get_server_socket_path(project_root: Path) -> Path:
+    """Get the socket path of the server for project_root."""
+    digest = hashlib.sha256(str(project_root.resolve()).encode()).hexdigest()[:16]
+    return get_runtime_dir() / f"ts-{digest}.sock"
+
+
+def has_local_eslint(project_root: Path) -> bool:
+    """Check whether the project has its own eslint installed the server can load."""
+    return (project_root / "node_modules" / "eslint" / "package.json").exists()
+
+
+def _connect(project_root: Path) -> socket.socket | None:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        sock.settimeout(CONNECT_TIMEOUT_S)
+        sock.connect(str(get_server_socket_path(project_root)))
+    except OSError:
+        sock.close()
+        return None
+    return sock
+
+
+def request_check(sock: socket.socket, file_path: Path, format_file: bool) -> dict | None:
+    """Ask a connected server to format and lint file_path.
+
+    Returns the server response, or None if the server failed or asked to be
+    restarted.
+    """
+    request = {"file": str(file_path.resolve()), "format": format_file}
+    try:
+        with sock:
+            sock.settimeout(REQUEST_TIMEOUT_S)
+            sock.sendall(json.dumps(request).encode())
+            sock.shutdown(socket.SHUT_WR)
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+        response = json.loads(b"".join(chunks))
+    except (OSError, ValueError):
+        return None
+
+    if not isinstance(response, dict) or "error" in response or response.get("restart"):
+        return None
+    if not isinstance(response.get("eslint"), list):
+        return None
+    return response
+
+
+def spawn_server(project_root: Path) -> None:
+    """Start the server for project_root in the background."""
+    node_bin = shutil.which("node")
+    if not node_bin:
+        return
+    try:
+        subprocess.Popen(
+            [
+                node_bin,
+                str(SERVER_SCRIPT),
+                str(project_root.resolve()),
+                str(get_server_socket_path(project_root)),
+                str(IDLE_TIMEOUT_S),
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def check_via_server(project_root: Path | None, file_path: Path, format_file: bool) -> list | None:
+    """Format and lint through the warm server.
+
+    Returns eslint's JSON results, or None when the caller should use the CLI.
+    """
+    if project_root is None or not server_enabled() or not has_local_eslint(project_root):
+        return None
+    sock = _connect(project_root)
+    if sock is None:
+        spawn_server(project_root)
+        return None
+    response = request_check(sock, file_path, format_file)
+    return response["eslint"] if response else None
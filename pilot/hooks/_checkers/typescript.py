@@ -6,10 +6,10 @@ import json
 import os
 import re
 import shutil
-import subprocess
 import sys
 from pathlib import Path
 
+from _snapshot import invalidate, read_text, write_text
 from _util import (
     BLUE,
     GREEN,
@@ -18,8 +18,20 @@ from _util import (
     check_file_length,
 )
 
+from _checkers import cache, toolchain, ts_server
+from _checkers.comments import strip_line_comments
+from _checkers.lsp import check_types, print_type_errors, type_check_enabled
+from _checkers.runner import BACKGROUND_BUDGET_S, Budget, complete_in_background
+from _checkers.touched import existed_before, pre_edit_content, print_untouched, split_touched, touched_lines
+
 TS_EXTENSIONS = {".ts", ".tsx", ".js", ".jsx", ".mjs", ".mts"}
+JSX_EXTENSIONS = {".tsx", ".jsx", ".js", ".mjs", ".cjs"}
+TS_TOOLS = ("prettier", "eslint")
 DEBUG = os.environ.get("HOOK_DEBUG", "").lower() == "true"
+TS_PRESERVE_RE = re.compile(
+    r"//\s*(?:@ts-|eslint-|prettier-|TODO|FIXME|XXX|NOTE|@type|@param|@returns)",
+    re.IGNORECASE,
+)
 
 
 def debug_log(message: str) -> None:
@@ -30,41 +42,15 @@ def debug_log(message: str) -> None:
 
 def strip_typescript_comments(file_path: Path) -> bool:
     """Remove inline // comments from TypeScript/JavaScript file."""
-    preserve_patterns = re.compile(
-        r"//\s*@ts-|//\s*eslint-|//\s*prettier-|//\s*TODO|//\s*FIXME|//\s*XXX|//\s*NOTE|//\s*@type|//\s*@param|//\s*@returns",
-        re.IGNORECASE,
-    )
-
-    try:
-        content = file_path.read_text()
-        lines = content.splitlines(keepends=True)
-    except Exception:
+    content = read_text(file_path)
+    if content is None:
         return False
 
-    new_lines = []
-    modified = False
-
-    for line in lines:
-        if "//" not in line or '"//' in line or "'//" in line or "`//" in line or "://" in line:
-            new_lines.append(line)
-            continue
-
-        match = re.search(r"//.*$", line)
-        if not match or preserve_patterns.search(match.group(0)):
-            new_lines.append(line)
-            continue
-
-        before_comment = line[: match.start()].rstrip()
-        if before_comment:
-            new_lines.append(before_comment + "\n")
-            modified = True
-        else:
-            modified = True
-
+    language = "jsx" if file_path.suffix in JSX_EXTENSIONS else "typescript"
+    new_content, modified = strip_line_comments(content, TS_PRESERVE_RE, language)
     if modified:
-        file_path.write_text("".join(new_lines))
-        return True
-    return False
+        write_text(file_path, new_content)
+    return modified
 
 
 def find_project_root(file_path: Path) -> Path | None:
@@ -90,43 +76,118 @@ def find_tool(tool_name: str, project_root: Path | None) -> str | None:
     return shutil.which(tool_name)
 
 
-def check_typescript(file_path: Path) -> tuple[int, str]:
-    """Check TypeScript file with prettier and eslint. Returns (exit_code, reason)."""
+def resolve_toolchain(file_path: Path) -> toolchain.Toolchain:
+    """Resolve the project root, prettier and eslint through the session toolchain cache."""
+    return toolchain.resolve("typescript", file_path, TS_TOOLS, find_tool, find_project_root)
+
+
+def is_lint_target(file_path: Path) -> bool:
+    """Check whether file_path gets formatted and linted (test files are skipped)."""
+    return ".test." not in file_path.name and ".spec." not in file_path.name
+
+
+def check_typescript(file_path: Path, tool_input: dict | None = None) -> tuple[int, str]:
+    """Check TypeScript file with prettier and eslint. Returns (exit_code, reason).
+
+    Uses the project's warm ESLint/Prettier server when available and the
+    CLI tools otherwise. tool_input scopes the report to the edited lines.
+    """
+    original = read_text(file_path)
     strip_typescript_comments(file_path)
 
-    if ".test." in file_path.name or ".spec." in file_path.name:
+    if not is_lint_target(file_path):
         return 0, ""
 
     check_file_length(file_path)
 
-    project_root = find_project_root(file_path)
+    resolved = resolve_toolchain(file_path)
+    project_root = resolved.root
+    prettier_bin = resolved.get("prettier")
+    eslint_bin = resolved.get("eslint")
+
+    previous = None
+    pre_edit = pre_edit_content(original, tool_input) if original is not None and eslint_bin else None
+    if pre_edit is not None:
+        previous = cache.lookup(_cache_key(file_path, prettier_bin, eslint_bin, pre_edit))
+    cached = cache.lookup(_cache_key(file_path, prettier_bin, eslint_bin)) if eslint_bin else None
+    if cached is not None:
+        return report_typescript(file_path, {**cached, **_check_types(project_root, file_path)}, tool_input, previous)
+
+    served = None
+    if eslint_bin and _is_project_local(eslint_bin, project_root) and _is_project_local(prettier_bin, project_root):
+        served = ts_server.check_via_server(project_root, file_path, format_file=prettier_bin is not None)
+        invalidate(file_path)
+
+    budget = Budget(project_root=project_root)
+    if served is not None:
+        _, results = _collect_eslint(served, False, {})
+    else:
+        if prettier_bin:
+            budget.run("prettier", [prettier_bin, "--write", str(file_path)], cwd=project_root)
+            invalidate(file_path)
+
+        if not eslint_bin:
+            types = _check_types(project_root, file_path)
+            return report_typescript(file_path, types, tool_input) if types else (0, "")
+
+        _, results = _run_eslint(eslint_bin, file_path, project_root, False, {}, budget)
+
+    if budget.skipped:
+        budget.report(file_path, "typescript", background=complete_in_background(file_path, "typescript"))
+        return report_typescript(file_path, results, tool_input, previous) if results else (2, "")
+    budget.report(file_path, "typescript")
 
-    prettier_bin = find_tool("prettier", project_root)
-    if prettier_bin:
-        try:
-            subprocess.run(
-                [prettier_bin, "--write", str(file_path)], capture_output=True, check=False, cwd=project_root
-            )
-        except Exception:
-            pass
+    if "eslint" in results:
+        errs, warns, data = results["eslint"]
+        stored = {"eslint": (errs, warns, [{k: v for k, v in f.items() if k != "source"} for f in data])}
+    else:
+        stored = results
+    cache.store(_cache_key(file_path, prettier_bin, eslint_bin), stored)
+    return report_typescript(file_path, {**results, **_check_types(project_root, file_path)}, tool_input, previous)
 
-    eslint_bin = find_tool("eslint", project_root)
 
-    if not eslint_bin:
-        return 0, ""
+def _check_types(project_root: Path | None, file_path: Path) -> dict[str, tuple]:
+    text = read_text(file_path) if type_check_enabled() else None
+    return check_types("typescript", project_root, file_path, text) if text is not None else {}
 
-    results: dict[str, tuple] = {}
-    has_issues = False
 
-    if eslint_bin:
-        has_issues, results = _run_eslint(eslint_bin, file_path, project_root, has_issues, results)
+def _is_project_local(binary: str | None, project_root: Path | None) -> bool:
+    """Check whether binary is absent or installed in the project's node_modules."""
+    if binary is None:
+        return True
+    if project_root is None:
+        return False
+    return Path(binary).is_relative_to(project_root / "node_modules")
+
+
+def _cache_key(
+    file_path: Path, prettier_bin: str | None, eslint_bin: str | None, content: str | None = None
+) -> str | None:
+    return cache.diagnostics_key(
+        "typescript",
+        file_path,
+        [prettier_bin, eslint_bin],
+        cache.TYPESCRIPT_CONFIG_FILES,
+        content=content.encode() if content is not None else None,
+    )
+
+
+def report_typescript(
+    file_path: Path, results: dict, tool_input: dict | None = None, previous: dict | None = None
+) -> tuple[int, str]:
+    """Print collected diagnostics and build the (exit_code, reason) result.
 
-    if has_issues:
-        _print_typescript_issues(file_path, results)
+    Diagnostics on lines the edit did not touch are collapsed into a count;
+    previous holds the cached results for the file before the edit, if known.
+    """
+    if results:
+        _print_typescript_issues(file_path, results, touched_lines(file_path, tool_input), previous)
         parts = []
         if "eslint" in results:
             errs, warns, _ = results["eslint"]
             parts.append(f"{errs + warns} eslint")
+        if "type errors" in results:
+            parts.append(f"{results['type errors'][0]} type errors")
         reason = f"TypeScript: {', '.join(parts)} in {file_path.name}"
         return 2, reason
 
@@ -135,37 +196,93 @@ def check_typescript(file_path: Path) -> tuple[int, str]:
     return 2, ""
 
 
+def format_typescript(file_path: Path, content: str) -> str | None:
+    """Format content with prettier over stdin, without touching file_path.
+
+    Returns None when prettier is not installed or fails.
+    """
+    resolved = resolve_toolchain(file_path)
+    prettier_bin = resolved.get("prettier")
+    if not prettier_bin:
+        return None
+    formatted = Budget(BACKGROUND_BUDGET_S, resolved.root).run(
+        "prettier", [prettier_bin, "--stdin-filepath", str(file_path)], input=content, cwd=resolved.root
+    )
+    if not formatted.completed or formatted.returncode != 0:
+        return None
+    return formatted.stdout
+
+
+def lint_typescript_batch(files: list[Path]) -> dict[Path, dict]:
+    """Lint several files with one read-only eslint call per project.
+
+    Returns per-file results in the shape check_typescript reports. Files whose
+    project has no eslint are omitted.
+    """
+    by_project: dict[Path | None, list[Path]] = {}
+    toolchains: dict[Path | None, toolchain.Toolchain] = {}
+    for file_path in files:
+        resolved = resolve_toolchain(file_path)
+        by_project.setdefault(resolved.root, []).append(file_path)
+        toolchains.setdefault(resolved.root, resolved)
+
+    results: dict[Path, dict] = {}
+    for project_root, project_files in by_project.items():
+        eslint_bin = toolchains[project_root].get("eslint")
+        if not eslint_bin:
+            continue
+        paths = [str(f) for f in project_files]
+        linted = Budget(BACKGROUND_BUDGET_S, project_root).run(
+            "eslint (batch)", [eslint_bin, "--format", "json", *paths], cwd=project_root
+        )
+        try:
+            data = json.loads(linted.stdout)
+        except json.JSONDecodeError:
+            continue
+
+        by_file = {Path(entry.get("filePath", "")).resolve(): entry for entry in data if isinstance(entry, dict)}
+        for file_path in project_files:
+            entry = by_file.get(file_path.resolve())
+            if entry is not None:
+                entry = {k: v for k, v in entry.items() if k != "source"}
+            _, file_results = _collect_eslint([entry] if entry else [], False, {})
+            results[file_path] = file_results
+    return results
+
+
 def _run_eslint(
     eslint_bin: str,
     file_path: Path,
     project_root: Path | None,
     has_issues: bool,
     results: dict[str, tuple],
+    budget: Budget | None = None,
 ) -> tuple[bool, dict[str, tuple]]:
     """Run eslint and collect results."""
+    budget = budget or Budget(project_root=project_root)
+    result = budget.run("eslint", [eslint_bin, "--format", "json", str(file_path)], cwd=project_root)
+    if not result.completed:
+        return has_issues, results
     try:
-        result = subprocess.run(
-            [eslint_bin, "--format", "json", str(file_path)],
-            capture_output=True,
-            text=True,
-            check=False,
-            cwd=project_root,
-        )
-        try:
-            data = json.loads(result.stdout)
-            total_errors = sum(f.get("errorCount", 0) for f in data)
-            total_warnings = sum(f.get("warningCount", 0) for f in data)
-            if total_errors > 0 or total_warnings > 0:
-                has_issues = True
-                results["eslint"] = (total_errors, total_warnings, data)
-        except json.JSONDecodeError:
-            pass
-    except Exception:
-        pass
+        data = json.loads(result.stdout)
+    except json.JSONDecodeError:
+        return has_issues, results
+    return _collect_eslint(data, has_issues, results)
+
+
+def _collect_eslint(data: list, has_issues: bool, results: dict[str, tuple]) -> tuple[bool, dict[str, tuple]]:
+    """Count errors and warnings in eslint JSON results."""
+    total_errors = sum(f.get("errorCount", 0) for f in data)
+    total_warnings = sum(f.get("warningCount", 0) for f in data)
+    if total_errors > 0 or total_warnings > 0:
+        has_issues = True
+        results["eslint"] = (total_errors, total_warnings, data)
     return has_issues, results
 
 
-def _print_typescript_issues(file_path: Path, results: dict[str, tuple]) -> None:
+def _print_typescript_issues(
+    file_path: Path, results: dict[str, tuple], touched: set[int] | None = None, previous: dict | None = None
+) -> None:
     """Print TypeScript diagnostic issues to stderr."""
     print("", file=sys.stderr)
     try:
@@ -181,17 +298,28 @@ def _print_typescript_issues(file_path: Path, results: dict[str, tuple]) -> None
         print("", file=sys.stderr)
         print(f"📝 ESLint: {total} {plural} ({total_errors} errors, {total_warnings} warnings)", file=sys.stderr)
         print("───────────────────────────────────────", file=sys.stderr)
+        before = None
+        if previous is not None:
+            before = [msg for entry in previous.get("eslint", (0, 0, []))[2] for msg in entry.get("messages", [])]
+        existed = existed_before(before, lambda msg: (msg.get("ruleId"), msg.get("message")))
         for file_result in data:
             file_name = Path(file_result.get("filePath", "")).name
-            for msg in file_result.get("messages", [])[:10]:
+            messages, untouched = split_touched(
+                file_result.get("messages", []), touched, lambda msg: msg.get("line"), existed
+            )
+            for msg in messages[:10]:
                 line = msg.get("line", 0)
                 rule_id = msg.get("ruleId", "unknown")
                 message = msg.get("message", "")
                 severity = "error" if msg.get("severity", 0) == 2 else "warn"
                 print(f"  {file_name}:{line} [{severity}] {rule_id}: {message}", file=sys.stderr)
-            if len(file_result.get("messages", [])) > 10:
-                remaining = len(file_result["messages"]) - 10
+            if len(messages) > 10:
+                remaining = len(messages) - 10
                 print(f"  ... and {remaining} more issues", file=sys.stderr)
+            print_untouched(untouched, pre_existing=existed is not None)
         print("", file=sys.stderr)
 
+    if "type errors" in results:
+        print_type_errors(file_path, results["type errors"][1], touched)
+
     print(f"{RED}Fix TypeScript issues above before continuing{NC}", file=sys.stderr)
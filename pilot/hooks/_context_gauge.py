@@ -0,0 +1,72 @@
+"""Context gauge - read the statusline's context reading from shared memory.
+
+The statusline (launcher/context_gauge.py) rewrites context.gauge in the
+session directory in place on every refresh: a fixed-size record of magic,
+sequence number, percentage, timestamp and Claude session id, written with
+the seqlock pattern (odd sequence number while the record is being written).
+Reading it takes no lock and no JSON parsing: copy the record from the page
+cache and retry if the sequence number was odd or changed meanwhile.
+
+A reading older than STALE_AFTER_S is treated as missing, here and in
+`pilot check-context`.
+"""
+
+from __future__ import annotations
+
+import mmap
+import os
+import struct
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+GAUGE_FILE = "context.gauge"
+MAGIC = b"PCG1"
+RECORD = struct.Struct("<4s4xQddH64s")
+SEQ = struct.Struct("<Q")
+SEQ_OFFSET = 8
+GAUGE_SIZE = 128
+STALE_AFTER_S = 60.0
+READ_ATTEMPTS = 64
+
+
+@dataclass(frozen=True)
+class GaugeReading:
+    """One complete reading published by the statusline."""
+
+    pct: float
+    ts: float
+    session_id: str
+    seq: int
+
+
+def read_gauge(session_dir: Path) -> GaugeReading | None:
+    """The last complete reading in session_dir, or None if there is none."""
+    try:
+        fd = os.open(session_dir / GAUGE_FILE, os.O_RDONLY)
+    except OSError:
+        return None
+    try:
+        if os.fstat(fd).st_size < GAUGE_SIZE:
+            return None
+        with mmap.mmap(fd, GAUGE_SIZE, access=mmap.ACCESS_READ) as gauge:
+            for _ in range(READ_ATTEMPTS):
+                magic, seq, pct, ts, length, encoded = RECORD.unpack(gauge[: RECORD.size])
+                if seq % 2 or SEQ.unpack_from(gauge, SEQ_OFFSET)[0] != seq:
+                    continue
+                if magic != MAGIC:
+                    return None
+                return GaugeReading(pct, ts, encoded[:length].decode(errors="replace"), seq)
+    except (OSError, ValueError):
+        return None
+    finally:
+        os.close(fd)
+    return None
+
+
+def read_context_pct(session_dir: Path) -> float | None:
+    """Context percentage from the gauge, or None if it is missing or stale."""
+    reading = read_gauge(session_dir)
+    if reading is None or time.time() - reading.ts > STALE_AFTER_S:
+        return None
+    return reading.pct
@@ -0,0 +1,145 @@
+"""Coverage index lookups - which tests executed the lines of a file.
+
+`pilot coverage` ingests the project's coverage artifacts (coverage.py data
+with dynamic contexts, Go cover profiles, Istanbul JSON) into
+<cache dir>/coverage/<project>.json. For every source file the index holds
+sorted, non-overlapping line ranges (parallel "starts" and "ends" arrays) and
+the ids of the tests covering each range, so finding the tests for a set of
+edited lines is a binary search per contiguous run of lines.
+
+The index is loaded once per mtime. A file missing from the index, or whose
+content no longer hashes to the source the coverage was recorded against, has
+no coverage data (None), which is different from a file whose edited lines no
+test executed (an empty list). An edit is looked up against the file as it
+was before the edit, so its line numbers match the recorded run.
+
+Set PILOT_COVERAGE_INDEX=0 to ignore the index.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+
+from _checkers.touched import pre_edit_content, replaced_lines
+from _snapshot import read_text
+from _util import get_cache_dir
+
+INDEX_VERSION = 2
+
+_memory: dict[str, tuple[int, int, dict]] = {}
+_LOCK = threading.Lock()
+
+
+def coverage_enabled() -> bool:
+    """Check whether the coverage index is used (PILOT_COVERAGE_INDEX=0 disables)."""
+    return os.environ.get("PILOT_COVERAGE_INDEX", "1").strip().lower() not in ("0", "false", "no")
+
+
+def find_project_root(start: Path) -> Path | None:
+    """Nearest directory above start holding .git."""
+    for directory in (start, *start.parents):
+        if (directory / ".git").exists():
+            return directory
+    return None
+
+
+def get_index_path(root: Path) -> Path:
+    digest = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+    return get_cache_dir() / "coverage" / f"{digest}.json"
+
+
+def load_index(root: Path) -> dict | None:
+    """The coverage index of a project, or None if `pilot coverage` never ran there."""
+    path = get_index_path(root)
+    try:
+        stat = path.stat()
+    except OSError:
+        return None
+    key = str(root)
+    with _LOCK:
+        cached = _memory.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    try:
+        index = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return None
+    if not isinstance(index, dict) or index.get("version") != INDEX_VERSION:
+        return None
+    with _LOCK:
+        _memory[key] = (stat.st_mtime_ns, stat.st_size, index)
+    return index
+
+
+def _runs(lines: set[int]) -> list[tuple[int, int]]:
+    runs: list[tuple[int, int]] = []
+    for line in sorted(lines):
+        if runs and runs[-1][1] == line - 1:
+            runs[-1] = (runs[-1][0], line)
+        else:
+            runs.append((line, line))
+    return runs
+
+
+def covering_ids(entry: dict, lines: set[int] | None) -> set[int]:
+    """Test ids covering any of lines (all lines of the file when None)."""
+    starts: list[int] = entry["starts"]
+    ends: list[int] = entry["ends"]
+    tests: list[list[int]] = entry["tests"]
+    if lines is None:
+        return {test_id for ids in tests for test_id in ids}
+    found: set[int] = set()
+    for first, last in _runs(lines):
+        i = bisect.bisect_left(ends, first)
+        while i < len(starts) and starts[i] <= last:
+            found.update(tests[i])
+            i += 1
+    return found
+
+
+def tests_covering(file_path: Path, lines: set[int] | None = None, source: str | None = None) -> list[str] | None:
+    """Tests that executed lines of file_path (any line when lines is None).
+
+    source is the content lines refer to, the file on disk by default.
+    Returns None when there is no coverage data recorded against it.
+    """
+    if not coverage_enabled():
+        return None
+    file_path = Path(file_path).resolve()
+    root = find_project_root(file_path.parent)
+    if root is None:
+        return None
+    index = load_index(root)
+    if index is None:
+        return None
+    entry = index.get("files", {}).get(file_path.relative_to(root).as_posix())
+    if entry is None:
+        return None
+    source = read_text(file_path) if source is None else source
+    if source is None or entry.get("sha") != hashlib.sha256(source.encode()).hexdigest():
+        return None
+    contexts: list[str] = index.get("contexts", [])
+    return sorted(contexts[i] for i in covering_ids(entry, lines) if i < len(contexts))
+
+
+def tests_covering_edit(file_path: Path, tool_input: dict | None) -> list[str] | None:
+    """Tests that executed the lines an Edit or MultiEdit replaced.
+
+    Returns None for a Write, for an edit that cannot be undone, and when there
+    is no coverage data for the file as it was before the edit.
+    """
+    content = read_text(file_path)
+    previous = pre_edit_content(content, tool_input) if content is not None else None
+    lines = replaced_lines(previous, tool_input) if previous is not None else None
+    return tests_covering(file_path, lines, previous) if lines is not None else None
+
+
+def clear_memory() -> None:
+    """Forget loaded indexes."""
+    with _LOCK:
+        _memory.clear()
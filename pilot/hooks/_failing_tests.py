@@ -0,0 +1,216 @@
+"""Failing-test state - which tests of a module failed in the last run, for every framework.
+
+The TDD enforcer lets an implementation edit pass without a reminder when a
+test for the module is currently failing (the red step of red-green). Three
+sources are understood:
+
+- pytest: .pytest_cache/v/cache/lastfailed
+- vitest and jest: JSON reports (--reporter=json / --json --outputFile) at the
+  paths in JS_REPORT_FILES, and vitest's own results cache
+- go: `go test -json` output saved to one of GO_REPORT_FILES
+
+Reports are located once per directory by walking up to MAX_PARENT_DEPTH
+parents (located again after LOCATION_TTL_S, to notice new reports), and each
+report is parsed once per mtime, so repeated lookups cost a stat per report.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+PYTEST_LASTFAILED = ".pytest_cache/v/cache/lastfailed"
+JS_REPORT_FILES = (
+    "test-results.json",
+    "vitest-results.json",
+    "jest-results.json",
+    "reports/test-results.json",
+    "node_modules/.vitest/results.json",
+    "node_modules/.vite/vitest/results.json",
+)
+GO_REPORT_FILES = ("test-results.json", "go-test.json", "test-report.json", "reports/go-test.json")
+MAX_PARENT_DEPTH = 10
+LOCATION_TTL_S = 30.0
+
+_LOCK = threading.Lock()
+_locations: dict[tuple[str, str], tuple[float, list[Path]]] = {}
+_parsed: dict[tuple[str, Path], tuple[int, int, list[FailingTest]]] = {}
+
+
+@dataclass(frozen=True)
+class FailingTest:
+    """One failing test: the test file (absolute when known) and the test's id within it."""
+
+    file: Path | None
+    test_id: str
+    package_dir: Path | None = None
+
+
+def _locate(kind: str, start: Path, names: tuple[str, ...]) -> list[Path]:
+    """Reports of one kind in start and its parents, memoized per start directory."""
+    key = (kind, str(start))
+    now = time.monotonic()
+    with _LOCK:
+        cached = _locations.get(key)
+    if cached is not None and now - cached[0] < LOCATION_TTL_S:
+        return cached[1]
+
+    found: list[Path] = []
+    current = start
+    for _ in range(MAX_PARENT_DEPTH):
+        found.extend(current / name for name in names if (current / name).is_file())
+        if current.parent == current:
+            break
+        current = current.parent
+    with _LOCK:
+        _locations[key] = (now, found)
+    return found
+
+
+def _parse_cached(kind: str, path: Path, parse) -> list[FailingTest]:
+    try:
+        stat = path.stat()
+    except OSError:
+        return []
+    key = (kind, path)
+    with _LOCK:
+        cached = _parsed.get(key)
+    if cached is not None and cached[:2] == (stat.st_mtime_ns, stat.st_size):
+        return cached[2]
+    try:
+        failing = parse(path)
+    except (OSError, ValueError, TypeError, AttributeError):
+        failing = []
+    with _LOCK:
+        _parsed[key] = (stat.st_mtime_ns, stat.st_size, failing)
+    return failing
+
+
+def parse_pytest_lastfailed(path: Path) -> list[FailingTest]:
+    """pytest's lastfailed cache: {"tests/test_x.py::test_a": true, ...} relative to the rootdir."""
+    data = json.loads(path.read_text())
+    rootdir = path.parents[3]
+    failing = []
+    for node_id in data if isinstance(data, dict) else []:
+        test_file = node_id.split("::")[0]
+        failing.append(FailingTest(rootdir / test_file, node_id))
+    return failing
+
+
+def parse_js_report(path: Path) -> list[FailingTest]:
+    """Jest-style JSON report (jest --json, vitest --reporter=json) or vitest's results cache."""
+    data = json.loads(path.read_text())
+    if not isinstance(data, dict):
+        return []
+    if path.match("node_modules/.vitest/results.json"):
+        base = path.parents[2]
+    elif path.match("node_modules/.vite/vitest/results.json"):
+        base = path.parents[3]
+    else:
+        base = path.parent
+
+    failing = []
+    if isinstance(data.get("testResults"), list):
+        for suite in data["testResults"]:
+            file = base / (suite.get("name") or suite.get("testFilePath") or "")
+            failed = [a for a in suite.get("assertionResults", []) if a.get("status") == "failed"]
+            if failed:
+                failing.extend(FailingTest(file, a.get("fullName") or a.get("title", "")) for a in failed)
+            elif suite.get("status") == "failed":
+                failing.append(FailingTest(file, ""))
+    elif isinstance(data.get("results"), dict):
+        for name, result in data["results"].items():
+            if isinstance(result, dict) and result.get("failed"):
+                failing.append(FailingTest(base / (name.split(":", 1)[1] if ":" in name else name), ""))
+    return failing
+
+
+def parse_go_report(path: Path) -> list[FailingTest]:
+    """`go test -json` output: one event per line, {"Action": "fail", "Package": ..., "Test": ...}."""
+    module_dir, module = _go_module(path.parent)
+    failing: dict[tuple[str, str], FailingTest] = {}
+    with path.open(errors="replace") as f:
+        for line in f:
+            line = line.strip()
+            if not line.startswith("{"):
+                continue
+            try:
+                event = json.loads(line)
+            except ValueError:
+                continue
+            if not isinstance(event, dict) or not event.get("Test"):
+                continue
+            test = event["Test"]
+            package = event.get("Package", "")
+            key = (package, test)
+            if event.get("Action") == "fail":
+                failing[key] = FailingTest(None, test, _package_dir(package, module_dir, module))
+            elif event.get("Action") == "pass":
+                failing.pop(key, None)
+    return list(failing.values())
+
+
+def _go_module(start: Path) -> tuple[Path | None, str | None]:
+    current = start
+    for _ in range(MAX_PARENT_DEPTH):
+        go_mod = current / "go.mod"
+        if go_mod.is_file():
+            for line in go_mod.read_text(errors="replace").splitlines():
+                if line.startswith("module "):
+                    return current, line.split()[1]
+            return current, None
+        if current.parent == current:
+            break
+        current = current.parent
+    return None, None
+
+
+def _package_dir(package: str, module_dir: Path | None, module: str | None) -> Path | None:
+    if module_dir is None or not module:
+        return None
+    if package == module:
+        return module_dir
+    if package.startswith(module + "/"):
+        return module_dir / package[len(module) + 1 :]
+    return None
+
+
+def failing_tests(impl_path: Path, test_names: list[str]) -> list[FailingTest]:
+    """Failing tests that belong to impl_path.
+
+    Python and TypeScript tests belong to a module when their file is one of
+    test_names; Go tests belong to every file of the package they run in.
+    """
+    impl_path = Path(os.path.abspath(impl_path))
+    start = impl_path.parent
+    suffix = impl_path.suffix
+    if suffix == ".py":
+        reports = [(path, parse_pytest_lastfailed) for path in _locate("pytest", start, (PYTEST_LASTFAILED,))]
+    elif suffix in (".ts", ".tsx"):
+        reports = [(path, parse_js_report) for path in _locate("js", start, JS_REPORT_FILES)]
+    elif suffix == ".go":
+        reports = [(path, parse_go_report) for path in _locate("go", start, GO_REPORT_FILES)]
+    else:
+        return []
+
+    names = set(test_names)
+    matched = []
+    for path, parse in reports:
+        for test in _parse_cached(suffix, path, parse):
+            if suffix == ".go":
+                if test.package_dir is not None and Path(os.path.abspath(test.package_dir)) == start:
+                    matched.append(test)
+            elif test.file is not None and test.file.name in names:
+                matched.append(test)
+    return matched
+
+
+def clear_memory() -> None:
+    """Forget located and parsed reports."""
+    with _LOCK:
+        _locations.clear()
+        _parsed.clear()
@@ -0,0 +1,559 @@
+#!/usr/bin/env python3
+"""Import graph - which tests transitively import a module.
+
+The TDD enforcer matches tests to modules by file name, which misses tests
+that cover a module under another name. This module keeps an import graph of
+each project (the nearest directory above an edited file holding .git,
+pyproject.toml, setup.py, package.json or go.mod) and answers the reverse
+question: which test files import this file, directly or through other
+modules.
+
+Imports are read per file: Python with an AST scan of import statements,
+TypeScript and JavaScript from relative import, export-from, require() and
+import() specifiers, Go from import declarations resolved against go.mod. A
+Go test also covers the other files of its package. Specifiers are stored
+with each file's mtime under <cache dir>/import-graph, one JSON file per
+project, and resolved to files when the graph is loaded.
+
+Updates are incremental: the edited file is re-read on every lookup, and a
+refresh (at most every PILOT_IMPORT_GRAPH_TTL seconds, default 30) re-reads
+files whose mtime changed and relists directories whose mtime changed. The
+first lookup in a project builds the graph in a background process and falls
+back to file names until it is ready.
+
+Set PILOT_IMPORT_GRAPH=0 to disable it.
+"""
+
+from __future__ import annotations
+
+import ast
+import fcntl
+import hashlib
+import json
+import os
+import posixpath
+import re
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import deque
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _tdd_index import is_test_name
+from _util import get_cache_dir, get_runtime_dir
+
+ROOT_MARKERS = (".git", "pyproject.toml", "setup.py", "package.json", "go.mod")
+MAX_ROOT_DEPTH = 20
+MAX_FILES = 100_000
+MAX_FILE_BYTES = 1024 * 1024
+SKIPPED_DIRS = frozenset(
+    {".git", "node_modules", "__pycache__", ".venv", "venv", "dist", "build", ".mypy_cache", ".ruff_cache", "vendor"}
+)
+PYTHON_EXTS = (".py",)
+TS_EXTS = (".ts", ".tsx", ".mts", ".cts", ".js", ".jsx", ".mjs", ".cjs")
+GO_EXTS = (".go",)
+SOURCE_EXTS = PYTHON_EXTS + TS_EXTS + GO_EXTS
+
+_TS_SPECIFIER_RE = re.compile(
+    r"""(?:\bfrom\s*|\bimport\s*\(?\s*|\brequire\s*\(\s*)(['"])(\.{1,2}/[^'"\n]*|\.{1,2})\1"""
+)
+_GO_IMPORT_BLOCK_RE = re.compile(r"^import\s*\((.*?)^\)", re.MULTILINE | re.DOTALL)
+_GO_IMPORT_LINE_RE = re.compile(r'^import\s+(?:[\w.]+\s+)?"([^"]+)"', re.MULTILINE)
+_GO_QUOTED_RE = re.compile(r'"([^"]+)"')
+_GO_MODULE_RE = re.compile(r"^module\s+(\S+)", re.MULTILINE)
+
+_memory: dict[str, ImportGraph] = {}
+_LOCK = threading.Lock()
+
+
+def graph_enabled() -> bool:
+    """Check whether the import graph is enabled (PILOT_IMPORT_GRAPH=0 disables)."""
+    return os.environ.get("PILOT_IMPORT_GRAPH", "1").strip().lower() not in ("0", "false", "no")
+
+
+def refresh_ttl() -> float:
+    try:
+        return float(os.environ.get("PILOT_IMPORT_GRAPH_TTL", "30"))
+    except ValueError:
+        return 30.0
+
+
+def find_project_root(file_path: Path) -> Path | None:
+    """Find the nearest directory above file_path holding one of ROOT_MARKERS."""
+    current = Path(os.path.abspath(file_path)).parent
+    for _ in range(MAX_ROOT_DEPTH + 1):
+        if any((current / marker).exists() for marker in ROOT_MARKERS):
+            return current
+        if current == current.parent:
+            break
+        current = current.parent
+    return None
+
+
+def get_graph_path(root: Path) -> Path:
+    digest = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+    return get_cache_dir() / "import-graph" / f"{digest}.json"
+
+
+def python_imports(source: str) -> list[list]:
+    """Imports of a Python module as [module, [names]] pairs; relative modules keep their dots."""
+    tree = ast.parse(source)
+    imports: list[list] = []
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            imports.extend([alias.name, []] for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            module = "." * node.level + (node.module or "")
+            imports.append([module, [alias.name for alias in node.names if alias.name != "*"]])
+    return imports
+
+
+def typescript_imports(source: str) -> list[str]:
+    """Relative module specifiers of import, export-from, require() and import() in a TS/JS file."""
+    return sorted({match.group(2) for match in _TS_SPECIFIER_RE.finditer(source)})
+
+
+def go_imports(source: str) -> list[str]:
+    """Import paths of a Go file."""
+    paths = set(_GO_IMPORT_LINE_RE.findall(source))
+    for block in _GO_IMPORT_BLOCK_RE.findall(source):
+        paths.update(_GO_QUOTED_RE.findall(block))
+    return sorted(paths)
+
+
+def read_imports(path: Path) -> list | None:
+    """Import specifiers of a source file, or None if it can't be read or parsed."""
+    try:
+        if path.stat().st_size > MAX_FILE_BYTES:
+            return []
+        source = path.read_text(errors="replace")
+    except OSError:
+        return None
+    if path.suffix in PYTHON_EXTS:
+        try:
+            return python_imports(source)
+        except (SyntaxError, ValueError):
+            return None
+    if path.suffix in TS_EXTS:
+        return typescript_imports(source)
+    return go_imports(source)
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+def _shared_depth(a: str, b: str) -> int:
+    """Number of leading directories two relative paths share."""
+    depth = 0
+    for left, right in zip(a.split("/"), b.split("/"), strict=False):
+        if not left or left != right:
+            break
+        depth += 1
+    return depth
+
+
+def _list_dir(directory: Path) -> tuple[int, list[str], list[str], str | None] | None:
+    """The mtime, subdirectories, source files and go.mod module path of directory."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+        entries = list(os.scandir(directory))
+    except OSError:
+        return None
+    subdirs = []
+    sources = []
+    go_module = None
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir:
+            if entry.name not in SKIPPED_DIRS and not entry.name.startswith("."):
+                subdirs.append(entry.name)
+        elif entry.name.endswith(SOURCE_EXTS) and not entry.name.endswith(".d.ts"):
+            sources.append(entry.name)
+        elif entry.name == "go.mod":
+            try:
+                match = _GO_MODULE_RE.search(Path(entry.path).read_text(errors="replace"))
+            except OSError:
+                match = None
+            go_module = match.group(1) if match else None
+    return mtime, subdirs, sources, go_module
+
+
+class ImportGraph:
+    """Import specifiers of every source file in a project, and the edges they resolve to."""
+
+    def __init__(
+        self,
+        root: Path,
+        dirs: dict[str, int],
+        files: dict[str, dict],
+        go_modules: dict[str, str],
+        refreshed_at: float,
+    ) -> None:
+        self.root = root
+        self.dirs = dirs
+        self.files = files
+        self.go_modules = go_modules
+        self.refreshed_at = refreshed_at
+        self._importers: dict[str, set[str]] | None = None
+        self._imported: dict[str, set[str]] = {}
+        self._resolver: _Resolver | None = None
+
+    @classmethod
+    def build(cls, root: Path) -> ImportGraph:
+        graph = cls(root, {}, {}, {}, time.time())
+        graph._scan_tree("")
+        return graph
+
+    def _scan_tree(self, rel: str) -> None:
+        pending = [rel]
+        while pending and len(self.files) <= MAX_FILES:
+            current = pending.pop()
+            listing = _list_dir(self.root / current)
+            if listing is None:
+                continue
+            self.dirs[current], subdirs, sources, go_module = listing
+            pending.extend(_join(current, name) for name in subdirs)
+            if go_module:
+                self.go_modules[current] = go_module
+            for name in sources:
+                self._read(_join(current, name))
+        self._importers = None
+
+    def _read(self, rel: str) -> bool:
+        """Re-read the imports of rel. Returns True if its entry changed."""
+        path = self.root / rel
+        try:
+            mtime = path.stat().st_mtime_ns
+        except OSError:
+            return self.files.pop(rel, None) is not None
+        entry = self.files.get(rel)
+        if entry is not None and entry["mtime"] == mtime:
+            return False
+        imports = read_imports(path)
+        if imports is None:
+            imports = entry["imports"] if entry else []
+        self.files[rel] = {"mtime": mtime, "imports": imports}
+        return entry is None or entry["imports"] != imports
+
+    def update(self, file_path: Path) -> bool:
+        """Re-read one file. Returns True if its imports changed or it was added or removed."""
+        try:
+            rel = Path(os.path.abspath(file_path)).relative_to(self.root).as_posix()
+        except ValueError:
+            return False
+        if not rel.endswith(SOURCE_EXTS):
+            return False
+        added = rel not in self.files
+        changed = self._read(rel)
+        if not changed:
+            return False
+        if added or rel not in self.files or self._resolver is None or self._importers is None:
+            self._importers = None
+        else:
+            self._relink(rel)
+        return True
+
+    def _relink(self, rel: str) -> None:
+        """Replace the edges of one file whose imports changed, keeping the rest of the graph."""
+        assert self._resolver is not None and self._importers is not None
+        for target in self._imported.pop(rel, ()):
+            self._importers.get(target, set()).discard(rel)
+        targets = self._resolver.resolve(rel, self.files[rel]["imports"]) - {rel}
+        self._imported[rel] = targets
+        for target in targets:
+            self._importers.setdefault(target, set()).add(rel)
+
+    def refresh(self) -> bool:
+        """Re-read files and relist directories whose mtime changed. Returns True if anything changed."""
+        changed = False
+        for rel in list(self.files):
+            changed = self._read(rel) or changed
+        for rel, mtime in sorted(self.dirs.items()):
+            if rel not in self.dirs:
+                continue
+            try:
+                if os.stat(self.root / rel).st_mtime_ns == mtime:
+                    continue
+            except OSError:
+                pass
+            changed = True
+            listing = _list_dir(self.root / rel)
+            if listing is None:
+                self._forget(rel)
+                continue
+            self.dirs[rel], subdirs, sources, go_module = listing
+            if go_module:
+                self.go_modules[rel] = go_module
+            else:
+                self.go_modules.pop(rel, None)
+            for name in sources:
+                self._read(_join(rel, name))
+            known = {d.rsplit("/", 1)[-1] for d in self.dirs if d != rel and d.rpartition("/")[0] == rel}
+            for name in known - set(subdirs):
+                self._forget(_join(rel, name))
+            for name in set(subdirs) - known:
+                self._scan_tree(_join(rel, name))
+        self.refreshed_at = time.time()
+        if changed:
+            self._importers = None
+        return changed
+
+    def _forget(self, rel: str) -> None:
+        prefix = _join(rel, "")
+        for stale in [d for d in self.dirs if d == rel or d.startswith(prefix)]:
+            del self.dirs[stale]
+            self.go_modules.pop(stale, None)
+        for stale in [f for f in self.files if f.startswith(prefix)]:
+            del self.files[stale]
+
+    def importers(self) -> dict[str, set[str]]:
+        """Reverse edges: file -> files that import it."""
+        if self._importers is None:
+            self._resolver = _Resolver(self)
+            self._imported = {
+                rel: self._resolver.resolve(rel, entry["imports"]) - {rel} for rel, entry in self.files.items()
+            }
+            self._importers = {}
+            for rel, targets in self._imported.items():
+                for target in targets:
+                    self._importers.setdefault(target, set()).add(rel)
+        return self._importers
+
+    def tests_importing(self, file_path: Path) -> list[Path]:
+        """Test files that import file_path directly or transitively."""
+        try:
+            start = Path(os.path.abspath(file_path)).relative_to(self.root).as_posix()
+        except ValueError:
+            return []
+        importers = self.importers()
+        seen = {start}
+        queue = deque([start])
+        tests = []
+        while queue:
+            for importer in importers.get(queue.popleft(), ()):
+                if importer in seen:
+                    continue
+                seen.add(importer)
+                queue.append(importer)
+                if is_test_name(posixpath.basename(importer)):
+                    tests.append(self.root / importer)
+        return sorted(tests)
+
+    def to_dict(self) -> dict:
+        return {
+            "root": str(self.root),
+            "dirs": self.dirs,
+            "files": self.files,
+            "go_modules": self.go_modules,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+class _Resolver:
+    """Resolves stored specifiers to project files."""
+
+    def __init__(self, graph: ImportGraph) -> None:
+        self.graph = graph
+        self.files = graph.files
+        self.python_modules: dict[str, list[str]] = {}
+        self.go_packages: dict[str, list[str]] = {}
+        for rel in self.files:
+            if rel.endswith(PYTHON_EXTS):
+                parts = rel[:-3].split("/")
+                if parts[-1] == "__init__":
+                    parts.pop()
+                for start in range(len(parts)):
+                    self.python_modules.setdefault(".".join(parts[start:]), []).append(rel)
+            elif rel.endswith(GO_EXTS) and not rel.endswith("_test.go"):
+                self.go_packages.setdefault(posixpath.dirname(rel), []).append(rel)
+
+    def resolve(self, rel: str, imports: list) -> set[str]:
+        if rel.endswith(PYTHON_EXTS):
+            return self._python(rel, imports)
+        if rel.endswith(TS_EXTS):
+            return self._typescript(rel, imports)
+        return self._go(rel, imports)
+
+    def _python(self, rel: str, imports: list) -> set[str]:
+        targets: set[str] = set()
+        for item in imports:
+            if not isinstance(item, list) or len(item) != 2:
+                continue
+            module, names = item
+            imports_attribute = not names
+            for name in names:
+                submodule = self._python_module(rel, f"{module}{name}" if module.endswith(".") else f"{module}.{name}")
+                targets.update(submodule)
+                imports_attribute = imports_attribute or not submodule
+            if imports_attribute:
+                targets.update(self._python_module(rel, module))
+        return targets
+
+    def _python_module(self, rel: str, module: str) -> list[str]:
+        level = len(module) - len(module.lstrip("."))
+        if level:
+            directory = posixpath.dirname(rel)
+            base = directory.split("/") if directory else []
+            base = base[: len(base) - (level - 1)]
+            path = "/".join(base + [part for part in module[level:].split(".") if part])
+            return [c for c in (f"{path}.py", _join(path, "__init__.py")) if c in self.files]
+        candidates = self.python_modules.get(module)
+        if not candidates or len(candidates) == 1:
+            return candidates or []
+        path = module.replace(".", "/")
+        exact = [c for c in candidates if c in (f"{path}.py", f"{path}/__init__.py")]
+        if exact:
+            return exact
+        directory = posixpath.dirname(rel)
+        depth = {c: _shared_depth(directory, posixpath.dirname(c)) for c in candidates}
+        closest = max(depth.values())
+        return [c for c in candidates if depth[c] == closest]
+
+    def _typescript(self, rel: str, specifiers: list) -> set[str]:
+        targets: set[str] = set()
+        directory = posixpath.dirname(rel)
+        for specifier in specifiers:
+            if not isinstance(specifier, str):
+                continue
+            path = posixpath.normpath(posixpath.join(directory, specifier))
+            stem = path[: -len(posixpath.splitext(path)[1])] if path.endswith((".js", ".jsx", ".mjs", ".cjs")) else path
+            candidates = [path, *(stem + ext for ext in TS_EXTS), *(_join(path, "index" + ext) for ext in TS_EXTS)]
+            match = next((c for c in candidates if c in self.files), None)
+            if match:
+                targets.add(match)
+        return targets
+
+    def _go(self, rel: str, import_paths: list) -> set[str]:
+        targets: set[str] = set()
+        if rel.endswith("_test.go"):
+            targets.update(self.go_packages.get(posixpath.dirname(rel), ()))
+        for import_path in import_paths:
+            if not isinstance(import_path, str):
+                continue
+            for module_dir, module in self.graph.go_modules.items():
+                if import_path == module:
+                    targets.update(self.go_packages.get(module_dir, ()))
+                elif import_path.startswith(module + "/"):
+                    package_dir = _join(module_dir, import_path[len(module) + 1 :])
+                    targets.update(self.go_packages.get(package_dir, ()))
+        return targets
+
+
+def _load(root: Path) -> ImportGraph | None:
+    try:
+        data = json.loads(get_graph_path(root).read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("root") != str(root):
+        return None
+    dirs, files, go_modules = data.get("dirs"), data.get("files"), data.get("go_modules")
+    if not isinstance(dirs, dict) or not isinstance(files, dict) or not isinstance(go_modules, dict):
+        return None
+    return ImportGraph(root, dirs, files, go_modules, float(data.get("refreshed_at", 0)))
+
+
+def _store(graph: ImportGraph) -> None:
+    graph_path = get_graph_path(graph.root)
+    with _LOCK:
+        try:
+            graph_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=graph_path.parent, prefix=".import-graph-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(graph.to_dict(), f)
+            os.replace(tmp_name, graph_path)
+        except OSError:
+            pass
+
+
+def _builder_lock_path(root: Path) -> Path:
+    digest = hashlib.sha256(str(root).encode()).hexdigest()[:16]
+    return get_runtime_dir() / f"import-graph-{digest}.lock"
+
+
+def spawn_builder(root: Path) -> None:
+    """Build the graph of root in a background process unless one is already building it."""
+    with _builder_lock_path(root).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__)), str(root)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def run_builder(root: Path) -> int:
+    """Build and store the graph of root (background process entry point)."""
+    with _builder_lock_path(root).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+        _store(ImportGraph.build(root))
+    return 0
+
+
+def get_graph(root: Path) -> ImportGraph | None:
+    """Return the up-to-date graph of root, or None while it is being built in the background."""
+    root = Path(os.path.abspath(root))
+    key = str(root)
+    graph = _memory.get(key) or _load(root)
+    if graph is None:
+        spawn_builder(root)
+        return None
+    if time.time() - graph.refreshed_at >= refresh_ttl() and graph.refresh():
+        _store(graph)
+    _memory[key] = graph
+    return graph
+
+
+def related_tests(file_path: Path) -> list[Path] | None:
+    """Test files that transitively import file_path, or None when no graph is available."""
+    if not graph_enabled():
+        return None
+    root = find_project_root(file_path)
+    if root is None:
+        return None
+    graph = get_graph(root)
+    if graph is None or len(graph.files) > MAX_FILES:
+        return None
+    if graph.update(file_path):
+        _store(graph)
+    return graph.tests_importing(file_path)
+
+
+def record_file(file_path: Path) -> None:
+    """Re-read a written or edited file in an existing graph of its project."""
+    if not graph_enabled():
+        return
+    root = find_project_root(file_path)
+    if root is None:
+        return
+    graph = _memory.get(str(root)) or _load(root)
+    if graph is not None and graph.update(file_path):
+        _memory[str(root)] = graph
+        _store(graph)
+
+
+def clear_memory() -> None:
+    """Forget in-memory graphs (the cache files are kept)."""
+    _memory.clear()
+
+
+if __name__ == "__main__":
+    sys.exit(run_builder(Path(sys.argv[1])))
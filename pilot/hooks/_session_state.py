@@ -0,0 +1,183 @@
+"""Session state store - all per-session state in one SQLite database.
+
+Session state used to be spread over files in the session directory
+(context-cache.json, active_plan.json, spec-stop-guard,
+pre-compact-state.json), some of them read three or four times by one hook
+and rewritten without coordination by hooks running in parallel. It now
+lives in state.db in the session directory, one JSON value per field of
+SessionState:
+
+- context_cache: the context monitor's last reading and the notices it showed
+- active_plan: the plan registered with `pilot register-plan`
+- stop_guard: when the spec stop guard last blocked a stop
+- pre_compact: state captured before compaction, until it is restored
+
+load_state() reads every field with one query. update_state() is a
+transaction: it reads the state under SQLite's write lock and on exit writes
+back only the fields that changed, so concurrent hooks serialize instead of
+overwriting each other. The database runs in WAL mode, so readers never wait
+for a writer.
+
+The legacy files are imported the first time a session's database is opened
+and then removed, except active_plan.json, which `pilot register-plan` keeps
+writing for the console. Context usage reported by the statusline is not
+session state; it is read from the context gauge (_context_gauge.py).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sqlite3
+from collections.abc import Iterator
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+
+from _util import _sessions_base
+
+STATE_FILE = "state.db"
+SCHEMA_VERSION = 1
+BUSY_TIMEOUT_S = 5.0
+LEGACY_FILES = {
+    "context_cache": "context-cache.json",
+    "active_plan": "active_plan.json",
+    "stop_guard": "spec-stop-guard",
+    "pre_compact": "pre-compact-state.json",
+}
+EXPORTED_FILES = frozenset({"active_plan.json"})
+OBSOLETE_FILES = ("context-pct.json",)
+STATE_ERRORS = (OSError, sqlite3.Error)
+
+
+@dataclass
+class SessionState:
+    """Typed view of one session's state; each field is one row of state.db."""
+
+    context_cache: dict = field(default_factory=dict)
+    active_plan: dict = field(default_factory=dict)
+    stop_guard: float | None = None
+    pre_compact: dict | None = None
+
+
+FIELDS = tuple(f.name for f in fields(SessionState))
+
+
+def get_session_dir(session_id: str | None = None) -> Path:
+    """Session directory for session_id (default: PILOT_SESSION_ID, else "default")."""
+    session_id = session_id or os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return _sessions_base() / session_id
+
+
+def _read_legacy(path: Path, name: str) -> object | None:
+    try:
+        text = path.read_text()
+    except OSError:
+        return None
+    try:
+        value = float(text.strip()) if name == "stop_guard" else json.loads(text)
+    except ValueError:
+        return None
+    return value if name == "stop_guard" or isinstance(value, dict) else None
+
+
+def _migrate(db: sqlite3.Connection, session_dir: Path) -> None:
+    """Import the legacy state files of session_dir, once per database."""
+    db.execute("BEGIN IMMEDIATE")
+    try:
+        if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            for name, file_name in LEGACY_FILES.items():
+                value = _read_legacy(session_dir / file_name, name)
+                if value is not None:
+                    db.execute("INSERT OR IGNORE INTO state (key, value) VALUES (?, ?)", (name, json.dumps(value)))
+            db.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        db.execute("COMMIT")
+    except BaseException:
+        db.execute("ROLLBACK")
+        raise
+    for file_name in (*LEGACY_FILES.values(), *OBSOLETE_FILES):
+        if file_name not in EXPORTED_FILES:
+            (session_dir / file_name).unlink(missing_ok=True)
+
+
+def _connect(session_dir: Path) -> sqlite3.Connection:
+    session_dir.mkdir(parents=True, exist_ok=True)
+    db = sqlite3.connect(session_dir / STATE_FILE, timeout=BUSY_TIMEOUT_S, isolation_level=None)
+    try:
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute("CREATE TABLE IF NOT EXISTS state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+        if db.execute("PRAGMA user_version").fetchone()[0] < SCHEMA_VERSION:
+            _migrate(db, session_dir)
+    except BaseException:
+        db.close()
+        raise
+    return db
+
+
+def _read(db: sqlite3.Connection) -> SessionState:
+    values = {}
+    for key, value in db.execute("SELECT key, value FROM state"):
+        if key not in FIELDS:
+            continue
+        try:
+            values[key] = json.loads(value)
+        except ValueError:
+            continue
+    return SessionState(**values)
+
+
+def _rows(state: SessionState) -> dict[str, str | None]:
+    """Serialized fields; None for fields at their default, which have no row."""
+    rows: dict[str, str | None] = {}
+    for name in FIELDS:
+        value = getattr(state, name)
+        rows[name] = json.dumps(value, sort_keys=True) if value not in (None, {}) else None
+    return rows
+
+
+def load_state(session_dir: Path | None = None) -> SessionState:
+    """Read the whole session state with one query. Returns defaults if it cannot be read."""
+    session_dir = session_dir or get_session_dir()
+    if not (session_dir / STATE_FILE).exists() and not any(
+        (session_dir / name).exists() for name in LEGACY_FILES.values()
+    ):
+        return SessionState()
+    try:
+        db = _connect(session_dir)
+    except STATE_ERRORS:
+        return SessionState()
+    try:
+        return _read(db)
+    except sqlite3.Error:
+        return SessionState()
+    finally:
+        db.close()
+
+
+@contextmanager
+def update_state(session_dir: Path | None = None) -> Iterator[SessionState]:
+    """Read-modify-write the session state as one transaction.
+
+    Raises one of STATE_ERRORS when the database cannot be opened or written.
+    """
+    db = _connect(session_dir or get_session_dir())
+    try:
+        db.execute("BEGIN IMMEDIATE")
+        try:
+            state = _read(db)
+            before = _rows(state)
+            yield state
+            for key, value in _rows(state).items():
+                if value == before[key]:
+                    continue
+                if value is None:
+                    db.execute("DELETE FROM state WHERE key = ?", (key,))
+                else:
+                    db.execute("INSERT OR REPLACE INTO state (key, value) VALUES (?, ?)", (key, value))
+            db.execute("COMMIT")
+        except BaseException:
+            db.execute("ROLLBACK")
+            raise
+    finally:
+        db.close()
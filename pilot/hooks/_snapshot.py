@@ -0,0 +1,175 @@
+"""File snapshots - one read of a checked file shared by every step of a check.
+
+A FileSnapshot holds a file's bytes (memory-mapped at MMAP_THRESHOLD_BYTES and
+above) and its stat identity, and computes the decoded text, line offsets and
+SHA-256 on first use.
+
+Inside snapshot_scope(), snapshot() hands every step the same object for a
+path, so comment stripping, the length check, cache keys and the lint queue
+share one read and one line split. A snapshot is replaced when the file is
+rewritten through write_text() and dropped by invalidate() after an external
+tool rewrites it. Outside a scope every call loads the file fresh.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import re
+from bisect import bisect_right
+from collections.abc import Iterable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import cached_property
+from pathlib import Path
+
+MMAP_THRESHOLD_BYTES = 1024 * 1024
+_NEWLINE = re.compile(b"\n")
+
+_scope: ContextVar[dict[str, FileSnapshot] | None] = ContextVar("snapshot_scope", default=None)
+
+
+class FileSnapshot:
+    """Content and identity of a file as read once."""
+
+    def __init__(self, path: Path, data: bytes | mmap.mmap, stat: os.stat_result) -> None:
+        self.path = path
+        self.size = stat.st_size
+        self.mtime_ns = stat.st_mtime_ns
+        self._identity = (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        self._data = data
+
+    @classmethod
+    def load(cls, path: Path) -> FileSnapshot | None:
+        """Read path, memory-mapping large files. Returns None if it cannot be read."""
+        try:
+            with path.open("rb") as f:
+                stat = os.fstat(f.fileno())
+                if stat.st_size >= MMAP_THRESHOLD_BYTES:
+                    data: bytes | mmap.mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                else:
+                    data = f.read()
+        except (OSError, ValueError):
+            return None
+        return cls(path, data, stat)
+
+    @property
+    def data(self) -> bytes | mmap.mmap:
+        return self._data
+
+    @property
+    def is_mapped(self) -> bool:
+        return isinstance(self._data, mmap.mmap)
+
+    @cached_property
+    def text(self) -> str:
+        """Content decoded as UTF-8. Raises UnicodeDecodeError like Path.read_text."""
+        return self._data[:].decode("utf-8")
+
+    @cached_property
+    def sha256(self) -> str:
+        return hashlib.sha256(self._data).hexdigest()
+
+    @cached_property
+    def line_offsets(self) -> list[int]:
+        """Byte offset of the start of every line."""
+        offsets = [0]
+        offsets.extend(match.end() for match in _NEWLINE.finditer(self._data))
+        if offsets[-1] == self.size:
+            offsets.pop()
+        return offsets
+
+    @property
+    def line_count(self) -> int:
+        return len(self.line_offsets)
+
+    def line_number(self, offset: int) -> int:
+        """1-based line number of the byte at offset."""
+        return bisect_right(self.line_offsets, offset)
+
+    def is_current(self) -> bool:
+        """Check whether the file on disk is still the one this snapshot read."""
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return False
+        return (stat.st_ino, stat.st_size, stat.st_mtime_ns) == self._identity
+
+    def close(self) -> None:
+        """Release the memory map of a large file."""
+        if isinstance(self._data, mmap.mmap):
+            self._data.close()
+
+
+def _key(path: Path) -> str:
+    return os.path.abspath(path)
+
+
+@contextmanager
+def snapshot_scope(seed: Iterable[FileSnapshot | None] = ()) -> Iterator[None]:
+    """Share snapshots between the steps of one check. Nested scopes reuse the outer one."""
+    if _scope.get() is not None:
+        yield
+        return
+    snapshots = {_key(snap.path): snap for snap in seed if snap is not None}
+    token = _scope.set(snapshots)
+    try:
+        yield
+    finally:
+        _scope.reset(token)
+        for snap in snapshots.values():
+            snap.close()
+
+
+def snapshot(path: Path) -> FileSnapshot | None:
+    """Snapshot of path, shared within the current scope."""
+    snapshots = _scope.get()
+    if snapshots is None:
+        return FileSnapshot.load(path)
+    key = _key(path)
+    snap = snapshots.get(key)
+    if snap is None:
+        snap = FileSnapshot.load(path)
+        if snap is not None:
+            snapshots[key] = snap
+    return snap
+
+
+def read_text(path: Path) -> str | None:
+    """Decoded content of path from its snapshot, or None if unreadable."""
+    snap = snapshot(path)
+    if snap is None:
+        return None
+    try:
+        return snap.text
+    except UnicodeDecodeError:
+        return None
+
+
+def write_text(path: Path, text: str) -> None:
+    """Rewrite path and replace its snapshot with the written content, without re-reading."""
+    invalidate(path)
+    path.write_text(text)
+    snapshots = _scope.get()
+    if snapshots is None:
+        return
+    data = text.encode()
+    try:
+        snap = FileSnapshot(path, data, path.stat())
+    except OSError:
+        return
+    snap.text = text
+    snapshots[_key(path)] = snap
+
+
+def invalidate(path: Path | None = None) -> None:
+    """Drop the snapshot of path, or of every file when a tool may have rewritten several."""
+    snapshots = _scope.get()
+    if not snapshots:
+        return
+    keys = list(snapshots) if path is None else [_key(path)]
+    for key in keys:
+        snap = snapshots.pop(key, None)
+        if snap is not None:
+            snap.close()
@@ -0,0 +1,270 @@
+"""Persistent test-file index for the TDD enforcer.
+
+Looking for the test of a module used to glob every tests/, test/ and
+__tests__ tree above it once per candidate name and extension. Instead each
+tests tree gets an index of the test files it holds (test_*.py, *_test.py,
+*.test.ts(x), *.spec.ts(x), *_test.go), keyed by file name, so a lookup is a
+dict hit.
+
+The index is built by one walk of the tree and stored under
+<cache dir>/test-index, one JSON file per tests tree, together with the mtime
+of every directory it covers. A refresh stats those directories and rescans
+only the ones whose mtime changed, which picks up added, removed and renamed
+test files. An index refreshed less than PILOT_TEST_INDEX_TTL seconds ago
+(default 5) is used as-is; a test file written through the Write tool is
+added immediately, so creating a test and then editing the module never
+waits for a refresh.
+
+Set PILOT_TEST_INDEX=0 to search the test directories on every lookup.
+"""
+
+from __future__ import annotations
+
+import bisect
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+
+from _util import get_cache_dir
+
+SKIPPED_DIRS = frozenset({"node_modules", "__pycache__", ".git"})
+TEST_SUFFIXES = (".test.ts", ".spec.ts", ".test.tsx", ".spec.tsx", "_test.go", "_test.py")
+
+_memory: dict[str, TestDirIndex] = {}
+_LOCK = threading.Lock()
+
+
+def index_enabled() -> bool:
+    """Check whether the test-file index is enabled (PILOT_TEST_INDEX=0 disables)."""
+    return os.environ.get("PILOT_TEST_INDEX", "1").strip().lower() not in ("0", "false", "no")
+
+
+def refresh_ttl() -> float:
+    try:
+        return float(os.environ.get("PILOT_TEST_INDEX_TTL", "5"))
+    except ValueError:
+        return 5.0
+
+
+def is_test_name(name: str) -> bool:
+    """Check whether a file name follows one of the test naming conventions."""
+    if name.startswith("test_") and name.endswith(".py"):
+        return True
+    return name.endswith(TEST_SUFFIXES)
+
+
+def get_index_path(test_dir: Path) -> Path:
+    digest = hashlib.sha256(str(test_dir).encode()).hexdigest()[:16]
+    return get_cache_dir() / "test-index" / f"{digest}.json"
+
+
+def _list_dir(directory: Path) -> tuple[int, list[str], list[str]] | None:
+    """The mtime, subdirectories and test file names of directory, or None if it is gone."""
+    try:
+        mtime = os.stat(directory).st_mtime_ns
+        entries = list(os.scandir(directory))
+    except OSError:
+        return None
+    subdirs = []
+    names = []
+    for entry in entries:
+        try:
+            is_dir = entry.is_dir(follow_symlinks=False)
+        except OSError:
+            continue
+        if is_dir:
+            if entry.name not in SKIPPED_DIRS:
+                subdirs.append(entry.name)
+        elif is_test_name(entry.name):
+            names.append(entry.name)
+    return mtime, subdirs, sorted(names)
+
+
+def _join(rel: str, name: str) -> str:
+    return f"{rel}/{name}" if rel else name
+
+
+def _scan_tree(test_dir: Path, rel: str, dirs: dict[str, int], files: dict[str, list[str]]) -> None:
+    """Record rel and everything below it."""
+    pending = [rel]
+    while pending:
+        current = pending.pop()
+        listing = _list_dir(test_dir / current)
+        if listing is None:
+            continue
+        dirs[current], subdirs, names = listing
+        pending.extend(_join(current, name) for name in subdirs)
+        if names:
+            files[current] = names
+        else:
+            files.pop(current, None)
+
+
+class TestDirIndex:
+    """Test files below one tests directory, by name."""
+
+    __test__ = False
+
+    def __init__(self, test_dir: Path, dirs: dict[str, int], files: dict[str, list[str]], refreshed_at: float) -> None:
+        self.test_dir = test_dir
+        self.dirs = dirs
+        self.files = files
+        self.refreshed_at = refreshed_at
+        self._reindex()
+
+    @classmethod
+    def build(cls, test_dir: Path) -> TestDirIndex:
+        dirs: dict[str, int] = {}
+        files: dict[str, list[str]] = {}
+        _scan_tree(test_dir, "", dirs, files)
+        return cls(test_dir, dirs, files, time.time())
+
+    def _reindex(self) -> None:
+        self.names = {name for names in self.files.values() for name in names}
+        self.sorted_names = sorted(self.names)
+
+    def has(self, name: str) -> bool:
+        """Check whether a test file called name exists anywhere in the tree."""
+        return name in self.names
+
+    def find(self, name: str) -> list[Path]:
+        """Paths of the test files called name."""
+        if name not in self.names:
+            return []
+        return sorted(self.test_dir / rel / name for rel, names in self.files.items() if name in names)
+
+    def has_prefix(self, prefix: str, suffix: str) -> bool:
+        """Check for a file named prefix + suffix or prefix-* + suffix."""
+        if prefix + suffix in self.names:
+            return True
+        start = prefix + "-"
+        position = bisect.bisect_left(self.sorted_names, start)
+        while position < len(self.sorted_names) and self.sorted_names[position].startswith(start):
+            if self.sorted_names[position].endswith(suffix):
+                return True
+            position += 1
+        return False
+
+    def refresh(self) -> bool:
+        """Relist directories whose mtime changed. Returns True if anything changed."""
+        changed = False
+        for rel, mtime in sorted(self.dirs.items()):
+            if rel not in self.dirs:
+                continue
+            try:
+                if os.stat(self.test_dir / rel).st_mtime_ns == mtime:
+                    continue
+            except OSError:
+                pass
+            changed = True
+            listing = _list_dir(self.test_dir / rel)
+            if listing is None:
+                self._forget(rel)
+                continue
+            self.dirs[rel], subdirs, names = listing
+            if names:
+                self.files[rel] = names
+            else:
+                self.files.pop(rel, None)
+            known = {d.rsplit("/", 1)[-1] for d in self.dirs if d != rel and d.rpartition("/")[0] == rel}
+            for name in known - set(subdirs):
+                self._forget(_join(rel, name))
+            for name in set(subdirs) - known:
+                _scan_tree(self.test_dir, _join(rel, name), self.dirs, self.files)
+        self.refreshed_at = time.time()
+        if changed:
+            self._reindex()
+        return changed
+
+    def _forget(self, rel: str) -> None:
+        """Drop rel and everything below it."""
+        prefix = _join(rel, "")
+        for stale in [d for d in self.dirs if d == rel or d.startswith(prefix)]:
+            del self.dirs[stale]
+            self.files.pop(stale, None)
+
+    def add(self, file_path: Path) -> bool:
+        """Record a test file written below the tree. Returns False if it is not below it."""
+        try:
+            rel = file_path.parent.relative_to(self.test_dir).as_posix()
+        except ValueError:
+            return False
+        rel = "" if rel == "." else rel
+        names = self.files.setdefault(rel, [])
+        if file_path.name not in names:
+            bisect.insort(names, file_path.name)
+        if file_path.name not in self.names:
+            self.names.add(file_path.name)
+            bisect.insort(self.sorted_names, file_path.name)
+        return True
+
+    def to_dict(self) -> dict:
+        return {
+            "test_dir": str(self.test_dir),
+            "dirs": self.dirs,
+            "files": self.files,
+            "refreshed_at": self.refreshed_at,
+        }
+
+
+def _load(test_dir: Path) -> TestDirIndex | None:
+    try:
+        data = json.loads(get_index_path(test_dir).read_text())
+    except (OSError, json.JSONDecodeError):
+        return None
+    if not isinstance(data, dict) or data.get("test_dir") != str(test_dir):
+        return None
+    dirs, files = data.get("dirs"), data.get("files")
+    if not isinstance(dirs, dict) or not isinstance(files, dict):
+        return None
+    return TestDirIndex(test_dir, dirs, files, float(data.get("refreshed_at", 0)))
+
+
+def _store(index: TestDirIndex) -> None:
+    index_path = get_index_path(index.test_dir)
+    with _LOCK:
+        try:
+            index_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_name = tempfile.mkstemp(dir=index_path.parent, prefix=".test-index-", suffix=".tmp")
+            with os.fdopen(fd, "w") as f:
+                json.dump(index.to_dict(), f)
+            os.replace(tmp_name, index_path)
+        except OSError:
+            pass
+
+
+def get_index(test_dir: Path) -> TestDirIndex:
+    """Return the up-to-date index of test_dir, building it on first use."""
+    test_dir = Path(os.path.abspath(test_dir))
+    key = str(test_dir)
+    index = _memory.get(key) or _load(test_dir)
+    if index is None:
+        index = TestDirIndex.build(test_dir)
+        _store(index)
+    elif time.time() - index.refreshed_at >= refresh_ttl() and index.refresh():
+        _store(index)
+    _memory[key] = index
+    return index
+
+
+def record_test_file(file_path: Path, test_dirs: list[Path]) -> None:
+    """Add a newly written test file to the indexes of the test_dirs that contain it.
+
+    Trees without an index yet are left alone; their first lookup builds one.
+    """
+    path = Path(os.path.abspath(file_path))
+    for test_dir in test_dirs:
+        test_dir = Path(os.path.abspath(test_dir))
+        index = _memory.get(str(test_dir)) or _load(test_dir)
+        if index is not None and index.add(path):
+            _memory[str(test_dir)] = index
+            _store(index)
+
+
+def clear_memory() -> None:
+    """Forget in-memory indexes (the cache files are kept)."""
+    _memory.clear()
@@ -0,0 +1,113 @@
+"""Transcript cursor - read only what was appended to a transcript since last time.
+
+Stop hooks need the last assistant message of the session transcript, which
+grows by every message of the session. A cursor per transcript records how far
+the transcript has been read (byte offset and inode) and a summary of the last
+assistant message seen, so each read parses only the lines appended since.
+
+The cursor is a small JSON file in the cursor directory, keyed by the
+transcript path. Reads hold an exclusive lock on it, so when several Stop hooks
+run at once, the first parses the new lines and the others reuse its result.
+A cursor whose inode no longer matches, or whose offset is past the end of the
+file, is discarded and the transcript is read from the start.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import tempfile
+from pathlib import Path
+
+
+def get_cursor_path(transcript: Path, cursor_dir: Path) -> Path:
+    """Cursor file for transcript in cursor_dir."""
+    digest = hashlib.sha256(str(transcript.resolve()).encode()).hexdigest()[:16]
+    return cursor_dir / f"{digest}.json"
+
+
+def summarize_assistant(msg: dict) -> dict:
+    """The parts of an assistant message the Stop hooks look at."""
+    message = msg.get("message", {})
+    content = message.get("content", []) if isinstance(message, dict) else []
+    if not isinstance(content, list):
+        content = []
+    return {
+        "tool_uses": [
+            block.get("name", "") for block in content if isinstance(block, dict) and block.get("type") == "tool_use"
+        ]
+    }
+
+
+def _load_cursor(path: Path) -> dict:
+    try:
+        cursor = json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+    return cursor if isinstance(cursor, dict) else {}
+
+
+def _save_cursor(path: Path, cursor: dict) -> None:
+    fd, tmp = tempfile.mkstemp(dir=path.parent, prefix=".cursor-")
+    try:
+        with os.fdopen(fd, "w") as f:
+            json.dump(cursor, f)
+        os.replace(tmp, path)
+    except OSError:
+        Path(tmp).unlink(missing_ok=True)
+
+
+def advance(transcript: Path, cursor: dict) -> dict:
+    """Return cursor moved to the end of transcript, parsing only the lines after its offset.
+
+    Only newline-terminated lines move the offset; a last line still being
+    written is parsed but read again next time.
+    """
+    stat = transcript.stat()
+    if (
+        cursor.get("path") != str(transcript)
+        or cursor.get("inode") != stat.st_ino
+        or not 0 <= cursor.get("offset", 0) <= stat.st_size
+    ):
+        cursor = {"path": str(transcript), "inode": stat.st_ino, "offset": 0, "last_assistant": None}
+    if cursor["offset"] == stat.st_size:
+        return cursor
+
+    offset = cursor["offset"]
+    last_assistant = cursor.get("last_assistant")
+    with transcript.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            complete = line.endswith(b"\n")
+            try:
+                msg = json.loads(line)
+            except ValueError:
+                msg = None
+            if isinstance(msg, dict) and msg.get("type") == "assistant":
+                last_assistant = summarize_assistant(msg)
+            if not complete:
+                break
+            offset += len(line)
+    return {**cursor, "offset": offset, "last_assistant": last_assistant}
+
+
+def last_assistant_summary(transcript: Path, cursor_dir: Path) -> dict | None:
+    """Summary of the last assistant message in transcript, or None if it has none.
+
+    Raises OSError if the transcript cannot be read.
+    """
+    try:
+        cursor_dir.mkdir(parents=True, exist_ok=True)
+        lock_file = (cursor_dir / ".lock").open("a")
+    except OSError:
+        return advance(transcript, {})["last_assistant"]
+    with lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        path = get_cursor_path(transcript, cursor_dir)
+        cursor = _load_cursor(path)
+        advanced = advance(transcript, cursor)
+        if advanced != cursor:
+            _save_cursor(path, advanced)
+        return advanced["last_assistant"]
@@ -6,12 +6,18 @@ and utility functions used across all hook scripts.
 
 from __future__ import annotations
 
+import hashlib
 import json
 import os
+import re
 import subprocess
 import sys
+import tempfile
 from pathlib import Path
 
+from _snapshot import snapshot
+from _transcript_cursor import last_assistant_summary
+
 RED = "\033[0;31m"
 YELLOW = "\033[0;33m"
 GREEN = "\033[0;32m"
@@ -30,18 +36,47 @@ def _sessions_base() -> Path:
     return Path.home() / ".pilot" / "sessions"
 
 
-def get_session_cache_path() -> Path:
-    """Get session-scoped context cache path."""
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    cache_dir = _sessions_base() / session_id
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir / "context-cache.json"
+def get_cache_dir() -> Path:
+    """Get persistent cache directory shared across sessions and worktrees.
+
+    PILOT_CACHE_DIR overrides the default ~/.pilot/cache location.
+    """
+    override = os.environ.get("PILOT_CACHE_DIR", "").strip()
+    return Path(override) if override else Path.home() / ".pilot" / "cache"
 
 
-def get_session_plan_path() -> Path:
-    """Get session-scoped active plan JSON path."""
+def get_runtime_dir() -> Path:
+    """Get per-user runtime directory for hook sockets and lock files."""
+    runtime_dir = Path(tempfile.gettempdir()) / f"pilot-{os.getuid()}"
+    runtime_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+    return runtime_dir
+
+
+def get_hook_socket_path() -> Path:
+    """Get session-scoped Unix socket path for the hook daemon.
+
+    Session IDs that are long or contain unusual characters are hashed so the
+    path stays within the Unix socket length limit.
+    """
     session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    return _sessions_base() / session_id / "active_plan.json"
+    if len(session_id) > 32 or not re.fullmatch(r"[A-Za-z0-9_.-]+", session_id):
+        session_id = hashlib.sha256(session_id.encode()).hexdigest()[:16]
+    return get_runtime_dir() / f"hooks-{session_id}.sock"
+
+
+def get_hooks_fingerprint() -> str:
+    """Fingerprint hook sources so a warm daemon notices plugin updates."""
+    hooks_dir = Path(__file__).parent
+    latest = 0
+    for directory in (hooks_dir, hooks_dir / "_checkers"):
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.name.endswith(".py"):
+                        latest = max(latest, entry.stat().st_mtime_ns)
+        except OSError:
+            continue
+    return str(latest)
 
 
 def find_git_root() -> Path | None:
@@ -79,7 +114,14 @@ def get_edited_file_from_stdin() -> Path | None:
     try:
         import select
 
-        if select.select([sys.stdin], [], [], 0)[0]:
+        try:
+            sys.stdin.fileno()
+        except (AttributeError, OSError, ValueError):
+            ready = True
+        else:
+            ready = bool(select.select([sys.stdin], [], [], 0)[0])
+
+        if ready:
             data = json.load(sys.stdin)
             tool_input = data.get("tool_input", {})
             file_path = tool_input.get("file_path")
@@ -91,41 +133,16 @@ def get_edited_file_from_stdin() -> Path | None:
 
 
 def is_waiting_for_user_input(transcript_path: str) -> bool:
-    """Check if Claude's last action was asking the user a question."""
-    try:
-        transcript = Path(transcript_path)
-        if not transcript.exists():
-            return False
-
-        last_assistant_msg = None
-        with transcript.open() as f:
-            for line in f:
-                try:
-                    msg = json.loads(line)
-                    if msg.get("type") == "assistant":
-                        last_assistant_msg = msg
-                except json.JSONDecodeError:
-                    continue
-
-        if not last_assistant_msg:
-            return False
-
-        message = last_assistant_msg.get("message", {})
-        if not isinstance(message, dict):
-            return False
-
-        content = message.get("content", [])
-        if not isinstance(content, list):
-            return False
-
-        for block in content:
-            if isinstance(block, dict) and block.get("type") == "tool_use":
-                if block.get("name") == "AskUserQuestion":
-                    return True
+    """Check if Claude's last action was asking the user a question.
 
-        return False
+    Reads the transcript through its cursor (_transcript_cursor.py), so only
+    lines appended since the previous Stop hook are parsed.
+    """
+    try:
+        summary = last_assistant_summary(Path(transcript_path), get_cache_dir() / "transcript-cursors")
     except OSError:
         return False
+    return summary is not None and "AskUserQuestion" in summary["tool_uses"]
 
 
 def check_file_length(file_path: Path) -> bool:
@@ -133,10 +150,10 @@ def check_file_length(file_path: Path) -> bool:
 
     Returns True if warning was emitted, False otherwise.
     """
-    try:
-        line_count = len(file_path.read_text().splitlines())
-    except Exception:
+    snap = snapshot(file_path)
+    if snap is None:
         return False
+    line_count = snap.line_count
 
     if line_count > FILE_LENGTH_CRITICAL:
         print("", file=sys.stderr)
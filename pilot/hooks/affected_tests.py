@@ -0,0 +1,429 @@
+#!/usr/bin/env python3
+"""Affected-test runner - runs the tests of an edited module in the background.
+
+After an edit, the tests that belong to the edited file (by name, sibling or
+in a test directory, and by import, see tdd_enforcer.related_test_files) are
+queued in affected-tests.json in the session directory. A background worker
+runs them once edits to that file have paused for PILOT_TEST_DEBOUNCE seconds
+(default 1):
+
+- Python: pytest with the test files as node IDs, from the nearest pytest root;
+  when the coverage index (`pilot coverage`) knows the tests that executed the
+  edited lines, only those tests run
+- Go: go test -run with the Test functions of the related test files, per package
+- TypeScript: vitest related, or jest --findRelatedTests, from the package root
+
+At most PILOT_TEST_WORKERS runs (default 2) execute at once, each limited to
+PILOT_TEST_TIMEOUT seconds (default 300). A newer edit of a file whose tests
+are running cancels the run and queues a fresh one. Finished runs are
+reported by the next PostToolUse or Stop hook: failures in full, and a short
+note once a failing module passes again.
+
+Running tests in the background is opt-in: set PILOT_AFFECTED_TESTS=1.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import hashlib
+import json
+import os
+import re
+import shutil
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _util import GREEN, NC, RED, _sessions_base, read_hook_stdin
+
+MAX_CONCURRENT = int(os.environ.get("PILOT_TEST_WORKERS", "2"))
+RUN_TIMEOUT_S = float(os.environ.get("PILOT_TEST_TIMEOUT", "300"))
+DEBOUNCE_S = float(os.environ.get("PILOT_TEST_DEBOUNCE", "1"))
+POLL_S = 0.2
+KILL_GRACE_S = 2.0
+OUTPUT_TAIL_LINES = 30
+PYTEST_ROOT_MARKERS = ("pytest.ini", "pyproject.toml", "setup.cfg", "tox.ini", "setup.py")
+MAX_ROOT_DEPTH = 20
+PYTEST_NO_TESTS = 5
+
+_GO_TEST_FUNC_RE = re.compile(r"^func\s+(Test\w*)\s*\(\s*\w+\s+\*testing\.T\s*\)", re.MULTILINE)
+
+
+def affected_tests_enabled() -> bool:
+    """Check whether affected tests run in the background (off unless PILOT_AFFECTED_TESTS=1)."""
+    return os.environ.get("PILOT_AFFECTED_TESTS", "0").strip().lower() in ("1", "true", "yes")
+
+
+def get_state_path() -> Path:
+    """Get session-scoped affected-test state path."""
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    state_dir = _sessions_base() / session_id
+    state_dir.mkdir(parents=True, exist_ok=True)
+    return state_dir / "affected-tests.json"
+
+
+@contextmanager
+def locked_state(state_path: Path) -> Iterator[dict]:
+    """Load the state under an exclusive lock and write it back atomically on exit."""
+    with state_path.with_suffix(".lock").open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            state = json.loads(state_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("pending", {})
+        state.setdefault("running", {})
+        state.setdefault("results", {})
+        state.setdefault("failing", [])
+        yield state
+        fd, tmp_name = tempfile.mkstemp(dir=state_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_name, state_path)
+
+
+def find_root(file_path: Path, markers: tuple[str, ...]) -> Path | None:
+    """Find the nearest directory above file_path holding one of markers."""
+    current = file_path.parent
+    for _ in range(MAX_ROOT_DEPTH + 1):
+        if any((current / marker).exists() for marker in markers):
+            return current
+        if current == current.parent:
+            break
+        current = current.parent
+    return None
+
+
+def _relative(path: Path, root: Path) -> str | None:
+    try:
+        return path.relative_to(root).as_posix()
+    except ValueError:
+        return None
+
+
+def covering_node_ids(file_path: Path, root: Path, tool_input: dict | None) -> list[str]:
+    """pytest node IDs that executed the edited lines of file_path, from the coverage index."""
+    from _coverage_index import tests_covering, tests_covering_edit
+
+    covering = (tests_covering_edit(file_path, tool_input) if tool_input else tests_covering(file_path)) or []
+    return [test for test in covering if "::" in test and (root / test.split("::")[0]).is_file()]
+
+
+def plan_python(file_path: Path, tests: list[Path], tool_input: dict | None = None) -> dict | None:
+    """pytest run of the tests covering the edited lines, or else of the related test files."""
+    from tdd_enforcer import is_test_file
+
+    root = find_root(file_path, PYTEST_ROOT_MARKERS)
+    if root is None:
+        return None
+    node_ids = [] if is_test_file(str(file_path)) else covering_node_ids(file_path, root, tool_input)
+    node_ids = node_ids or [rel for rel in (_relative(test, root) for test in tests) if rel]
+    venv_python = root / ".venv" / "bin" / "python"
+    if venv_python.exists():
+        pytest = [str(venv_python), "-m", "pytest"]
+    elif binary := shutil.which("pytest"):
+        pytest = [binary]
+    else:
+        return None
+    if not node_ids:
+        return None
+    return {"cwd": str(root), "command": [*pytest, "-q", "--no-header", *node_ids], "tests": node_ids}
+
+
+def go_test_functions(test_file: Path) -> list[str]:
+    """Names of the Test functions declared in a Go test file."""
+    try:
+        return _GO_TEST_FUNC_RE.findall(test_file.read_text(errors="replace"))
+    except OSError:
+        return []
+
+
+def plan_go(file_path: Path, tests: list[Path]) -> dict | None:
+    """go test -run of the Test functions in the related test files, per package."""
+    root = find_root(file_path, ("go.mod",))
+    go = shutil.which("go")
+    if root is None or go is None:
+        return None
+    functions: list[str] = []
+    packages: list[str] = []
+    for test in tests:
+        rel = _relative(test.parent, root)
+        names = go_test_functions(test)
+        if rel is None or not names:
+            continue
+        functions.extend(name for name in names if name not in functions)
+        package = f"./{rel}" if rel != "." else "."
+        if package not in packages:
+            packages.append(package)
+    if not functions:
+        return None
+    pattern = "^(" + "|".join(functions) + ")$"
+    return {"cwd": str(root), "command": [go, "test", "-run", pattern, *packages], "tests": functions}
+
+
+def plan_typescript(file_path: Path) -> dict | None:
+    """vitest or jest run of the tests related to file_path, as resolved by the runner itself."""
+    root = find_root(file_path, ("package.json",))
+    if root is None:
+        return None
+    rel = _relative(file_path, root)
+    bin_dir = root / "node_modules" / ".bin"
+    if rel is None:
+        return None
+    if (bin_dir / "vitest").exists():
+        command = [str(bin_dir / "vitest"), "related", "--run", "--passWithNoTests", rel]
+    elif (bin_dir / "jest").exists():
+        command = [str(bin_dir / "jest"), "--findRelatedTests", rel, "--passWithNoTests"]
+    else:
+        return None
+    return {"cwd": str(root), "command": command, "tests": [rel]}
+
+
+def plan_run(file_path: Path, tool_input: dict | None = None) -> dict | None:
+    """The test command for an edited file, or None if it has no runnable tests."""
+    from tdd_enforcer import is_test_file, related_test_files, should_skip
+
+    file_path = file_path.absolute()
+    if should_skip(str(file_path)):
+        return None
+    if file_path.suffix in (".ts", ".tsx"):
+        job = plan_typescript(file_path)
+    elif file_path.suffix in (".py", ".go"):
+        tests = [file_path] if is_test_file(str(file_path)) else related_test_files(str(file_path))
+        if file_path.suffix == ".go" and not is_test_file(str(file_path)):
+            tests += sorted(set(file_path.parent.glob("*_test.go")) - set(tests))
+        job = plan_python(file_path, tests, tool_input) if file_path.suffix == ".py" else plan_go(file_path, tests)
+    else:
+        return None
+    if job is None:
+        return None
+    return {"module": str(file_path), "language": file_path.suffix.lstrip("."), **job}
+
+
+def queue_tests(file_path: Path, now: float | None = None, tool_input: dict | None = None) -> bool:
+    """Queue the tests of an edited file and make sure a worker runs them. Returns True if queued."""
+    job = plan_run(file_path, tool_input)
+    if job is None:
+        return False
+    state_path = get_state_path()
+    with locked_state(state_path) as state:
+        state["pending"][job["module"]] = {**job, "queued_at": time.time() if now is None else now}
+        state["results"].pop(job["module"], None)
+    spawn_worker(state_path)
+    return True
+
+
+def _worker_lock_path(state_path: Path) -> Path:
+    return state_path.with_suffix(".worker.lock")
+
+
+def spawn_worker(state_path: Path) -> None:
+    """Start the background worker unless one is already running."""
+    with _worker_lock_path(state_path).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__)), str(state_path)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def _log_path(state_path: Path, module: str) -> Path:
+    digest = hashlib.sha256(module.encode()).hexdigest()[:16]
+    log_dir = state_path.parent / "affected-tests"
+    log_dir.mkdir(parents=True, exist_ok=True)
+    return log_dir / f"{digest}.log"
+
+
+def start_run(job: dict, log_path: Path) -> subprocess.Popen | None:
+    """Start a test command in its own process group, writing output to log_path."""
+    try:
+        with log_path.open("w") as log:
+            return subprocess.Popen(
+                job["command"],
+                cwd=job["cwd"],
+                stdin=subprocess.DEVNULL,
+                stdout=log,
+                stderr=subprocess.STDOUT,
+                start_new_session=True,
+            )
+    except OSError:
+        return None
+
+
+def stop_run(proc: subprocess.Popen) -> None:
+    """Terminate a test run and everything it started."""
+    for sig in (signal.SIGTERM, signal.SIGKILL):
+        try:
+            os.killpg(proc.pid, sig)
+        except OSError:
+            return
+        try:
+            proc.wait(KILL_GRACE_S)
+            return
+        except subprocess.TimeoutExpired:
+            continue
+
+
+def make_result(job: dict, exit_code: int | None, log_path: Path, timed_out: bool = False) -> dict:
+    """Result entry for a finished run."""
+    try:
+        lines = log_path.read_text(errors="replace").splitlines()
+    except OSError:
+        lines = []
+    if timed_out:
+        status = "timeout"
+    elif exit_code == 0 or (job["language"] == "py" and exit_code == PYTEST_NO_TESTS):
+        status = "passed"
+    else:
+        status = "failed"
+    summary = next((line.strip() for line in reversed(lines) if line.strip()), "")
+    return {
+        "module": job["module"],
+        "language": job["language"],
+        "tests": job["tests"],
+        "command": job["command"],
+        "status": status,
+        "exit_code": exit_code,
+        "summary": summary,
+        "output": lines[-OUTPUT_TAIL_LINES:],
+        "finished_at": time.time(),
+    }
+
+
+def run_worker(state_path: Path) -> int:
+    """Run queued test jobs until the queue is empty, cancelling runs superseded by newer edits."""
+    with _worker_lock_path(state_path).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+
+        running: dict[str, tuple[subprocess.Popen, dict, float, Path]] = {}
+        try:
+            while True:
+                with locked_state(state_path) as state:
+                    step(state, running, state_path)
+                    if not running and not state["pending"]:
+                        return 0
+                time.sleep(POLL_S)
+        finally:
+            for proc, _job, _started, _log in running.values():
+                stop_run(proc)
+
+
+def step(state: dict, running: dict[str, tuple[subprocess.Popen, dict, float, Path]], state_path: Path) -> None:
+    """One worker iteration: cancel stale runs, collect finished ones, start ready jobs."""
+    now = time.time()
+    for module in [module for module in running if module in state["pending"]]:
+        stop_run(running.pop(module)[0])
+        state["running"].pop(module, None)
+
+    for module, (proc, job, started, log_path) in list(running.items()):
+        exit_code = proc.poll()
+        timed_out = exit_code is None and now - started > RUN_TIMEOUT_S
+        if exit_code is None and not timed_out:
+            continue
+        if timed_out:
+            stop_run(proc)
+        state["results"][module] = make_result(job, exit_code, log_path, timed_out)
+        state["running"].pop(module, None)
+        del running[module]
+
+    ready = sorted(
+        (job for job in state["pending"].values() if now - job["queued_at"] >= DEBOUNCE_S),
+        key=lambda job: job["queued_at"],
+    )
+    for job in ready[: max(MAX_CONCURRENT - len(running), 0)]:
+        module = job["module"]
+        del state["pending"][module]
+        log_path = _log_path(state_path, module)
+        proc = start_run(job, log_path)
+        if proc is None:
+            state["results"][module] = make_result(job, None, log_path)
+            continue
+        running[module] = (proc, job, now, log_path)
+        state["running"][module] = {"pid": proc.pid, "started_at": now, "command": job["command"]}
+
+
+def take_results(state_path: Path) -> list[tuple[dict, bool]]:
+    """Remove finished results. Each comes with whether its module was failing before."""
+    with locked_state(state_path) as state:
+        results = list(state["results"].values())
+        state["results"] = {}
+        failing = set(state["failing"])
+        taken = []
+        for result in results:
+            taken.append((result, result["module"] in failing))
+            if result["status"] == "passed":
+                failing.discard(result["module"])
+            else:
+                failing.add(result["module"])
+        state["failing"] = sorted(failing)
+    return taken
+
+
+def report_results(state_path: Path | None = None) -> tuple[int, str] | None:
+    """Print finished runs worth reporting. Returns (2, "") when something was printed."""
+    state_path = state_path or get_state_path()
+    if not state_path.exists():
+        return None
+    printed = False
+    for result, was_failing in take_results(state_path):
+        name = Path(result["module"]).name
+        if result["status"] == "passed":
+            if was_failing:
+                print("", file=sys.stderr)
+                print(f"{GREEN}✅ Tests for {name} pass again{NC}", file=sys.stderr)
+                printed = True
+            continue
+        print("", file=sys.stderr)
+        if result["status"] == "timeout":
+            print(f"{RED}⏱ Tests for {name} timed out after {RUN_TIMEOUT_S:.0f}s{NC}", file=sys.stderr)
+        else:
+            print(f"{RED}❌ Tests for {name} failed: {result['summary']}{NC}", file=sys.stderr)
+        print(f"  $ {' '.join(result['command'])}", file=sys.stderr)
+        for line in result["output"]:
+            print(f"  {line}", file=sys.stderr)
+        printed = True
+    return (2, "") if printed else None
+
+
+def check_affected_tests(
+    tool_name: str, file_path: Path | None, tool_input: dict | None = None
+) -> tuple[int, str] | None:
+    """PostToolUse: report finished runs, then queue the tests of an edited file."""
+    if not affected_tests_enabled():
+        return None
+    result = report_results()
+    if tool_name in ("Write", "Edit", "MultiEdit") and file_path is not None:
+        queue_tests(file_path, tool_input=tool_input)
+    return result
+
+
+def run_stop_report() -> int:
+    """Stop hook: report finished runs once before the session stops."""
+    event = read_hook_stdin()
+    if not affected_tests_enabled() or event.get("stop_hook_active", False):
+        return 0
+    result = report_results()
+    return result[0] if result else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_worker(Path(sys.argv[1])))
@@ -1,27 +1,53 @@
 #!/usr/bin/env python3
-"""Context monitor - warns when context usage is high."""
+"""Context monitor - warns when context usage is high.
+
+Every monitored check records (tool call number, context %) in the session
+state and fits the context growth per tool call over the recent samples. The
+forecast decides how many tool calls to skip before the next check (few when
+a notice or compaction is near, up to MAX_THROTTLE_CALLS far from it) and
+brings the warning forward when compaction is fewer than
+WARN_CALLS_REMAINING tool calls away.
+
+Tool calls are counted in tool-calls.counter in the session directory, a
+fixed-size (calls, next check) record updated in place under flock, so a
+throttled call never opens a session state write transaction.
+"""
 
 from __future__ import annotations
 
-import json
+import fcntl
 import os
+import struct
 import sys
 import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+from _context_gauge import read_context_pct
+from _session_state import STATE_ERRORS, get_session_dir, update_state
 from _util import (
     COMPACTION_THRESHOLD_PCT,
     CYAN,
     NC,
     YELLOW,
-    get_session_cache_path,
 )
 
 THRESHOLD_WARN = 65
 THRESHOLD_AUTOCOMPACT = 75
 LEARN_THRESHOLDS = [40, 55, 65]
 
+FORECAST_SAMPLES = 12
+DEFAULT_GROWTH_PER_CALL = 1.0
+MIN_GROWTH_PER_CALL = 0.1
+COMPACTION_DROP_PCT = 10
+THROTTLE_FRACTION = 0.5
+MAX_THROTTLE_CALLS = 25
+WARN_CALLS_REMAINING = 20
+
+COUNTER_FILE = "tool-calls.counter"
+COUNTER = struct.Struct("<QQ")
+NEXT_CHECK_OFFSET = 8
+
 
 def _to_effective(raw_pct: float) -> float:
     """Convert raw context % to effective % (where compaction threshold = 100%)."""
@@ -33,143 +59,108 @@ def _get_pilot_session_id() -> str:
     return os.environ.get("PILOT_SESSION_ID", "").strip() or "unknown"
 
 
-def get_session_flags(session_id: str) -> tuple[list[int], bool]:
-    """Get shown flags for this session (learn thresholds, warn-once flag)."""
-    if get_session_cache_path().exists():
-        try:
-            with get_session_cache_path().open() as f:
-                cache = json.load(f)
-                if cache.get("session_id") == session_id:
-                    return cache.get("shown_learn", []), cache.get("shown_80_warn", False)
-        except (json.JSONDecodeError, OSError):
-            pass
-    return [], False
-
-
-def save_cache(
-    tokens: int, session_id: str, shown_learn: list[int] | None = None, shown_80_warn: bool | None = None
-) -> None:
-    """Save context calculation to cache with session ID."""
-    existing_shown: list[int] = []
-    existing_80_warn = False
-    if get_session_cache_path().exists():
-        try:
-            with get_session_cache_path().open() as f:
-                cache = json.load(f)
-                if cache.get("session_id") == session_id:
-                    existing_shown = cache.get("shown_learn", [])
-                    existing_80_warn = cache.get("shown_80_warn", False)
-        except (json.JSONDecodeError, OSError):
-            pass
-
-    if shown_learn:
-        existing_shown = list(set(existing_shown + shown_learn))
-    if shown_80_warn:
-        existing_80_warn = True
-
-    try:
-        with get_session_cache_path().open("w") as f:
-            json.dump(
-                {
-                    "tokens": tokens,
-                    "timestamp": time.time(),
-                    "session_id": session_id,
-                    "shown_learn": existing_shown,
-                    "shown_80_warn": existing_80_warn,
-                },
-                f,
-            )
-    except OSError:
-        pass
-
-
 def _read_statusline_context_pct() -> float | None:
-    """Read authoritative context percentage from statusline cache.
+    """Read authoritative context percentage reported by the statusline.
 
-    Returns None if cache is missing, corrupt, or stale (>60s).
-    Cache is already scoped per Pilot session via PILOT_SESSION_ID.
+    Returns None if the context gauge is missing or stale.
+    The gauge is already scoped per Pilot session via PILOT_SESSION_ID.
     """
-    pilot_session_id = os.environ.get("PILOT_SESSION_ID", "").strip()
-    if not pilot_session_id:
-        return None
-    cache_file = Path.home() / ".pilot" / "sessions" / pilot_session_id / "context-pct.json"
-    if not cache_file.exists():
-        return None
-    try:
-        data = json.loads(cache_file.read_text())
-        ts = data.get("ts")
-        if ts is None or time.time() - ts > 60:
-            return None
-        pct = data.get("pct")
-        return float(pct) if pct is not None else None
-    except (json.JSONDecodeError, OSError, ValueError, TypeError):
+    if not os.environ.get("PILOT_SESSION_ID", "").strip():
         return None
+    return read_context_pct(get_session_dir())
 
 
-def _is_throttled(session_id: str) -> bool:
-    """Check if context monitoring should be throttled (skipped).
+def record_sample(samples: list[list[float]], calls: int, pct: float) -> list[list[float]]:
+    """Append (calls, pct), starting over when the context shrank (compaction)."""
+    if samples and pct < samples[-1][1] - COMPACTION_DROP_PCT:
+        samples = []
+    return [*samples, [calls, pct]][-FORECAST_SAMPLES:]
 
-    Returns True if:
-    - Last check was < 30 seconds ago AND
-    - Last cached context was below the warning threshold (~80% effective)
 
-    Always returns False at high context (never throttle when approaching compaction).
-    """
-    cache_path = get_session_cache_path()
-    if not cache_path.exists():
-        return False
-
-    try:
-        with cache_path.open() as f:
-            cache = json.load(f)
-            if cache.get("session_id") != session_id:
-                return False
-
-            timestamp = cache.get("timestamp")
-            if timestamp is None:
-                return False
-
-            if time.time() - timestamp < 30:
-                tokens = cache.get("tokens", 0)
-                percentage = (tokens / 200000) * 100
-                if percentage < THRESHOLD_WARN:
-                    return True
-
-            return False
-    except (json.JSONDecodeError, OSError, KeyError):
-        return False
-
-
-def _resolve_context(session_id: str) -> tuple[float, int, list[int], bool] | None:
-    """Resolve context percentage and tokens. Returns (pct, tokens, shown_learn, shown_80) or None.
-    Uses the session-scoped statusline cache (context-pct.json) which is
-    written by the statusline process for this specific Pilot session.
-    """
-    statusline_pct = _read_statusline_context_pct()
-    if statusline_pct is None:
+def growth_per_call(samples: list[list[float]]) -> float | None:
+    """Least-squares slope of context % over tool calls, or None with too few samples."""
+    if len(samples) < 2:
+        return None
+    mean_calls = sum(calls for calls, _ in samples) / len(samples)
+    mean_pct = sum(pct for _, pct in samples) / len(samples)
+    spread = sum((calls - mean_calls) ** 2 for calls, _ in samples)
+    if spread == 0:
         return None
+    return sum((calls - mean_calls) * (pct - mean_pct) for calls, pct in samples) / spread
 
-    shown_learn, shown_80_warn = get_session_flags(session_id)
-    return statusline_pct, int(statusline_pct / 100 * 200000), shown_learn, shown_80_warn
 
+def calls_until(target_pct: float, pct: float, rate: float) -> float:
+    """Forecast tool calls until context reaches target_pct at rate % per call."""
+    return max(target_pct - pct, 0.0) / rate
 
-def run_context_monitor() -> int:
-    """Run context monitoring and return exit code."""
-    session_id = _get_pilot_session_id()
 
-    if _is_throttled(session_id):
+def _next_notice_pct(pct: float, shown_learn: list[int], shown_80_warn: bool) -> float:
+    """The context % of the next notice this session has not shown yet."""
+    pending = [threshold for threshold in LEARN_THRESHOLDS if threshold not in shown_learn]
+    if not shown_80_warn:
+        pending.append(THRESHOLD_WARN)
+    pending.append(THRESHOLD_AUTOCOMPACT)
+    return min(pending)
+
+
+def throttle_calls(pct: float, rate: float, shown_learn: list[int], shown_80_warn: bool) -> int:
+    """Tool calls to skip before the next check.
+
+    Skips a fraction of the calls forecast until the next notice, so checks
+    get denser as one approaches. Never throttles at or above THRESHOLD_WARN.
+    """
+    if pct >= THRESHOLD_WARN:
         return 0
+    remaining = calls_until(_next_notice_pct(pct, shown_learn, shown_80_warn), pct, rate)
+    return int(min(remaining * THROTTLE_FRACTION, MAX_THROTTLE_CALLS))
+
 
-    resolved = _resolve_context(session_id)
-    if resolved is None:
+def count_call(session_dir: Path) -> tuple[int, int]:
+    """Count a tool call in the session's counter. Returns (calls, next check). Raises OSError on failure."""
+    session_dir.mkdir(parents=True, exist_ok=True)
+    fd = os.open(session_dir / COUNTER_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        record = os.pread(fd, COUNTER.size, 0)
+        calls, next_check = COUNTER.unpack(record) if len(record) == COUNTER.size else (0, 0)
+        calls += 1
+        os.pwrite(fd, COUNTER.pack(calls, next_check), 0)
+    finally:
+        os.close(fd)
+    return calls, next_check
+
+
+def schedule_check(session_dir: Path, next_check: int) -> None:
+    """Record the tool call number of the next due check. Raises OSError on failure."""
+    fd = os.open(session_dir / COUNTER_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+    try:
+        fcntl.flock(fd, fcntl.LOCK_EX)
+        if os.fstat(fd).st_size < COUNTER.size:
+            os.ftruncate(fd, COUNTER.size)
+        os.pwrite(fd, struct.pack("<Q", next_check), NEXT_CHECK_OFFSET)
+    finally:
+        os.close(fd)
+
+
+def _check(cache: dict, session_id: str, calls: int) -> int:
+    """Check context at tool call number calls, record the result in cache, and return exit code."""
+    if cache.get("session_id") != session_id:
+        cache.clear()
+        cache["session_id"] = session_id
+    cache["calls"] = calls
+
+    percentage = _read_statusline_context_pct()
+    if percentage is None:
         return 0
 
-    percentage, total_tokens, shown_learn, shown_80_warn = resolved
+    shown_learn = cache.get("shown_learn", [])
+    shown_80_warn = cache.get("shown_80_warn", False)
+    samples = record_sample(cache.get("samples", []), calls, percentage)
+    fitted = growth_per_call(samples)
+    rate = max(fitted, MIN_GROWTH_PER_CALL) if fitted is not None else DEFAULT_GROWTH_PER_CALL
+    remaining = calls_until(COMPACTION_THRESHOLD_PCT, percentage, rate)
     effective = _to_effective(percentage)
 
-    save_cache(total_tokens, session_id)
-
-    new_learn_shown: list[int] = []
     if percentage < THRESHOLD_AUTOCOMPACT:
         for threshold in LEARN_THRESHOLDS:
             if percentage >= threshold and threshold not in shown_learn:
@@ -177,11 +168,11 @@ def run_context_monitor() -> int:
                     f"{CYAN}💡 Context {effective:.0f}% — non-obvious discovery or reusable workflow? → Invoke Skill(learn){NC}",
                     file=sys.stderr,
                 )
-                new_learn_shown.append(threshold)
+                shown_learn = sorted([*shown_learn, threshold])
                 break
 
+    exit_code = 0
     if percentage >= THRESHOLD_AUTOCOMPACT:
-        save_cache(total_tokens, session_id, new_learn_shown if new_learn_shown else None)
         print("", file=sys.stderr)
         print(
             f"{YELLOW}⚠️  Context at {effective:.0f}%. Auto-compact approaching — no rush, no context is lost.{NC}",
@@ -191,26 +182,53 @@ def run_context_monitor() -> int:
             f"{YELLOW}Complete current task with full quality. Do NOT cut corners or skip verification.{NC}",
             file=sys.stderr,
         )
-        return 2
-
-    if percentage >= THRESHOLD_WARN and not shown_80_warn:
-        save_cache(total_tokens, session_id, new_learn_shown if new_learn_shown else None, shown_80_warn=True)
+        exit_code = 2
+    elif not shown_80_warn and (
+        percentage >= THRESHOLD_WARN or (fitted is not None and remaining <= WARN_CALLS_REMAINING)
+    ):
+        shown_80_warn = True
         print("", file=sys.stderr)
         print(
             f"{CYAN}💡 Context at {effective:.0f}%. Auto-compact will handle context management automatically. No rush.{NC}",
             file=sys.stderr,
         )
-        return 0
 
-    if percentage >= THRESHOLD_WARN and shown_80_warn:
-        if new_learn_shown:
-            save_cache(total_tokens, session_id, new_learn_shown)
-        return 0
+    cache.update(
+        {
+            "pct": percentage,
+            "timestamp": time.time(),
+            "samples": samples,
+            "growth_per_call": fitted,
+            "calls_remaining": round(remaining),
+            "next_check": calls + 1 + throttle_calls(percentage, rate, shown_learn, shown_80_warn),
+            "shown_learn": shown_learn,
+            "shown_80_warn": shown_80_warn,
+        }
+    )
+    return exit_code
 
-    if new_learn_shown:
-        save_cache(total_tokens, session_id, new_learn_shown)
 
-    return 0
+def run_context_monitor() -> int:
+    """Run context monitoring and return exit code.
+
+    Only a due check opens a session state transaction; the check and
+    recording its result are one transaction.
+    """
+    if not os.environ.get("PILOT_SESSION_ID", "").strip():
+        return 0
+    session_id = _get_pilot_session_id()
+    session_dir = get_session_dir()
+    try:
+        calls, next_check = count_call(session_dir)
+        if calls < next_check:
+            return 0
+        with update_state(session_dir) as state:
+            exit_code = _check(state.context_cache, session_id, calls)
+            next_check = state.context_cache.get("next_check", 0)
+        schedule_check(session_dir, next_check)
+    except STATE_ERRORS:
+        return 0
+    return exit_code
 
 
 if __name__ == "__main__":
@@ -8,11 +8,49 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+import lint_queue
 from _checkers.go import check_go
 from _checkers.python import check_python
 from _checkers.typescript import TS_EXTENSIONS, check_typescript
+from _snapshot import FileSnapshot, snapshot_scope
 from _util import find_git_root, get_edited_file_from_stdin
 
+LANGUAGES = {".py": "python", ".go": "go", **dict.fromkeys(TS_EXTENSIONS, "typescript")}
+
+
+def _run_checker(language: str, target_file: Path, tool_input: dict | None) -> tuple[int, str]:
+    checker = {"python": check_python, "typescript": check_typescript}.get(language, check_go)
+    return checker(target_file, tool_input) if tool_input else checker(target_file)
+
+
+def check_file(
+    target_file: Path, tool_input: dict | None = None, snapshot: FileSnapshot | None = None
+) -> tuple[int, str] | None:
+    """Dispatch a file to its language checker.
+
+    Edits that are part of a burst are queued for a batched lint instead, and
+    settled results from earlier bursts are reported alongside. tool_input is
+    the PostToolUse tool input, used to scope work to the edited lines.
+    Every step shares one snapshot of the file, seeded with snapshot if the
+    caller already read it.
+
+    Returns (exit_code, reason), or None if the file type is not checked.
+    """
+    language = LANGUAGES.get(target_file.suffix)
+    if language is None:
+        return None
+
+    with snapshot_scope([snapshot]):
+        result = lint_queue.coalesce(target_file, language) or _run_checker(language, target_file, tool_input)
+        if not lint_queue.coalescing_enabled():
+            return result
+
+        settled = lint_queue.report_ready(lint_queue.get_queue_path())
+    if settled is None:
+        return result
+    reasons = [reason for reason in (result[1], settled[1]) if reason]
+    return max(result[0], settled[0]), "; ".join(reasons)
+
 
 def main() -> int:
     """Main entry point — dispatch by file extension."""
@@ -24,15 +62,11 @@ def main() -> int:
     if not target_file or not target_file.exists():
         return 0
 
-    if target_file.suffix == ".py":
-        exit_code, reason = check_python(target_file)
-    elif target_file.suffix in TS_EXTENSIONS:
-        exit_code, reason = check_typescript(target_file)
-    elif target_file.suffix == ".go":
-        exit_code, reason = check_go(target_file)
-    else:
+    result = check_file(target_file)
+    if result is None:
         return 0
 
+    exit_code, reason = result
     if reason:
         print(json.dumps({"decision": "block", "reason": reason}))
     else:
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+"""Hook client - forwards a hook invocation to the warm hook daemon.
+
+hooks.json invokes this client with the hook name instead of running the hook
+script directly. The client sends stdin, cwd and environment to the session's
+hook daemon over a Unix socket and replays its stdout, stderr and exit code
+unchanged. When the daemon cannot be reached it is started in the background
+and the hook runs in-process, so no call ever waits for the daemon to come up.
+
+Once the request has been sent the daemon owns it: running the hook again
+in-process would repeat its checks and formatter writes. The client waits up
+to PILOT_HOOK_DAEMON_TIMEOUT seconds (default 30, above the checker budget
+and the hooks.json timeouts) and, if no answer comes, reports the hook as
+skipped instead of running it a second time.
+
+Set PILOT_HOOK_DAEMON=0 to always run hooks in-process.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _util import get_hook_socket_path, get_hooks_fingerprint
+
+CONNECT_TIMEOUT_S = 0.5
+RESPONSE_TIMEOUT_S = float(os.environ.get("PILOT_HOOK_DAEMON_TIMEOUT", "30"))
+
+
+def _daemon_enabled() -> bool:
+    """Check whether hooks should be forwarded to the daemon."""
+    return os.environ.get("PILOT_HOOK_DAEMON", "1").strip().lower() not in ("0", "false", "no")
+
+
+def forward_to_daemon(hook: str, payload: str) -> dict | None:
+    """Send a hook request to the daemon.
+
+    Returns the daemon response, or None if the request could not be delivered
+    or the daemon asked the client to fall back (e.g. after the hook sources
+    changed). A delivered request is never handed back for in-process
+    execution: if the daemon does not answer within RESPONSE_TIMEOUT_S, the
+    result reports the hook as skipped.
+    """
+    request = {
+        "hook": hook,
+        "stdin": payload,
+        "cwd": os.getcwd(),
+        "env": dict(os.environ),
+        "fingerprint": get_hooks_fingerprint(),
+    }
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        try:
+            sock.settimeout(CONNECT_TIMEOUT_S)
+            sock.connect(str(get_hook_socket_path()))
+            sock.settimeout(RESPONSE_TIMEOUT_S)
+            # A request cut short here parses as {} in the daemon, fails the
+            # fingerprint check and is never run, so falling back is safe.
+            sock.sendall(json.dumps(request).encode())
+            sock.shutdown(socket.SHUT_WR)
+        except OSError:
+            return None
+        try:
+            chunks = []
+            while chunk := sock.recv(65536):
+                chunks.append(chunk)
+            response = json.loads(b"".join(chunks))
+        except (OSError, ValueError):
+            return _unanswered(hook)
+
+    if not isinstance(response, dict):
+        return _unanswered(hook)
+    if response.get("restart"):
+        return None
+    return response
+
+
+def _unanswered(hook: str) -> dict:
+    """Result for a delivered request the daemon never answered."""
+    return {
+        "exit_code": 0,
+        "stdout": "",
+        "stderr": f"hook daemon did not answer {hook} within {RESPONSE_TIMEOUT_S:g}s; skipped\n",
+    }
+
+
+def spawn_daemon() -> None:
+    """Start the hook daemon in the background, detached from this process."""
+    import subprocess
+
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).parent / "hook_daemon.py")],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def main() -> int:
+    """Forward the named hook to the daemon, falling back to in-process execution."""
+    if len(sys.argv) < 2:
+        print("Usage: hook_client.py <hook-name>", file=sys.stderr)
+        return 1
+
+    hook = sys.argv[1]
+    try:
+        payload = "" if sys.stdin.isatty() else sys.stdin.read()
+    except (OSError, ValueError):
+        payload = ""
+
+    if _daemon_enabled():
+        response = forward_to_daemon(hook, payload)
+        if response is not None:
+            sys.stdout.write(response.get("stdout", ""))
+            sys.stderr.write(response.get("stderr", ""))
+            return int(response.get("exit_code", 0))
+        spawn_daemon()
+
+    from hook_daemon import run_hook
+
+    exit_code, stdout, stderr = run_hook(hook, payload)
+    sys.stdout.write(stdout)
+    sys.stderr.write(stderr)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""Hook daemon - runs hook handlers in a long-lived process with warm imports.
+
+One daemon serves one Pilot session over a Unix socket (see hook_client.py).
+Requests are handled one at a time because handlers rely on process-global
+state (cwd, environment, sys streams), which is swapped in per request. The
+daemon exits after IDLE_TIMEOUT_S without requests, or as soon as a client
+reports a different hook source fingerprint (plugin update).
+"""
+
+from __future__ import annotations
+
+import fcntl
+import importlib
+import io
+import json
+import os
+import socket
+import sys
+import traceback
+from collections.abc import Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _util import get_hook_socket_path, get_hooks_fingerprint
+
+HANDLERS: dict[str, tuple[str, str]] = {
+    "affected_tests": ("affected_tests", "run_stop_report"),
+    "context_monitor": ("context_monitor", "run_context_monitor"),
+    "file_checker": ("file_checker", "main"),
+    "lint_queue": ("lint_queue", "run_stop_report"),
+    "post_tool_use": ("post_tool_use", "run_post_tool_use"),
+    "post_compact_restore": ("post_compact_restore", "run_post_compact_restore"),
+    "pre_compact": ("pre_compact", "run_pre_compact"),
+    "session_end": ("session_end", "main"),
+    "spec_plan_validator": ("spec_plan_validator", "main"),
+    "spec_stop_guard": ("spec_stop_guard", "main"),
+    "spec_verify_validator": ("spec_verify_validator", "main"),
+    "tdd_enforcer": ("tdd_enforcer", "run_tdd_enforcer"),
+    "tool_redirect": ("tool_redirect", "run_tool_redirect"),
+}
+
+IDLE_TIMEOUT_S = float(os.environ.get("PILOT_HOOK_DAEMON_IDLE", "600"))
+REQUEST_READ_TIMEOUT_S = 10.0
+
+
+def _exit_status(code: object) -> int:
+    """Convert a SystemExit code to a process exit status."""
+    if code is None:
+        return 0
+    if isinstance(code, int):
+        return code
+    print(code, file=sys.stderr)
+    return 1
+
+
+def run_hook(name: str, stdin_text: str) -> tuple[int, str, str]:
+    """Run a hook handler in-process. Returns (exit_code, stdout, stderr)."""
+    target = HANDLERS.get(name)
+    if target is None:
+        return 1, "", f"Unknown hook: {name}\n"
+
+    stdout = io.StringIO()
+    stderr = io.StringIO()
+    saved_streams = sys.stdin, sys.stdout, sys.stderr
+    sys.stdin, sys.stdout, sys.stderr = io.StringIO(stdin_text), stdout, stderr
+    try:
+        module_name, func_name = target
+        handler = getattr(importlib.import_module(module_name), func_name)
+        exit_code = _exit_status(handler())
+    except SystemExit as e:
+        exit_code = _exit_status(e.code)
+    except Exception:
+        traceback.print_exc()
+        exit_code = 1
+    finally:
+        sys.stdin, sys.stdout, sys.stderr = saved_streams
+
+    return exit_code, stdout.getvalue(), stderr.getvalue()
+
+
+@contextmanager
+def _request_context(cwd: str, env: dict[str, str]) -> Iterator[None]:
+    """Apply the client's cwd and environment for the duration of one request."""
+    saved_env = dict(os.environ)
+    try:
+        saved_cwd = os.getcwd()
+    except OSError:
+        saved_cwd = "/"
+    os.environ.clear()
+    os.environ.update(env)
+    try:
+        os.chdir(cwd)
+    except OSError:
+        pass
+    try:
+        yield
+    finally:
+        os.environ.clear()
+        os.environ.update(saved_env)
+        os.chdir(saved_cwd)
+
+
+def _warm_imports() -> None:
+    """Import every handler module up front so the first request is warm."""
+    for module_name, _ in HANDLERS.values():
+        try:
+            importlib.import_module(module_name)
+        except Exception:
+            pass
+
+
+def _read_request(conn: socket.socket) -> dict:
+    """Read a JSON request until the client shuts down its write side."""
+    conn.settimeout(REQUEST_READ_TIMEOUT_S)
+    chunks = []
+    while chunk := conn.recv(65536):
+        chunks.append(chunk)
+    try:
+        request = json.loads(b"".join(chunks))
+    except ValueError:
+        return {}
+    return request if isinstance(request, dict) else {}
+
+
+def _send_response(conn: socket.socket, response: dict) -> None:
+    """Send a JSON response, ignoring clients that already went away."""
+    try:
+        conn.sendall(json.dumps(response).encode())
+    except OSError:
+        pass
+
+
+def handle_request(request: dict) -> dict:
+    """Execute one hook request inside the client's cwd and environment."""
+    env = request.get("env")
+    with _request_context(str(request.get("cwd", "/")), env if isinstance(env, dict) else {}):
+        exit_code, stdout, stderr = run_hook(str(request.get("hook", "")), str(request.get("stdin", "")))
+    return {"exit_code": exit_code, "stdout": stdout, "stderr": stderr}
+
+
+def serve(socket_path: Path, idle_timeout: float = IDLE_TIMEOUT_S) -> int:
+    """Serve hook requests on socket_path until idle or the hook sources change."""
+    lock_file = socket_path.with_suffix(".lock").open("w")
+    try:
+        fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except OSError:
+        lock_file.close()
+        return 0
+
+    fingerprint = get_hooks_fingerprint()
+    socket_path.unlink(missing_ok=True)
+    server = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+
+    def shutdown() -> None:
+        server.close()
+        socket_path.unlink(missing_ok=True)
+        lock_file.close()
+
+    try:
+        server.bind(str(socket_path))
+        os.chmod(socket_path, 0o600)
+        server.listen(16)
+        server.settimeout(idle_timeout)
+        os.chdir("/")
+        _warm_imports()
+
+        while True:
+            try:
+                conn, _ = server.accept()
+            except TimeoutError:
+                break
+            with conn:
+                try:
+                    request = _read_request(conn)
+                except OSError:
+                    continue
+                if request.get("fingerprint") != fingerprint:
+                    shutdown()
+                    _send_response(conn, {"restart": True})
+                    return 0
+                _send_response(conn, handle_request(request))
+    finally:
+        if not lock_file.closed:
+            shutdown()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(serve(get_hook_socket_path()))
@@ -0,0 +1,339 @@
+#!/usr/bin/env python3
+"""Lint queue - coalesces bursts of edits into one batched lint run.
+
+The first edit after a quiet period is checked synchronously as before. When
+further edits follow within BURST_WINDOW_S, file_checker only strips comments
+and records the file here; a background worker waits until no edit has arrived
+for QUIET_WINDOW_S, then formats and lints the latest content of every queued
+file with one batched tool run per language and project.
+
+Results are keyed by the content hash they were computed for. file_checker
+reports results whose hash still matches the file on disk and drops the rest,
+so diagnostics for superseded intermediate states never reach the agent.
+Results still waiting when the agent stops are reported by the Stop hook.
+
+Set PILOT_LINT_COALESCE=0 to check every edit synchronously.
+"""
+
+from __future__ import annotations
+
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _checkers.go import format_go, lint_go_batch, report_go, strip_go_comments
+from _checkers.go import is_lint_target as is_go_target
+from _checkers.python import format_python, lint_python_batch, report_python, strip_python_comments
+from _checkers.python import is_lint_target as is_python_target
+from _checkers.typescript import format_typescript, lint_typescript_batch, report_typescript, strip_typescript_comments
+from _checkers.typescript import is_lint_target as is_typescript_target
+from _snapshot import read_text, snapshot, snapshot_scope, write_text
+from _util import CYAN, NC, _sessions_base, read_hook_stdin
+
+BURST_WINDOW_S = float(os.environ.get("PILOT_LINT_BURST_WINDOW", "5"))
+QUIET_WINDOW_S = float(os.environ.get("PILOT_LINT_QUIET_WINDOW", "1.5"))
+STOP_WAIT_S = float(os.environ.get("PILOT_LINT_STOP_WAIT", "5"))
+STOP_POLL_S = 0.1
+
+STRIPPERS: dict[str, Callable[[Path], bool]] = {
+    "python": strip_python_comments,
+    "typescript": strip_typescript_comments,
+    "go": strip_go_comments,
+}
+TARGETS: dict[str, Callable[[Path], bool]] = {
+    "python": is_python_target,
+    "typescript": is_typescript_target,
+    "go": is_go_target,
+}
+FORMATTERS: dict[str, Callable[[Path, str], str | None]] = {
+    "python": format_python,
+    "typescript": format_typescript,
+    "go": format_go,
+}
+BATCH_LINTERS: dict[str, Callable[[list[Path]], dict[Path, dict]]] = {
+    "python": lint_python_batch,
+    "typescript": lint_typescript_batch,
+    "go": lint_go_batch,
+}
+REPORTERS: dict[str, Callable[[Path, dict], tuple[int, str]]] = {
+    "python": report_python,
+    "typescript": report_typescript,
+    "go": report_go,
+}
+
+
+def coalescing_enabled() -> bool:
+    """Check whether edit bursts are coalesced (PILOT_LINT_COALESCE=0 disables)."""
+    return os.environ.get("PILOT_LINT_COALESCE", "1").strip().lower() not in ("0", "false", "no")
+
+
+def get_queue_path() -> Path:
+    """Get session-scoped lint queue path."""
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    queue_dir = _sessions_base() / session_id
+    queue_dir.mkdir(parents=True, exist_ok=True)
+    return queue_dir / "lint-queue.json"
+
+
+def content_hash(file_path: Path) -> str | None:
+    """Hash the file's current content, or None if it cannot be read."""
+    snap = snapshot(file_path)
+    return snap.sha256 if snap is not None else None
+
+
+@contextmanager
+def locked_queue(queue_path: Path) -> Iterator[dict]:
+    """Load the queue under an exclusive lock and write it back atomically on exit."""
+    with queue_path.with_suffix(".lock").open("w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            state = json.loads(queue_path.read_text())
+        except (OSError, json.JSONDecodeError):
+            state = {}
+        state.setdefault("last_edit_at", 0.0)
+        state.setdefault("pending", {})
+        state.setdefault("results", {})
+        yield state
+        fd, tmp_name = tempfile.mkstemp(dir=queue_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "w") as f:
+            json.dump(state, f)
+        os.replace(tmp_name, queue_path)
+
+
+def note_edit(queue_path: Path, file_path: Path, language: str, now: float | None = None) -> bool:
+    """Record an edit. Returns True if it belongs to a burst and was queued.
+
+    Edits outside a burst are checked synchronously, which supersedes anything
+    queued or stored for the same file.
+    """
+    now = time.time() if now is None else now
+    key = str(file_path.resolve())
+    with locked_queue(queue_path) as state:
+        in_burst = now - state["last_edit_at"] < BURST_WINDOW_S
+        state["last_edit_at"] = now
+        state["results"].pop(key, None)
+        if not in_burst:
+            state["pending"].pop(key, None)
+            return False
+        STRIPPERS[language](file_path)
+        state["pending"][key] = {"language": language, "hash": content_hash(file_path), "queued_at": now}
+    return True
+
+
+def enqueue(file_path: Path, language: str) -> bool:
+    """Queue file_path for a background lint regardless of edit timing."""
+    queue_path = get_queue_path()
+    with locked_queue(queue_path) as state:
+        state["pending"][str(file_path.resolve())] = {
+            "language": language,
+            "hash": content_hash(file_path),
+            "queued_at": time.time(),
+        }
+    spawn_worker(queue_path)
+    return True
+
+
+def take_ready_results(queue_path: Path) -> list[tuple[Path, str, dict]]:
+    """Remove and return stored results that still match the files on disk."""
+    ready = []
+    with locked_queue(queue_path) as state:
+        for key, entry in list(state["results"].items()):
+            del state["results"][key]
+            path = Path(key)
+            if content_hash(path) == entry["hash"]:
+                ready.append((path, entry["language"], entry["results"]))
+    return ready
+
+
+def report_ready(queue_path: Path) -> tuple[int, str] | None:
+    """Print settled diagnostics from earlier bursts. Returns merged (exit_code, reason)."""
+    ready = take_ready_results(queue_path)
+    if not ready:
+        return None
+    exit_code = 0
+    reasons = []
+    for path, language, results in ready:
+        code, reason = REPORTERS[language](path, results)
+        exit_code = max(exit_code, code)
+        if reason:
+            reasons.append(reason)
+    return exit_code, "; ".join(reasons)
+
+
+def defer_check(queue_path: Path, file_path: Path) -> tuple[int, str]:
+    """Return the hook result for a queued edit and make sure a worker is running."""
+    with locked_queue(queue_path) as state:
+        pending = len(state["pending"])
+    spawn_worker(queue_path)
+    print("", file=sys.stderr)
+    print(
+        f"{CYAN}⏳ Lint deferred for {file_path.name} until edits settle ({pending} file(s) queued){NC}",
+        file=sys.stderr,
+    )
+    return 0, ""
+
+
+def coalesce(file_path: Path, language: str) -> tuple[int, str] | None:
+    """Queue file_path if it is part of an edit burst.
+
+    Returns the hook result for a queued edit, or None if the caller should
+    check the file synchronously.
+    """
+    if not coalescing_enabled() or not TARGETS[language](file_path):
+        return None
+    queue_path = get_queue_path()
+    if not note_edit(queue_path, file_path, language):
+        return None
+    return defer_check(queue_path, file_path)
+
+
+def _worker_lock_path(queue_path: Path) -> Path:
+    return queue_path.with_suffix(".worker.lock")
+
+
+def spawn_worker(queue_path: Path) -> None:
+    """Start the background worker unless one is already running."""
+    with _worker_lock_path(queue_path).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return
+    try:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__)), str(queue_path)],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            start_new_session=True,
+            close_fds=True,
+        )
+    except OSError:
+        pass
+
+
+def format_pending(queue_path: Path, pending: dict[str, dict]) -> dict[str, str]:
+    """Format queued files over stdin and write back those the agent has not edited since.
+
+    Formatting runs without the queue lock. The write happens under it, and
+    only if both the queue and the file on disk still hold the content hash
+    the file was queued with; the queued hash then moves to the formatted
+    content. Returns the settled content hash of every file ready to lint.
+    """
+    formatted: dict[str, str | None] = {}
+    with snapshot_scope():
+        for key, entry in pending.items():
+            path = Path(key)
+            content = read_text(path)
+            if content is None or content_hash(path) != entry["hash"]:
+                continue
+            text = FORMATTERS[entry["language"]](path, content)
+            formatted[key] = None if text == content else text
+
+    settled: dict[str, str] = {}
+    with locked_queue(queue_path) as state:
+        for key, text in formatted.items():
+            current = state["pending"].get(key)
+            path = Path(key)
+            if current is None or current["hash"] != pending[key]["hash"] or content_hash(path) != current["hash"]:
+                continue
+            if text is not None:
+                try:
+                    write_text(path, text)
+                except OSError:
+                    continue
+                current["hash"] = content_hash(path)
+            settled[key] = current["hash"]
+    return settled
+
+
+def lint_pending(pending: dict[str, dict], settled: dict[str, str]) -> dict[str, dict]:
+    """Batch-lint settled files whose content is still what they settled to.
+
+    Returns result entries keyed like pending, each recording the content hash
+    the diagnostics belong to.
+    """
+    by_language: dict[str, list[Path]] = {}
+    entries: dict[str, dict] = {}
+    with snapshot_scope():
+        for key, settled_hash in settled.items():
+            path = Path(key)
+            if content_hash(path) == settled_hash:
+                by_language.setdefault(pending[key]["language"], []).append(path)
+
+        for language, files in by_language.items():
+            for path, results in BATCH_LINTERS[language](files).items():
+                entries[str(path)] = {"language": language, "hash": content_hash(path), "results": results}
+    return entries
+
+
+def run_worker(queue_path: Path) -> int:
+    """Lint queued files once edits have been quiet for QUIET_WINDOW_S, until the queue is empty."""
+    with _worker_lock_path(queue_path).open("w") as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            return 0
+
+        while True:
+            with locked_queue(queue_path) as state:
+                pending = dict(state["pending"])
+                last_edit_at = state["last_edit_at"]
+            if not pending:
+                return 0
+
+            wait = last_edit_at + QUIET_WINDOW_S - time.time()
+            if wait > 0:
+                time.sleep(wait)
+                continue
+
+            settled = format_pending(queue_path, pending)
+            entries = lint_pending(pending, settled)
+            with locked_queue(queue_path) as state:
+                for key, queued in pending.items():
+                    current = state["pending"].get(key)
+                    if current is None or current["hash"] not in (queued["hash"], settled.get(key)):
+                        continue
+                    del state["pending"][key]
+                    if key in entries and entries[key]["hash"] == current["hash"]:
+                        state["results"][key] = entries[key]
+
+
+def wait_for_queue(queue_path: Path, timeout_s: float = STOP_WAIT_S) -> bool:
+    """Wait up to timeout_s for the worker to drain the queue. Returns True once it is empty."""
+    deadline = time.monotonic() + timeout_s
+    spawned = False
+    while True:
+        with locked_queue(queue_path) as state:
+            if not state["pending"]:
+                return True
+        if time.monotonic() >= deadline:
+            return False
+        if not spawned:
+            spawn_worker(queue_path)
+            spawned = True
+        time.sleep(STOP_POLL_S)
+
+
+def run_stop_report() -> int:
+    """Stop hook: report queued lint results before the session stops."""
+    event = read_hook_stdin()
+    if not coalescing_enabled() or event.get("stop_hook_active", False):
+        return 0
+    queue_path = get_queue_path()
+    if not queue_path.exists():
+        return 0
+    wait_for_queue(queue_path)
+    result = report_ready(queue_path)
+    return 2 if result and result[1] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(run_worker(Path(sys.argv[1])))
@@ -6,48 +6,32 @@ Fires after Claude Code compaction completes to re-inject Pilot-specific context
 
 from __future__ import annotations
 
-import json
-import os
 import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from _util import (
-    get_session_plan_path,
-    read_hook_stdin,
-)
-
-
-def _sessions_base() -> Path:
-    """Get base sessions directory."""
-    return Path.home() / ".pilot" / "sessions"
+from _session_state import STATE_ERRORS, get_session_dir, load_state, update_state
+from _util import read_hook_stdin
 
 
 def _read_active_plan() -> dict | None:
     """Read active plan state from session data."""
-    plan_path = get_session_plan_path()
-    if not plan_path.exists():
-        return None
-
-    try:
-        return json.loads(plan_path.read_text())
-    except (json.JSONDecodeError, OSError):
-        return None
+    return load_state().active_plan or None
 
 
-def _read_fallback_state(session_id: str) -> dict | None:
+def _read_fallback_state() -> dict | None:
     """Read pre-compact fallback state if available."""
-    fallback_file = _sessions_base() / session_id / "pre-compact-state.json"
-    if not fallback_file.exists():
+    session_dir = get_session_dir()
+    if not session_dir.is_dir():
         return None
-
     try:
-        state = json.loads(fallback_file.read_text())
-        fallback_file.unlink()
-        return state
-    except (json.JSONDecodeError, OSError):
+        with update_state(session_dir) as session:
+            state = session.pre_compact
+            session.pre_compact = None
+    except STATE_ERRORS:
         return None
+    return state
 
 
 def _format_context_message(plan_data: dict | None, fallback_state: dict | None) -> str:
@@ -86,12 +70,11 @@ def run_post_compact_restore() -> int:
 
     Returns exit code: 0 (output to stdout visible in context).
     """
-    hook_data = read_hook_stdin()
-    session_id = hook_data.get("session_id", os.environ.get("PILOT_SESSION_ID", "default"))
+    read_hook_stdin()
 
     plan_data = _read_active_plan()
 
-    fallback_state = _read_fallback_state(session_id)
+    fallback_state = _read_fallback_state()
 
     message = _format_context_message(plan_data, fallback_state)
     print(message)
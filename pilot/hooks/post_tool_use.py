@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""PostToolUse dispatcher - runs file checks, TDD reminder, test results and context monitor together.
+
+Reads the hook event once, builds a shared HookContext, fans the applicable
+checks out on a thread pool and merges their decisions and stderr into a
+single hook response. Wall time is the slowest check rather than the sum.
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import sys
+import threading
+import traceback
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TextIO
+
+sys.path.insert(0, str(Path(__file__).parent))
+from _snapshot import FileSnapshot
+from _util import _sessions_base, find_git_root, read_hook_stdin
+from affected_tests import affected_tests_enabled, check_affected_tests
+from context_monitor import run_context_monitor
+from file_checker import LANGUAGES, check_file
+from tdd_enforcer import check_tdd
+
+EDIT_TOOLS = ("Write", "Edit", "MultiEdit")
+CONTEXT_TOOLS = ("Read", "Write", "Edit", "MultiEdit", "Bash", "Task", "Skill", "Grep", "Glob")
+
+
+@dataclass(frozen=True)
+class HookContext:
+    """Shared, read-only view of one PostToolUse event."""
+
+    event: dict
+    tool_name: str
+    tool_input: dict
+    file_path: Path | None
+    git_root: Path | None
+    session_dir: Path
+    file_snapshot: FileSnapshot | None
+
+
+@dataclass
+class CheckResult:
+    """Outcome of one check: exit code, block reason and captured stderr.
+
+    applied is False when the check had nothing to do for this event.
+    """
+
+    name: str
+    exit_code: int
+    reason: str
+    stderr: str
+    applied: bool = True
+
+
+class _ThreadLocalStream(io.TextIOBase):
+    """Text stream that routes writes to a per-thread buffer when one is active."""
+
+    def __init__(self, fallback: TextIO) -> None:
+        self._fallback = fallback
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self._fallback).write(text)
+
+    def flush(self) -> None:
+        buffer = getattr(self._local, "buffer", None)
+        (buffer or self._fallback).flush()
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        """Capture everything the current thread writes to this stream."""
+        buffer = io.StringIO()
+        self._local.buffer = buffer
+        try:
+            yield buffer
+        finally:
+            self._local.buffer = None
+
+
+def build_context(event: dict) -> HookContext:
+    """Resolve everything the checks share, once per event."""
+    tool_input = event.get("tool_input", {})
+    if not isinstance(tool_input, dict):
+        tool_input = {}
+    file_path_str = tool_input.get("file_path", "")
+    file_path = Path(file_path_str) if file_path_str else None
+    tool_name = event.get("tool_name", "")
+
+    # Only the file checker reads the snapshot, so skip the disk read for
+    # Read events and for file types it does not check.
+    checked = file_path is not None and tool_name in EDIT_TOOLS and file_path.suffix in LANGUAGES
+    file_snapshot = FileSnapshot.load(file_path) if checked else None
+
+    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
+    return HookContext(
+        event=event,
+        tool_name=tool_name,
+        tool_input=tool_input,
+        file_path=file_path,
+        git_root=find_git_root(),
+        session_dir=_sessions_base() / session_id,
+        file_snapshot=file_snapshot,
+    )
+
+
+def _run_file_checker(ctx: HookContext) -> tuple[int, str] | None:
+    if ctx.file_path is None or ctx.file_snapshot is None:
+        return None
+    return check_file(ctx.file_path, ctx.tool_input, ctx.file_snapshot)
+
+
+def _run_tdd_enforcer(ctx: HookContext) -> tuple[int, str] | None:
+    return check_tdd(ctx.event), ""
+
+
+def _run_affected_tests(ctx: HookContext) -> tuple[int, str] | None:
+    return check_affected_tests(ctx.tool_name, ctx.file_path, ctx.tool_input)
+
+
+def _run_context_monitor(_ctx: HookContext) -> tuple[int, str] | None:
+    return run_context_monitor(), ""
+
+
+Check = Callable[[HookContext], tuple[int, str] | None]
+
+
+def select_checks(ctx: HookContext) -> list[tuple[str, Check]]:
+    """Pick the checks that apply to this tool, in reporting order."""
+    checks: list[tuple[str, Check]] = []
+    if ctx.tool_name in EDIT_TOOLS:
+        checks.append(("file_checker", _run_file_checker))
+        checks.append(("tdd_enforcer", _run_tdd_enforcer))
+    if ctx.tool_name in CONTEXT_TOOLS:
+        if affected_tests_enabled():
+            checks.append(("affected_tests", _run_affected_tests))
+        checks.append(("context_monitor", _run_context_monitor))
+    return checks
+
+
+def _run_check(name: str, check: Check, ctx: HookContext, stream: _ThreadLocalStream) -> CheckResult:
+    with stream.capture() as buffer:
+        try:
+            result = check(ctx)
+        except Exception:
+            traceback.print_exc(file=buffer)
+            result = (1, "")
+    if result is None:
+        return CheckResult(name, 0, "", buffer.getvalue(), applied=False)
+    exit_code, reason = result
+    return CheckResult(name, exit_code, reason, buffer.getvalue())
+
+
+def run_checks(ctx: HookContext, checks: list[tuple[str, Check]]) -> list[CheckResult]:
+    """Run checks concurrently, returning results in the order they were given."""
+    if not checks:
+        return []
+
+    stream = _ThreadLocalStream(sys.stderr)
+    saved_stderr = sys.stderr
+    sys.stderr = stream
+    try:
+        with ThreadPoolExecutor(max_workers=len(checks)) as pool:
+            futures = [pool.submit(_run_check, name, check, ctx, stream) for name, check in checks]
+            return [future.result() for future in futures]
+    finally:
+        sys.stderr = saved_stderr
+
+
+def merge_results(results: list[CheckResult]) -> tuple[int, dict | None, str]:
+    """Merge check results into (exit_code, decision JSON or None, stderr)."""
+    exit_code = max((result.exit_code for result in results), default=0)
+    reasons = [result.reason for result in results if result.reason]
+    stderr = "".join(result.stderr for result in results)
+
+    decision: dict | None = None
+    if reasons:
+        decision = {"decision": "block", "reason": "; ".join(reasons)}
+    elif any(result.name == "file_checker" and result.applied for result in results):
+        decision = {}
+    return exit_code, decision, stderr
+
+
+def run_post_tool_use() -> int:
+    """Run all PostToolUse checks for one event and return exit code."""
+    event = read_hook_stdin()
+    if not event:
+        return 0
+
+    ctx = build_context(event)
+    if ctx.git_root:
+        os.chdir(ctx.git_root)
+
+    exit_code, decision, stderr = merge_results(run_checks(ctx, select_checks(ctx)))
+    if stderr:
+        sys.stderr.write(stderr)
+    if decision is not None:
+        print(json.dumps(decision))
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(run_post_tool_use())
@@ -2,6 +2,8 @@
 
 Fires before Claude Code compaction to preserve Pilot-specific session state
 (active plan, task list, context) to Pilot Memory for post-compaction restoration.
+The same state is kept in the session state store, where post_compact_restore
+picks it up.
 """
 
 from __future__ import annotations
@@ -14,32 +16,21 @@ from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
 
-from _util import (
-    get_session_plan_path,
-    read_hook_stdin,
-)
+from _session_state import STATE_ERRORS, SessionState, update_state
+from _util import read_hook_stdin
 
 
-def _sessions_base() -> Path:
-    """Get base sessions directory."""
-    return Path.home() / ".pilot" / "sessions"
-
-
-def _capture_active_plan() -> dict | None:
+def _capture_active_plan(session: SessionState) -> dict | None:
     """Capture active plan state from session data."""
-    plan_path = get_session_plan_path()
-    if not plan_path.exists():
+    plan_data = session.active_plan
+    if not plan_data:
         return None
 
-    try:
-        plan_data = json.loads(plan_path.read_text())
-        return {
-            "plan_path": plan_data.get("plan_path"),
-            "status": plan_data.get("status"),
-            "current_task": plan_data.get("current_task"),
-        }
-    except (json.JSONDecodeError, OSError):
-        return None
+    return {
+        "plan_path": plan_data.get("plan_path"),
+        "status": plan_data.get("status"),
+        "current_task": plan_data.get("current_task"),
+    }
 
 
 def _capture_task_list() -> dict | None:
@@ -113,13 +104,14 @@ def _save_to_worker_api(state: dict, session_id: str) -> bool:
         return False
 
 
-def _save_fallback_file(state: dict, session_id: str) -> None:
-    """Save state to local fallback file."""
-    session_dir = _sessions_base() / session_id
-    session_dir.mkdir(parents=True, exist_ok=True)
-
-    fallback_file = session_dir / "pre-compact-state.json"
-    fallback_file.write_text(json.dumps(state, indent=2))
+def _save_session_state(state: dict) -> None:
+    """Fill in the active plan and keep state in the session state store, in one transaction."""
+    try:
+        with update_state() as session:
+            state["active_plan"] = _capture_active_plan(session)
+            session.pre_compact = state
+    except STATE_ERRORS as e:
+        print(f"Warning: session state save failed: {e}", file=sys.stderr)
 
 
 def run_pre_compact() -> int:
@@ -135,18 +127,16 @@ def run_pre_compact() -> int:
     state = {
         "trigger": trigger,
         "custom_instructions": custom_instructions,
-        "active_plan": _capture_active_plan(),
+        "active_plan": None,
         "task_list": _capture_task_list(),
     }
+    _save_session_state(state)
 
     saved_to_api = _save_to_worker_api(state, session_id)
-    if not saved_to_api:
-        _save_fallback_file(state, session_id)
-
     if saved_to_api:
         print("🔄 Compaction in progress — Pilot state captured to memory", file=sys.stderr)
     else:
-        print("🔄 Compaction in progress — Pilot state captured to local file (worker unavailable)", file=sys.stderr)
+        print("🔄 Compaction in progress — Pilot state captured to session state (worker unavailable)", file=sys.stderr)
 
     return 2
 
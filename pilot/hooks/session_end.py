@@ -13,6 +13,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+from _session_state import load_state
 from _util import _sessions_base
 from notify import send_notification
 
@@ -40,18 +41,8 @@ def _get_active_session_count() -> int:
 def _is_plan_verified() -> bool:
     """Check if active plan has VERIFIED status."""
     session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    session_dir = _sessions_base() / session_id
-    plan_file = session_dir / "active_plan.json"
-
-    if not plan_file.exists():
-        return False
-
-    try:
-        data = json.loads(plan_file.read_text())
-        status = data.get("status", "").upper()
-        return status == "VERIFIED"
-    except (json.JSONDecodeError, OSError):
-        return False
+    active_plan = load_state(_sessions_base() / session_id).active_plan
+    return str(active_plan.get("status", "")).upper() == "VERIFIED"
 
 
 def main() -> int:
@@ -18,32 +18,16 @@ import time
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
-from _util import CYAN, NC, RED, YELLOW, _sessions_base, get_session_plan_path, is_waiting_for_user_input
+from _session_state import STATE_ERRORS, get_session_dir, load_state, update_state
+from _util import CYAN, NC, RED, YELLOW, is_waiting_for_user_input
 from notify import send_notification
 
 COOLDOWN_SECONDS = 60
 
 
-def get_stop_guard_path() -> Path:
-    """Get session-scoped stop guard state path."""
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    guard_dir = _sessions_base() / session_id
-    guard_dir.mkdir(parents=True, exist_ok=True)
-    return guard_dir / "spec-stop-guard"
-
-
-def find_active_plan() -> tuple[Path | None, str | None, bool]:
-    """Find the active plan for THIS session via session-scoped active_plan.json."""
-    plan_json = get_session_plan_path()
-    if not plan_json.exists():
-        return None, None, False
-
-    try:
-        data = json.loads(plan_json.read_text())
-        plan_path_str = data.get("plan_path", "")
-    except (json.JSONDecodeError, OSError):
-        return None, None, False
-
+def find_active_plan(active_plan: dict) -> tuple[Path | None, str | None, bool]:
+    """Find the active plan for THIS session from the session's registered plan."""
+    plan_path_str = active_plan.get("plan_path", "")
     if not plan_path_str:
         return None, None, False
 
@@ -90,7 +74,8 @@ def main() -> int:
     if input_data.get("stop_hook_active", False):
         return 0
 
-    plan_path, status, approved = find_active_plan()
+    session_dir = get_session_dir()
+    plan_path, status, approved = find_active_plan(load_state(session_dir).active_plan)
     if plan_path is None or status is None:
         return 0
 
@@ -100,21 +85,16 @@ def main() -> int:
         return 0
 
     now = time.time()
-    state_file = get_stop_guard_path()
-    if state_file.exists():
-        try:
-            last_block = float(state_file.read_text().strip())
-            if now - last_block < COOLDOWN_SECONDS:
-                state_file.unlink(missing_ok=True)
-                send_notification("Pilot", "Waiting for your input")
-                return 0
-        except (ValueError, OSError):
-            pass
-
+    escape = False
     try:
-        state_file.write_text(str(now))
-    except OSError:
+        with update_state(session_dir) as state:
+            escape = state.stop_guard is not None and now - state.stop_guard < COOLDOWN_SECONDS
+            state.stop_guard = None if escape else now
+    except STATE_ERRORS:
         pass
+    if escape:
+        send_notification("Pilot", "Waiting for your input")
+        return 0
 
     next_phase = get_next_phase(status, approved)
 
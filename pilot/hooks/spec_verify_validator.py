@@ -10,6 +10,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+from _session_state import load_state
 from _util import NC, RED, is_waiting_for_user_input
 
 
@@ -24,15 +25,10 @@ def main() -> int:
     transcript_path = input_data.get("transcript_path", "")
     if transcript_path and is_waiting_for_user_input(transcript_path):
         return 0
-    session_id = os.environ.get("PILOT_SESSION_ID", "").strip() or "default"
-    plan_json = Path.home() / ".pilot" / "sessions" / session_id / "active_plan.json"
-    if not plan_json.exists():
+    plan_path_str = load_state().active_plan.get("plan_path", "")
+    if not plan_path_str:
         return 0
     try:
-        data = json.loads(plan_json.read_text())
-        plan_path_str = data.get("plan_path", "")
-        if not plan_path_str:
-            return 0
         plan_file = Path(plan_path_str)
         if not plan_file.is_absolute():
             plan_file = Path(os.environ.get("CLAUDE_PROJECT_ROOT", str(Path.cwd()))) / plan_file
@@ -40,7 +36,7 @@ def main() -> int:
             return 0
         status_match = re.search(r"^Status:\s*(\w+)", plan_file.read_text(), re.MULTILINE)
         status = status_match.group(1).upper() if status_match else None
-    except (json.JSONDecodeError, OSError):
+    except OSError:
         return 0
     if status == "COMPLETE":
         print(
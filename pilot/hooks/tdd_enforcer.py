@@ -14,6 +14,7 @@ import sys
 from pathlib import Path
 
 sys.path.insert(0, str(Path(__file__).parent))
+from _tdd_index import get_index, index_enabled, is_test_name, record_test_file
 from _util import NC, YELLOW
 
 EXCLUDED_EXTENSIONS = [
@@ -76,55 +77,20 @@ def should_skip(file_path: str) -> bool:
 
 def is_test_file(file_path: str) -> bool:
     """Check if file is a test file."""
-    path = Path(file_path)
-    name = path.name
-
-    if name.endswith(".py"):
-        stem = path.stem
-        if stem.startswith("test_") or stem.endswith("_test"):
-            return True
+    return is_test_name(Path(file_path).name)
 
-    if name.endswith((".test.ts", ".spec.ts", ".test.tsx", ".spec.tsx")):
-        return True
 
-    if name.endswith("_test.go"):
-        return True
+def has_related_failing_test(impl_file: str) -> bool:
+    """Check if a test specifically for this module is currently failing.
 
-    return False
-
-
-def has_related_failing_test(project_dir: str, impl_file: str) -> bool:
-    """Check if there's a failing test specifically for this module.
-
-    Looks for test files matching the implementation file name in the
-    pytest lastfailed cache. Only returns True if there's a failing test
-    that appears to be for the module being edited.
+    Reads pytest's lastfailed cache, vitest/jest JSON reports and `go test
+    -json` output (see _failing_tests). Python and TypeScript tests count when
+    their file is named after the module; Go tests count for every file of
+    their package.
     """
-    cache_file = Path(project_dir) / ".pytest_cache" / "v" / "cache" / "lastfailed"
-
-    if not cache_file.exists():
-        return False
+    from _failing_tests import failing_tests
 
-    impl_path = Path(impl_file)
-    module_name = impl_path.stem
-
-    try:
-        with cache_file.open() as f:
-            lastfailed = json.load(f)
-
-        if not lastfailed:
-            return False
-
-        for test_path in lastfailed:
-            test_file = test_path.split("::")[0]
-            test_name = Path(test_file).stem
-
-            if test_name == f"test_{module_name}" or test_name == f"{module_name}_test":
-                return True
-
-        return False
-    except (json.JSONDecodeError, OSError):
-        return False
+    return bool(failing_tests(Path(impl_file), conventional_test_names(impl_file)))
 
 
 def _find_test_dirs(start: Path) -> list[Path]:
@@ -144,6 +110,8 @@ def _find_test_dirs(start: Path) -> list[Path]:
 
 def _search_test_dirs(test_dirs: list[Path], base_name: str, extensions: list[str]) -> bool:
     """Search test directories for files matching base_name with any of the given extensions."""
+    if index_enabled():
+        return any(get_index(test_dir).has(f"{base_name}{ext}") for test_dir in test_dirs for ext in extensions)
     patterns = [f"**/{base_name}{ext}" for ext in extensions]
     for test_dir in test_dirs:
         for pattern in patterns:
@@ -154,6 +122,8 @@ def _search_test_dirs(test_dirs: list[Path], base_name: str, extensions: list[st
 
 def _search_test_dirs_prefix(test_dirs: list[Path], prefix: str, extensions: list[str]) -> bool:
     """Search test directories for files whose name starts with prefix (e.g. 'vault' matches 'vault-view.test.ts')."""
+    if index_enabled():
+        return any(get_index(test_dir).has_prefix(prefix, ext) for test_dir in test_dirs for ext in extensions)
     for test_dir in test_dirs:
         for ext in extensions:
             if list(test_dir.glob(f"**/{prefix}{ext}")) or list(test_dir.glob(f"**/{prefix}-*{ext}")):
@@ -232,6 +202,53 @@ def has_go_test_file(impl_path: str) -> bool:
     return _search_test_dirs(test_dirs, base_name, ["_test.go"])
 
 
+def has_importing_test(impl_path: str) -> bool:
+    """Check if a test file imports the module, directly or through other modules."""
+    from _import_graph import related_tests
+
+    return bool(related_tests(Path(impl_path)))
+
+
+def has_covering_test(impl_path: str, tool_name: str, tool_input: dict) -> bool:
+    """Check if the coverage index knows a test that executes the lines an Edit replaced.
+
+    A Write replaces the whole file, so no recorded coverage speaks for it.
+    """
+    from _coverage_index import tests_covering_edit
+
+    return tool_name == "Edit" and bool(tests_covering_edit(Path(impl_path), tool_input))
+
+
+def conventional_test_names(impl_path: str) -> list[str]:
+    """Conventional test file names for an implementation file."""
+    path = Path(impl_path)
+    if path.suffix == ".py":
+        return [f"test_{path.stem}.py", f"{path.stem}_test.py"]
+    if path.suffix == ".go":
+        return [f"{path.stem}_test.go"]
+    if path.suffix in (".ts", ".tsx"):
+        extensions = (
+            [".test.ts", ".spec.ts"] if path.suffix == ".ts" else [".test.tsx", ".spec.tsx", ".test.ts", ".spec.ts"]
+        )
+        names = dict.fromkeys([path.stem, _pascal_to_kebab(path.stem)])
+        return [f"{name}{ext}" for name in names for ext in extensions]
+    return []
+
+
+def related_test_files(impl_path: str) -> list[Path]:
+    """Test files for an implementation file: by name (sibling or in test dirs) and by import."""
+    from _import_graph import related_tests
+
+    path = Path(impl_path).absolute()
+    names = conventional_test_names(impl_path)
+    found = {path.parent / name for name in names if (path.parent / name).exists()}
+    for test_dir in _find_test_dirs(path.parent):
+        for name in names:
+            found.update(get_index(test_dir).find(name) if index_enabled() else test_dir.glob(f"**/{name}"))
+    found.update(related_tests(path) or [])
+    return sorted(found)
+
+
 def _is_import_line(line: str) -> bool:
     """Check if a line is part of an import statement."""
     if line.startswith(("import ", "from ")):
@@ -296,6 +313,11 @@ def run_tdd_enforcer() -> int:
     except (json.JSONDecodeError, OSError):
         return 0
 
+    return check_tdd(hook_data)
+
+
+def check_tdd(hook_data: dict) -> int:
+    """Run TDD enforcement for an already-parsed PostToolUse event and return exit code."""
     tool_name = hook_data.get("tool_name", "")
     if tool_name not in ("Write", "Edit"):
         return 0
@@ -309,27 +331,25 @@ def run_tdd_enforcer() -> int:
         return 0
 
     if is_test_file(file_path):
+        if tool_name == "Write" and index_enabled():
+            record_test_file(Path(file_path), _find_test_dirs(Path(file_path).parent))
+        from _import_graph import record_file
+
+        record_file(Path(file_path))
         return 0
 
     if is_trivial_edit(tool_name, tool_input):
         return 0
 
-    if file_path.endswith(".py"):
-        path = Path(file_path).parent
-        found_failing = False
-
-        for _ in range(10):
-            if has_related_failing_test(str(path), file_path):
-                found_failing = True
-                break
-            if path.parent == path:
-                break
-            path = path.parent
-
-        if found_failing:
-            return 0
+    if has_related_failing_test(file_path):
+        return 0
 
-        if has_python_test_file(file_path):
+    if file_path.endswith(".py"):
+        if (
+            has_python_test_file(file_path)
+            or has_covering_test(file_path, tool_name, tool_input)
+            or has_importing_test(file_path)
+        ):
             return 0
 
         module_name = Path(file_path).stem
@@ -339,7 +359,11 @@ def run_tdd_enforcer() -> int:
         )
 
     if file_path.endswith((".ts", ".tsx")):
-        if has_typescript_test_file(file_path):
+        if (
+            has_typescript_test_file(file_path)
+            or has_covering_test(file_path, tool_name, tool_input)
+            or has_importing_test(file_path)
+        ):
             return 0
 
         base_name = Path(file_path).stem
@@ -349,7 +373,11 @@ def run_tdd_enforcer() -> int:
         )
 
     if file_path.endswith(".go"):
-        if has_go_test_file(file_path):
+        if (
+            has_go_test_file(file_path)
+            or has_covering_test(file_path, tool_name, tool_input)
+            or has_importing_test(file_path)
+        ):
             return 0
 
         base_name = Path(file_path).stem
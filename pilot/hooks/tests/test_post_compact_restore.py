@@ -10,55 +10,51 @@ from pathlib import Path
 from unittest.mock import patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from _session_state import SessionState, load_state
 
 
 class TestPostCompactRestoreHook:
     """Test SessionStart(compact) hook context restoration."""
 
     @patch("post_compact_restore.read_hook_stdin")
-    @patch("post_compact_restore.get_session_plan_path")
+    @patch("post_compact_restore.load_state")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_restores_active_plan_context(
-        self, mock_plan_path, mock_stdin, capsys
+        self, mock_load_state, mock_stdin, capsys
     ):
         """Should restore active plan context with structured message."""
         from post_compact_restore import run_post_compact_restore
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            plan_json = Path(tmpdir) / "active_plan.json"
-            plan_json.write_text(
-                json.dumps(
-                    {
-                        "status": "PENDING",
-                        "plan_path": "docs/plans/2026-02-16-test.md",
-                        "current_task": 3,
-                    }
-                )
-            )
-            mock_plan_path.return_value = plan_json
+        mock_load_state.return_value = SessionState(
+            active_plan={
+                "status": "PENDING",
+                "plan_path": "docs/plans/2026-02-16-test.md",
+                "current_task": 3,
+            }
+        )
 
-            mock_stdin.return_value = {"session_id": "test123"}
+        mock_stdin.return_value = {"session_id": "test123"}
 
-            result = run_post_compact_restore()
+        result = run_post_compact_restore()
 
-            assert result == 0
+        assert result == 0
 
-            captured = capsys.readouterr()
-            assert "[Pilot Context Restored After Compaction]" in captured.out
-            assert "Active Plan:" in captured.out
-            assert "2026-02-16-test.md" in captured.out
-            assert "PENDING" in captured.out
+        captured = capsys.readouterr()
+        assert "[Pilot Context Restored After Compaction]" in captured.out
+        assert "Active Plan:" in captured.out
+        assert "2026-02-16-test.md" in captured.out
+        assert "PENDING" in captured.out
 
     @patch("post_compact_restore.read_hook_stdin")
-    @patch("post_compact_restore.get_session_plan_path")
+    @patch("post_compact_restore.load_state")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_handles_no_active_plan(
-        self, mock_plan_path, mock_stdin, capsys
+        self, mock_load_state, mock_stdin, capsys
     ):
         """Should handle case where no active plan exists."""
         from post_compact_restore import run_post_compact_restore
 
-        mock_plan_path.return_value = Path("/nonexistent")
+        mock_load_state.return_value = SessionState()
         mock_stdin.return_value = {"session_id": "test123"}
 
         result = run_post_compact_restore()
@@ -70,11 +66,11 @@ class TestPostCompactRestoreHook:
         assert "No active plan" in captured.out or "Active Plan:" not in captured.out
 
     @patch("post_compact_restore.read_hook_stdin")
-    @patch("post_compact_restore.get_session_plan_path")
-    @patch("post_compact_restore._sessions_base")
+    @patch("post_compact_restore.load_state")
+    @patch("_session_state._sessions_base")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_includes_fallback_state_if_available(
-        self, mock_sessions_base, mock_plan_path, mock_stdin, capsys
+        self, mock_sessions_base, mock_load_state, mock_stdin, capsys
     ):
         """Should include pre-compact fallback state if available."""
         from post_compact_restore import run_post_compact_restore
@@ -98,7 +94,7 @@ class TestPostCompactRestoreHook:
                 )
             )
 
-            mock_plan_path.return_value = Path("/nonexistent")
+            mock_load_state.return_value = SessionState()
             mock_stdin.return_value = {"session_id": "test123"}
 
             result = run_post_compact_restore()
@@ -106,20 +102,21 @@ class TestPostCompactRestoreHook:
             assert result == 0
 
             captured = capsys.readouterr()
-            assert "2026-02-16-test.md" in captured.out or "Restored" in captured.out
+            assert "2026-02-16-test.md" in captured.out
+            assert load_state(session_dir).pre_compact is None
 
     @patch("post_compact_restore.read_hook_stdin")
-    @patch("post_compact_restore.get_session_plan_path")
+    @patch("post_compact_restore.load_state")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123", "CLAUDE_CODE_TASK_LIST_ID": "test-tasks"})
     def test_fast_execution(
-        self, mock_plan_path, mock_stdin
+        self, mock_load_state, mock_stdin
     ):
         """Should complete in under 2 seconds."""
         import time
 
         from post_compact_restore import run_post_compact_restore
 
-        mock_plan_path.return_value = Path("/nonexistent")
+        mock_load_state.return_value = SessionState()
         mock_stdin.return_value = {"session_id": "test123"}
 
         start = time.time()
@@ -5,11 +5,19 @@ from __future__ import annotations
 import json
 import os
 import sys
-import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
+
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from _session_state import load_state, update_state
+
+
+@pytest.fixture
+def sessions_dir(tmp_path):
+    with patch("_session_state._sessions_base", return_value=tmp_path):
+        yield tmp_path
 
 
 class TestPreCompactHook:
@@ -17,98 +25,96 @@ class TestPreCompactHook:
 
     @patch("pre_compact.urllib.request.urlopen")
     @patch("pre_compact.read_hook_stdin")
-    @patch("pre_compact.get_session_plan_path")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_captures_active_plan_state(
-        self, mock_plan_path, mock_stdin, mock_urlopen, capsys
+        self, mock_stdin, mock_urlopen, sessions_dir, capsys
     ):
         """Should capture active plan state from session data."""
         from pre_compact import run_pre_compact
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            plan_json = Path(tmpdir) / "active_plan.json"
-            plan_json.write_text(
-                json.dumps(
-                    {
-                        "status": "PENDING",
-                        "plan_path": "docs/plans/2026-02-16-test.md",
-                        "current_task": 3,
-                    }
-                )
-            )
-            mock_plan_path.return_value = plan_json
-
-            mock_stdin.return_value = {
-                "session_id": "test123",
-                "trigger": "auto",
-                "custom_instructions": "",
+        with update_state(sessions_dir / "test123") as session:
+            session.active_plan = {
+                "status": "PENDING",
+                "plan_path": "docs/plans/2026-02-16-test.md",
+                "current_task": 3,
             }
 
-            mock_response = MagicMock()
-            mock_response.status = 200
-            mock_urlopen.return_value = mock_response
+        mock_stdin.return_value = {
+            "session_id": "test123",
+            "trigger": "auto",
+            "custom_instructions": "",
+        }
+
+        mock_response = MagicMock()
+        mock_response.status = 200
+        mock_urlopen.return_value = mock_response
 
-            result = run_pre_compact()
+        result = run_pre_compact()
 
-            assert mock_urlopen.called
-            call_args = mock_urlopen.call_args
-            req = call_args[0][0]
-            payload = json.loads(req.data.decode())
-            assert "PENDING" in payload["text"]
-            assert "2026-02-16-test.md" in payload["text"]
+        assert mock_urlopen.called
+        call_args = mock_urlopen.call_args
+        req = call_args[0][0]
+        payload = json.loads(req.data.decode())
+        assert "PENDING" in payload["text"]
+        assert "2026-02-16-test.md" in payload["text"]
 
-            assert result == 2
-            captured = capsys.readouterr()
-            assert "Compaction in progress" in captured.err
+        assert result == 2
+        captured = capsys.readouterr()
+        assert "Compaction in progress" in captured.err
 
     @patch("pre_compact.urllib.request.urlopen")
     @patch("pre_compact.read_hook_stdin")
-    @patch("pre_compact.get_session_plan_path")
-    @patch("pre_compact._sessions_base")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
-    def test_fallback_to_local_file_on_http_failure(
-        self, mock_sessions_base, mock_plan_path, mock_stdin, mock_urlopen, capsys
+    def test_fallback_to_session_state_on_http_failure(
+        self, mock_stdin, mock_urlopen, sessions_dir, capsys
     ):
-        """Should write to local file if HTTP API fails."""
+        """Should write to the session state if HTTP API fails."""
         from pre_compact import run_pre_compact
 
-        with tempfile.TemporaryDirectory() as tmpdir:
-            sessions_dir = Path(tmpdir)
-            mock_sessions_base.return_value = sessions_dir
+        mock_stdin.return_value = {
+            "session_id": "test123",
+            "trigger": "manual",
+            "custom_instructions": "compress heavily",
+        }
 
-            mock_plan_path.return_value = Path(tmpdir) / "nonexistent.json"
+        mock_urlopen.side_effect = Exception("Connection refused")
 
-            mock_stdin.return_value = {
-                "session_id": "test123",
-                "trigger": "manual",
-                "custom_instructions": "compress heavily",
-            }
+        result = run_pre_compact()
+
+        state = load_state(sessions_dir / "test123").pre_compact
+        assert state is not None
+        assert state["trigger"] == "manual"
 
-            mock_urlopen.side_effect = Exception("Connection refused")
+        assert result == 2
+        captured = capsys.readouterr()
+        assert "session state" in captured.err
 
-            result = run_pre_compact()
+    @patch("pre_compact.urllib.request.urlopen")
+    @patch("pre_compact.read_hook_stdin")
+    @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
+    def test_reads_plan_and_saves_state_in_one_transaction(
+        self, mock_stdin, mock_urlopen, sessions_dir
+    ):
+        """Should open the session state store once."""
+        import pre_compact
 
-            fallback_file = sessions_dir / "test123" / "pre-compact-state.json"
-            assert fallback_file.exists()
+        mock_stdin.return_value = {"session_id": "test123", "trigger": "auto"}
+        mock_urlopen.side_effect = Exception("Connection refused")
 
-            state = json.loads(fallback_file.read_text())
-            assert state["trigger"] == "manual"
+        with patch.object(pre_compact, "update_state", wraps=update_state) as mock_update:
+            pre_compact.run_pre_compact()
 
-            assert result == 2
-            captured = capsys.readouterr()
-            assert "local file" in captured.err
+        mock_update.assert_called_once_with()
 
     @patch("pre_compact.urllib.request.urlopen")
     @patch("pre_compact.read_hook_stdin")
-    @patch("pre_compact.get_session_plan_path")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_captures_trigger_type(
-        self, mock_plan_path, mock_stdin, mock_urlopen, capsys
+        self, mock_stdin, mock_urlopen, sessions_dir, capsys
     ):
         """Should capture whether compaction was manual or auto."""
         from pre_compact import run_pre_compact
 
-        mock_plan_path.return_value = Path("/nonexistent")
         mock_stdin.return_value = {
             "session_id": "test123",
             "trigger": "manual",
@@ -129,15 +135,13 @@ class TestPreCompactHook:
 
     @patch("pre_compact.urllib.request.urlopen")
     @patch("pre_compact.read_hook_stdin")
-    @patch("pre_compact.get_session_plan_path")
     @patch("os.environ", {"PILOT_SESSION_ID": "test123"})
     def test_handles_no_active_plan(
-        self, mock_plan_path, mock_stdin, mock_urlopen
+        self, mock_stdin, mock_urlopen, sessions_dir
     ):
         """Should handle case where no active plan exists."""
         from pre_compact import run_pre_compact
 
-        mock_plan_path.return_value = Path("/nonexistent")
         mock_stdin.return_value = {
             "session_id": "test123",
             "trigger": "auto",
@@ -3,12 +3,14 @@
 from __future__ import annotations
 
 import json
+import shutil
 import sys
 import tempfile
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
+from _session_state import load_state, update_state
 from spec_stop_guard import main
 
 
@@ -35,22 +37,22 @@ class TestSpecStopGuardNotifications:
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.is_waiting_for_user_input")
     @patch("spec_stop_guard.send_notification")
-    @patch("spec_stop_guard.get_stop_guard_path")
+    @patch("spec_stop_guard.get_session_dir")
     @patch("spec_stop_guard.time.time")
     @patch("sys.stdin")
     def test_notifies_when_cooldown_allows_stop(
-        self, mock_stdin, mock_time, mock_guard_path, mock_notify, mock_waiting, mock_find_plan
+        self, mock_stdin, mock_time, mock_session_dir, mock_notify, mock_waiting, mock_find_plan
     ):
         """Should send notification when stop allowed due to cooldown escape hatch."""
         mock_find_plan.return_value = (Path("/plan.md"), "PENDING", True)
         mock_waiting.return_value = False
         mock_time.return_value = 100.0
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".state") as f:
-            f.write("50.0")
-            state_path = Path(f.name)
+        session_dir = Path(tempfile.mkdtemp())
+        with update_state(session_dir) as state:
+            state.stop_guard = 50.0
 
-        mock_guard_path.return_value = state_path
+        mock_session_dir.return_value = session_dir
         mock_stdin.read.return_value = json.dumps(
             {"transcript_path": "/transcript.jsonl", "stop_hook_active": False}
         )
@@ -60,8 +62,9 @@ class TestSpecStopGuardNotifications:
 
             assert result == 0
             mock_notify.assert_called_once_with("Pilot", "Waiting for your input")
+            assert load_state(session_dir).stop_guard is None
         finally:
-            state_path.unlink(missing_ok=True)
+            shutil.rmtree(session_dir)
 
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.send_notification")
@@ -81,22 +84,22 @@ class TestSpecStopGuardNotifications:
     @patch("spec_stop_guard.find_active_plan")
     @patch("spec_stop_guard.is_waiting_for_user_input")
     @patch("spec_stop_guard.send_notification")
-    @patch("spec_stop_guard.get_stop_guard_path")
+    @patch("spec_stop_guard.get_session_dir")
     @patch("spec_stop_guard.time.time")
     @patch("sys.stdin")
     def test_no_notification_when_stop_blocked(
-        self, mock_stdin, mock_time, mock_guard_path, mock_notify, mock_waiting, mock_find_plan
+        self, mock_stdin, mock_time, mock_session_dir, mock_notify, mock_waiting, mock_find_plan
     ):
         """Should NOT send notification when stop is blocked."""
         mock_find_plan.return_value = (Path("/plan.md"), "PENDING", True)
         mock_waiting.return_value = False
         mock_time.return_value = 200.0
 
-        with tempfile.NamedTemporaryFile(mode="w", delete=False, suffix=".state") as f:
-            f.write("100.0")
-            state_path = Path(f.name)
+        session_dir = Path(tempfile.mkdtemp())
+        with update_state(session_dir) as state:
+            state.stop_guard = 100.0
 
-        mock_guard_path.return_value = state_path
+        mock_session_dir.return_value = session_dir
         mock_stdin.read.return_value = json.dumps(
             {"transcript_path": "/transcript.jsonl", "stop_hook_active": False}
         )
@@ -106,5 +109,6 @@ class TestSpecStopGuardNotifications:
 
             assert result == 2
             mock_notify.assert_not_called()
+            assert load_state(session_dir).stop_guard == 200.0
         finally:
-            state_path.unlink(missing_ok=True)
+            shutil.rmtree(session_dir)
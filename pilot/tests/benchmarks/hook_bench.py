@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""Hook latency benchmark - measures what each hooks.json entry adds to a tool call.
+
+Every Python hook in pilot/hooks/hooks.json is spawned exactly as Claude Code
+spawns it (shell command, JSON on stdin) inside a throwaway git project, with
+representative payloads for each event and tool. For every hook it reports:
+
+- cold start: daemon disabled, every call pays interpreter start and imports
+- warm start: calls forwarded to an already-running hook daemon
+- p50/p95/p99 wall time, peak RSS of the spawned process
+- cumulative import time of the hook module (python -X importtime)
+
+Budgets are checked as ratios: each run also times a bare `python3 -c pass`
+spawn on the same machine, and the baseline's time and memory budgets are
+scaled by how that reference compares to the one recorded with the baseline.
+A baseline written on a laptop therefore gates a slower CI runner fairly.
+
+Usage:
+    python pilot/tests/benchmarks/hook_bench.py                   # report
+    python pilot/tests/benchmarks/hook_bench.py --json            # machine-readable report
+    python pilot/tests/benchmarks/hook_bench.py --check           # exit 1 on budget regressions
+    python pilot/tests/benchmarks/hook_bench.py --write-baseline  # record baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import os
+import re
+import shlex
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+PLUGIN_ROOT = Path(__file__).resolve().parents[2]
+HOOKS_DIR = PLUGIN_ROOT / "hooks"
+HOOKS_JSON = HOOKS_DIR / "hooks.json"
+BASELINE_PATH = Path(__file__).parent / "baseline.json"
+
+SKIPPED_EVENTS = {"SessionEnd"}
+BENCH_SESSION_ID = "hook-bench"
+METRICS = ("cold_p95_ms", "warm_p95_ms", "peak_rss_mb", "import_ms")
+ABSOLUTE_SLACK = {"cold_p95_ms": 15.0, "warm_p95_ms": 10.0, "peak_rss_mb": 4.0, "import_ms": 10.0}
+DEFAULT_TOLERANCE_PCT = 30.0
+REFERENCE_COMMAND = "python3 -c pass"
+
+TOOL_PAYLOAD_TOOLS = {
+    "PreToolUse": ("Bash", "Grep", "WebSearch", "Task"),
+    "PostToolUse": ("Write", "Edit", "Read", "Bash", "Grep"),
+}
+
+
+@dataclass
+class HookCommand:
+    """One Python hook command from hooks.json."""
+
+    event: str
+    matcher: str
+    command: str
+    hook_name: str
+
+
+@dataclass
+class HookResult:
+    """Measurements for one hook/payload combination."""
+
+    hook_id: str
+    cold_ms: list[float] = field(default_factory=list)
+    warm_ms: list[float] = field(default_factory=list)
+    peak_rss_mb: float = 0.0
+    import_ms: float | None = None
+
+    def summary(self) -> dict:
+        """Summarize raw samples into the reported metrics."""
+        return {
+            "cold_p50_ms": percentile(self.cold_ms, 50),
+            "cold_p95_ms": percentile(self.cold_ms, 95),
+            "cold_p99_ms": percentile(self.cold_ms, 99),
+            "warm_p50_ms": percentile(self.warm_ms, 50),
+            "warm_p95_ms": percentile(self.warm_ms, 95),
+            "warm_p99_ms": percentile(self.warm_ms, 99),
+            "peak_rss_mb": round(self.peak_rss_mb, 1),
+            "import_ms": self.import_ms,
+        }
+
+
+def percentile(samples: list[float], pct: float) -> float | None:
+    """Nearest-rank percentile, rounded to 0.1 ms."""
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return round(ordered[rank - 1], 1)
+
+
+def _hook_name(command: str) -> str:
+    """Derive the hook name from a hooks.json command line."""
+    parts = shlex.split(command.replace("${CLAUDE_PLUGIN_ROOT}", str(PLUGIN_ROOT)))
+    for index, part in enumerate(parts):
+        if part.endswith("hook_client.py") and index + 1 < len(parts):
+            return parts[index + 1]
+        if part.endswith(".py"):
+            return Path(part).stem
+    return parts[-1] if parts else command
+
+
+def load_hook_commands(hooks_json: Path = HOOKS_JSON) -> list[HookCommand]:
+    """Collect every Python hook command from hooks.json."""
+    config = json.loads(hooks_json.read_text())
+    commands: list[HookCommand] = []
+    for event, groups in config.get("hooks", {}).items():
+        for group in groups:
+            for hook in group.get("hooks", []):
+                command = hook.get("command", "")
+                if hook.get("type") != "command" or ".py" not in command:
+                    continue
+                commands.append(HookCommand(event, group.get("matcher", ""), command, _hook_name(command)))
+    return commands
+
+
+def matcher_matches(matcher: str, tool_name: str) -> bool:
+    """Apply a hooks.json matcher the way Claude Code does (regex, '*' or empty = all)."""
+    if matcher in ("", "*"):
+        return True
+    return re.fullmatch(matcher, tool_name) is not None
+
+
+def build_sandbox(root: Path) -> dict[str, Path]:
+    """Create a throwaway git project, home and transcript for the hooks to act on."""
+    project = root / "project"
+    src = project / "src"
+    src.mkdir(parents=True)
+    (root / "home").mkdir()
+    (root / "tmp").mkdir()
+    subprocess.run(["git", "init", "-q", str(project)], check=False, capture_output=True)
+
+    app = src / "app.py"
+    functions = [f"def handler_{i}(value: int) -> int:\n    return value + {i}\n\n\n" for i in range(60)]
+    app.write_text('"""Benchmark module."""\n\n\n' + "".join(functions).rstrip() + "\n")
+
+    transcript = root / "transcript.jsonl"
+    messages = [{"type": "user", "message": {"content": "hi"}}] * 200
+    messages.append({"type": "assistant", "message": {"content": [{"type": "text", "text": "done"}]}})
+    transcript.write_text("\n".join(json.dumps(m) for m in messages) + "\n")
+    return {"root": root, "project": project, "app": app, "transcript": transcript}
+
+
+def build_payloads(hook: HookCommand, sandbox: dict[str, Path]) -> dict[str, dict]:
+    """Representative stdin payloads for a hook, keyed by payload name."""
+    app = str(sandbox["app"])
+    tool_inputs = {
+        "Write": {"file_path": app, "content": sandbox["app"].read_text()},
+        "Edit": {"file_path": app, "old_string": "return value + 1\n", "new_string": "return value + 1\n"},
+        "Read": {"file_path": app},
+        "Bash": {"command": "ls"},
+        "Grep": {"pattern": "handler_", "path": str(sandbox["project"])},
+        "WebSearch": {"query": "python packaging"},
+        "Task": {"subagent_type": "general-purpose", "prompt": "x"},
+    }
+    base = {
+        "session_id": BENCH_SESSION_ID,
+        "transcript_path": str(sandbox["transcript"]),
+        "cwd": str(sandbox["project"]),
+    }
+
+    if hook.event in TOOL_PAYLOAD_TOOLS:
+        payloads = {}
+        for tool in TOOL_PAYLOAD_TOOLS[hook.event]:
+            if matcher_matches(hook.matcher, tool):
+                payloads[tool] = {
+                    **base,
+                    "hook_event_name": hook.event,
+                    "tool_name": tool,
+                    "tool_input": tool_inputs[tool],
+                }
+        return payloads
+    if hook.event == "Stop":
+        return {"Stop": {**base, "hook_event_name": "Stop", "stop_hook_active": False}}
+    if hook.event == "PreCompact":
+        return {"PreCompact": {**base, "hook_event_name": "PreCompact", "trigger": "auto", "custom_instructions": ""}}
+    if hook.event == "SessionStart":
+        return {"compact": {**base, "hook_event_name": "SessionStart", "source": "compact"}}
+    return {hook.event: {**base, "hook_event_name": hook.event}}
+
+
+def _bench_env(sandbox: dict[str, Path], daemon: bool) -> dict[str, str]:
+    env = dict(os.environ)
+    env.update(
+        {
+            "HOME": str(sandbox["root"] / "home"),
+            "TMPDIR": str(sandbox["root"] / "tmp"),
+            "PILOT_SESSION_ID": BENCH_SESSION_ID,
+            "CLAUDE_PLUGIN_ROOT": str(PLUGIN_ROOT),
+            "CLAUDE_PROJECT_ROOT": str(sandbox["project"]),
+            "PILOT_HOOK_DAEMON": "1" if daemon else "0",
+            "PILOT_HOOK_DAEMON_IDLE": "60",
+            "PILOT_LINT_COALESCE": "0",
+            "PILOT_TS_SERVER": "0",
+        }
+    )
+    return env
+
+
+def spawn_once(command: str, payload: dict, env: dict[str, str], cwd: Path) -> tuple[float, float]:
+    """Spawn a hook command once. Returns (wall_ms, peak_rss_mb)."""
+    start = time.perf_counter()
+    proc = subprocess.Popen(
+        command,
+        shell=True,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        cwd=cwd,
+        env=env,
+    )
+    assert proc.stdin is not None
+    try:
+        proc.stdin.write(json.dumps(payload).encode())
+        proc.stdin.close()
+    except BrokenPipeError:
+        pass
+    _, status, rusage = os.wait4(proc.pid, 0)
+    wall_ms = (time.perf_counter() - start) * 1000
+    proc.returncode = os.waitstatus_to_exitcode(status)
+
+    rss_divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return wall_ms, rusage.ru_maxrss / rss_divisor
+
+
+def daemon_socket_path(sandbox: dict[str, Path]) -> Path:
+    """Socket path the bench session's daemon listens on."""
+    return sandbox["root"] / "tmp" / f"pilot-{os.getuid()}" / f"hooks-{BENCH_SESSION_ID}.sock"
+
+
+def stop_daemon(socket_path: Path) -> None:
+    """Ask the bench daemon to exit by presenting a mismatching fingerprint."""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(2)
+            sock.connect(str(socket_path))
+            sock.sendall(json.dumps({"fingerprint": ""}).encode())
+            sock.shutdown(socket.SHUT_WR)
+            sock.recv(1024)
+    except OSError:
+        pass
+
+
+def _wait_for(path: Path, timeout: float = 10.0) -> bool:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if path.exists():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def measure_import_ms(module: str, runs: int = 3) -> float | None:
+    """Best-of-N cumulative import time of a hook module, in milliseconds."""
+    if not (HOOKS_DIR / f"{module}.py").exists():
+        return None
+    env = {**os.environ, "PYTHONPATH": str(HOOKS_DIR)}
+    best: float | None = None
+    for _ in range(runs + 1):
+        result = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+            capture_output=True,
+            text=True,
+            cwd=HOOKS_DIR,
+            env=env,
+            check=False,
+        )
+        for line in result.stderr.splitlines():
+            parts = [part.strip() for part in line.removeprefix("import time:").split("|")]
+            if len(parts) == 3 and parts[2] == module and parts[1].isdigit():
+                value = int(parts[1]) / 1000
+                best = value if best is None else min(best, value)
+    return round(best, 1) if best is not None else None
+
+
+def measure_reference(iterations: int) -> dict:
+    """Bare interpreter start on this machine, the yardstick budgets are scaled by."""
+    samples = []
+    with tempfile.TemporaryDirectory(prefix="pilot-hook-bench-") as tmp:
+        spawn_once(REFERENCE_COMMAND, {}, dict(os.environ), Path(tmp))
+        for _ in range(iterations):
+            samples.append(spawn_once(REFERENCE_COMMAND, {}, dict(os.environ), Path(tmp)))
+    return {
+        "spawn_ms": percentile([wall_ms for wall_ms, _ in samples], 50),
+        "rss_mb": round(max(rss_mb for _, rss_mb in samples), 1),
+    }
+
+
+def reference_scales(recorded: dict | None, current: dict | None) -> dict[str, float]:
+    """Per-metric factor from the baseline machine to this one (1.0 when unknown)."""
+    scales = dict.fromkeys(METRICS, 1.0)
+    if not recorded or not current:
+        return scales
+    if recorded.get("spawn_ms") and current.get("spawn_ms"):
+        for metric in ("cold_p95_ms", "warm_p95_ms", "import_ms"):
+            scales[metric] = current["spawn_ms"] / recorded["spawn_ms"]
+    if recorded.get("rss_mb") and current.get("rss_mb"):
+        scales["peak_rss_mb"] = current["rss_mb"] / recorded["rss_mb"]
+    return scales
+
+
+def run_benchmarks(
+    iterations: int, warm_iterations: int, only: str | None = None, hook_ids: set[str] | None = None
+) -> dict[str, HookResult]:
+    """Benchmark every Python hook in hooks.json (or only those in hook_ids)."""
+    results: dict[str, HookResult] = {}
+    import_cache: dict[str, float | None] = {}
+
+    with tempfile.TemporaryDirectory(prefix="pilot-hook-bench-") as tmp:
+        sandbox = build_sandbox(Path(tmp))
+        cold_env = _bench_env(sandbox, daemon=False)
+        warm_env = _bench_env(sandbox, daemon=True)
+        socket_path = daemon_socket_path(sandbox)
+
+        try:
+            for hook in load_hook_commands():
+                if hook.event in SKIPPED_EVENTS:
+                    continue
+                for payload_name, payload in build_payloads(hook, sandbox).items():
+                    hook_id = f"{hook.event}:{hook.hook_name}:{payload_name}"
+                    if (only and only not in hook_id) or (hook_ids is not None and hook_id not in hook_ids):
+                        continue
+                    result = HookResult(hook_id)
+
+                    spawn_once(hook.command, payload, cold_env, sandbox["project"])
+                    for _ in range(iterations):
+                        wall_ms, rss_mb = spawn_once(hook.command, payload, cold_env, sandbox["project"])
+                        result.cold_ms.append(wall_ms)
+                        result.peak_rss_mb = max(result.peak_rss_mb, rss_mb)
+
+                    spawn_once(hook.command, payload, warm_env, sandbox["project"])
+                    if _wait_for(socket_path):
+                        spawn_once(hook.command, payload, warm_env, sandbox["project"])
+                        for _ in range(warm_iterations):
+                            wall_ms, _ = spawn_once(hook.command, payload, warm_env, sandbox["project"])
+                            result.warm_ms.append(wall_ms)
+
+                    if hook.hook_name not in import_cache:
+                        import_cache[hook.hook_name] = measure_import_ms(hook.hook_name)
+                    result.import_ms = import_cache[hook.hook_name]
+                    results[hook_id] = result
+        finally:
+            stop_daemon(socket_path)
+
+    return results
+
+
+def compare_to_baseline(summaries: dict[str, dict], baseline: dict, reference: dict | None = None) -> list[str]:
+    """List budget violations of the current run against a baseline.
+
+    reference is this machine's measure_reference(); budgets are scaled by it
+    relative to the reference stored in the baseline.
+    """
+    tolerance = float(baseline.get("tolerance_pct", DEFAULT_TOLERANCE_PCT)) / 100
+    scales = reference_scales(baseline.get("reference"), reference)
+    violations = []
+    for hook_id, budget in baseline.get("hooks", {}).items():
+        current = summaries.get(hook_id)
+        if current is None:
+            continue
+        for metric in METRICS:
+            allowed = budget.get(metric)
+            measured = current.get(metric)
+            if allowed is None or measured is None:
+                continue
+            scaled = allowed * scales[metric]
+            limit = max(scaled * (1 + tolerance), scaled + ABSOLUTE_SLACK[metric] * scales[metric])
+            if measured > limit:
+                violations.append(
+                    f"{hook_id}: {metric} {measured} > budget {round(limit, 1)} "
+                    f"(baseline {allowed}, machine scale {scales[metric]:.2f})"
+                )
+    return violations
+
+
+def format_table(summaries: dict[str, dict]) -> str:
+    """Render summaries as a fixed-width text table."""
+    columns = ["cold_p50_ms", "cold_p95_ms", "cold_p99_ms", "warm_p50_ms", "warm_p95_ms", "warm_p99_ms"]
+    columns += ["peak_rss_mb", "import_ms"]
+    width = max([len("hook")] + [len(hook_id) for hook_id in summaries])
+    header = "hook".ljust(width) + "".join(col.rjust(13) for col in columns)
+    lines = [header, "-" * len(header)]
+    for hook_id, summary in summaries.items():
+        cells = ["-" if summary[col] is None else str(summary[col]) for col in columns]
+        lines.append(hook_id.ljust(width) + "".join(cell.rjust(13) for cell in cells))
+    return "\n".join(lines)
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the hook benchmark suite."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--iterations", type=int, default=20, help="Cold-start samples per hook")
+    parser.add_argument("--warm-iterations", type=int, default=20, help="Warm-start samples per hook")
+    parser.add_argument("--only", help="Only run hooks whose id contains this string")
+    parser.add_argument("--json", dest="json_output", action="store_true")
+    parser.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    parser.add_argument("--check", action="store_true", help="Exit 1 if any hook exceeds its budget")
+    parser.add_argument("--write-baseline", action="store_true", help="Record this run as the new baseline")
+    args = parser.parse_args(argv)
+
+    reference = measure_reference(args.iterations)
+    results = run_benchmarks(args.iterations, args.warm_iterations, args.only)
+    summaries = {hook_id: result.summary() for hook_id, result in results.items()}
+
+    if args.json_output:
+        raw = {k: asdict(v) for k, v in results.items()}
+        print(json.dumps({"reference": reference, "hooks": summaries, "raw": raw}, indent=2))
+    else:
+        print(format_table(summaries))
+        print(f"\nreference ({REFERENCE_COMMAND}): {reference['spawn_ms']} ms p50, {reference['rss_mb']} MB")
+
+    if args.write_baseline:
+        existing = json.loads(args.baseline.read_text()) if args.baseline.exists() else {}
+        baseline = {
+            "tolerance_pct": existing.get("tolerance_pct", DEFAULT_TOLERANCE_PCT),
+            "reference": reference,
+            "hooks": {
+                hook_id: {metric: summary[metric] for metric in METRICS if summary[metric] is not None}
+                for hook_id, summary in summaries.items()
+            },
+        }
+        args.baseline.write_text(json.dumps(baseline, indent=2) + "\n")
+        print(f"\nBaseline written to {args.baseline}", file=sys.stderr)
+
+    if args.check:
+        if not args.baseline.exists():
+            print(f"No baseline at {args.baseline}", file=sys.stderr)
+            return 1
+        baseline = json.loads(args.baseline.read_text())
+        violations = compare_to_baseline(summaries, baseline, reference)
+        if violations:
+            # One slow sample on a shared runner is not a regression: measure
+            # the hooks over budget again and keep only the repeat offenders.
+            over = {
+                hook_id
+                for hook_id, summary in summaries.items()
+                if compare_to_baseline({hook_id: summary}, baseline, reference)
+            }
+            retry = run_benchmarks(args.iterations, args.warm_iterations, hook_ids=over)
+            retried = {hook_id: result.summary() for hook_id, result in retry.items()}
+            violations = compare_to_baseline(retried, baseline, reference)
+        if violations:
+            print("\nHook latency budget exceeded:", file=sys.stderr)
+            for violation in violations:
+                print(f"  {violation}", file=sys.stderr)
+            return 1
+        print(f"\nAll {len(summaries)} hooks within budget", file=sys.stderr)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""History tail benchmark - reverse block reads vs readlines() on history.jsonl.
+
+Generates a synthetic ~/.claude/history.jsonl of the requested size (records
+shaped like Claude Code's: display text, project, sessionId, timestamp) and
+times reading its last record both ways:
+
+- readlines: read every line of the file and parse the last one, as the
+  statusline and check-context used to
+- tail: launcher.jsonl_tail.last_record, which reads one block from the end
+
+Each is timed with a warm page cache, reporting the mean latency and the peak
+Python memory allocated while reading (tracemalloc).
+
+Usage:
+    python pilot/tests/benchmarks/jsonl_tail_bench.py                # 500 MB
+    python pilot/tests/benchmarks/jsonl_tail_bench.py --size-mb 50   # custom size
+    python pilot/tests/benchmarks/jsonl_tail_bench.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[3]
+sys.path.insert(0, str(REPO_ROOT))
+
+from launcher.jsonl_tail import last_record  # noqa: E402
+
+CHUNK_RECORDS = 10_000
+
+
+def generate_history(path: Path, size_mb: float) -> int:
+    """Write about size_mb megabytes of history records to path. Returns the record count."""
+    target = int(size_mb * 1024 * 1024)
+    written = 0
+    records = 0
+    with path.open("w") as f:
+        while written < target:
+            chunk = "".join(
+                json.dumps(
+                    {
+                        "display": f"refactor the parser for case {n} " + "and keep the tests green " * (n % 7),
+                        "pastedContents": {},
+                        "timestamp": 1_700_000_000_000 + n,
+                        "project": "/home/dev/projects/app",
+                        "sessionId": f"session-{n // 500:06d}",
+                    }
+                )
+                + "\n"
+                for n in range(records, records + CHUNK_RECORDS)
+            )
+            f.write(chunk)
+            written += len(chunk)
+            records += CHUNK_RECORDS
+    return records
+
+
+def read_with_readlines(path: Path) -> dict:
+    with path.open() as f:
+        lines = f.readlines()
+    return json.loads(lines[-1])
+
+
+def measure(read, path: Path, repeat: int) -> tuple[float, float, dict]:
+    """Mean milliseconds per read, peak traced memory in MB, and the record read."""
+    record = read(path)
+    start = time.perf_counter()
+    for _ in range(repeat):
+        read(path)
+    mean_ms = (time.perf_counter() - start) * 1000 / repeat
+
+    tracemalloc.start()
+    try:
+        read(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return mean_ms, peak / (1024 * 1024), record
+
+
+def run_benchmarks(size_mb: float, repeat: int = 3, tail_repeat: int = 1000) -> dict:
+    """Time both readers on a synthetic history file of size_mb megabytes."""
+    with tempfile.TemporaryDirectory() as tmp:
+        history = Path(tmp) / "history.jsonl"
+        records = generate_history(history, size_mb)
+        file_mb = history.stat().st_size / (1024 * 1024)
+        tail_ms, tail_mb, tail_record = measure(last_record, history, tail_repeat)
+        readlines_ms, readlines_mb, readlines_record = measure(read_with_readlines, history, repeat)
+
+    assert tail_record == readlines_record, "tail reader and readlines disagree on the last record"
+    return {
+        "file_mb": round(file_mb, 1),
+        "records": records,
+        "readlines_ms": round(readlines_ms, 2),
+        "readlines_peak_mb": round(readlines_mb, 1),
+        "tail_ms": round(tail_ms, 4),
+        "tail_peak_mb": round(tail_mb, 3),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the history tail benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--size-mb", type=float, default=500, help="Size of the generated history file")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed readlines() reads")
+    parser.add_argument("--json", dest="json_output", action="store_true")
+    args = parser.parse_args(argv)
+
+    row = run_benchmarks(args.size_mb, args.repeat)
+    if args.json_output:
+        print(json.dumps(row, indent=2))
+        return 0
+
+    print(f"history.jsonl: {row['file_mb']} MB, {row['records']} records")
+    print(f"{'readlines per read':<28}{row['readlines_ms']:>12} ms {row['readlines_peak_mb']:>10} MB peak")
+    print(f"{'tail per read':<28}{row['tail_ms']:>12} ms {row['tail_peak_mb']:>10} MB peak")
+    speedup = row["readlines_ms"] / row["tail_ms"] if row["tail_ms"] else float("inf")
+    print(f"{'speedup':<28}{speedup:>11.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""Comment stripping benchmark - streaming lexer vs the per-line regex stripper.
+
+Generates TypeScript and Go sources of the requested size in two shapes:
+handwritten code with a dense mix of strings, template literals, block comments
+and // comments, and generated code (long runs of data lines under a single
+header comment). Times the streaming lexer (_checkers.comments) against the
+per-line regex approach it replaced.
+
+For Python it times a full-file tokenizer pass against stripping only the
+lines an Edit wrote (the PostToolUse tool_input). Only in-memory work is
+timed; file I/O is identical for both.
+
+Usage:
+    python pilot/tests/benchmarks/strip_bench.py                # 10k and 50k lines
+    python pilot/tests/benchmarks/strip_bench.py --lines 20000  # custom size
+    python pilot/tests/benchmarks/strip_bench.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import re
+import sys
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+from _checkers.comments import strip_line_comments  # noqa: E402
+from _checkers.go import GO_PRESERVE_RE  # noqa: E402
+from _checkers.python import _strip_comments  # noqa: E402
+from _checkers.typescript import TS_PRESERVE_RE  # noqa: E402
+
+TS_BLOCK = """\
+// Section {i}
+export function handler{i}(req: Request): Response {{
+  const url = "https://example.com/api/{i}"; // endpoint
+  const label = `item-${{req.id}}-{i}`;
+  /* block comment {i} */
+  if (req.count > {i}) {{
+    return respond(url, label); // early exit
+  }}
+  // eslint-disable-next-line no-console
+  console.log(label);
+  return respond(url, label);
+}}
+
+"""
+
+GO_BLOCK = """\
+// Handler{i} handles request {i}.
+func Handler{i}(w http.ResponseWriter, r *http.Request) {{
+\turl := "https://example.com/api/{i}" // endpoint
+\tsep := '/'
+\t/* block comment {i} */
+\tif r.ContentLength > {i} {{
+\t\treturn // early exit
+\t}}
+\tfmt.Fprintf(w, "%s%c", url, sep) //nolint:errcheck
+}}
+
+"""
+
+PY_BLOCK = """\
+class Handler{i}:
+    \"\"\"Handle request {i}.\"\"\"
+
+    def run(self, request):  # entry point
+        url = "https://example.com/api/{i}#anchor"
+        if request.count > {i}:
+            return respond(url)  # noqa: E501
+        return respond(url, retries=3)
+
+"""
+PY_EDIT = {"old_string": "retries=3)", "new_string": "retries=3)  # edited"}
+
+GENERATED_TS_LINE = '  {{ id: {i}, name: "field_{i}", type: {t}, repeated: false, offset: 0x{i:04x} }},\n'
+GENERATED_GO_LINE = '\t{{ID: {i}, Name: "field_{i}", Type: {t}, Offset: 0x{i:04x}}},\n'
+GENERATED_HEADER = "// Code generated by protoc-gen. DO NOT EDIT.\n"
+
+
+def generate_source(block: str, lines: int) -> str:
+    """Repeat block until the source has at least lines lines."""
+    per_block = block.count("\n")
+    return "".join(block.format(i=i) for i in range(lines // per_block + 1))
+
+
+def generate_data(line: str, lines: int) -> str:
+    """A generated file: one header comment followed by lines data lines."""
+    return GENERATED_HEADER + "".join(line.format(i=i, t=i % 7) for i in range(lines))
+
+
+def legacy_strip(content: str, preserve: re.Pattern[str]) -> tuple[str, bool]:
+    """The per-line regex stripper the lexer replaced."""
+    new_lines = []
+    modified = False
+    for line in content.splitlines(keepends=True):
+        if "//" not in line or '"//' in line or "'//" in line or "`//" in line or "://" in line:
+            new_lines.append(line)
+            continue
+        match = re.search(r"//.*$", line)
+        if not match or preserve.search(match.group(0)):
+            new_lines.append(line)
+            continue
+        before_comment = line[: match.start()].rstrip()
+        modified = True
+        if before_comment:
+            new_lines.append(before_comment + "\n")
+    return "".join(new_lines), modified
+
+
+def best_of(func, repeat: int) -> float:
+    """Fastest of repeat runs in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def run_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Time both strippers for each language and size."""
+    rows = []
+    languages = (
+        ("typescript", TS_BLOCK, GENERATED_TS_LINE, TS_PRESERVE_RE),
+        ("go", GO_BLOCK, GENERATED_GO_LINE, GO_PRESERVE_RE),
+    )
+    for language, block, data_line, preserve in languages:
+        for lines in sizes:
+            for shape, source in (
+                ("handwritten", generate_source(block, lines)),
+                ("generated", generate_data(data_line, lines)),
+            ):
+                rows.append(
+                    {
+                        "language": language,
+                        "shape": shape,
+                        "lines": source.count("\n"),
+                        "lexer_ms": round(best_of(lambda: strip_line_comments(source, preserve, language), repeat), 2),
+                        "regex_ms": round(best_of(lambda: legacy_strip(source, preserve), repeat), 2),
+                    }
+                )
+    return rows
+
+
+def run_python_benchmarks(sizes: list[int], repeat: int) -> list[dict]:
+    """Time full-file and edit-scoped Python comment stripping."""
+    rows = []
+    for lines in sizes:
+        source = generate_source(PY_BLOCK, lines)
+        middle = source.find("retries=3)", len(source) // 2)
+        edited = source[:middle] + PY_EDIT["new_string"] + source[middle + len(PY_EDIT["old_string"]) :]
+        rows.append(
+            {
+                "lines": edited.count("\n"),
+                "full_ms": round(best_of(lambda: _strip_comments(edited), repeat), 2),
+                "edit_ms": round(best_of(lambda: _strip_comments(edited, PY_EDIT), repeat), 2),
+            }
+        )
+    return rows
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the comment stripping benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, action="append", help="Source size in lines (repeatable)")
+    parser.add_argument("--repeat", type=int, default=5, help="Runs per measurement; the fastest is reported")
+    parser.add_argument("--json", dest="json_output", action="store_true")
+    args = parser.parse_args(argv)
+
+    sizes = args.lines or [10_000, 50_000]
+    rows = run_benchmarks(sizes, args.repeat)
+    python_rows = run_python_benchmarks(sizes, args.repeat)
+    if args.json_output:
+        print(json.dumps({"lexer": rows, "python": python_rows}, indent=2))
+        return 0
+
+    print(f"{'language':<12}{'shape':<13}{'lines':>8}{'lexer ms':>12}{'regex ms':>12}{'speedup':>10}")
+    for row in rows:
+        speedup = row["regex_ms"] / row["lexer_ms"] if row["lexer_ms"] else float("inf")
+        print(
+            f"{row['language']:<12}{row['shape']:<13}{row['lines']:>8}"
+            f"{row['lexer_ms']:>12}{row['regex_ms']:>12}{speedup:>9.1f}x"
+        )
+
+    print(f"\n{'python':<25}{'lines':>8}{'full ms':>12}{'edit ms':>12}{'speedup':>10}")
+    for row in python_rows:
+        speedup = row["full_ms"] / row["edit_ms"] if row["edit_ms"] else float("inf")
+        print(f"{'':<25}{row['lines']:>8}{row['full_ms']:>12}{row['edit_ms']:>12}{speedup:>9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""TDD enforcer lookup benchmark - test-file index vs recursive globbing.
+
+Generates a synthetic repository of the requested size: Python, TypeScript and
+Go sources under src/ spread over packages, and a tests/ tree holding a test
+for most of them plus fixtures and helpers that are not tests. Then times the
+test-file lookup the enforcer runs on every edit, for a sample of source files:
+
+- glob: PILOT_TEST_INDEX=0, every lookup globs the tests tree
+- build: the one-time walk that creates the index
+- cold: a new process, the index is loaded from the cache file and refreshed
+- warm: the index is already in memory (hook daemon, within the refresh TTL)
+
+Usage:
+    python pilot/tests/benchmarks/tdd_index_bench.py                # 50k files
+    python pilot/tests/benchmarks/tdd_index_bench.py --files 10000  # custom size
+    python pilot/tests/benchmarks/tdd_index_bench.py --json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+sys.path.insert(0, str(HOOKS_DIR))
+
+import _tdd_index  # noqa: E402
+from tdd_enforcer import has_go_test_file, has_python_test_file, has_typescript_test_file  # noqa: E402
+
+FILES_PER_PACKAGE = 50
+LOOKUPS = {".py": has_python_test_file, ".ts": has_typescript_test_file, ".go": has_go_test_file}
+TEST_NAMES = {".py": "test_{stem}.py", ".ts": "{stem}.test.ts", ".go": "{stem}_test.go"}
+
+
+def generate_repo(root: Path, files: int) -> list[Path]:
+    """Create about files files under root and return the source files."""
+    sources = []
+    extensions = list(LOOKUPS)
+    created = 0
+    package = 0
+    while created < files:
+        src_dir = root / "src" / f"pkg{package:04d}"
+        tests_dir = root / "tests" / f"pkg{package:04d}"
+        src_dir.mkdir(parents=True)
+        tests_dir.mkdir(parents=True)
+        for i in range(FILES_PER_PACKAGE // 2):
+            ext = extensions[i % len(extensions)]
+            stem = f"module{package:04d}_{i:02d}"
+            source = src_dir / f"{stem}{ext}"
+            source.touch()
+            sources.append(source)
+            if i % 5:
+                (tests_dir / TEST_NAMES[ext].format(stem=stem)).touch()
+            else:
+                (tests_dir / f"fixture_{stem}.json").touch()
+        created += FILES_PER_PACKAGE
+        package += 1
+    return sources
+
+
+def sample(sources: list[Path], count: int) -> list[Path]:
+    return random.Random(0).sample(sources, min(count, len(sources)))
+
+
+def time_lookups(paths: list[Path], before=None) -> tuple[float, int]:
+    """Mean milliseconds per lookup, and how many found a test."""
+    total = 0.0
+    found = 0
+    for path in paths:
+        if before:
+            before()
+        start = time.perf_counter()
+        found += LOOKUPS[path.suffix](str(path))
+        total += time.perf_counter() - start
+    return total * 1000 / len(paths), found
+
+
+def run_benchmarks(files: int, lookups: int) -> dict:
+    """Time every lookup strategy on a synthetic repository of files files."""
+    saved = {name: os.environ.get(name) for name in ("PILOT_CACHE_DIR", "PILOT_TEST_INDEX", "PILOT_TEST_INDEX_TTL")}
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp) / "repo"
+        sources = generate_repo(root, files)
+        paths = sample(sources, lookups)
+        os.environ["PILOT_CACHE_DIR"] = str(Path(tmp) / "cache")
+        try:
+            os.environ["PILOT_TEST_INDEX"] = "0"
+            glob_ms, glob_found = time_lookups(paths)
+
+            os.environ["PILOT_TEST_INDEX"] = "1"
+            os.environ["PILOT_TEST_INDEX_TTL"] = "0"
+            _tdd_index.clear_memory()
+            start = time.perf_counter()
+            _tdd_index.get_index(root / "tests")
+            build_ms = (time.perf_counter() - start) * 1000
+            cold_ms, cold_found = time_lookups(paths, before=_tdd_index.clear_memory)
+
+            os.environ["PILOT_TEST_INDEX_TTL"] = "3600"
+            warm_ms, warm_found = time_lookups(paths)
+        finally:
+            _tdd_index.clear_memory()
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+    assert glob_found == cold_found == warm_found, "index and glob lookups disagree"
+    return {
+        "files": len(sources) * 2,
+        "lookups": len(paths),
+        "found": glob_found,
+        "glob_ms": round(glob_ms, 3),
+        "build_ms": round(build_ms, 2),
+        "cold_ms": round(cold_ms, 3),
+        "warm_ms": round(warm_ms, 4),
+    }
+
+
+def main(argv: list[str] | None = None) -> int:
+    """Run the test-file lookup benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=50_000, help="Approximate repository size in files")
+    parser.add_argument("--lookups", type=int, default=30, help="Source files looked up per strategy")
+    parser.add_argument("--json", dest="json_output", action="store_true")
+    args = parser.parse_args(argv)
+
+    row = run_benchmarks(args.files, args.lookups)
+    if args.json_output:
+        print(json.dumps(row, indent=2))
+        return 0
+
+    print(f"{row['files']} files, {row['lookups']} lookups ({row['found']} with a test)")
+    print(f"{'glob per lookup':<28}{row['glob_ms']:>12} ms")
+    print(f"{'index build (once)':<28}{row['build_ms']:>12} ms")
+    print(f"{'index cold per lookup':<28}{row['cold_ms']:>12} ms")
+    print(f"{'index warm per lookup':<28}{row['warm_ms']:>12} ms")
+    speedup = row["glob_ms"] / row["warm_ms"] if row["warm_ms"] else float("inf")
+    print(f"{'warm speedup':<28}{speedup:>11.0f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,99 @@
+"""Tests for the hook latency benchmark helpers."""
+
+from __future__ import annotations
+
+from hook_bench import (
+    HookCommand,
+    build_payloads,
+    build_sandbox,
+    compare_to_baseline,
+    load_hook_commands,
+    matcher_matches,
+    percentile,
+    reference_scales,
+)
+
+
+class TestPercentile:
+    def test_nearest_rank(self):
+        samples = [float(i) for i in range(1, 101)]
+
+        assert percentile(samples, 50) == 50.0
+        assert percentile(samples, 95) == 95.0
+        assert percentile(samples, 99) == 99.0
+
+    def test_empty_samples(self):
+        assert percentile([], 95) is None
+
+
+class TestLoadHookCommands:
+    def test_finds_python_hooks_only(self):
+        commands = load_hook_commands()
+        names = {command.hook_name for command in commands}
+
+        assert "post_tool_use" in names
+        assert "tool_redirect" in names
+        assert all(".py" in command.command for command in commands)
+
+
+class TestPayloads:
+    def test_matcher_semantics(self):
+        assert matcher_matches("Write|Edit", "Edit") is True
+        assert matcher_matches("Write|Edit", "EditX") is False
+        assert matcher_matches("*", "Anything") is True
+
+    def test_payloads_follow_matcher(self, tmp_path):
+        sandbox = build_sandbox(tmp_path)
+        hook = HookCommand("PostToolUse", "Write|Edit", "cmd", "post_tool_use")
+
+        payloads = build_payloads(hook, sandbox)
+
+        assert set(payloads) == {"Write", "Edit"}
+        assert payloads["Edit"]["tool_input"]["file_path"] == str(sandbox["app"])
+
+
+class TestCompareToBaseline:
+    def test_flags_regression_beyond_tolerance(self):
+        baseline = {"tolerance_pct": 20, "hooks": {"h": {"cold_p95_ms": 100.0}}}
+
+        violations = compare_to_baseline({"h": {"cold_p95_ms": 150.0}}, baseline)
+
+        assert len(violations) == 1
+        assert "cold_p95_ms" in violations[0]
+
+    def test_within_tolerance_passes(self):
+        baseline = {"tolerance_pct": 20, "hooks": {"h": {"cold_p95_ms": 100.0}}}
+
+        assert compare_to_baseline({"h": {"cold_p95_ms": 115.0}}, baseline) == []
+
+    def test_absolute_slack_absorbs_noise_on_fast_hooks(self):
+        baseline = {"tolerance_pct": 10, "hooks": {"h": {"warm_p95_ms": 5.0}}}
+
+        assert compare_to_baseline({"h": {"warm_p95_ms": 12.0}}, baseline) == []
+
+    def test_unknown_hooks_are_ignored(self):
+        baseline = {"hooks": {"gone": {"cold_p95_ms": 1.0}}}
+
+        assert compare_to_baseline({"new": {"cold_p95_ms": 500.0}}, baseline) == []
+
+    def test_budgets_scale_with_the_reference_machine(self):
+        baseline = {
+            "tolerance_pct": 20,
+            "reference": {"spawn_ms": 20.0, "rss_mb": 10.0},
+            "hooks": {"h": {"cold_p95_ms": 100.0, "peak_rss_mb": 20.0}},
+        }
+        slower = {"spawn_ms": 40.0, "rss_mb": 10.0}
+
+        assert compare_to_baseline({"h": {"cold_p95_ms": 230.0, "peak_rss_mb": 20.0}}, baseline, slower) == []
+        assert len(compare_to_baseline({"h": {"cold_p95_ms": 250.0}}, baseline, slower)) == 1
+
+
+class TestReferenceScales:
+    def test_unknown_reference_keeps_absolute_budgets(self):
+        assert set(reference_scales(None, {"spawn_ms": 30.0}).values()) == {1.0}
+
+    def test_time_and_memory_scale_separately(self):
+        scales = reference_scales({"spawn_ms": 20.0, "rss_mb": 10.0}, {"spawn_ms": 30.0, "rss_mb": 12.0})
+
+        assert scales["cold_p95_ms"] == scales["warm_p95_ms"] == scales["import_ms"] == 1.5
+        assert scales["peak_rss_mb"] == 1.2
@@ -0,0 +1,28 @@
+"""Tests for the history tail benchmark helpers."""
+
+from __future__ import annotations
+
+import json
+
+from jsonl_tail_bench import generate_history, run_benchmarks
+
+
+class TestCorpus:
+    def test_history_reaches_requested_size(self, tmp_path):
+        history = tmp_path / "history.jsonl"
+
+        records = generate_history(history, 1)
+
+        assert history.stat().st_size >= 1024 * 1024
+        lines = history.read_text().splitlines()
+        assert len(lines) == records
+        assert json.loads(lines[-1])["sessionId"]
+
+
+class TestRunBenchmarks:
+    def test_readers_agree(self):
+        row = run_benchmarks(2, repeat=1, tail_repeat=10)
+
+        assert row["file_mb"] >= 2
+        assert row["tail_peak_mb"] < row["readlines_peak_mb"]
+        assert all(row[key] >= 0 for key in ("readlines_ms", "tail_ms"))
@@ -0,0 +1,38 @@
+"""Tests for the comment stripping benchmark helpers."""
+
+from __future__ import annotations
+
+from strip_bench import (
+    GENERATED_TS_LINE,
+    TS_BLOCK,
+    generate_data,
+    generate_source,
+    run_benchmarks,
+    run_python_benchmarks,
+)
+
+
+class TestCorpus:
+    def test_sources_reach_requested_size(self):
+        assert generate_source(TS_BLOCK, 1000).count("\n") >= 1000
+        assert generate_data(GENERATED_TS_LINE, 1000).count("\n") == 1001
+
+
+class TestRunBenchmarks:
+    def test_reports_both_shapes_per_language(self):
+        rows = run_benchmarks([100], repeat=1)
+
+        assert {(row["language"], row["shape"]) for row in rows} == {
+            ("typescript", "handwritten"),
+            ("typescript", "generated"),
+            ("go", "handwritten"),
+            ("go", "generated"),
+        }
+        assert all(row["lexer_ms"] >= 0 and row["regex_ms"] >= 0 for row in rows)
+
+    def test_python_edit_scoped_rows(self):
+        rows = run_python_benchmarks([100], repeat=1)
+
+        assert len(rows) == 1
+        assert rows[0]["lines"] >= 100
+        assert rows[0]["edit_ms"] >= 0 and rows[0]["full_ms"] >= 0
@@ -0,0 +1,22 @@
+"""Tests for the TDD enforcer lookup benchmark helpers."""
+
+from __future__ import annotations
+
+from tdd_index_bench import generate_repo, run_benchmarks
+
+
+class TestCorpus:
+    def test_repo_reaches_requested_size(self, tmp_path):
+        sources = generate_repo(tmp_path, 200)
+
+        assert len(sources) == 100
+        assert sum(1 for path in (tmp_path / "tests").rglob("*") if path.is_file()) == 100
+
+
+class TestRunBenchmarks:
+    def test_index_agrees_with_glob(self):
+        row = run_benchmarks(500, lookups=10)
+
+        assert row["lookups"] == 10
+        assert 0 < row["found"] < 10
+        assert all(row[key] >= 0 for key in ("glob_ms", "build_ms", "cold_ms", "warm_ms"))
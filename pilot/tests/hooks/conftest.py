@@ -1,8 +1,49 @@
-"""Configure sys.path so _checkers and _util are importable in tests."""
+"""Configure sys.path so _checkers and _util are importable in tests, and isolate caches."""
 
 import sys
 from pathlib import Path
 
+import pytest
+
 _hooks_dir = str(Path(__file__).resolve().parents[2] / "hooks")
 if _hooks_dir not in sys.path:
     sys.path.insert(0, _hooks_dir)
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path_factory, monkeypatch):
+    """Keep the persistent diagnostics cache out of the real home directory."""
+    monkeypatch.setenv("PILOT_CACHE_DIR", str(tmp_path_factory.mktemp("pilot-cache")))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_sessions(tmp_path_factory, monkeypatch):
+    """Keep session-scoped state (toolchain cache, lint queue) out of the real home directory."""
+    monkeypatch.setenv("HOME", str(tmp_path_factory.mktemp("home")))
+
+
+@pytest.fixture(autouse=True)
+def _isolated_run_log(tmp_path_factory, monkeypatch):
+    """Keep checker run logs out of the real session directory."""
+    from _checkers import runner
+
+    log_path = tmp_path_factory.mktemp("pilot-session") / "checker-runs.jsonl"
+    monkeypatch.setattr(runner, "get_run_log_path", lambda: log_path)
+
+
+@pytest.fixture
+def synchronous_lint(monkeypatch):
+    """Check every edit synchronously, for tests that assert on one check's output."""
+    monkeypatch.setenv("PILOT_LINT_COALESCE", "0")
+
+
+@pytest.fixture
+def uncached_toolchain(monkeypatch):
+    """Resolve tools on every call, for tests that patch shutil.which."""
+    monkeypatch.setenv("PILOT_TOOLCHAIN_CACHE", "0")
+
+
+@pytest.fixture
+def no_import_graph(monkeypatch):
+    """Keep the TDD enforcer from building import graphs in the background."""
+    monkeypatch.setenv("PILOT_IMPORT_GRAPH", "0")
@@ -0,0 +1,214 @@
+"""Tests for the background affected-test runner."""
+
+from __future__ import annotations
+
+import subprocess
+import sys
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import affected_tests
+import pytest
+from affected_tests import (
+    check_affected_tests,
+    locked_state,
+    plan_run,
+    queue_tests,
+    report_results,
+    run_worker,
+    step,
+)
+
+
+@pytest.fixture
+def state_path(tmp_path, monkeypatch):
+    path = tmp_path / "session" / "affected-tests.json"
+    path.parent.mkdir()
+    monkeypatch.setattr(affected_tests, "get_state_path", lambda: path)
+    monkeypatch.setattr(affected_tests, "DEBOUNCE_S", 0.0)
+    monkeypatch.setenv("PILOT_AFFECTED_TESTS", "1")
+    return path
+
+
+def _write(path: Path, text: str = "") -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _job(module: str, code: str) -> dict:
+    return {
+        "module": module,
+        "language": "py",
+        "cwd": str(Path.cwd()),
+        "command": [sys.executable, "-c", code],
+        "tests": ["tests/test_x.py"],
+        "queued_at": 0.0,
+    }
+
+
+def _run_until_idle(state_path: Path, running: dict, limit_s: float = 10.0) -> dict:
+    deadline = time.monotonic() + limit_s
+    while time.monotonic() < deadline:
+        with locked_state(state_path) as state:
+            step(state, running, state_path)
+            if not running and not state["pending"]:
+                return state
+        time.sleep(0.05)
+    raise AssertionError("worker did not finish")
+
+
+class TestPlanRun:
+    """Each language maps an edit to the narrowest test command."""
+
+    def test_python_node_ids(self, tmp_path):
+        _write(tmp_path / "pyproject.toml")
+        impl = _write(tmp_path / "src" / "utils.py")
+        _write(tmp_path / "tests" / "unit" / "test_utils.py")
+
+        with patch("affected_tests.shutil.which", return_value="/usr/bin/pytest"):
+            job = plan_run(impl)
+
+        assert job["cwd"] == str(tmp_path)
+        assert job["command"] == ["/usr/bin/pytest", "-q", "--no-header", "tests/unit/test_utils.py"]
+
+    def test_python_without_tests(self, tmp_path):
+        _write(tmp_path / "pyproject.toml")
+        impl = _write(tmp_path / "src" / "utils.py")
+
+        with patch("affected_tests.shutil.which", return_value="/usr/bin/pytest"):
+            assert plan_run(impl) is None
+
+    def test_go_run_pattern(self, tmp_path):
+        _write(tmp_path / "go.mod", "module example.com/app\n")
+        impl = _write(tmp_path / "store" / "store.go", "package store\n")
+        _write(
+            tmp_path / "store" / "store_test.go",
+            "package store\n\nfunc TestGet(t *testing.T) {}\nfunc TestPut(t *testing.T) {}\nfunc helper() {}\n",
+        )
+
+        with patch("affected_tests.shutil.which", return_value="/usr/bin/go"):
+            job = plan_run(impl)
+
+        assert job["command"] == ["/usr/bin/go", "test", "-run", "^(TestGet|TestPut)$", "./store"]
+
+    def test_typescript_vitest_related(self, tmp_path):
+        _write(tmp_path / "package.json", "{}")
+        _write(tmp_path / "node_modules" / ".bin" / "vitest")
+        impl = _write(tmp_path / "src" / "format.ts")
+
+        job = plan_run(impl)
+
+        assert job["command"][1:] == ["related", "--run", "--passWithNoTests", "src/format.ts"]
+
+
+class TestWorker:
+    """Runs are limited, superseded runs are cancelled, results are recorded."""
+
+    def test_records_pass_and_failure(self, state_path):
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('1 passed')")
+            state["pending"]["/b.py"] = _job("/b.py", "print('1 failed'); raise SystemExit(1)")
+
+        state = _run_until_idle(state_path, {})
+
+        assert state["results"]["/a.py"]["status"] == "passed"
+        assert state["results"]["/b.py"]["status"] == "failed"
+        assert state["results"]["/b.py"]["summary"] == "1 failed"
+
+    def test_worker_exits_when_queue_is_empty(self, state_path):
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('1 passed')")
+
+        assert run_worker(state_path) == 0
+        with locked_state(state_path) as state:
+            assert state["results"]["/a.py"]["status"] == "passed"
+            assert state["running"] == {}
+
+    def test_concurrency_limit(self, state_path, monkeypatch):
+        monkeypatch.setattr(affected_tests, "MAX_CONCURRENT", 1)
+        running: dict = {}
+        with locked_state(state_path) as state:
+            for name in ("/a.py", "/b.py"):
+                state["pending"][name] = _job(name, "import time; time.sleep(0.2)")
+            step(state, running, state_path)
+
+        assert len(running) == 1
+        assert len(state["pending"]) == 1
+        _run_until_idle(state_path, running)
+
+    def test_newer_edit_cancels_running_tests(self, state_path):
+        running: dict = {}
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "import time; time.sleep(30)")
+            step(state, running, state_path)
+        stale = running["/a.py"][0]
+
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('ok')")
+        state = _run_until_idle(state_path, running)
+
+        assert stale.poll() is not None
+        assert state["results"]["/a.py"]["status"] == "passed"
+
+
+class TestReporting:
+    """Failures are reported once; a module that passes again gets a note."""
+
+    def test_failure_then_recovery(self, state_path, capsys):
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('E   assert 1 == 2'); raise SystemExit(1)")
+        _run_until_idle(state_path, {})
+
+        assert report_results(state_path) == (2, "")
+        err = capsys.readouterr().err
+        assert "Tests for a.py failed" in err
+        assert "assert 1 == 2" in err
+        assert report_results(state_path) is None
+
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('1 passed')")
+        _run_until_idle(state_path, {})
+
+        assert report_results(state_path) == (2, "")
+        assert "pass again" in capsys.readouterr().err
+
+    def test_quiet_when_passing(self, state_path, capsys):
+        with locked_state(state_path) as state:
+            state["pending"]["/a.py"] = _job("/a.py", "print('1 passed')")
+        _run_until_idle(state_path, {})
+
+        assert report_results(state_path) is None
+        assert capsys.readouterr().err == ""
+
+
+class TestHookEntryPoints:
+    def test_disabled_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("PILOT_AFFECTED_TESTS", raising=False)
+
+        assert check_affected_tests("Edit", tmp_path / "a.py") is None
+
+    def test_stop_hook_skips_test_discovery_imports(self):
+        code = "import sys, affected_tests; print(sorted({'tdd_enforcer', '_coverage_index'} & set(sys.modules)))"
+
+        result = subprocess.run(
+            [sys.executable, "-c", code], cwd=Path(affected_tests.__file__).parent, capture_output=True, text=True
+        )
+
+        assert result.stdout.strip() == "[]"
+
+    def test_edit_queues_and_spawns_worker(self, state_path, tmp_path):
+        _write(tmp_path / "pyproject.toml")
+        impl = _write(tmp_path / "utils.py")
+        _write(tmp_path / "test_utils.py")
+
+        with (
+            patch("affected_tests.shutil.which", return_value="/usr/bin/pytest"),
+            patch.object(affected_tests, "spawn_worker") as mock_spawn,
+        ):
+            assert queue_tests(impl)
+
+        mock_spawn.assert_called_once_with(state_path)
+        with locked_state(state_path) as state:
+            assert state["pending"][str(impl)]["tests"] == ["test_utils.py"]
@@ -0,0 +1,110 @@
+"""Tests for the streaming // comment lexer."""
+
+from __future__ import annotations
+
+from _checkers.comments import strip_line_comments
+from _checkers.go import GO_PRESERVE_RE
+from _checkers.typescript import TS_PRESERVE_RE
+
+
+def strip_ts(content: str) -> tuple[str, bool]:
+    return strip_line_comments(content, TS_PRESERVE_RE, "typescript")
+
+
+def strip_jsx(content: str) -> tuple[str, bool]:
+    return strip_line_comments(content, TS_PRESERVE_RE, "jsx")
+
+
+def strip_go(content: str) -> tuple[str, bool]:
+    return strip_line_comments(content, GO_PRESERVE_RE, "go")
+
+
+class TestTypescript:
+    """Only // comments in code are removed."""
+
+    def test_inline_and_full_line_comments(self) -> None:
+        assert strip_ts("// header\nconst x = 1; // set x\n") == ("const x = 1;\n", True)
+
+    def test_comment_after_string_containing_slashes(self) -> None:
+        assert strip_ts('const u = "http://a"; // api\n') == ('const u = "http://a";\n', True)
+
+    def test_slashes_in_strings_are_kept(self) -> None:
+        source = "const a = '//x';\nconst b = \"a // b\";\n"
+
+        assert strip_ts(source) == (source, False)
+
+    def test_template_literal_with_nested_expression(self) -> None:
+        source = "const s = `a // ${f({ k: `x // ${y}` })} // b`; // c\n"
+
+        assert strip_ts(source) == ("const s = `a // ${f({ k: `x // ${y}` })} // b`;\n", True)
+
+    def test_comment_inside_template_expression(self) -> None:
+        source = "const s = `${\n  x // why\n}`;\n"
+
+        assert strip_ts(source) == ("const s = `${\n  x\n}`;\n", True)
+
+    def test_block_comment_is_untouched(self) -> None:
+        source = "/* see http://example.com\n// not a line comment */\nconst x = 1;\n"
+
+        assert strip_ts(source) == (source, False)
+
+    def test_regex_literal_with_quote(self) -> None:
+        source = 'const r = /"\\/\\//g; // strip\nconst d = a / b; // div\n'
+
+        assert strip_ts(source) == ('const r = /"\\/\\//g;\nconst d = a / b;\n', True)
+
+    def test_url_comment_is_stripped(self) -> None:
+        assert strip_ts("fetch(u); // see https://example.com\n") == ("fetch(u);\n", True)
+
+    def test_directives_are_preserved(self) -> None:
+        source = "// @ts-expect-error\nconst x: number = 'a'; // eslint-disable-line\n"
+
+        assert strip_ts(source) == (source, False)
+
+    def test_last_line_without_newline(self) -> None:
+        assert strip_ts("const x = 1; // c") == ("const x = 1;", True)
+
+    def test_comments_around_long_plain_stretch(self) -> None:
+        data = 'const row = { id: 1, name: "a" };\n' * 100
+        source = f"// generated\n{data}const s = `${{x}}`; // tail\n"
+
+        assert strip_ts(source) == (f"{data}const s = `${{x}}`;\n", True)
+
+
+class TestJsx:
+    """JSX text holding "//" is left alone."""
+
+    def test_url_in_element_text(self) -> None:
+        source = "return (\n  <p>\n    Docs at https://example.com/docs\n  </p>\n);\n"
+
+        assert strip_jsx(source) == (source, False)
+
+    def test_slashes_at_start_of_element_text(self) -> None:
+        source = '<a href="http://x">//text</a>;\n'
+
+        assert strip_jsx(source) == (source, False)
+
+    def test_comment_in_code_is_stripped(self) -> None:
+        assert strip_jsx("const x = <p />; // render\n") == ("const x = <p />;\n", True)
+
+
+class TestGo:
+    """Go strings, runes and raw strings hide // from the lexer."""
+
+    def test_raw_string_and_rune(self) -> None:
+        source = "var re = `https?://.*` // pattern\nvar c = '/' // slash\n"
+
+        assert strip_go(source) == ("var re = `https?://.*`\nvar c = '/'\n", True)
+
+    def test_escaped_quote_in_string(self) -> None:
+        source = 'var s = "a\\"// b" // c\n'
+
+        assert strip_go(source) == ('var s = "a\\"// b"\n', True)
+
+    def test_directives_are_preserved(self) -> None:
+        source = "//go:generate stringer -type=T\nx := 1 //nolint:errcheck\n"
+
+        assert strip_go(source) == (source, False)
+
+    def test_division_is_code(self) -> None:
+        assert strip_go("y := a / b // half\n") == ("y := a / b\n", True)
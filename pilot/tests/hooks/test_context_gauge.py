@@ -0,0 +1,65 @@
+"""Tests for reading the statusline's context gauge."""
+
+from __future__ import annotations
+
+import time
+
+from _context_gauge import GAUGE_FILE, GAUGE_SIZE, MAGIC, RECORD, SEQ, SEQ_OFFSET, read_context_pct, read_gauge
+
+
+def _publish(session_dir, pct, ts, seq=2, session_id=b"cc-1"):
+    session_dir.mkdir(parents=True, exist_ok=True)
+    record = bytearray(GAUGE_SIZE)
+    RECORD.pack_into(record, 0, MAGIC, seq, pct, ts, len(session_id), session_id)
+    (session_dir / GAUGE_FILE).write_bytes(record)
+
+
+def test_reads_complete_record(tmp_path):
+    _publish(tmp_path, 42.5, 100.0)
+
+    reading = read_gauge(tmp_path)
+
+    assert (reading.pct, reading.ts, reading.session_id, reading.seq) == (42.5, 100.0, "cc-1", 2)
+
+
+def test_missing_or_unwritten_gauge(tmp_path):
+    assert read_gauge(tmp_path) is None
+
+    (tmp_path / GAUGE_FILE).write_bytes(bytes(GAUGE_SIZE))
+    assert read_gauge(tmp_path) is None
+
+    (tmp_path / GAUGE_FILE).write_bytes(b"PCG1")
+    assert read_gauge(tmp_path) is None
+
+
+def test_record_being_written_is_not_read(tmp_path):
+    _publish(tmp_path, 42.5, 100.0, seq=3)
+
+    assert read_gauge(tmp_path) is None
+
+
+def test_retries_until_the_writer_finishes(tmp_path, monkeypatch):
+    _publish(tmp_path, 42.5, 100.0, seq=3)
+    attempts = []
+
+    class FinishingWriter:
+        size = RECORD.size
+
+        def unpack(self, buffer):
+            attempts.append(SEQ.unpack_from(buffer, SEQ_OFFSET)[0])
+            if len(attempts) == 1:
+                _publish(tmp_path, 50.0, 101.0, seq=4)
+            return RECORD.unpack(buffer)
+
+    monkeypatch.setattr("_context_gauge.RECORD", FinishingWriter())
+
+    assert read_gauge(tmp_path).pct == 50.0
+    assert attempts == [3, 4]
+
+
+def test_stale_reading_is_ignored(tmp_path):
+    _publish(tmp_path, 42.5, time.time() - 61)
+    assert read_context_pct(tmp_path) is None
+
+    _publish(tmp_path, 42.5, time.time())
+    assert read_context_pct(tmp_path) == 42.5
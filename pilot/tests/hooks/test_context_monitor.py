@@ -1,127 +1,169 @@
-"""Tests for context_monitor throttling and context resolution."""
+"""Tests for context_monitor forecasting, throttling and notices."""
 
-import json
 import time
 
-from context_monitor import _is_throttled, _resolve_context
+import _session_state
+import pytest
+from _context_gauge import GAUGE_FILE, GAUGE_SIZE, MAGIC, RECORD
+from _session_state import load_state
+from context_monitor import (
+    COUNTER,
+    COUNTER_FILE,
+    MAX_THROTTLE_CALLS,
+    THRESHOLD_WARN,
+    _check,
+    growth_per_call,
+    record_sample,
+    run_context_monitor,
+    throttle_calls,
+)
 
+SESSION_ID = "test-session-123"
 
-def test_throttle_skips_when_recent_and_low_context(tmp_path, monkeypatch):
-    """Throttle returns True when last check was < 30s ago and context below warning threshold."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
 
-    session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 100000,
-        "timestamp": time.time() - 5,
-    }))
+@pytest.fixture
+def session_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(_session_state, "_sessions_base", lambda: tmp_path / "sessions")
+    monkeypatch.setenv("PILOT_SESSION_ID", SESSION_ID)
+    return tmp_path / "sessions" / SESSION_ID
 
-    assert _is_throttled(session_id) is True
 
+def _publish(session_dir, pct, ts=None):
+    """Write a context gauge record the way the statusline does."""
+    session_dir.mkdir(parents=True, exist_ok=True)
+    record = bytearray(GAUGE_SIZE)
+    RECORD.pack_into(record, 0, MAGIC, 2, pct, time.time() if ts is None else ts, 0, b"")
+    (session_dir / GAUGE_FILE).write_bytes(record)
 
-def test_throttle_allows_when_high_context(tmp_path, monkeypatch):
-    """Throttle returns False when context is high (never skip near compaction)."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
 
-    session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 170000,
-        "timestamp": time.time() - 5,
-    }))
+def test_growth_per_call_fits_samples():
+    assert growth_per_call([]) is None
+    assert growth_per_call([[1, 10.0]]) is None
+    assert growth_per_call([[1, 10.0], [3, 11.0], [5, 12.0]]) == pytest.approx(0.5)
 
-    assert _is_throttled(session_id) is False
 
+def test_record_sample_keeps_recent_window_and_resets_after_compaction():
+    samples = []
+    for calls in range(1, 20):
+        samples = record_sample(samples, calls, float(calls))
+    assert len(samples) == 12
+    assert samples[-1] == [19, 19.0]
 
-def test_throttle_allows_when_stale_timestamp(tmp_path, monkeypatch):
-    """Throttle returns False when last check was > 30s ago."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
+    assert record_sample([[1, 60.0], [2, 62.0]], 3, 20.0) == [[3, 20.0]]
 
-    session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 100000,
-        "timestamp": time.time() - 35,
-    }))
 
-    assert _is_throttled(session_id) is False
+def test_throttle_grows_with_distance_to_next_notice():
+    assert throttle_calls(10.0, 0.2, [], False) == MAX_THROTTLE_CALLS
+    assert throttle_calls(38.0, 0.5, [], False) == 2
+    assert throttle_calls(38.0, 2.0, [], False) == 0
+    assert throttle_calls(THRESHOLD_WARN, 0.01, [40, 55, 65], True) == 0
 
 
-def test_throttle_allows_when_no_cache(tmp_path, monkeypatch):
-    """Throttle returns False when no cache file exists."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
+def test_no_statusline_value_checks_again_next_call(session_dir):
+    cache = {}
 
-    assert _is_throttled("test-session-123") is False
+    assert _check(cache, SESSION_ID, 1) == 0
+    assert _check(cache, SESSION_ID, 2) == 0
 
+    assert cache["calls"] == 2
+    assert "next_check" not in cache
 
-def test_throttle_allows_when_different_session(tmp_path, monkeypatch):
-    """Throttle returns False when cache is for a different session."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
 
-    cache_file.write_text(json.dumps({
-        "session_id": "other-session-456",
-        "tokens": 100000,
-        "timestamp": time.time() - 5,
-    }))
+def test_stale_statusline_value_is_ignored(session_dir):
+    _publish(session_dir, 45.0, ts=time.time() - 61)
+    cache = {}
 
-    assert _is_throttled("test-session-123") is False
+    _check(cache, SESSION_ID, 1)
 
+    assert "pct" not in cache
 
 
+def test_skips_checks_far_from_the_limit(session_dir):
+    for calls in range(1, 41):
+        _publish(session_dir, 10.0 + calls * 0.1)
+        run_context_monitor()
 
-def test_resolve_context_returns_none_when_statusline_cache_missing(tmp_path, monkeypatch):
-    """Returns None when no statusline cache exists (no racy fallback)."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-    monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: None)
+    cache = load_state(session_dir).context_cache
+    assert [calls for calls, _ in cache["samples"]] == [1, 16]
+    assert cache["growth_per_call"] == pytest.approx(0.1)
+    assert cache["next_check"] == 16 + 1 + MAX_THROTTLE_CALLS
 
-    result = _resolve_context("test-session-123")
+    _publish(session_dir, 70.0)
+    run_context_monitor()
 
-    assert result is None
+    assert load_state(session_dir).context_cache["pct"] < 70.0
 
 
-def test_resolve_context_returns_statusline_percentage(tmp_path, monkeypatch):
-    """Returns percentage from statusline cache when available."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-    monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: 45.0)
+def test_forecast_brings_the_warning_forward(session_dir, capsys):
+    cache = {}
+    for calls in range(1, 4):
+        _publish(session_dir, 50.0 + calls * 3)
+        _check(cache, SESSION_ID, calls)
 
-    result = _resolve_context("test-session-123")
+    assert cache["pct"] < 65
+    assert cache["calls_remaining"] <= 20
+    assert cache["shown_80_warn"] is True
+    assert "Auto-compact will handle" in capsys.readouterr().err
 
-    assert result is not None
-    pct, tokens, shown_learn, shown_80 = result
-    assert pct == 45.0
-    assert tokens == 90000
-    assert shown_learn == []
-    assert shown_80 is False
 
+def test_other_session_starts_fresh(session_dir):
+    cache = {"session_id": "other-session-456", "calls": 40, "next_check": 60, "shown_80_warn": True}
+    _publish(session_dir, 20.0)
 
-def test_resolve_context_includes_session_flags(tmp_path, monkeypatch):
-    """Returns session flags (learn thresholds, 80% warning) from cache."""
-    cache_file = tmp_path / "context_cache.json"
-    monkeypatch.setattr("context_monitor.get_session_cache_path", lambda: cache_file)
-    monkeypatch.setattr("context_monitor._read_statusline_context_pct", lambda: 85.0)
+    _check(cache, SESSION_ID, 1)
 
-    session_id = "test-session-123"
-    cache_file.write_text(json.dumps({
-        "session_id": session_id,
-        "tokens": 170000,
-        "timestamp": time.time() - 5,
-        "shown_learn": [40, 60],
-        "shown_80_warn": True,
-    }))
+    assert cache["session_id"] == SESSION_ID
+    assert cache["calls"] == 1
+    assert cache["pct"] == 20.0
+    assert cache["shown_80_warn"] is False
 
-    result = _resolve_context(session_id)
 
-    assert result is not None
-    pct, tokens, shown_learn, shown_80 = result
-    assert pct == 85.0
-    assert tokens == 170000
-    assert shown_learn == [40, 60]
-    assert shown_80 is True
+def test_autocompact_warning_blocks(session_dir, capsys):
+    _publish(session_dir, 80.0)
+
+    assert run_context_monitor() == 2
+    assert "Auto-compact approaching" in capsys.readouterr().err
+
+
+def test_run_records_shown_notices_once(session_dir, capsys):
+    """A warning shown once is remembered in the session state and not repeated."""
+    _publish(session_dir, 70.0)
+
+    assert run_context_monitor() == 0
+    assert "Context at" in capsys.readouterr().err
+
+    cache = load_state(session_dir).context_cache
+    assert cache["shown_80_warn"] is True
+    assert cache["shown_learn"] == [40]
+    assert cache["next_check"] == 2
+
+    assert run_context_monitor() == 0
+    assert "Context at" not in capsys.readouterr().err
+
+
+def test_run_without_pilot_session_creates_nothing(tmp_path, monkeypatch):
+    monkeypatch.setattr(_session_state, "_sessions_base", lambda: tmp_path / "sessions")
+    monkeypatch.delenv("PILOT_SESSION_ID", raising=False)
+
+    assert run_context_monitor() == 0
+    assert not (tmp_path / "sessions").exists()
+
+
+def test_run_counts_throttled_calls_without_a_transaction(session_dir):
+    session_dir.mkdir(parents=True)
+    (session_dir / COUNTER_FILE).write_bytes(COUNTER.pack(3, 10))
+
+    assert run_context_monitor() == 0
+
+    assert COUNTER.unpack((session_dir / COUNTER_FILE).read_bytes()) == (4, 10)
+    assert not (session_dir / _session_state.STATE_FILE).exists()
+
+
+def test_run_schedules_the_next_check_in_the_counter(session_dir):
+    _publish(session_dir, 20.0)
+
+    run_context_monitor()
+
+    calls, next_check = COUNTER.unpack((session_dir / COUNTER_FILE).read_bytes())
+    assert calls == 1
+    assert next_check == load_state(session_dir).context_cache["next_check"] > 2
@@ -0,0 +1,144 @@
+"""Tests for coverage index lookups and coverage-driven test selection."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from pathlib import Path
+from unittest.mock import patch
+
+import _coverage_index
+import pytest
+from _coverage_index import covering_ids, get_index_path, tests_covering
+from affected_tests import plan_run
+from tdd_enforcer import check_tdd
+
+CONTEXTS = ["tests/test_app.py::test_a", "tests/test_app.py::test_b", "tests/test_app.py::test_c"]
+ENTRY = {"starts": [1, 3, 4, 10], "ends": [2, 3, 5, 12], "tests": [[0], [0, 1], [1], [2]]}
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    _coverage_index.clear_memory()
+    yield
+    _coverage_index.clear_memory()
+
+
+@pytest.fixture
+def project(tmp_path):
+    root = (tmp_path / "project").resolve()
+    (root / ".git").mkdir(parents=True)
+    (root / "pyproject.toml").write_text("")
+    (root / "src").mkdir()
+    (root / "src" / "app.py").write_text("".join(f"line{n} = {n}\n" for n in range(1, 21)))
+    (root / "tests").mkdir()
+    (root / "tests" / "test_app.py").write_text("")
+    return root
+
+
+def _write_index(root: Path, files: dict) -> None:
+    for rel, entry in files.items():
+        entry["sha"] = hashlib.sha256((root / rel).read_bytes()).hexdigest()
+    path = get_index_path(root)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps({"version": 2, "root": str(root), "contexts": CONTEXTS, "files": files}))
+
+
+def _edit(root: Path, line: int) -> dict:
+    """Edit line of src/app.py on disk and return the Edit tool_input."""
+    app = root / "src" / "app.py"
+    old, new = f"line{line} = {line}", f"line{line} = {line}0"
+    app.write_text(app.read_text().replace(old, new))
+    return {"file_path": str(app), "old_string": old, "new_string": new}
+
+
+class TestLookup:
+    def test_lines_map_to_tests(self):
+        assert covering_ids(ENTRY, {3}) == {0, 1}
+        assert covering_ids(ENTRY, {5, 6, 7}) == {1}
+        assert covering_ids(ENTRY, {7, 8}) == set()
+        assert covering_ids(ENTRY, {2, 11}) == {0, 2}
+        assert covering_ids(ENTRY, None) == {0, 1, 2}
+
+    def test_tests_covering(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+
+        assert tests_covering(project / "src" / "app.py", {4}) == ["tests/test_app.py::test_b"]
+        assert tests_covering(project / "src" / "app.py", {15}) == []
+
+    def test_unknown_file_or_project(self, project, tmp_path):
+        assert tests_covering(project / "src" / "app.py", {1}) is None
+
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+
+        assert tests_covering(project / "src" / "other.py", {1}) is None
+        assert tests_covering(tmp_path / "loose.py", {1}) is None
+
+    def test_reloads_after_update(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        assert tests_covering(project / "src" / "app.py", {15}) == []
+
+        _write_index(project, {"src/app.py": {"starts": [15], "ends": [15], "tests": [[2]]}})
+
+        assert tests_covering(project / "src" / "app.py", {15}) == ["tests/test_app.py::test_c"]
+
+    def test_changed_source_has_no_coverage(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+
+        (project / "src" / "app.py").write_text("\n" + (project / "src" / "app.py").read_text())
+
+        assert tests_covering(project / "src" / "app.py", {4}) is None
+
+    def test_disabled(self, project, monkeypatch):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        monkeypatch.setenv("PILOT_COVERAGE_INDEX", "0")
+
+        assert tests_covering(project / "src" / "app.py", {1}) is None
+
+
+class TestTddEnforcer:
+    def test_covered_lines_count_as_tested(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        (project / "tests" / "test_app.py").unlink()
+
+        assert check_tdd({"tool_name": "Edit", "tool_input": _edit(project, 4)}) == 0
+
+    def test_uncovered_lines_get_the_reminder(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        (project / "tests" / "test_app.py").unlink()
+
+        assert check_tdd({"tool_name": "Edit", "tool_input": _edit(project, 15)}) == 2
+
+    def test_coverage_of_earlier_content_is_ignored(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        (project / "tests" / "test_app.py").unlink()
+        _edit(project, 1)
+
+        assert check_tdd({"tool_name": "Edit", "tool_input": _edit(project, 4)}) == 2
+
+    def test_write_is_not_covered(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        (project / "tests" / "test_app.py").unlink()
+        app = project / "src" / "app.py"
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(app), "content": app.read_text()}}) == 2
+
+
+class TestAffectedTests:
+    def test_runs_only_the_tests_covering_the_edit(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        tool_input = _edit(project, 3)
+
+        with patch("affected_tests.shutil.which", return_value="/usr/bin/pytest"):
+            job = plan_run(project / "src" / "app.py", tool_input)
+
+        assert job["tests"] == ["tests/test_app.py::test_a", "tests/test_app.py::test_b"]
+
+    def test_falls_back_to_test_files(self, project):
+        _write_index(project, {"src/app.py": dict(ENTRY)})
+        tool_input = _edit(project, 15)
+
+        with patch("affected_tests.shutil.which", return_value="/usr/bin/pytest"):
+            job = plan_run(project / "src" / "app.py", tool_input)
+
+        assert job["tests"] == ["tests/test_app.py"]
@@ -0,0 +1,173 @@
+"""Tests for the persistent diagnostics cache."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from _checkers import cache, go
+from _checkers.python import check_python
+
+
+def _fake_tool(tmp_path: Path, name: str = "ruff") -> Path:
+    tool = tmp_path / "bin" / name
+    tool.parent.mkdir(exist_ok=True)
+    tool.write_text("#!/bin/sh\n")
+    return tool
+
+
+class TestDiagnosticsKey:
+    """Keys change with content, tool and config."""
+
+    def test_same_inputs_same_key(self, tmp_path: Path) -> None:
+        """Identical content, tools and config produce the same key."""
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+        tool = str(_fake_tool(tmp_path))
+
+        first = cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES)
+        second = cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES)
+
+        assert first is not None
+        assert first == second
+
+    def test_content_change_changes_key(self, tmp_path: Path) -> None:
+        """Editing the file invalidates the key."""
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+        tool = str(_fake_tool(tmp_path))
+        before = cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES)
+
+        src.write_text("x = 2\n")
+
+        assert cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES) != before
+
+    def test_config_change_changes_key(self, tmp_path: Path) -> None:
+        """Editing pyproject.toml above the file invalidates the key."""
+        (tmp_path / ".git").mkdir()
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\nline-length = 88\n")
+        src = tmp_path / "pkg" / "app.py"
+        src.parent.mkdir()
+        src.write_text("x = 1\n")
+        tool = str(_fake_tool(tmp_path))
+        before = cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES)
+
+        (tmp_path / "pyproject.toml").write_text("[tool.ruff]\nline-length = 120\n")
+
+        assert cache.diagnostics_key("python", src, [tool], cache.PYTHON_CONFIG_FILES) != before
+
+    def test_tool_upgrade_changes_key(self, tmp_path: Path) -> None:
+        """Replacing the tool binary invalidates the key."""
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+        tool = _fake_tool(tmp_path)
+        before = cache.diagnostics_key("python", src, [str(tool)], cache.PYTHON_CONFIG_FILES)
+
+        tool.write_text("#!/bin/sh\n# newer release\n")
+
+        assert cache.diagnostics_key("python", src, [str(tool)], cache.PYTHON_CONFIG_FILES) != before
+
+    def test_unresolvable_tool_is_uncacheable(self, tmp_path: Path) -> None:
+        """A tool path that cannot be stat'ed disables caching."""
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+
+        assert cache.diagnostics_key("python", src, [str(tmp_path / "nope")], ()) is None
+
+    def test_disabled_by_env(self, tmp_path: Path, monkeypatch) -> None:
+        """PILOT_DIAGNOSTICS_CACHE=0 turns the cache off."""
+        monkeypatch.setenv("PILOT_DIAGNOSTICS_CACHE", "0")
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+
+        assert cache.diagnostics_key("python", src, [str(_fake_tool(tmp_path))], ()) is None
+
+
+class TestGoKey:
+    """go vet results depend on the in-module packages a file imports."""
+
+    def test_imported_package_change_changes_key(self, tmp_path: Path) -> None:
+        (tmp_path / "go.mod").write_text("module example.com/app\n\ngo 1.22\n")
+        util = tmp_path / "pkg" / "util" / "util.go"
+        util.parent.mkdir(parents=True)
+        util.write_text('package util\n\nfunc Name() string { return "a" }\n')
+        other = tmp_path / "pkg" / "other" / "other.go"
+        other.parent.mkdir(parents=True)
+        other.write_text("package other\n")
+        main = tmp_path / "cmd" / "main.go"
+        main.parent.mkdir()
+        main.write_text('package main\n\nimport (\n\t"fmt"\n\n\t"example.com/app/pkg/util"\n)\n')
+        tool = str(_fake_tool(tmp_path, "go"))
+        before = go._cache_key(main, [tool])
+
+        other.write_text("package other\n\nvar X = 1\n")
+        unrelated = go._cache_key(main, [tool])
+        util.write_text("package util\n\nfunc Name() int { return 1 }\n")
+
+        assert unrelated == before
+        assert go._cache_key(main, [tool]) != before
+
+
+class TestStoreAndLookup:
+    """Entries round-trip and are evicted least recently used first."""
+
+    def test_round_trip(self) -> None:
+        """Stored payloads are returned by lookup."""
+        cache.store("abc", {"ruff": [1, ["app.py:1:1: F401 unused"]]})
+
+        assert cache.lookup("abc") == {"ruff": [1, ["app.py:1:1: F401 unused"]]}
+
+    def test_missing_key_returns_none(self) -> None:
+        """Unknown and None keys miss."""
+        assert cache.lookup("missing") is None
+        assert cache.lookup(None) is None
+
+    def test_evicts_least_recently_used(self, tmp_path: Path) -> None:
+        """Oldest entries are removed once the entry cap is exceeded."""
+        for i, name in enumerate(["old", "mid", "new"]):
+            entry = tmp_path / f"{name}.json"
+            entry.write_text("{}")
+            os.utime(entry, ns=(i * 1_000_000_000, i * 1_000_000_000))
+
+        removed = cache.evict(tmp_path, max_entries=2)
+
+        assert removed == 1
+        assert sorted(p.stem for p in tmp_path.glob("*.json")) == ["mid", "new"]
+
+    def test_evicts_by_size(self, tmp_path: Path) -> None:
+        """Entries are removed until the byte cap holds."""
+        for i in range(3):
+            entry = tmp_path / f"e{i}.json"
+            entry.write_text("x" * 100)
+            os.utime(entry, ns=(i * 1_000_000_000, i * 1_000_000_000))
+
+        cache.evict(tmp_path, max_bytes=150)
+
+        assert [p.name for p in tmp_path.glob("*.json")] == ["e2.json"]
+
+
+class TestCheckerIntegration:
+    """Checkers replay cached diagnostics without spawning tools."""
+
+    def test_second_check_of_same_content_skips_ruff(self, tmp_path: Path, uncached_toolchain) -> None:
+        """Re-checking unchanged content reuses the stored result."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("import os\n")
+        ruff_bin = str(_fake_tool(tmp_path))
+        diagnostic = {"code": "F401", "location": {"row": 1, "column": 8}, "message": "`os` imported", "fix": None}
+        mock_check = MagicMock(returncode=1, stdout="import os\n", stderr=json.dumps([diagnostic]))
+
+        with (
+            patch("_checkers.python.check_file_length"),
+            patch("_checkers.python.shutil.which", return_value=ruff_bin),
+            patch("_checkers.runner.subprocess.run", return_value=mock_check) as mock_run,
+        ):
+            first = check_python(py_file)
+            calls_after_first = mock_run.call_count
+            second = check_python(py_file)
+
+        assert first == second == (2, "Python: 1 ruff in app.py")
+        assert calls_after_first > 0
+        assert mock_run.call_count == calls_after_first
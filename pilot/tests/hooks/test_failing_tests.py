@@ -0,0 +1,109 @@
+"""Tests for the multi-framework failing-test state reader."""
+
+from __future__ import annotations
+
+import json
+import os
+from unittest.mock import patch
+
+import _failing_tests
+import pytest
+from _failing_tests import failing_tests, parse_go_report, parse_js_report
+from tdd_enforcer import check_tdd, has_related_failing_test
+
+
+@pytest.fixture(autouse=True)
+def _fresh_state():
+    _failing_tests.clear_memory()
+    yield
+    _failing_tests.clear_memory()
+
+
+def _write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestPytest:
+    def test_failing_test_for_module(self, tmp_path):
+        _write(
+            tmp_path / ".pytest_cache" / "v" / "cache" / "lastfailed", json.dumps({"tests/test_utils.py::test_a": True})
+        )
+        impl = _write(tmp_path / "src" / "pkg" / "utils.py")
+        other = _write(tmp_path / "src" / "pkg" / "helpers.py")
+
+        assert has_related_failing_test(str(impl))
+        assert not has_related_failing_test(str(other))
+
+    def test_parsed_once_per_mtime(self, tmp_path):
+        lastfailed = _write(tmp_path / ".pytest_cache" / "v" / "cache" / "lastfailed", "{}")
+        impl = _write(tmp_path / "utils.py")
+        parse = _failing_tests.parse_pytest_lastfailed
+
+        with patch.object(_failing_tests, "parse_pytest_lastfailed", wraps=parse) as mock_parse:
+            assert not failing_tests(impl, ["test_utils.py"])
+            assert not failing_tests(impl, ["test_utils.py"])
+            lastfailed.write_text(json.dumps({"test_utils.py::test_b": True}))
+            _bump_mtime(lastfailed)
+            assert failing_tests(impl, ["test_utils.py"])[0].test_id == "test_utils.py::test_b"
+
+        assert mock_parse.call_count == 2
+
+
+class TestJavaScript:
+    def test_jest_json_report(self, tmp_path):
+        report = {
+            "testResults": [
+                {
+                    "name": str(tmp_path / "src" / "format.test.ts"),
+                    "status": "failed",
+                    "assertionResults": [
+                        {"fullName": "format pads", "status": "failed"},
+                        {"fullName": "format trims", "status": "passed"},
+                    ],
+                }
+            ]
+        }
+        path = _write(tmp_path / "test-results.json", json.dumps(report))
+
+        assert [(t.file.name, t.test_id) for t in parse_js_report(path)] == [("format.test.ts", "format pads")]
+
+    def test_vitest_results_cache(self, tmp_path):
+        cache = {"version": "1.6.0", "results": {":src/format.test.ts": {"failed": True, "duration": 3}}}
+        _write(tmp_path / "node_modules" / ".vitest" / "results.json", json.dumps(cache))
+        impl = _write(tmp_path / "src" / "format.ts")
+
+        assert has_related_failing_test(str(impl))
+
+
+class TestGo:
+    def test_go_test_json(self, tmp_path):
+        _write(tmp_path / "go.mod", "module example.com/app\n")
+        events = [
+            {"Action": "run", "Package": "example.com/app/store", "Test": "TestGet"},
+            {"Action": "fail", "Package": "example.com/app/store", "Test": "TestGet"},
+            {"Action": "fail", "Package": "example.com/app/api", "Test": "TestServe"},
+            {"Action": "pass", "Package": "example.com/app/api", "Test": "TestServe"},
+            {"Action": "fail", "Package": "example.com/app/store"},
+        ]
+        report = _write(tmp_path / "go-test.json", "\n".join(json.dumps(e) for e in events) + "\n")
+
+        failing = parse_go_report(report)
+
+        assert [(t.test_id, t.package_dir) for t in failing] == [("TestGet", tmp_path / "store")]
+
+    def test_failing_package_covers_its_files(self, tmp_path):
+        _write(tmp_path / "go.mod", "module example.com/app\n")
+        _write(
+            tmp_path / "go-test.json",
+            json.dumps({"Action": "fail", "Package": "example.com/app/store", "Test": "TestGet"}) + "\n",
+        )
+        impl = _write(tmp_path / "store" / "cache.go", "package store\n")
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(impl)}}) == 0
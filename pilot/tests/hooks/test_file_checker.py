@@ -6,7 +6,11 @@ import json
 from pathlib import Path
 from unittest.mock import patch
 
-from pilot.hooks.file_checker import main
+import pytest
+
+from pilot.hooks.file_checker import check_file, main
+
+pytestmark = pytest.mark.usefixtures("synchronous_lint")
 
 
 def test_python_file_dispatches_to_python_checker(tmp_path):
@@ -110,3 +114,15 @@ class TestJsonDecisionOutput:
 
         captured = capsys.readouterr()
         assert captured.out == ""
+
+
+def test_tool_input_is_passed_to_python_checker(tmp_path):
+    """The PostToolUse tool_input reaches the Python checker for edit-scoped stripping."""
+    py_file = tmp_path / "app.py"
+    py_file.write_text("x = 1\n")
+    tool_input = {"file_path": str(py_file), "old_string": "x = 0", "new_string": "x = 1"}
+
+    with patch("pilot.hooks.file_checker.check_python", return_value=(0, "")) as mock_check:
+        check_file(py_file, tool_input)
+
+    mock_check.assert_called_once_with(py_file, tool_input)
@@ -5,8 +5,11 @@ from __future__ import annotations
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from _checkers.go import check_go
 
+pytestmark = pytest.mark.usefixtures("uncached_toolchain")
+
 
 class TestCheckGoVetCounting:
     """Verify go vet issue counting excludes header lines."""
@@ -28,7 +31,7 @@ class TestCheckGoVetCounting:
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
             patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
-            patch("_checkers.go.subprocess.run", return_value=mock_result),
+            patch("_checkers.runner.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
 
@@ -53,7 +56,7 @@ class TestCheckGoVetCounting:
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
             patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
-            patch("_checkers.go.subprocess.run", return_value=mock_result),
+            patch("_checkers.runner.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
 
@@ -74,7 +77,7 @@ class TestCheckGoVetCounting:
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
             patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
-            patch("_checkers.go.subprocess.run", return_value=mock_vet),
+            patch("_checkers.runner.subprocess.run", return_value=mock_vet),
         ):
             _, reason = check_go(go_file)
 
@@ -113,7 +116,7 @@ class TestCheckGoCleanFile:
             patch("_checkers.go.strip_go_comments"),
             patch("_checkers.go.check_file_length"),
             patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}" if name == "go" else None),
-            patch("_checkers.go.subprocess.run", return_value=mock_result),
+            patch("_checkers.runner.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_go(go_file)
 
@@ -0,0 +1,133 @@
+"""Tests for the hook daemon and its thin client."""
+
+from __future__ import annotations
+
+import io
+import json
+import os
+import socket
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import hook_client
+import pytest
+from hook_daemon import HANDLERS, handle_request, run_hook
+
+HOOKS_DIR = Path(__file__).resolve().parents[2] / "hooks"
+
+
+class TestRunHook:
+    """In-process hook execution captures streams and exit codes."""
+
+    def test_unknown_hook_returns_error(self):
+        exit_code, stdout, stderr = run_hook("no_such_hook", "")
+
+        assert exit_code == 1
+        assert stdout == ""
+        assert "Unknown hook" in stderr
+
+    def test_captures_stderr_and_exit_code(self):
+        payload = json.dumps({"tool_name": "WebSearch", "tool_input": {"query": "x"}})
+
+        exit_code, _, stderr = run_hook("tool_redirect", payload)
+
+        assert exit_code == 2
+        assert "WebSearch is blocked" in stderr
+
+    def test_allowed_tool_is_silent(self):
+        payload = json.dumps({"tool_name": "Read", "tool_input": {}})
+
+        exit_code, stdout, stderr = run_hook("tool_redirect", payload)
+
+        assert exit_code == 0
+        assert stdout == ""
+        assert stderr == ""
+
+    def test_restores_sys_streams(self):
+        before = sys.stdin, sys.stdout, sys.stderr
+
+        run_hook("tool_redirect", "{}")
+
+        assert (sys.stdin, sys.stdout, sys.stderr) == before
+
+    def test_all_handlers_resolve(self):
+        import importlib
+
+        for module_name, func_name in HANDLERS.values():
+            assert callable(getattr(importlib.import_module(module_name), func_name))
+
+
+class TestHandleRequest:
+    """Requests run inside the client's cwd and environment."""
+
+    def test_environment_is_restored(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TEST_MARKER", "daemon")
+        cwd_before = os.getcwd()
+
+        response = handle_request(
+            {"hook": "tool_redirect", "stdin": "{}", "cwd": str(tmp_path), "env": {"PILOT_SESSION_ID": "x"}}
+        )
+
+        assert response["exit_code"] == 0
+        assert os.environ["PILOT_TEST_MARKER"] == "daemon"
+        assert os.getcwd() == cwd_before
+
+
+class TestClient:
+    """Client falls back when no daemon is listening and round-trips when one is."""
+
+    def test_forward_returns_none_without_daemon(self, tmp_path, monkeypatch):
+        monkeypatch.setattr(hook_client, "get_hook_socket_path", lambda: tmp_path / "missing.sock")
+
+        assert hook_client.forward_to_daemon("tool_redirect", "{}") is None
+
+    def test_delivered_request_is_not_run_again_when_daemon_hangs(self, tmp_path, monkeypatch, capsys):
+        socket_path = tmp_path / "hung.sock"
+        monkeypatch.setattr(hook_client, "get_hook_socket_path", lambda: socket_path)
+        monkeypatch.setattr(hook_client, "RESPONSE_TIMEOUT_S", 0.2)
+        monkeypatch.setattr(sys, "argv", ["hook_client.py", "tool_redirect"])
+        monkeypatch.setattr(
+            sys, "stdin", io.StringIO(json.dumps({"tool_name": "WebSearch", "tool_input": {"query": "x"}}))
+        )
+        monkeypatch.setattr(hook_client, "spawn_daemon", lambda: pytest.fail("daemon respawned"))
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as server:
+            server.bind(str(socket_path))
+            server.listen(1)
+            start = time.monotonic()
+
+            exit_code = hook_client.main()
+
+            assert time.monotonic() - start < 5
+        assert exit_code == 0
+        assert "WebSearch is blocked" not in capsys.readouterr().err
+
+    def test_round_trip_through_daemon(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("TMPDIR", str(tmp_path))
+        monkeypatch.setenv("PILOT_SESSION_ID", "daemon-test")
+        monkeypatch.setenv("PILOT_HOOK_DAEMON_IDLE", "20")
+        socket_path = tmp_path / f"pilot-{os.getuid()}" / "hooks-daemon-test.sock"
+        monkeypatch.setattr(hook_client, "get_hook_socket_path", lambda: socket_path)
+
+        proc = subprocess.Popen([sys.executable, str(HOOKS_DIR / "hook_daemon.py")], env=dict(os.environ))
+        try:
+            deadline = time.time() + 10
+            while not socket_path.exists() and time.time() < deadline:
+                time.sleep(0.05)
+            payload = json.dumps({"tool_name": "WebSearch", "tool_input": {"query": "x"}})
+
+            response = hook_client.forward_to_daemon("tool_redirect", payload)
+
+            assert response is not None
+            assert response["exit_code"] == 2
+            assert "WebSearch is blocked" in response["stderr"]
+
+            monkeypatch.setattr(hook_client, "get_hooks_fingerprint", lambda: "stale")
+            assert hook_client.forward_to_daemon("tool_redirect", payload) is None
+            proc.wait(timeout=10)
+            assert not socket_path.exists()
+        finally:
+            if proc.poll() is None:
+                proc.kill()
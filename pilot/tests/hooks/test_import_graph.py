@@ -0,0 +1,149 @@
+"""Tests for the import graph used to associate tests with modules."""
+
+from __future__ import annotations
+
+import os
+from unittest.mock import patch
+
+import _import_graph
+import pytest
+from _import_graph import ImportGraph, go_imports, python_imports, related_tests, run_builder, typescript_imports
+from tdd_enforcer import check_tdd
+
+
+@pytest.fixture(autouse=True)
+def _enabled(monkeypatch):
+    monkeypatch.setenv("PILOT_IMPORT_GRAPH", "1")
+    monkeypatch.setenv("PILOT_IMPORT_GRAPH_TTL", "0")
+    _import_graph.clear_memory()
+    yield
+    _import_graph.clear_memory()
+
+
+def _write(path, text=""):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@pytest.fixture
+def python_project(tmp_path):
+    _write(tmp_path / "pyproject.toml")
+    _write(tmp_path / "src" / "pkg" / "__init__.py")
+    _write(tmp_path / "src" / "pkg" / "core.py", "VALUE = 1\n")
+    _write(tmp_path / "src" / "pkg" / "api.py", "from .core import VALUE\n")
+    _write(tmp_path / "tests" / "test_service.py", "from pkg.api import VALUE\n")
+    _write(tmp_path / "tests" / "test_other.py", "import json\n")
+    return tmp_path
+
+
+class TestImportScanning:
+    """Specifiers are read per language."""
+
+    def test_python_ast(self):
+        source = "import os, a.b\nfrom ..pkg import mod as m\nfrom . import x\n\ndef f():\n    from c import d\n"
+
+        assert python_imports(source) == [["os", []], ["a.b", []], ["..pkg", ["mod"]], [".", ["x"]], ["c", ["d"]]]
+
+    def test_typescript_relative_specifiers(self):
+        source = (
+            "import { a } from './a';\nimport type { B } from \"../b\";\nexport * from './c';\n"
+            "const d = require('./d');\nconst e = await import('./e');\nimport 'react';\n"
+        )
+
+        assert typescript_imports(source) == ["../b", "./a", "./c", "./d", "./e"]
+
+    def test_go_import_forms(self):
+        source = 'package a\n\nimport "fmt"\nimport (\n\t"example.com/app/store"\n\tlog "example.com/app/log"\n)\n'
+
+        assert go_imports(source) == ["example.com/app/log", "example.com/app/store", "fmt"]
+
+
+class TestReverseLookup:
+    """Tests importing a module directly or transitively are found."""
+
+    def test_python_transitive(self, python_project):
+        graph = ImportGraph.build(python_project)
+
+        assert graph.tests_importing(python_project / "src" / "pkg" / "core.py") == [
+            python_project / "tests" / "test_service.py"
+        ]
+
+    def test_typescript(self, tmp_path):
+        _write(tmp_path / "package.json", "{}")
+        _write(tmp_path / "src" / "util" / "format.ts", "export const f = 1;\n")
+        _write(tmp_path / "src" / "util" / "index.ts", "export * from './format';\n")
+        _write(tmp_path / "src" / "view.tsx", "import { f } from './util';\n")
+        _write(tmp_path / "tests" / "screen.spec.ts", "import View from '../src/view.js';\n")
+
+        graph = ImportGraph.build(tmp_path)
+
+        assert graph.tests_importing(tmp_path / "src" / "util" / "format.ts") == [tmp_path / "tests" / "screen.spec.ts"]
+
+    def test_go_packages(self, tmp_path):
+        _write(tmp_path / "go.mod", "module example.com/app\n\ngo 1.22\n")
+        _write(tmp_path / "internal" / "store" / "store.go", "package store\n")
+        _write(tmp_path / "api" / "api.go", 'package api\n\nimport "example.com/app/internal/store"\n')
+        _write(tmp_path / "api" / "handlers_test.go", "package api\n")
+
+        graph = ImportGraph.build(tmp_path)
+
+        assert graph.tests_importing(tmp_path / "internal" / "store" / "store.go") == [
+            tmp_path / "api" / "handlers_test.go"
+        ]
+
+
+class TestIncrementalUpdates:
+    """Edited files are re-read without rebuilding the project."""
+
+    def test_update_relinks_one_file(self, python_project):
+        graph = ImportGraph.build(python_project)
+        core = python_project / "src" / "pkg" / "core.py"
+        assert graph.tests_importing(core)
+
+        api = _write(python_project / "src" / "pkg" / "api.py", "VALUE = 2\n")
+        _bump_mtime(api)
+        with patch.object(_import_graph, "_Resolver", side_effect=AssertionError("rebuilt")):
+            assert graph.update(api)
+            assert graph.tests_importing(core) == []
+
+    def test_refresh_finds_new_test(self, python_project):
+        run_builder(python_project)
+        core = python_project / "src" / "pkg" / "core.py"
+        _write(python_project / "tests" / "unit" / "test_values.py", "from pkg.core import VALUE\n")
+        _bump_mtime(python_project / "tests")
+
+        assert python_project / "tests" / "unit" / "test_values.py" in related_tests(core)
+
+    def test_first_lookup_builds_in_background(self, python_project):
+        with patch.object(_import_graph, "spawn_builder") as mock_spawn:
+            assert related_tests(python_project / "src" / "pkg" / "core.py") is None
+
+        mock_spawn.assert_called_once_with(python_project)
+
+
+class TestEnforcerIntegration:
+    def test_test_under_other_name_counts(self, python_project):
+        run_builder(python_project)
+        core = python_project / "src" / "pkg" / "core.py"
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(core)}}) == 0
+
+    def test_no_importing_test_warns(self, python_project):
+        run_builder(python_project)
+        lonely = _write(python_project / "src" / "pkg" / "lonely.py", "X = 1\n")
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(lonely)}}) == 2
+
+    def test_named_test_counts_when_the_graph_misses_the_link(self, python_project):
+        run_builder(python_project)
+        lonely = _write(python_project / "src" / "pkg" / "lonely.py", "X = 1\n")
+        _write(python_project / "tests" / "conftest.py", "import pytest\n")
+        _write(python_project / "tests" / "test_lonely.py", "def test_x(lonely_fixture):\n    pass\n")
+
+        assert check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(lonely)}}) == 0
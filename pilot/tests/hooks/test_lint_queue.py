@@ -0,0 +1,265 @@
+"""Tests for edit-burst lint coalescing."""
+
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+import lint_queue
+import pytest
+from _checkers.go import _attribute_go_output
+from _checkers.python import lint_python_batch
+
+
+@pytest.fixture
+def queue_path(tmp_path: Path, monkeypatch) -> Path:
+    monkeypatch.setenv("PILOT_LINT_COALESCE", "1")
+    path = tmp_path / "lint-queue.json"
+    monkeypatch.setattr(lint_queue, "get_queue_path", lambda: path)
+    return path
+
+
+class TestNoteEdit:
+    """Edits inside the burst window are queued; others are checked synchronously."""
+
+    def test_first_edit_is_synchronous(self, queue_path: Path, tmp_path: Path) -> None:
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+
+        assert lint_queue.note_edit(queue_path, src, "python", now=100.0) is False
+
+    def test_rapid_second_edit_is_queued(self, queue_path: Path, tmp_path: Path) -> None:
+        src = tmp_path / "app.py"
+        src.write_text("x = 1  # set x\n")
+        lint_queue.note_edit(queue_path, src, "python", now=100.0)
+
+        assert lint_queue.note_edit(queue_path, src, "python", now=101.0) is True
+
+        state = json.loads(queue_path.read_text())
+        entry = state["pending"][str(src.resolve())]
+        assert src.read_text() == "x = 1\n"
+        assert entry["hash"] == lint_queue.content_hash(src)
+
+    def test_edit_after_quiet_period_clears_queue(self, queue_path: Path, tmp_path: Path) -> None:
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+        lint_queue.note_edit(queue_path, src, "python", now=100.0)
+        lint_queue.note_edit(queue_path, src, "python", now=101.0)
+
+        assert lint_queue.note_edit(queue_path, src, "python", now=200.0) is False
+        assert json.loads(queue_path.read_text())["pending"] == {}
+
+
+class TestResults:
+    """Only results matching the file on disk are reported."""
+
+    def test_stale_results_are_dropped(self, queue_path: Path, tmp_path: Path) -> None:
+        fresh = tmp_path / "fresh.py"
+        stale = tmp_path / "stale.py"
+        fresh.write_text("x = 1\n")
+        stale.write_text("y = 1\n")
+        with lint_queue.locked_queue(queue_path) as state:
+            for path in (fresh, stale):
+                state["results"][str(path)] = {
+                    "language": "python",
+                    "hash": lint_queue.content_hash(path),
+                    "results": {},
+                }
+        stale.write_text("y = 2\n")
+
+        ready = lint_queue.take_ready_results(queue_path)
+
+        assert [path for path, _, _ in ready] == [fresh]
+        assert json.loads(queue_path.read_text())["results"] == {}
+
+    def test_report_ready_uses_language_reporter(self, queue_path: Path, tmp_path: Path) -> None:
+        src = tmp_path / "app.py"
+        src.write_text("import os\n")
+        diagnostics = [{"code": "F401", "line": 1, "column": 8, "message": "unused", "fixable": False}]
+        with lint_queue.locked_queue(queue_path) as state:
+            state["results"][str(src)] = {
+                "language": "python",
+                "hash": lint_queue.content_hash(src),
+                "results": {"ruff": [1, diagnostics]},
+            }
+
+        assert lint_queue.report_ready(queue_path) == (2, "Python: 1 ruff in app.py")
+
+
+class TestWorker:
+    """The worker batch-lints settled files and drops superseded states."""
+
+    def test_batches_pending_files_per_language(self, queue_path: Path, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(lint_queue, "QUIET_WINDOW_S", 0.0)
+        files = [tmp_path / "a.py", tmp_path / "b.py"]
+        for path in files:
+            path.write_text("x = 1\n")
+        with lint_queue.locked_queue(queue_path) as state:
+            for path in files:
+                state["pending"][str(path)] = {
+                    "language": "python",
+                    "hash": lint_queue.content_hash(path),
+                    "queued_at": 0.0,
+                }
+        batch = MagicMock(side_effect=lambda paths: {p: {} for p in paths})
+        monkeypatch.setitem(lint_queue.BATCH_LINTERS, "python", batch)
+        monkeypatch.setitem(lint_queue.FORMATTERS, "python", lambda path, content: content)
+
+        assert lint_queue.run_worker(queue_path) == 0
+
+        batch.assert_called_once_with(files)
+        state = json.loads(queue_path.read_text())
+        assert state["pending"] == {}
+        assert sorted(state["results"]) == sorted(str(p) for p in files)
+
+    def test_file_edited_since_queueing_is_not_linted(self, queue_path: Path, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(lint_queue, "QUIET_WINDOW_S", 0.0)
+        src = tmp_path / "a.py"
+        src.write_text("x = 1\n")
+        with lint_queue.locked_queue(queue_path) as state:
+            state["pending"][str(src)] = {"language": "python", "hash": "old", "queued_at": 0.0}
+        batch = MagicMock(return_value={})
+        monkeypatch.setitem(lint_queue.BATCH_LINTERS, "python", batch)
+
+        lint_queue.run_worker(queue_path)
+
+        batch.assert_not_called()
+        assert json.loads(queue_path.read_text())["results"] == {}
+
+    def test_formatted_content_is_written_back(self, queue_path: Path, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(lint_queue, "QUIET_WINDOW_S", 0.0)
+        src = tmp_path / "a.py"
+        src.write_text("x=1\n")
+        with lint_queue.locked_queue(queue_path) as state:
+            state["pending"][str(src)] = {"language": "python", "hash": lint_queue.content_hash(src), "queued_at": 0.0}
+        monkeypatch.setitem(lint_queue.FORMATTERS, "python", lambda path, content: "x = 1\n")
+        monkeypatch.setitem(lint_queue.BATCH_LINTERS, "python", lambda paths: {p: {} for p in paths})
+
+        lint_queue.run_worker(queue_path)
+
+        assert src.read_text() == "x = 1\n"
+        state = json.loads(queue_path.read_text())
+        assert state["results"][str(src)]["hash"] == lint_queue.content_hash(src)
+
+    def test_edit_during_formatting_is_not_overwritten(self, queue_path: Path, tmp_path: Path, monkeypatch) -> None:
+        monkeypatch.setattr(lint_queue, "QUIET_WINDOW_S", 0.0)
+        src = tmp_path / "a.py"
+        src.write_text("x=1\n")
+        with lint_queue.locked_queue(queue_path) as state:
+            state["pending"][str(src)] = {"language": "python", "hash": lint_queue.content_hash(src), "queued_at": 0.0}
+
+        def format_while_agent_edits(path: Path, content: str) -> str:
+            path.write_text("x = 2  # agent edit\n")
+            return "x = 1\n"
+
+        batch = MagicMock(return_value={})
+        monkeypatch.setitem(lint_queue.FORMATTERS, "python", format_while_agent_edits)
+        monkeypatch.setitem(lint_queue.BATCH_LINTERS, "python", batch)
+
+        lint_queue.run_worker(queue_path)
+
+        assert src.read_text() == "x = 2  # agent edit\n"
+        batch.assert_not_called()
+
+
+class TestStopReport:
+    """Results of coalesced edits are reported before the session stops."""
+
+    def test_reports_results_left_in_queue(self, queue_path: Path, tmp_path: Path, capsys) -> None:
+        src = tmp_path / "app.py"
+        src.write_text("import os\n")
+        diagnostics = [{"code": "F401", "line": 1, "column": 8, "message": "unused", "fixable": False}]
+        with lint_queue.locked_queue(queue_path) as state:
+            state["results"][str(src)] = {
+                "language": "python",
+                "hash": lint_queue.content_hash(src),
+                "results": {"ruff": [1, diagnostics]},
+            }
+
+        with patch("lint_queue.read_hook_stdin", return_value={}):
+            assert lint_queue.run_stop_report() == 2
+
+        assert "F401" in capsys.readouterr().err
+
+    def test_nothing_to_report_lets_the_session_stop(self, queue_path: Path) -> None:
+        with lint_queue.locked_queue(queue_path):
+            pass
+
+        with patch("lint_queue.read_hook_stdin", return_value={}):
+            assert lint_queue.run_stop_report() == 0
+
+    def test_skipped_when_stop_hook_already_active(self, queue_path: Path) -> None:
+        with (
+            patch("lint_queue.read_hook_stdin", return_value={"stop_hook_active": True}),
+            patch.object(lint_queue, "report_ready") as mock_report,
+        ):
+            assert lint_queue.run_stop_report() == 0
+
+        mock_report.assert_not_called()
+
+
+class TestFileCheckerIntegration:
+    """file_checker defers burst edits instead of checking each one."""
+
+    def test_second_rapid_edit_is_deferred(self, queue_path: Path, tmp_path: Path) -> None:
+        from file_checker import check_file
+
+        src = tmp_path / "app.py"
+        src.write_text("x = 1\n")
+
+        with (
+            patch("file_checker.check_python", return_value=(2, "")) as mock_check,
+            patch.object(lint_queue, "spawn_worker") as mock_spawn,
+        ):
+            first = check_file(src)
+            second = check_file(src)
+
+        assert first == (2, "")
+        assert second == (0, "")
+        mock_check.assert_called_once()
+        mock_spawn.assert_called_once_with(queue_path)
+
+    def test_test_files_are_never_queued(self, queue_path: Path, tmp_path: Path) -> None:
+        src = tmp_path / "test_app.py"
+        src.write_text("x = 1\n")
+
+        assert lint_queue.coalesce(src, "python") is None
+        assert lint_queue.coalesce(src, "python") is None
+
+
+class TestBatchLinters:
+    """Batched tool output is attributed back to each file."""
+
+    def test_python_batch_splits_ruff_report_by_file(self, tmp_path: Path, uncached_toolchain) -> None:
+        a, b = tmp_path / "a.py", tmp_path / "b.py"
+        report = [
+            {"code": "F401", "filename": str(a), "location": {"row": 1, "column": 8}, "message": "unused", "fix": None}
+        ]
+        calls = []
+
+        def run_side_effect(cmd, **_kwargs):
+            calls.append(cmd)
+            return MagicMock(returncode=1, stdout=json.dumps(report), stderr="")
+
+        with (
+            patch("_checkers.python.shutil.which", return_value="/usr/bin/ruff"),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
+        ):
+            results = lint_python_batch([a, b])
+
+        assert len(calls) == 1
+        assert str(a) in calls[0] and str(b) in calls[0]
+        assert "--fix" not in calls[0]
+        assert results[a]["ruff"][0] == 1
+        assert results[b] == {}
+
+    def test_go_output_attributed_by_path(self, tmp_path: Path) -> None:
+        a, b = (tmp_path / "a.go").resolve(), (tmp_path / "b.go").resolve()
+        targets: dict[Path, dict] = {a: {}, b: {}}
+        output = f"# example.com/pkg\n{a}:3:2: unreachable code\n{b}:7:1: bad printf\n  context line\n"
+
+        _attribute_go_output(output, targets, "vet", skip_headers=True)
+
+        assert targets[a]["vet"] == (1, [f"{a}:3:2: unreachable code"])
+        assert targets[b]["vet"] == (1, [f"{b}:7:1: bad printf", "context line"])
@@ -0,0 +1,231 @@
+"""Tests for warm language server type checking."""
+
+from __future__ import annotations
+
+import os
+import sys
+import textwrap
+import threading
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from _checkers import lsp, lsp_server
+from _checkers.lsp_server import LanguageServerSession, text_change
+from _checkers.python import check_python
+
+FAKE_SERVER = textwrap.dedent(
+    """
+    import json, sys
+
+    def read():
+        length = None
+        while True:
+            line = sys.stdin.buffer.readline()
+            if not line:
+                sys.exit(0)
+            if not line.strip():
+                break
+            name, _, value = line.decode().partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        return json.loads(sys.stdin.buffer.read(length))
+
+    def send(message):
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode()
+        sys.stdout.buffer.write(b"Content-Length: %d\\r\\n\\r\\n" % len(body) + body)
+        sys.stdout.buffer.flush()
+
+    def offset(text, position):
+        lines = text.split("\\n")
+        return sum(len(line) + 1 for line in lines[: position["line"]]) + position["character"]
+
+    documents = {}
+    while True:
+        message = read()
+        method = message.get("method")
+        if method == "initialize":
+            send({"id": message["id"], "result": {"capabilities": {"textDocumentSync": {"change": 2}}}})
+        elif method == "shutdown":
+            send({"id": message["id"], "result": None})
+        elif method == "exit":
+            sys.exit(0)
+        elif method in ("textDocument/didOpen", "textDocument/didChange"):
+            doc = message["params"]["textDocument"]
+            if method == "textDocument/didOpen":
+                documents[doc["uri"]] = doc["text"]
+            else:
+                text = documents[doc["uri"]]
+                for change in message["params"]["contentChanges"]:
+                    start = offset(text, change["range"]["start"])
+                    end = offset(text, change["range"]["end"])
+                    text = text[:start] + change["text"] + text[end:]
+                documents[doc["uri"]] = text
+            text = documents[doc["uri"]]
+            diagnostics = [
+                {"range": {"start": {"line": n, "character": 0}}, "severity": 1, "code": "bad", "message": "bad call"}
+                for n, line in enumerate(text.splitlines())
+                if "bad" in line
+            ]
+            send({"method": "textDocument/publishDiagnostics",
+                  "params": {"uri": doc["uri"], "version": doc["version"], "diagnostics": diagnostics}})
+            dependent = [{"range": {"start": {"line": 0, "character": 0}}, "severity": 1, "message": "broken import"}]
+            send({"method": "textDocument/publishDiagnostics",
+                  "params": {"uri": "file:///proj/dep.py", "diagnostics": dependent if "remove_api" in text else []}})
+    """
+)
+
+
+@pytest.fixture
+def fake_server(tmp_path):
+    script = tmp_path / "fake_lsp.py"
+    script.write_text(FAKE_SERVER)
+    return [sys.executable, str(script)]
+
+
+@pytest.fixture
+def session(fake_server, tmp_path):
+    session = LanguageServerSession(fake_server, tmp_path)
+    assert session.initialize(timeout=10)
+    yield session
+    session.close()
+
+
+def _record_notifications(session: LanguageServerSession) -> list[tuple[str, dict]]:
+    sent: list[tuple[str, dict]] = []
+    notify = session.notify
+
+    def record(method: str, params: dict) -> None:
+        sent.append((method, params))
+        notify(method, params)
+
+    session.notify = record
+    return sent
+
+
+class TestTextChange:
+    """Edits are sent as a single range replacement."""
+
+    def test_replacement_in_middle(self):
+        change = text_change("a\nbcd\ne\n", "a\nbXd\ne\n")
+
+        assert change == {
+            "range": {"start": {"line": 1, "character": 1}, "end": {"line": 1, "character": 2}},
+            "text": "X",
+        }
+
+    def test_columns_count_utf16_units(self):
+        change = text_change("s = '😀a'\n", "s = '😀b'\n")
+
+        assert change["range"]["start"] == {"line": 0, "character": 7}
+
+    def test_append(self):
+        change = text_change("x = 1\n", "x = 1\ny = 2\n")
+
+        assert change["range"]["start"] == change["range"]["end"] == {"line": 1, "character": 0}
+        assert change["text"] == "y = 2\n"
+
+
+class TestSession:
+    """Diagnostics come back for the synced version; dependents only when new."""
+
+    def test_reports_edited_file_after_incremental_change(self, session, tmp_path):
+        path = str(tmp_path / "app.py")
+
+        first = session.check(path, "x = 1\n", timeout=5)
+        second = session.check(path, "x = 1\nbad()\n", timeout=5)
+
+        assert first["diagnostics"] == []
+        assert [(d["line"], d["code"]) for d in second["diagnostics"]] == [(2, "bad")]
+        assert session.documents[Path(path).as_uri()][0] == 2
+
+    def test_new_dependent_errors_are_reported_once(self, session, tmp_path):
+        path = str(tmp_path / "api.py")
+
+        broken = session.check(path, "def api(): ...\nremove_api = True\n", timeout=5)
+        again = session.check(path, "def api(): ...\nremove_api = True  \n", timeout=5)
+
+        assert [(d["file"], d["message"]) for d in broken["dependents"]] == [("/proj/dep.py", "broken import")]
+        assert again["dependents"] == []
+
+    def test_least_recently_checked_document_is_closed(self, session, tmp_path, monkeypatch):
+        monkeypatch.setattr(lsp_server, "MAX_OPEN_DOCUMENTS", 2)
+        sent = _record_notifications(session)
+        first, second, third = (str(tmp_path / f"m{n}.py") for n in range(3))
+
+        for path in (first, second, first, third):
+            session.check(path, "x = 1\n", timeout=5)
+
+        assert list(session.documents) == [Path(first).as_uri(), Path(third).as_uri()]
+        assert ("textDocument/didClose", {"textDocument": {"uri": Path(second).as_uri()}}) in sent
+
+    def test_document_changed_on_disk_is_closed_and_announced(self, session, tmp_path):
+        sent = _record_notifications(session)
+        module = tmp_path / "mod.py"
+        module.write_text("x = 1\n")
+        session.check(str(module), "x = 1\n", timeout=5)
+        module.write_text("x = 2\n")
+        os.utime(module, ns=(0, 0))
+
+        session.check(str(tmp_path / "app.py"), "y = 1\n", timeout=5)
+
+        uri = module.as_uri()
+        assert uri not in session.documents
+        assert ("textDocument/didClose", {"textDocument": {"uri": uri}}) in sent
+        assert ("workspace/didChangeWatchedFiles", {"changes": [{"uri": uri, "type": 2}]}) in sent
+
+
+class TestCheckTypes:
+    """The hook-side client is opt-in and falls back while the server starts."""
+
+    def test_disabled_by_default(self, tmp_path, monkeypatch):
+        monkeypatch.delenv("PILOT_TYPE_CHECK", raising=False)
+        with patch.object(lsp, "spawn_server") as mock_spawn:
+            assert lsp.check_types("python", tmp_path, tmp_path / "a.py", "bad()\n") == {}
+        mock_spawn.assert_not_called()
+
+    def test_spawns_server_when_not_running(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TYPE_CHECK", "1")
+        with (
+            patch.object(lsp, "get_server_socket_path", return_value=tmp_path / "none.sock"),
+            patch.object(lsp, "spawn_server") as mock_spawn,
+        ):
+            assert lsp.check_types("python", tmp_path, tmp_path / "a.py", "x = 1\n") == {}
+        mock_spawn.assert_called_once_with("python", tmp_path)
+
+    def test_round_trip_through_warm_server(self, fake_server, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TYPE_CHECK", "1")
+        socket_path = tmp_path / "lsp.sock"
+        thread = threading.Thread(target=lsp_server.serve, args=(tmp_path, socket_path, 5.0, fake_server), daemon=True)
+        thread.start()
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+
+        with patch.object(lsp, "get_server_socket_path", return_value=socket_path):
+            result = lsp.check_types("python", tmp_path, tmp_path / "a.py", "bad()\n")
+
+        count, diagnostics = result["type errors"]
+        assert count == 1
+        assert diagnostics[0]["message"] == "bad call"
+
+
+class TestCheckerIntegration:
+    """Type errors are reported alongside the linters' results."""
+
+    def test_python_reports_type_errors(self, tmp_path, capsys, uncached_toolchain):
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x: int = 'a'\n")
+        error = {"file": str(py_file.resolve()), "line": 1, "column": 10, "code": "assignment", "message": "bad type"}
+
+        with (
+            patch("_checkers.python.shutil.which", return_value=None),
+            patch("_checkers.python.check_types", return_value={"type errors": (1, [error])}),
+        ):
+            exit_code, reason = check_python(py_file)
+
+        assert exit_code == 2
+        assert reason == "Python: 1 type errors in app.py"
+        assert "app.py:1:10 assignment: bad type" in capsys.readouterr().err
@@ -0,0 +1,183 @@
+"""Tests for the consolidated PostToolUse dispatcher."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from io import StringIO
+from pathlib import Path
+from unittest.mock import patch
+
+from post_tool_use import CheckResult, build_context, merge_results, run_checks, run_post_tool_use, select_checks
+
+
+def _event(tool_name: str, file_path: Path | None = None) -> dict:
+    tool_input = {"file_path": str(file_path)} if file_path else {}
+    return {"tool_name": tool_name, "tool_input": tool_input}
+
+
+class TestSelectChecks:
+    """Checks are chosen by tool name."""
+
+    def test_edit_runs_all_checks(self, tmp_path):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Edit", tmp_path / "app.py"))
+
+        names = [name for name, _ in select_checks(ctx)]
+
+        assert names == ["file_checker", "tdd_enforcer", "context_monitor"]
+
+    def test_read_runs_only_context_monitor(self):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Read"))
+
+        assert [name for name, _ in select_checks(ctx)] == ["context_monitor"]
+
+    def test_unknown_tool_runs_nothing(self):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("WebSearch"))
+
+        assert select_checks(ctx) == []
+
+
+class TestBuildContext:
+    """Shared context is resolved once per event."""
+
+    def test_resolves_git_root_once(self, tmp_path):
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+
+        with patch("post_tool_use.find_git_root", return_value=tmp_path) as mock_root:
+            ctx = build_context(_event("Write", py_file))
+
+        mock_root.assert_called_once()
+        assert ctx.git_root == tmp_path
+        assert ctx.file_snapshot is not None
+
+    def test_missing_file_has_no_snapshot(self, tmp_path):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Write", tmp_path / "missing.py"))
+
+        assert ctx.file_snapshot is None
+
+    def test_only_checked_edits_load_a_snapshot(self, tmp_path):
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        notes = tmp_path / "notes.md"
+        notes.write_text("# notes\n")
+
+        with (
+            patch("post_tool_use.find_git_root", return_value=None),
+            patch("post_tool_use.FileSnapshot.load") as load,
+        ):
+            read_ctx = build_context(_event("Read", py_file))
+            doc_ctx = build_context(_event("Write", notes))
+
+        load.assert_not_called()
+        assert read_ctx.file_snapshot is None
+        assert doc_ctx.file_snapshot is None
+
+
+class TestRunChecks:
+    """Checks run concurrently with per-check stderr capture."""
+
+    def test_checks_run_concurrently(self):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Read"))
+        barrier = threading.Barrier(2, timeout=5)
+
+        def check(_ctx):
+            barrier.wait()
+            return 0, ""
+
+        start = time.monotonic()
+        results = run_checks(ctx, [("a", check), ("b", check)])
+
+        assert [r.name for r in results] == ["a", "b"]
+        assert time.monotonic() - start < 5
+
+    def test_stderr_is_captured_per_check_in_order(self):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Read"))
+
+        def slow(_ctx):
+            time.sleep(0.05)
+            print("slow", file=sys.stderr)
+            return 0, ""
+
+        def fast(_ctx):
+            print("fast", file=sys.stderr)
+            return 2, ""
+
+        results = run_checks(ctx, [("slow", slow), ("fast", fast)])
+
+        assert [r.stderr for r in results] == ["slow\n", "fast\n"]
+
+    def test_crashing_check_reports_traceback(self):
+        with patch("post_tool_use.find_git_root", return_value=None):
+            ctx = build_context(_event("Read"))
+
+        def boom(_ctx):
+            raise RuntimeError("boom")
+
+        (result,) = run_checks(ctx, [("boom", boom)])
+
+        assert result.exit_code == 1
+        assert "RuntimeError: boom" in result.stderr
+
+
+class TestMergeResults:
+    """Decisions and exit codes merge into one response."""
+
+    def test_block_reason_wins(self):
+        results = [
+            CheckResult("file_checker", 2, "Python: 1 ruff in app.py", "ruff\n"),
+            CheckResult("tdd_enforcer", 2, "", "tdd\n"),
+            CheckResult("context_monitor", 0, "", ""),
+        ]
+
+        exit_code, decision, stderr = merge_results(results)
+
+        assert exit_code == 2
+        assert decision == {"decision": "block", "reason": "Python: 1 ruff in app.py"}
+        assert stderr == "ruff\ntdd\n"
+
+    def test_empty_decision_when_file_checked_clean(self):
+        exit_code, decision, _ = merge_results([CheckResult("file_checker", 2, "", "ok\n")])
+
+        assert exit_code == 2
+        assert decision == {}
+
+    def test_no_decision_without_file_check(self):
+        _, decision, _ = merge_results([CheckResult("context_monitor", 0, "", "")])
+
+        assert decision is None
+
+
+class TestRunPostToolUse:
+    """End-to-end dispatch from stdin."""
+
+    def test_edit_merges_all_checks(self, tmp_path, monkeypatch, capsys):
+        py_file = tmp_path / "app.py"
+        py_file.write_text("x = 1\n")
+        monkeypatch.setattr("sys.stdin", StringIO(json.dumps(_event("Edit", py_file))))
+
+        with (
+            patch("post_tool_use.find_git_root", return_value=None),
+            patch("post_tool_use.check_file", return_value=(2, "Python: 1 ruff in app.py")),
+            patch("post_tool_use.check_tdd", return_value=0),
+            patch("post_tool_use.run_context_monitor", return_value=0),
+        ):
+            exit_code = run_post_tool_use()
+
+        captured = capsys.readouterr()
+        assert exit_code == 2
+        assert json.loads(captured.out)["decision"] == "block"
+
+    def test_empty_stdin_is_noop(self, monkeypatch, capsys):
+        monkeypatch.setattr("sys.stdin", StringIO(""))
+
+        assert run_post_tool_use() == 0
+        assert capsys.readouterr().out == ""
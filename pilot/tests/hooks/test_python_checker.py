@@ -2,10 +2,20 @@
 
 from __future__ import annotations
 
+import json
+import shutil
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
-from _checkers.python import check_python, strip_python_comments
+import pytest
+from _checkers.python import check_python, run_ruff_pipeline, strip_python_comments
+
+pytestmark = pytest.mark.usefixtures("uncached_toolchain")
+
+
+def _ruff_diagnostic(code: str, row: int, column: int, message: str, fixable: bool = False) -> dict:
+    fix = {"applicability": "safe", "edits": [], "message": "fix"} if fixable else None
+    return {"code": code, "location": {"row": row, "column": column}, "message": message, "fix": fix}
 
 
 class TestStripPythonComments:
@@ -105,6 +115,92 @@ class TestStripPythonComments:
         assert result is False
 
 
+class TestEditScopedStripping:
+    """With an Edit's tool_input only the lines it wrote are stripped."""
+
+    def test_only_edited_lines_are_stripped(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text("a = 1  # keep\nb = [\n    2,  # new\n]\n")
+
+        result = strip_python_comments(py_file, {"old_string": "    2,\n", "new_string": "    2,  # new\n"})
+
+        assert result is True
+        assert py_file.read_text() == "a = 1  # keep\nb = [\n    2,\n]\n"
+
+    def test_multi_edit_strips_every_edit(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text("def f():\n    x = 1  # one\n    # two\n    return x\ny = 2  # keep\n")
+        edits = [{"old_string": "x = 1", "new_string": "x = 1  # one"}, {"old_string": "", "new_string": "    # two\n"}]
+
+        strip_python_comments(py_file, {"edits": edits})
+
+        assert py_file.read_text() == "def f():\n    x = 1\n    return x\ny = 2  # keep\n"
+
+    def test_write_strips_whole_file(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text("a = 1  # one\nb = 2  # two\n")
+
+        strip_python_comments(py_file, {"content": "a = 1  # one\nb = 2  # two\n"})
+
+        assert py_file.read_text() == "a = 1\nb = 2\n"
+
+    def test_edit_inside_docstring_falls_back_to_full_pass(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        source = 'def f():\n    """Usage:\n\n    run  # not a comment\n    """\n'
+        py_file.write_text(source)
+
+        result = strip_python_comments(py_file, {"old_string": "run", "new_string": "run  # not a comment"})
+
+        assert result is False
+        assert py_file.read_text() == source
+
+    def test_triple_quote_inside_string_does_not_hide_docstring(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        source = 'QUOTE = \'"""\'\nUSAGE = """\nrun  # not a comment\n"""\n'
+        py_file.write_text(source)
+
+        result = strip_python_comments(py_file, {"old_string": "run", "new_string": "run  # not a comment"})
+
+        assert result is False
+        assert py_file.read_text() == source
+
+    def test_definition_text_inside_docstring_is_not_a_resync_point(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        source = 'USAGE = """\ndef example():\n    run  # not a comment\n"""\n'
+        py_file.write_text(source)
+
+        result = strip_python_comments(py_file, {"old_string": "run", "new_string": "run  # not a comment"})
+
+        assert result is False
+        assert py_file.read_text() == source
+
+    def test_docstring_after_last_definition_is_still_detected(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        source = '"""Module."""\n\n\ndef f():\n    """Usage:\n\n    run  # not a comment\n    """\n'
+        py_file.write_text(source)
+
+        result = strip_python_comments(py_file, {"old_string": "run", "new_string": "run  # not a comment"})
+
+        assert result is False
+        assert py_file.read_text() == source
+
+    def test_edit_after_docstring_is_stripped(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text('"""Module."""\n\na = 1  # keep\nb = 2  # new\n')
+
+        strip_python_comments(py_file, {"old_string": "b = 2", "new_string": "b = 2  # new"})
+
+        assert py_file.read_text() == '"""Module."""\n\na = 1  # keep\nb = 2\n'
+
+    def test_missing_replacement_text_falls_back_to_full_pass(self, tmp_path: Path) -> None:
+        py_file = tmp_path / "app.py"
+        py_file.write_text("a = 1  # one\n")
+
+        strip_python_comments(py_file, {"old_string": "x", "new_string": "y  # gone"})
+
+        assert py_file.read_text() == "a = 1\n"
+
+
 class TestCheckPythonTestFileSkip:
     """Test files should skip validation."""
 
@@ -158,19 +254,21 @@ class TestCheckPythonRuffIssues:
         py_file = tmp_path / "app.py"
         py_file.write_text("x = 1\n")
 
-        mock_format = MagicMock(returncode=0, stdout="", stderr="")
-        mock_fix = MagicMock(returncode=0, stdout="", stderr="")
+        mock_format = MagicMock(returncode=0, stdout="x = 1\n", stderr="")
         mock_check = MagicMock(
             returncode=1,
-            stdout="app.py:1:1: F401 unused import\napp.py:2:1: E302 expected 2 blank lines\n",
-            stderr="",
+            stdout="x = 1\n",
+            stderr=json.dumps(
+                [
+                    _ruff_diagnostic("F401", 1, 1, "unused import"),
+                    _ruff_diagnostic("E302", 2, 1, "expected 2 blank lines"),
+                ]
+            ),
         )
 
         def run_side_effect(cmd, **kwargs):
             if "format" in cmd:
                 return mock_format
-            if "--select" in cmd:
-                return mock_fix
             return mock_check
 
         def which_side_effect(name):
@@ -182,7 +280,7 @@ class TestCheckPythonRuffIssues:
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
             patch("_checkers.python.shutil.which", side_effect=which_side_effect),
-            patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_python(py_file)
 
@@ -205,7 +303,7 @@ class TestCheckPythonRuffIssues:
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
             patch("_checkers.python.shutil.which", side_effect=which_side_effect),
-            patch("_checkers.python.subprocess.run", return_value=mock_result),
+            patch("_checkers.runner.subprocess.run", return_value=mock_result),
         ):
             exit_code, reason = check_python(py_file)
 
@@ -235,9 +333,78 @@ class TestCheckPythonRuffOnly:
             patch("_checkers.python.strip_python_comments"),
             patch("_checkers.python.check_file_length"),
             patch("_checkers.python.shutil.which", side_effect=which_side_effect),
-            patch("_checkers.python.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
         ):
             check_python(py_file)
 
         invoked_binaries = [cmd[0] for cmd in called_commands]
         assert not any("basedpyright" in b for b in invoked_binaries)
+
+
+class TestRuffPipeline:
+    """Fix, lint and format run in two stdin invocations with JSON output."""
+
+    def test_two_invocations_and_single_write(self, tmp_path: Path) -> None:
+        """Fixed source is piped into format and written back once; diagnostics are structured."""
+        py_file = tmp_path / "app.py"
+        py_file.write_text("import sys\nimport os\nx=1\n")
+        calls: list[tuple[list[str], str]] = []
+
+        def run_side_effect(cmd, input=None, **_kwargs):
+            calls.append((cmd, input))
+            if "format" in cmd:
+                return MagicMock(returncode=0, stdout="import os\nimport sys\n\nx = 1\n", stderr="")
+            diagnostic = _ruff_diagnostic("F401", 1, 8, "`os` imported but unused", fixable=True)
+            return MagicMock(returncode=1, stdout="import os\nimport sys\nx=1\n", stderr=json.dumps([diagnostic]))
+
+        with (
+            patch("_checkers.python.check_file_length"),
+            patch("_checkers.python.shutil.which", return_value="/usr/bin/ruff"),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
+        ):
+            exit_code, reason = check_python(py_file)
+
+        assert len(calls) == 2
+        assert "check" in calls[0][0]
+        assert "--output-format=json" in calls[0][0]
+        assert calls[0][1] == "import sys\nimport os\nx=1\n"
+        assert "format" in calls[1][0]
+        assert calls[1][1] == "import os\nimport sys\nx=1\n"
+        assert py_file.read_text() == "import os\nimport sys\n\nx = 1\n"
+        assert (exit_code, reason) == (2, "Python: 1 ruff in app.py")
+
+    def test_structured_diagnostics(self, tmp_path: Path) -> None:
+        """Diagnostics carry code, line, column, message and fix availability."""
+        report = "warning: something\n" + json.dumps(
+            [_ruff_diagnostic("F401", 3, 8, "unused", fixable=True), _ruff_diagnostic(None, 5, 1, "bad syntax")]
+        )
+
+        with patch(
+            "_checkers.runner.subprocess.run", return_value=MagicMock(returncode=1, stdout="x = 1\n", stderr=report)
+        ):
+            content, diagnostics = run_ruff_pipeline("/usr/bin/ruff", tmp_path / "app.py", "x = 1\n")
+
+        assert content == "x = 1\n"
+        assert diagnostics == [
+            {"code": "F401", "line": 3, "column": 8, "message": "unused", "fixable": True},
+            {"code": "invalid-syntax", "line": 5, "column": 1, "message": "bad syntax", "fixable": False},
+        ]
+
+    @pytest.mark.skipif(shutil.which("ruff") is None, reason="ruff not installed")
+    def test_sorts_imports_when_project_does_not_select_them(self, tmp_path: Path) -> None:
+        """Import and __all__ sorting apply even if the project's ruff config selects neither."""
+        (tmp_path / "pyproject.toml").write_text('[tool.ruff.lint]\nselect = ["E", "F"]\n')
+        source = 'import sys\nimport os\n\n__all__ = ["b", "a"]\n\na = b = 1\nprint(os, sys)\n'
+
+        content, diagnostics = run_ruff_pipeline(shutil.which("ruff"), tmp_path / "app.py", source)
+
+        assert content == 'import os\nimport sys\n\n__all__ = ["a", "b"]\n\na = b = 1\nprint(os, sys)\n'
+        assert diagnostics == []
+
+    def test_failed_format_keeps_content(self, tmp_path: Path) -> None:
+        """A ruff failure never truncates the file."""
+        with patch("_checkers.runner.subprocess.run", return_value=MagicMock(returncode=2, stdout="", stderr="")):
+            content, diagnostics = run_ruff_pipeline("/usr/bin/ruff", tmp_path / "app.py", "x = 1\n")
+
+        assert content == "x = 1\n"
+        assert diagnostics == []
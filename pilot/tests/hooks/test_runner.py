@@ -0,0 +1,189 @@
+"""Tests for budgeted checker tool execution."""
+
+from __future__ import annotations
+
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from _checkers import runner
+from _checkers.go import check_go
+from _checkers.runner import Budget, Tool
+
+
+class TestBudget:
+    """Tools run within the remaining budget or are skipped with a reason."""
+
+    def test_runs_tool_and_learns_cost(self) -> None:
+        budget = Budget(10.0)
+
+        run = budget.run("echo", [sys.executable, "-c", "print('hi')"])
+
+        assert run.completed
+        assert run.stdout.strip() == "hi"
+        assert "echo" in runner.load_costs()
+
+    def test_skips_tool_expected_to_exceed_budget(self) -> None:
+        budget = Budget(1.0)
+
+        with patch("_checkers.runner.subprocess.run") as mock_run:
+            run = budget.run("golangci-lint", ["golangci-lint", "run"])
+
+        mock_run.assert_not_called()
+        assert run.skipped.startswith("over budget")
+        assert budget.skipped == [run]
+
+    def test_kills_tool_that_runs_past_budget(self) -> None:
+        runner.record_cost("sleeper", 0.1)
+        budget = Budget(0.5)
+
+        run = budget.run("sleeper", [sys.executable, "-c", "import time; time.sleep(5)"])
+
+        assert run.skipped.startswith("timed out")
+        assert runner.estimated_cost("sleeper") >= 0.5
+
+    def test_timed_out_tool_is_skipped_next_time(self) -> None:
+        runner.record_cost("sleeper", 0.1)
+        Budget(0.5).run("sleeper", [sys.executable, "-c", "import time; time.sleep(5)"])
+
+        with patch("_checkers.runner.subprocess.run") as mock_run:
+            run = Budget(0.5).run("sleeper", ["sleeper"])
+
+        mock_run.assert_not_called()
+        assert run.skipped.startswith("over budget")
+
+    def test_skipped_tool_cost_decays_towards_default(self) -> None:
+        runner.record_cost("golangci-lint", 60.0)
+
+        with patch("_checkers.runner.subprocess.run", return_value=MagicMock(returncode=0, stdout="", stderr="")):
+            for _ in range(20):
+                Budget(10.0).run("golangci-lint", ["golangci-lint", "run"])
+
+        assert runner.estimated_cost("golangci-lint") < 10.0
+
+    def test_missing_binary_is_skipped(self, tmp_path: Path) -> None:
+        run = Budget(10.0).run("ghost", [str(tmp_path / "ghost")])
+
+        assert run.skipped.startswith("failed to start")
+
+
+class TestOrdering:
+    """Analyzers are ordered by value per expected second."""
+
+    def test_cheaper_tool_of_equal_value_first(self) -> None:
+        runner.record_cost("slow", 5.0)
+        runner.record_cost("fast", 0.5)
+
+        assert runner.order_by_value([("slow", 1.0), ("fast", 1.0)]) == ["fast", "slow"]
+
+    def test_costs_are_kept_per_project_root(self, tmp_path: Path) -> None:
+        runner.record_cost("eslint", 30.0, tmp_path / "big")
+
+        assert runner.estimated_cost("eslint", project_root=tmp_path / "big") == 30.0
+        assert runner.estimated_cost("eslint", project_root=tmp_path / "small") == runner.DEFAULT_COSTS_S["eslint"]
+
+    def test_learned_cost_moves_towards_new_samples(self) -> None:
+        runner.record_cost("tool", 1.0)
+        runner.record_cost("tool", 2.0)
+
+        assert 1.0 < runner.estimated_cost("tool") < 2.0
+
+
+class TestRunAll:
+    """Mutating tools run serially first; read-only analyzers run concurrently."""
+
+    def test_analyzers_overlap(self) -> None:
+        for name in ("a", "b", "c"):
+            runner.record_cost(name, 0.1)
+        tools = [Tool(name, [sys.executable, "-c", "import time; time.sleep(0.5)"]) for name in ("a", "b", "c")]
+
+        budget = Budget(10.0)
+        start = time.monotonic()
+        runs = budget.run_all(tools)
+        elapsed = time.monotonic() - start
+
+        assert all(run.completed for run in runs.values())
+        assert elapsed < 1.2
+
+    def test_mutating_tools_finish_before_analyzers_start(self) -> None:
+        events: list[str] = []
+        lock = threading.Lock()
+
+        def run_side_effect(cmd, **_kwargs):
+            with lock:
+                events.append(f"start {cmd[0]}")
+            time.sleep(0.05)
+            with lock:
+                events.append(f"end {cmd[0]}")
+            return MagicMock(returncode=0, stdout="", stderr="")
+
+        tools = [
+            Tool("vet", ["vet"]),
+            Tool("fmt", ["fmt"], mutating=True),
+            Tool("lint", ["lint"]),
+            Tool("fix", ["fix"], mutating=True),
+        ]
+        with patch("_checkers.runner.subprocess.run", side_effect=run_side_effect):
+            Budget(10.0).run_all(tools)
+
+        assert events[:4] == ["start fmt", "end fmt", "start fix", "end fix"]
+
+    def test_runs_keyed_in_declaration_order(self) -> None:
+        delays = {"slow": 0.2, "fast": 0.0}
+
+        def run_side_effect(cmd, **_kwargs):
+            time.sleep(delays[cmd[0]])
+            return MagicMock(returncode=0, stdout=cmd[0], stderr="")
+
+        tools = [Tool("slow", ["slow"], value=1.0), Tool("fast", ["fast"], value=5.0)]
+        with patch("_checkers.runner.subprocess.run", side_effect=run_side_effect):
+            runs = Budget(10.0).run_all(tools)
+
+        assert list(runs) == ["slow", "fast"]
+        assert [run.stdout for run in runs.values()] == ["slow", "fast"]
+
+
+class TestRunLog:
+    """Every check records which tools ran and which were skipped."""
+
+    def test_skips_are_logged_and_printed(self, tmp_path: Path, capsys) -> None:
+        budget = Budget(0.0)
+        budget.run("eslint", ["eslint"])
+
+        budget.report(tmp_path / "app.ts", "typescript")
+
+        entry = json.loads(runner.get_run_log_path().read_text().splitlines()[-1])
+        assert entry["language"] == "typescript"
+        assert entry["skipped"][0]["tool"] == "eslint"
+        assert "over budget" in entry["skipped"][0]["reason"]
+        assert "Skipped eslint" in capsys.readouterr().err
+
+
+class TestGoBudget:
+    """A slow golangci-lint is skipped without dropping go vet results."""
+
+    def test_golangci_lint_skipped_when_over_budget(self, tmp_path: Path, monkeypatch, uncached_toolchain) -> None:
+        go_file = tmp_path / "main.go"
+        go_file.write_text("package main\n")
+        monkeypatch.setattr(runner, "DEFAULT_COSTS_S", {**runner.DEFAULT_COSTS_S, "golangci-lint": 999.0})
+        called: list[list[str]] = []
+
+        def run_side_effect(cmd, **_kwargs):
+            called.append(cmd)
+            return MagicMock(returncode=0, stdout="", stderr="")
+
+        with (
+            patch("_checkers.go.check_file_length"),
+            patch("_checkers.go.shutil.which", side_effect=lambda name: f"/usr/bin/{name}"),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
+        ):
+            exit_code, reason = check_go(go_file)
+
+        assert (exit_code, reason) == (2, "")
+        assert not any("golangci-lint" in cmd[0] for cmd in called)
+        assert any(cmd[1:2] == ["vet"] for cmd in called)
+        entry = json.loads(runner.get_run_log_path().read_text().splitlines()[-1])
+        assert [s["tool"] for s in entry["skipped"]] == ["golangci-lint"]
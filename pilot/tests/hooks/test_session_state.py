@@ -0,0 +1,130 @@
+"""Tests for the transactional session state store."""
+
+from __future__ import annotations
+
+import json
+import multiprocessing
+import sqlite3
+
+import _session_state
+import pytest
+from _session_state import STATE_FILE, SessionState, get_session_dir, load_state, update_state
+
+
+@pytest.fixture
+def session_dir(tmp_path):
+    return tmp_path / "sessions" / "test-session"
+
+
+def _increment(session_dir, times):
+    for _ in range(times):
+        with update_state(session_dir) as state:
+            state.context_cache["count"] = state.context_cache.get("count", 0) + 1
+
+
+def test_session_dir_from_environment(tmp_path, monkeypatch):
+    monkeypatch.setattr(_session_state, "_sessions_base", lambda: tmp_path)
+    monkeypatch.setenv("PILOT_SESSION_ID", "abc")
+    assert get_session_dir() == tmp_path / "abc"
+
+    monkeypatch.delenv("PILOT_SESSION_ID")
+    assert get_session_dir() == tmp_path / "default"
+
+
+def test_load_without_state_creates_nothing(session_dir):
+    assert load_state(session_dir) == SessionState()
+    assert not session_dir.exists()
+
+
+def test_update_then_load(session_dir):
+    with update_state(session_dir) as state:
+        state.active_plan = {"plan_path": "docs/plans/x.md", "status": "PENDING"}
+        state.stop_guard = 12.5
+
+    loaded = load_state(session_dir)
+
+    assert loaded.active_plan == {"plan_path": "docs/plans/x.md", "status": "PENDING"}
+    assert loaded.stop_guard == 12.5
+    assert loaded.pre_compact is None
+
+
+def test_defaults_remove_rows(session_dir):
+    with update_state(session_dir) as state:
+        state.stop_guard = 1.0
+        state.pre_compact = {"trigger": "auto"}
+
+    with update_state(session_dir) as state:
+        state.stop_guard = None
+        state.pre_compact = None
+
+    with sqlite3.connect(session_dir / STATE_FILE) as db:
+        assert db.execute("SELECT COUNT(*) FROM state").fetchone()[0] == 0
+
+
+def test_exception_rolls_back(session_dir):
+    with update_state(session_dir) as state:
+        state.stop_guard = 1.0
+
+    with pytest.raises(RuntimeError), update_state(session_dir) as state:
+        state.stop_guard = 2.0
+        raise RuntimeError("hook failed")
+
+    assert load_state(session_dir).stop_guard == 1.0
+
+
+def test_concurrent_updates_are_not_lost(session_dir):
+    _increment(session_dir, 1)
+    context = multiprocessing.get_context("fork")
+    workers = [context.Process(target=_increment, args=(session_dir, 25)) for _ in range(4)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join(30)
+
+    assert load_state(session_dir).context_cache["count"] == 101
+
+
+class TestMigration:
+    def _write_legacy(self, session_dir):
+        session_dir.mkdir(parents=True)
+        (session_dir / "context-cache.json").write_text(json.dumps({"session_id": "s", "shown_80_warn": True}))
+        (session_dir / "context-pct.json").write_text(json.dumps({"pct": 42.0, "ts": 1.0}))
+        (session_dir / "active_plan.json").write_text(json.dumps({"plan_path": "p.md", "status": "COMPLETE"}))
+        (session_dir / "spec-stop-guard").write_text("99.5")
+        (session_dir / "pre-compact-state.json").write_text(json.dumps({"trigger": "manual"}))
+
+    def test_imports_legacy_files(self, session_dir):
+        self._write_legacy(session_dir)
+
+        state = load_state(session_dir)
+
+        assert state == SessionState(
+            context_cache={"session_id": "s", "shown_80_warn": True},
+            active_plan={"plan_path": "p.md", "status": "COMPLETE"},
+            stop_guard=99.5,
+            pre_compact={"trigger": "manual"},
+        )
+        assert sorted(path.name for path in session_dir.iterdir()) == ["active_plan.json", STATE_FILE]
+
+    def test_migrates_once(self, session_dir):
+        self._write_legacy(session_dir)
+        load_state(session_dir)
+
+        (session_dir / "spec-stop-guard").write_text("1.0")
+
+        assert load_state(session_dir).stop_guard == 99.5
+
+    def test_keeps_values_written_before_migration(self, session_dir):
+        self._write_legacy(session_dir)
+        with sqlite3.connect(session_dir / STATE_FILE) as db:
+            db.execute("CREATE TABLE state (key TEXT PRIMARY KEY, value TEXT NOT NULL)")
+            db.execute("INSERT INTO state VALUES ('active_plan', ?)", (json.dumps({"plan_path": "q.md"}),))
+
+        assert load_state(session_dir).active_plan == {"plan_path": "q.md"}
+
+    def test_skips_corrupt_files(self, session_dir):
+        session_dir.mkdir(parents=True)
+        (session_dir / "context-cache.json").write_text("{not json")
+        (session_dir / "spec-stop-guard").write_text("yesterday")
+
+        assert load_state(session_dir) == SessionState()
@@ -0,0 +1,124 @@
+"""Tests for shared file snapshots."""
+
+from __future__ import annotations
+
+import hashlib
+from unittest.mock import patch
+
+import _snapshot
+from _checkers.runner import Budget, Tool
+from _snapshot import FileSnapshot, invalidate, snapshot, snapshot_scope, write_text
+
+
+class TestFileSnapshot:
+    """A snapshot exposes content, line structure and hash of one read."""
+
+    def test_line_offsets_and_count(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("a\nbb\n\nccc")
+
+        snap = FileSnapshot.load(path)
+
+        assert snap.line_offsets == [0, 2, 5, 6]
+        assert snap.line_count == len(path.read_text().splitlines())
+        assert snap.line_number(3) == 2
+
+    def test_trailing_newline_does_not_add_a_line(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\ny = 2\n")
+
+        assert FileSnapshot.load(path).line_count == 2
+
+    def test_sha256_matches_file_bytes(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        assert FileSnapshot.load(path).sha256 == hashlib.sha256(b"x = 1\n").hexdigest()
+
+    def test_large_files_are_memory_mapped(self, tmp_path):
+        path = tmp_path / "big.ts"
+        path.write_text("const x = 1;\n" * 100)
+
+        with patch.object(_snapshot, "MMAP_THRESHOLD_BYTES", 64):
+            snap = FileSnapshot.load(path)
+
+        assert snap.is_mapped
+        assert snap.line_count == 100
+        assert snap.text == path.read_text()
+        snap.close()
+
+    def test_missing_file(self, tmp_path):
+        assert FileSnapshot.load(tmp_path / "missing.py") is None
+
+    def test_is_current_tracks_rewrites(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+        snap = FileSnapshot.load(path)
+
+        assert snap.is_current()
+        path.write_text("x = 22\n")
+        assert not snap.is_current()
+
+
+class TestScope:
+    """Within a scope every step shares one snapshot per file."""
+
+    def test_snapshot_is_shared_within_scope(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        with snapshot_scope():
+            assert snapshot(path) is snapshot(path)
+        assert snapshot(path) is not snapshot(path)
+
+    def test_seeded_snapshot_is_reused(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+        seed = FileSnapshot.load(path)
+
+        with snapshot_scope([seed]), patch.object(FileSnapshot, "load") as mock_load:
+            assert snapshot(path) is seed
+        mock_load.assert_not_called()
+
+    def test_write_text_replaces_snapshot_without_reading(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        with snapshot_scope():
+            snapshot(path)
+            write_text(path, "x = 1\ny = 2\n")
+            with patch.object(FileSnapshot, "load") as mock_load:
+                snap = snapshot(path)
+            mock_load.assert_not_called()
+            assert snap.text == "x = 1\ny = 2\n"
+            assert snap.line_count == 2
+            assert snap.is_current()
+
+    def test_invalidate_forces_reload(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        with snapshot_scope():
+            first = snapshot(path)
+            path.write_text("x = 2\n")
+            invalidate(path)
+            assert snapshot(path).text == "x = 2\n"
+            assert snapshot(path) is not first
+
+    def test_mutating_tool_drops_snapshots(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        with snapshot_scope():
+            first = snapshot(path)
+            Budget().run_all([Tool("fmt", ["true"], mutating=True)])
+            assert snapshot(path) is not first
+
+    def test_read_only_tool_keeps_snapshots(self, tmp_path):
+        path = tmp_path / "a.py"
+        path.write_text("x = 1\n")
+
+        with snapshot_scope():
+            first = snapshot(path)
+            Budget().run_all([Tool("vet", ["true"])])
+            assert snapshot(path) is first
@@ -9,6 +9,8 @@ import subprocess
 import tempfile
 from pathlib import Path
 
+from _session_state import update_state
+
 PROJECT_ROOT = str(Path(__file__).parent.parent.parent.parent)
 
 
@@ -95,13 +97,17 @@ class TestSpecVerifyValidator:
 
     TEST_SESSION_ID = "_test_verify_validator_"
 
-    def _setup_active_plan(self, plan_path: Path) -> Path:
-        """Write active_plan.json in an isolated test session directory."""
-        session_dir = Path.home() / ".pilot" / "sessions" / self.TEST_SESSION_ID
-        session_dir.mkdir(parents=True, exist_ok=True)
-        active_plan_json = session_dir / "active_plan.json"
-        active_plan_json.write_text(json.dumps({"plan_path": str(plan_path)}))
-        return active_plan_json
+    def _session_dir(self) -> Path:
+        return Path.home() / ".pilot" / "sessions" / self.TEST_SESSION_ID
+
+    def _setup_active_plan(self, plan_path: Path) -> None:
+        """Register the plan in an isolated test session's state."""
+        with update_state(self._session_dir()) as state:
+            state.active_plan = {"plan_path": str(plan_path)}
+
+    def _clear_active_plan(self) -> None:
+        with update_state(self._session_dir()) as state:
+            state.active_plan = {}
 
     def _run_validator(self, input_data: dict) -> subprocess.CompletedProcess:
         """Run spec_verify_validator with isolated PILOT_SESSION_ID."""
@@ -122,12 +128,12 @@ class TestSpecVerifyValidator:
             plan_path.parent.mkdir(parents=True, exist_ok=True)
             plan_path.write_text("# Test\n\nStatus: VERIFIED\n")
 
-            active_plan_json = self._setup_active_plan(plan_path)
+            self._setup_active_plan(plan_path)
             try:
                 result = self._run_validator({"project_root": tmpdir, "stop_hook_active": False})
                 assert result.returncode == 0, f"Should allow stop when VERIFIED. stderr: {result.stderr}"
             finally:
-                active_plan_json.unlink(missing_ok=True)
+                self._clear_active_plan()
 
     def test_blocks_stop_when_status_complete(self):
         """Should block stop when plan status is still COMPLETE."""
@@ -136,13 +142,13 @@ class TestSpecVerifyValidator:
             plan_path.parent.mkdir(parents=True, exist_ok=True)
             plan_path.write_text("# Test\n\nStatus: COMPLETE\n")
 
-            active_plan_json = self._setup_active_plan(plan_path)
+            self._setup_active_plan(plan_path)
             try:
                 result = self._run_validator({"project_root": tmpdir, "stop_hook_active": False})
                 assert result.returncode == 2, f"Should block stop when COMPLETE. stderr: {result.stderr}"
                 assert "status was not updated" in result.stderr.lower()
             finally:
-                active_plan_json.unlink(missing_ok=True)
+                self._clear_active_plan()
 
     def test_allows_stop_when_asking_user_question(self):
         """Should allow stop when AskUserQuestion was the last tool."""
@@ -162,7 +168,7 @@ class TestSpecVerifyValidator:
             }
             transcript.write_text(json.dumps(msg) + "\n")
 
-            active_plan_json = self._setup_active_plan(plan_path)
+            self._setup_active_plan(plan_path)
             try:
                 result = self._run_validator({
                     "project_root": tmpdir,
@@ -171,4 +177,4 @@ class TestSpecVerifyValidator:
                 })
                 assert result.returncode == 0, f"Should allow stop during AskUserQuestion. stderr: {result.stderr}"
             finally:
-                active_plan_json.unlink(missing_ok=True)
+                self._clear_active_plan()
@@ -15,6 +15,8 @@ from pilot.hooks.tdd_enforcer import (
     should_skip,
 )
 
+pytestmark = pytest.mark.usefixtures("no_import_graph")
+
 
 class TestIsTestFile:
     """Test is_test_file() detection."""
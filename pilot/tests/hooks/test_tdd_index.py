@@ -0,0 +1,156 @@
+"""Tests for the persistent test-file index used by the TDD enforcer."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import _tdd_index
+import pytest
+from _tdd_index import TestDirIndex, get_index, get_index_path, record_test_file
+from tdd_enforcer import check_tdd, has_python_test_file, has_typescript_test_file
+
+
+@pytest.fixture(autouse=True)
+def _fresh_index(monkeypatch):
+    """Start every test without in-memory indexes and refresh on every lookup."""
+    _tdd_index.clear_memory()
+    monkeypatch.setenv("PILOT_TEST_INDEX_TTL", "0")
+    yield
+    _tdd_index.clear_memory()
+
+
+def _touch(path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return path
+
+
+def _bump_mtime(path):
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+class TestBuild:
+    """The index holds test files only, by name, across nested directories."""
+
+    def test_indexes_nested_test_files(self, tmp_path):
+        _touch(tmp_path / "tests" / "unit" / "test_utils.py")
+        _touch(tmp_path / "tests" / "e2e" / "vault-view.spec.ts")
+        _touch(tmp_path / "tests" / "helpers.py")
+        _touch(tmp_path / "tests" / "node_modules" / "dep.test.ts")
+
+        index = get_index(tmp_path / "tests")
+
+        assert index.names == {"test_utils.py", "vault-view.spec.ts"}
+
+    def test_prefix_lookup(self, tmp_path):
+        _touch(tmp_path / "tests" / "vault-view.test.ts")
+        _touch(tmp_path / "tests" / "vaulted.test.ts")
+
+        index = get_index(tmp_path / "tests")
+
+        assert index.has_prefix("vault", ".test.ts")
+        assert not index.has_prefix("vault", ".spec.ts")
+        assert not index.has_prefix("vaulted-x", ".test.ts")
+
+    def test_persisted_under_cache_dir(self, tmp_path):
+        _touch(tmp_path / "tests" / "test_app.py")
+
+        get_index(tmp_path / "tests")
+
+        data = json.loads(get_index_path(tmp_path / "tests").read_text())
+        assert data["files"] == {"": ["test_app.py"]}
+
+
+class TestRefresh:
+    """Only directories whose mtime changed are listed again."""
+
+    def test_picks_up_added_and_removed_files(self, tmp_path):
+        tests = tmp_path / "tests"
+        old = _touch(tests / "unit" / "test_old.py")
+        get_index(tests)
+        _tdd_index.clear_memory()
+
+        old.unlink()
+        _touch(tests / "unit" / "test_new.py")
+        _bump_mtime(tests / "unit")
+
+        assert get_index(tests).names == {"test_new.py"}
+
+    def test_picks_up_new_and_removed_directories(self, tmp_path):
+        tests = tmp_path / "tests"
+        _touch(tests / "gone" / "test_gone.py")
+        index = get_index(tests)
+
+        (tests / "gone" / "test_gone.py").unlink()
+        (tests / "gone").rmdir()
+        _touch(tests / "added" / "deep" / "test_added.py")
+        _bump_mtime(tests)
+
+        assert index.refresh()
+        assert index.names == {"test_added.py"}
+        assert set(index.dirs) == {"", "added", "added/deep"}
+
+    def test_unchanged_tree_is_not_relisted(self, tmp_path, monkeypatch):
+        tests = tmp_path / "tests"
+        _touch(tests / "unit" / "test_app.py")
+        index = TestDirIndex.build(tests)
+        listed = []
+        monkeypatch.setattr(_tdd_index, "_list_dir", lambda directory: listed.append(directory))
+
+        assert not index.refresh()
+        assert listed == []
+
+    def test_ttl_skips_refresh(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TEST_INDEX_TTL", "60")
+        tests = tmp_path / "tests"
+        tests.mkdir()
+        get_index(tests)
+
+        _touch(tests / "test_late.py")
+        _bump_mtime(tests)
+
+        assert not get_index(tests).has("test_late.py")
+
+
+class TestEnforcerIntegration:
+    """Lookups go through the index; written test files are recorded immediately."""
+
+    def test_python_lookup(self, tmp_path):
+        impl = _touch(tmp_path / "src" / "utils.py")
+        _touch(tmp_path / "tests" / "unit" / "test_utils.py")
+
+        assert has_python_test_file(str(impl))
+
+    def test_typescript_parent_prefix_lookup(self, tmp_path):
+        impl = _touch(tmp_path / "src" / "VaultView" / "Panel.tsx")
+        _touch(tmp_path / "tests" / "vault-view-panel.test.tsx")
+
+        assert has_typescript_test_file(str(impl))
+
+    def test_written_test_file_is_recorded(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TEST_INDEX_TTL", "60")
+        impl = _touch(tmp_path / "src" / "utils.py")
+        (tmp_path / "tests").mkdir()
+        assert not has_python_test_file(str(impl))
+
+        test_file = _touch(tmp_path / "tests" / "test_utils.py")
+        check_tdd({"tool_name": "Write", "tool_input": {"file_path": str(test_file)}})
+
+        assert has_python_test_file(str(impl))
+
+    def test_record_ignores_unindexed_trees(self, tmp_path):
+        test_file = _touch(tmp_path / "tests" / "test_utils.py")
+
+        record_test_file(test_file, [tmp_path / "tests"])
+
+        assert not get_index_path(tmp_path / "tests").exists()
+
+    def test_disabled_falls_back_to_glob(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TEST_INDEX", "0")
+        impl = _touch(tmp_path / "src" / "utils.py")
+        _touch(tmp_path / "tests" / "test_utils.py")
+
+        assert has_python_test_file(str(impl))
+        assert not get_index_path(tmp_path / "tests").exists()
@@ -0,0 +1,110 @@
+"""Tests for the toolchain resolution cache."""
+
+from __future__ import annotations
+
+import json
+import os
+from pathlib import Path
+from unittest.mock import MagicMock
+
+import pytest
+from _checkers import toolchain
+from _checkers.toolchain import find_marker_root, resolve
+
+
+@pytest.fixture
+def cached(tmp_path, monkeypatch):
+    """Enable the cache with a session file under tmp_path and empty memory."""
+    monkeypatch.setenv("PILOT_TOOLCHAIN_CACHE", "1")
+    toolchain_path = tmp_path / "session" / "toolchain.json"
+    monkeypatch.setattr(toolchain, "get_toolchain_path", lambda: toolchain_path)
+    toolchain.clear_memory()
+    yield toolchain_path
+    toolchain.clear_memory()
+
+
+def _project(tmp_path: Path) -> Path:
+    (tmp_path / "proj" / "src").mkdir(parents=True)
+    (tmp_path / "proj" / "package.json").write_text("{}")
+    return tmp_path / "proj" / "src" / "app.ts"
+
+
+class TestResolve:
+    """Lookups hit the cache until a watched path or $PATH changes."""
+
+    def test_second_lookup_skips_resolution(self, tmp_path, cached):
+        file_path = _project(tmp_path)
+        find_binary = MagicMock(return_value="/usr/bin/eslint")
+
+        first = resolve("typescript", file_path, ("eslint",), find_binary)
+        second = resolve("typescript", file_path, ("eslint",), find_binary)
+
+        assert first == second
+        assert second.root == tmp_path / "proj"
+        assert find_binary.call_count == 1
+
+    def test_entries_persist_in_session_file(self, tmp_path, cached):
+        file_path = _project(tmp_path)
+        resolve("typescript", file_path, ("eslint",), lambda name, root: "/usr/bin/eslint")
+        toolchain.clear_memory()
+        find_binary = MagicMock()
+
+        result = resolve("typescript", file_path, ("eslint",), find_binary)
+
+        find_binary.assert_not_called()
+        assert result.get("eslint") == "/usr/bin/eslint"
+        entries = json.loads(cached.read_text())["entries"]
+        assert entries[f"typescript:{file_path.parent}"]["root"] == str(tmp_path / "proj")
+
+    def test_manifest_change_invalidates(self, tmp_path, cached):
+        file_path = _project(tmp_path)
+        find_binary = MagicMock(return_value=None)
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        manifest = tmp_path / "proj" / "package.json"
+        stat = manifest.stat()
+        os.utime(manifest, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        assert find_binary.call_count == 2
+
+    def test_node_modules_bin_change_invalidates(self, tmp_path, cached):
+        file_path = _project(tmp_path)
+        find_binary = MagicMock(return_value=None)
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        (tmp_path / "proj" / "node_modules" / ".bin").mkdir(parents=True)
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        assert find_binary.call_count == 2
+
+    def test_path_change_invalidates(self, tmp_path, cached, monkeypatch):
+        file_path = _project(tmp_path)
+        find_binary = MagicMock(return_value=None)
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        monkeypatch.setenv("PATH", f"{tmp_path}:{os.environ.get('PATH', '')}")
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        assert find_binary.call_count == 2
+
+    def test_disabled_resolves_every_time(self, tmp_path, monkeypatch):
+        monkeypatch.setenv("PILOT_TOOLCHAIN_CACHE", "0")
+        file_path = _project(tmp_path)
+        find_binary = MagicMock(return_value=None)
+
+        resolve("typescript", file_path, ("eslint",), find_binary)
+        resolve("typescript", file_path, ("eslint",), find_binary)
+
+        assert find_binary.call_count == 2
+
+
+class TestFindMarkerRoot:
+    def test_finds_nearest_marker(self, tmp_path):
+        (tmp_path / "mod" / "pkg").mkdir(parents=True)
+        (tmp_path / "mod" / "go.mod").write_text("module x\n")
+
+        assert find_marker_root(tmp_path / "mod" / "pkg" / "a.go", "go.mod") == tmp_path / "mod"
+
+    def test_no_marker(self, tmp_path):
+        assert find_marker_root(tmp_path / "a.go", "no-such-marker.xyz") is None
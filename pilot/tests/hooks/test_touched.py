@@ -0,0 +1,149 @@
+"""Tests for diff-scoped diagnostics reporting."""
+
+from __future__ import annotations
+
+import subprocess
+from pathlib import Path
+
+from _checkers.go import _split_go_output
+from _checkers.python import report_python
+from _checkers.touched import lines_from_git_diff, pre_edit_content, replaced_lines, split_touched, touched_lines
+
+
+def _git(cwd: Path, *args: str) -> None:
+    subprocess.run(["git", *args], cwd=cwd, check=True, capture_output=True)
+
+
+def _diag(line: int) -> dict:
+    return {"code": "F841", "line": line, "column": 1, "message": f"issue on {line}", "fixable": False}
+
+
+class TestTouchedLines:
+    """Touched lines come from tool_input first, then git diff."""
+
+    def test_edit_new_string(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a = 1\nb = 2\nc = 3\nd = 4\n")
+
+        assert touched_lines(path, {"old_string": "b = 1\nc = 1", "new_string": "b = 2\nc = 3"}) == {2, 3}
+
+    def test_multi_edit(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a = 1\nb = 2\nc = 3\n")
+
+        assert touched_lines(path, {"edits": [{"new_string": "a = 1"}, {"new_string": "c = 3"}]}) == {1, 3}
+
+    def test_no_tool_input_reports_everything(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("a = 1\n")
+
+        assert touched_lines(path) is None
+
+    def test_write_uses_git_diff(self, tmp_path):
+        _git(tmp_path, "init", "-q")
+        _git(tmp_path, "-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "--allow-empty", "-m", "init")
+        path = tmp_path / "app.py"
+        path.write_text("a = 1\nb = 2\nc = 3\n")
+        _git(tmp_path, "add", "app.py")
+        _git(tmp_path, "-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "add")
+        path.write_text("a = 1\nb = 20\nc = 3\nd = 4\n")
+
+        assert touched_lines(path, {"content": path.read_text()}) == {2, 4}
+
+    def test_deletion_touches_lines_around_it(self, tmp_path):
+        _git(tmp_path, "init", "-q")
+        path = tmp_path / "app.py"
+        path.write_text("a = 1\nb = 2\nc = 3\nd = 4\n")
+        _git(tmp_path, "add", "app.py")
+        _git(tmp_path, "-c", "user.email=t@t", "-c", "user.name=t", "commit", "-q", "-m", "add")
+        path.write_text("a = 1\nb = 2\nd = 4\n")
+
+        assert touched_lines(path, {"old_string": "c = 3\n", "new_string": ""}) == {2, 3}
+
+    def test_reformatted_replacement_falls_back_to_git(self, tmp_path):
+        path = tmp_path / "app.py"
+        path.write_text("x = [1, 2]\n")
+
+        assert touched_lines(path, {"new_string": "x = [1,2]"}) == lines_from_git_diff(path)
+        assert lines_from_git_diff(path) is None
+
+
+class TestPreEditContent:
+    """The file before an edit is rebuilt by undoing its replacements."""
+
+    def test_edit_is_undone(self):
+        assert pre_edit_content("a = 1\nb = 3\n", {"old_string": "b = 2", "new_string": "b = 3"}) == "a = 1\nb = 2\n"
+
+    def test_multi_edit_is_undone_in_reverse(self):
+        edits = [{"old_string": "x", "new_string": "y"}, {"old_string": "y = 1", "new_string": "z = 1"}]
+
+        assert pre_edit_content("z = 1\n", {"edits": edits}) == "x = 1\n"
+
+    def test_deletion_cannot_be_undone(self):
+        assert pre_edit_content("a = 1\n", {"old_string": "b = 2\n", "new_string": ""}) is None
+
+    def test_ambiguous_replacement_cannot_be_undone(self):
+        assert pre_edit_content("x = 1\nx = 1\n", {"old_string": "x = 0", "new_string": "x = 1"}) is None
+
+    def test_replaced_lines_are_found_before_the_edit(self):
+        previous = "a = 1\nb = 2\nc = 3\n"
+
+        assert replaced_lines(previous, {"old_string": "b = 2\nc = 3", "new_string": "b = 2"}) == {2, 3}
+        assert replaced_lines(previous, {"old_string": "", "new_string": "d = 4"}) is None
+
+
+class TestSplitTouched:
+    def test_collapses_untouched(self):
+        shown, hidden = split_touched([_diag(1), _diag(5), _diag(9)], {5}, lambda d: d["line"])
+
+        assert [d["line"] for d in shown] == [5]
+        assert hidden == 2
+
+    def test_new_issue_off_touched_lines_is_shown(self):
+        shown, hidden = split_touched(
+            [_diag(1), _diag(9)], {5}, lambda d: d["line"], lambda d: d["message"] == "issue on 1"
+        )
+
+        assert [d["line"] for d in shown] == [9]
+        assert hidden == 1
+
+    def test_unknown_touched_shows_all(self):
+        assert split_touched([_diag(1)], None, lambda d: d["line"]) == ([_diag(1)], 0)
+
+    def test_go_context_lines_follow_their_issue(self, tmp_path):
+        lines = ["main.go:3:2: unused x (unused)", "\tx := 1", "main.go:9:1: bad (vet)", "other.go:1:1: dep"]
+
+        shown, hidden = _split_go_output(tmp_path / "main.go", lines, {3})
+
+        assert shown == ["main.go:3:2: unused x (unused)", "\tx := 1", "other.go:1:1: dep"]
+        assert hidden == 1
+
+
+class TestReport:
+    def test_python_report_collapses_pre_existing_issues(self, tmp_path, capsys):
+        path = tmp_path / "legacy.py"
+        path.write_text("".join(f"v{i} = {i}\n" for i in range(1, 11)))
+        results = {"ruff": (3, [_diag(2), _diag(7), _diag(9)])}
+
+        exit_code, reason = report_python(path, results, {"new_string": "v7 = 7"})
+
+        err = capsys.readouterr().err
+        assert exit_code == 2
+        assert reason == "Python: 3 ruff in legacy.py"
+        assert "issue on 7" in err
+        assert "issue on 2" not in err
+        assert "+ 2 issues on lines this edit did not touch" in err
+
+    def test_python_report_labels_only_cached_issues_pre_existing(self, tmp_path, capsys):
+        path = tmp_path / "legacy.py"
+        path.write_text("".join(f"v{i} = {i}\n" for i in range(1, 11)))
+        results = {"ruff": (3, [_diag(2), _diag(7), _diag(9)])}
+        previous = {"ruff": [1, [_diag(2)]]}
+
+        report_python(path, results, {"new_string": "v7 = 7"}, previous)
+
+        err = capsys.readouterr().err
+        assert "issue on 7" in err
+        assert "issue on 9" in err
+        assert "issue on 2" not in err
+        assert "+ 1 pre-existing issue on lines this edit did not touch" in err
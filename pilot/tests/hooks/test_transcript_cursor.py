@@ -0,0 +1,90 @@
+"""Tests for the incremental transcript cursor."""
+
+from __future__ import annotations
+
+import json
+import os
+
+import pytest
+from _transcript_cursor import advance, get_cursor_path, last_assistant_summary
+
+
+def _assistant(*tools):
+    return {
+        "type": "assistant",
+        "message": {"content": [{"type": "tool_use", "name": name, "input": {}} for name in tools]},
+    }
+
+
+def _append(transcript, *messages, trailer=""):
+    with transcript.open("a") as f:
+        f.write("".join(json.dumps(msg) + "\n" for msg in messages) + trailer)
+
+
+@pytest.fixture
+def transcript(tmp_path):
+    return tmp_path / "transcript.jsonl"
+
+
+@pytest.fixture
+def cursor_dir(tmp_path):
+    return tmp_path / "cursors"
+
+
+def test_parses_only_appended_lines(transcript, cursor_dir, monkeypatch):
+    _append(transcript, _assistant("Write"), {"type": "user"})
+    assert last_assistant_summary(transcript, cursor_dir) == {"tool_uses": ["Write"]}
+    parsed = []
+    original = json.loads
+    monkeypatch.setattr("_transcript_cursor.json.loads", lambda text: parsed.append(text) or original(text))
+
+    _append(transcript, _assistant("AskUserQuestion"))
+
+    assert last_assistant_summary(transcript, cursor_dir) == {"tool_uses": ["AskUserQuestion"]}
+    transcript_lines = [text for text in parsed if isinstance(text, bytes)]
+    assert len(transcript_lines) == 1
+    assert b"AskUserQuestion" in transcript_lines[0]
+
+
+def test_unchanged_transcript_is_not_read(transcript, cursor_dir):
+    _append(transcript, _assistant("Write"))
+    last_assistant_summary(transcript, cursor_dir)
+    cursor = json.loads(get_cursor_path(transcript, cursor_dir).read_text())
+
+    assert advance(transcript, cursor) is cursor
+    assert cursor["offset"] == transcript.stat().st_size
+
+
+def test_keeps_last_assistant_when_only_other_lines_follow(transcript, cursor_dir):
+    _append(transcript, _assistant("AskUserQuestion"))
+    last_assistant_summary(transcript, cursor_dir)
+
+    _append(transcript, {"type": "user"}, {"type": "system"})
+
+    assert last_assistant_summary(transcript, cursor_dir) == {"tool_uses": ["AskUserQuestion"]}
+
+
+def test_partial_line_is_read_again(transcript, cursor_dir):
+    _append(transcript, _assistant("Write"), trailer='{"type": "assistant", "mess')
+    assert last_assistant_summary(transcript, cursor_dir) == {"tool_uses": ["Write"]}
+
+    with transcript.open("a") as f:
+        f.write('age": {"content": [{"type": "tool_use", "name": "AskUserQuestion"}]}}\n')
+
+    assert last_assistant_summary(transcript, cursor_dir) == {"tool_uses": ["AskUserQuestion"]}
+
+
+def test_replaced_transcript_is_read_from_the_start(transcript, cursor_dir, tmp_path):
+    _append(transcript, _assistant("AskUserQuestion"), {"type": "user"}, {"type": "user"})
+    last_assistant_summary(transcript, cursor_dir)
+
+    replacement = tmp_path / "replacement.jsonl"
+    _append(replacement, {"type": "user"})
+    os.replace(replacement, transcript)
+
+    assert last_assistant_summary(transcript, cursor_dir) is None
+
+
+def test_missing_transcript_raises(transcript, cursor_dir):
+    with pytest.raises(OSError):
+        last_assistant_summary(transcript, cursor_dir)
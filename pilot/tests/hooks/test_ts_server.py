@@ -0,0 +1,116 @@
+"""Tests for the warm ESLint/Prettier server and its client."""
+
+from __future__ import annotations
+
+import json
+import shutil
+import subprocess
+import time
+from pathlib import Path
+from unittest.mock import patch
+
+import pytest
+from _checkers import ts_server
+
+FAKE_ESLINT = """
+let instances = 0;
+class ESLint {
+  constructor() { instances += 1; this.instance = instances; }
+  async lintFiles(files) {
+    const src = require("fs").readFileSync(files[0], "utf8");
+    const count = (src.match(/\\bvar\\b/g) || []).length;
+    const messages = Array.from({ length: count }, () => ({
+      line: 1, ruleId: "no-var", message: "Unexpected var", severity: 2,
+    }));
+    return [{ filePath: files[0], errorCount: count, warningCount: 0, messages, source: src, instance: this.instance }];
+  }
+}
+module.exports = { ESLint };
+"""
+
+FAKE_PRETTIER = """
+module.exports = {
+  async getFileInfo() { return { ignored: false, inferredParser: "typescript" }; },
+  async resolveConfig() { return {}; },
+  async format(src) { return src.replace(/ +$/gm, ""); },
+};
+"""
+
+
+def _make_project(root: Path) -> Path:
+    (root / "package.json").write_text('{"name": "app"}')
+    for name, source in (("eslint", FAKE_ESLINT), ("prettier", FAKE_PRETTIER)):
+        pkg = root / "node_modules" / name
+        pkg.mkdir(parents=True)
+        (pkg / "package.json").write_text(json.dumps({"name": name, "main": "index.js"}))
+        (pkg / "index.js").write_text(source)
+    src = root / "src" / "app.ts"
+    src.parent.mkdir()
+    src.write_text("var x = 1;   \n")
+    return src
+
+
+class TestClientFallback:
+    """The client returns None whenever the CLI path should be used."""
+
+    def test_no_local_eslint_skips_server(self, tmp_path: Path) -> None:
+        """Projects without node_modules/eslint never start a server."""
+        (tmp_path / "app.ts").write_text("const x = 1;\n")
+
+        with patch.object(ts_server, "spawn_server") as mock_spawn:
+            assert ts_server.check_via_server(tmp_path, tmp_path / "app.ts", True) is None
+
+        mock_spawn.assert_not_called()
+
+    def test_unreachable_server_is_spawned(self, tmp_path: Path, monkeypatch) -> None:
+        """A missing server is started in the background and the CLI is used for this edit."""
+        src = _make_project(tmp_path)
+        monkeypatch.setattr(ts_server, "get_server_socket_path", lambda _root: tmp_path / "missing.sock")
+
+        with patch.object(ts_server, "spawn_server") as mock_spawn:
+            assert ts_server.check_via_server(tmp_path, src, True) is None
+
+        mock_spawn.assert_called_once_with(tmp_path)
+
+    def test_disabled_by_env(self, tmp_path: Path, monkeypatch) -> None:
+        """PILOT_TS_SERVER=0 always uses the CLI."""
+        src = _make_project(tmp_path)
+        monkeypatch.setenv("PILOT_TS_SERVER", "0")
+
+        with patch.object(ts_server, "spawn_server") as mock_spawn:
+            assert ts_server.check_via_server(tmp_path, src, True) is None
+
+        mock_spawn.assert_not_called()
+
+
+@pytest.mark.skipif(shutil.which("node") is None, reason="node not installed")
+class TestServerRoundTrip:
+    """A real Node server formats, lints and reloads on config change."""
+
+    def test_format_lint_and_reload(self, tmp_path: Path, monkeypatch) -> None:
+        src = _make_project(tmp_path)
+        socket_path = tmp_path / "ts.sock"
+        monkeypatch.setattr(ts_server, "get_server_socket_path", lambda _root: socket_path)
+
+        proc = subprocess.Popen(["node", str(ts_server.SERVER_SCRIPT), str(tmp_path), str(socket_path), "20"])
+        try:
+            deadline = time.time() + 10
+            while not socket_path.exists() and time.time() < deadline:
+                time.sleep(0.05)
+
+            first = ts_server.check_via_server(tmp_path, src, True)
+
+            assert first is not None
+            assert src.read_text() == "var x = 1;\n"
+            assert first[0]["errorCount"] == 1
+            assert "source" not in first[0]
+
+            assert ts_server.check_via_server(tmp_path, src, True)[0]["instance"] == first[0]["instance"]
+
+            (tmp_path / "eslint.config.js").write_text("module.exports = [];\n")
+            reloaded = ts_server.check_via_server(tmp_path, src, True)
+
+            assert reloaded[0]["instance"] > first[0]["instance"]
+        finally:
+            proc.kill()
+            proc.wait(timeout=10)
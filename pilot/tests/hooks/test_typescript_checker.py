@@ -6,6 +6,7 @@ import json
 from pathlib import Path
 from unittest.mock import MagicMock, patch
 
+import pytest
 from _checkers.typescript import (
     TS_EXTENSIONS,
     check_typescript,
@@ -14,6 +15,8 @@ from _checkers.typescript import (
     strip_typescript_comments,
 )
 
+pytestmark = pytest.mark.usefixtures("uncached_toolchain")
+
 
 class TestTsExtensions:
     """Verify supported file extensions."""
@@ -102,6 +105,16 @@ class TestStripTypescriptComments:
         assert result is False
         assert "https://example.com" in ts_file.read_text()
 
+    def test_preserves_url_in_jsx_text_of_js_file(self, tmp_path: Path) -> None:
+        """Plain .js files can hold JSX, so URLs in element text are kept."""
+        js_file = tmp_path / "link.js"
+        js_file.write_text('export default () => <a href="x">http://foo.com</a>;\n')
+
+        result = strip_typescript_comments(js_file)
+
+        assert result is False
+        assert js_file.read_text() == 'export default () => <a href="x">http://foo.com</a>;\n'
+
     def test_no_comments_returns_false(self, tmp_path: Path) -> None:
         """Files without comments return False."""
         ts_file = tmp_path / "app.ts"
@@ -256,7 +269,7 @@ class TestCheckTypescriptEslintIssues:
             patch("_checkers.typescript.check_file_length"),
             patch("_checkers.typescript.find_project_root", return_value=None),
             patch("_checkers.typescript.find_tool", side_effect=lambda name, _: f"/usr/bin/{name}" if name in ("prettier", "eslint") else None),
-            patch("_checkers.typescript.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_typescript(ts_file)
 
@@ -287,7 +300,7 @@ class TestCheckTypescriptCleanFile:
             patch("_checkers.typescript.check_file_length"),
             patch("_checkers.typescript.find_project_root", return_value=None),
             patch("_checkers.typescript.find_tool", side_effect=lambda name, _: f"/usr/bin/{name}" if name in ("prettier", "eslint") else None),
-            patch("_checkers.typescript.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
         ):
             exit_code, reason = check_typescript(ts_file)
 
@@ -320,7 +333,7 @@ class TestCheckTypescriptTscNotCalled:
             patch("_checkers.typescript.check_file_length"),
             patch("_checkers.typescript.find_project_root", return_value=None),
             patch("_checkers.typescript.find_tool", side_effect=lambda name, _: f"/usr/bin/{name}"),
-            patch("_checkers.typescript.subprocess.run", side_effect=run_side_effect),
+            patch("_checkers.runner.subprocess.run", side_effect=run_side_effect),
         ):
             check_typescript(ts_file)
 
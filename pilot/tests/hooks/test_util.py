@@ -26,8 +26,6 @@ from _util import (  # type: ignore[import-not-found]
     check_file_length,
     find_git_root,
     get_edited_file_from_stdin,
-    get_session_cache_path,
-    get_session_plan_path,
     is_waiting_for_user_input,
     read_hook_stdin,
 )
@@ -57,32 +55,6 @@ def test_sessions_base_returns_path():
     assert base == Path.home() / ".pilot" / "sessions"
 
 
-@patch.dict("os.environ", {"PILOT_SESSION_ID": "test-session-123"})
-def test_get_session_cache_path_with_session_id():
-    """get_session_cache_path returns session-scoped cache path."""
-    path = get_session_cache_path()
-    assert isinstance(path, Path)
-    assert "test-session-123" in str(path)
-    assert path.name == "context-cache.json"
-
-
-@patch.dict("os.environ", {}, clear=True)
-def test_get_session_cache_path_defaults_to_default():
-    """get_session_cache_path uses 'default' when PILOT_SESSION_ID is missing."""
-    path = get_session_cache_path()
-    assert isinstance(path, Path)
-    assert "default" in str(path)
-
-
-@patch.dict("os.environ", {"PILOT_SESSION_ID": "test-session-456"})
-def test_get_session_plan_path():
-    """get_session_plan_path returns session-scoped active plan path."""
-    path = get_session_plan_path()
-    assert isinstance(path, Path)
-    assert "test-session-456" in str(path)
-    assert path.name == "active_plan.json"
-
-
 @patch("subprocess.run")
 def test_find_git_root_success(mock_run):
     """find_git_root returns git root when in repo."""